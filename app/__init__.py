@@ -1,10 +1,10 @@
 import logging
 import os
 
-import nltk
 from flask import Flask
 
 from app.models import db
+from app.guards.rate_limiter import RateLimiter
 from app.routes.auth import auth_bp
 from app.routes.workouts import workouts_bp
 from app.routes.leaderboard import leaderboard_bp
@@ -12,10 +12,35 @@ from app.routes.main import main_bp
 from app.routes.stats import stats_bp
 from app.routes.user import user_bp
 from app.routes.groups import groups_bp
+from app.routes.admin import admin_bp
+from app.routes.metrics import metrics_bp
+from app.services.metrics_service import MetricsService
+from app.services.prefetch_service import PrefetchService
+from app.services.profiler_service import ProfilerService
+from app.services.query_stats_service import QueryStatsService
+from app.services.telemetry_service import TelemetryService
 
 from scripts.init_db import init_db
 
 
+def _warm_up(app, logger):
+    """Import nltk/openai, verify the corpora and build shared clients."""
+    from app.services.movement_service import get_lemmatizer, missing_nltk_corpora
+    from app.services.openai_service import _get_client
+
+    if not app.config.get("SKIP_NLTK_DOWNLOAD"):
+        missing = missing_nltk_corpora()
+        if missing:
+            logger.warning(
+                "NLTK corpora missing: %s. Run `python scripts/download_nltk_data.py`; "
+                "movement matching falls back to simple plural stripping until then.",
+                ", ".join(missing),
+            )
+        else:
+            get_lemmatizer()
+    _get_client()
+
+
 def create_app(test_config=None):
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
@@ -35,14 +60,92 @@ def create_app(test_config=None):
     app.config.setdefault("IMPACT_BODYWEIGHT_FACTOR", float(os.getenv("IMPACT_BODYWEIGHT_FACTOR", 0.25)))
     app.config.setdefault("IMPACT_MIN_EFFECTIVE_LOAD", float(os.getenv("IMPACT_MIN_EFFECTIVE_LOAD", 0.0)))
 
+    app.config.setdefault("AI_REQUEST_BUDGET_SECONDS", float(os.getenv("AI_REQUEST_BUDGET_SECONDS", 45)))
+    app.config.setdefault("AI_BACKOFF_BASE_SECONDS", float(os.getenv("AI_BACKOFF_BASE_SECONDS", 0.5)))
+    app.config.setdefault("AI_BACKOFF_MAX_SECONDS", float(os.getenv("AI_BACKOFF_MAX_SECONDS", 8)))
+    app.config.setdefault("AI_CIRCUIT_FAILURE_RATE", float(os.getenv("AI_CIRCUIT_FAILURE_RATE", 0.5)))
+    app.config.setdefault("AI_CIRCUIT_MIN_CALLS", int(os.getenv("AI_CIRCUIT_MIN_CALLS", 5)))
+    app.config.setdefault("AI_CIRCUIT_WINDOW_SIZE", int(os.getenv("AI_CIRCUIT_WINDOW_SIZE", 20)))
+    app.config.setdefault("AI_CIRCUIT_RESET_SECONDS", float(os.getenv("AI_CIRCUIT_RESET_SECONDS", 30)))
+
+    app.config.setdefault("TELEMETRY_ENABLED", os.getenv("TELEMETRY_ENABLED", "true").lower() != "false")
+    app.config.setdefault("TELEMETRY_BATCH_SIZE", int(os.getenv("TELEMETRY_BATCH_SIZE", 50)))
+    app.config.setdefault("TELEMETRY_FLUSH_SECONDS", float(os.getenv("TELEMETRY_FLUSH_SECONDS", 5)))
+
+    # Per-request SQL counts/timings, Server-Timing headers and the slow-query log
+    app.config.setdefault(
+        "SQL_INSTRUMENTATION_ENABLED", os.getenv("SQL_INSTRUMENTATION_ENABLED", "false").lower() == "true"
+    )
+    app.config.setdefault("SQL_SLOW_QUERY_MS", float(os.getenv("SQL_SLOW_QUERY_MS", 200)))
+    app.config.setdefault("SQL_STATS_WINDOW", int(os.getenv("SQL_STATS_WINDOW", 500)))
+
+    # Served at /metrics; set METRICS_MULTIPROC_DIR under multi-worker gunicorn
+    app.config.setdefault("METRICS_ENABLED", os.getenv("METRICS_ENABLED", "true").lower() != "false")
+    app.config.setdefault(
+        "METRICS_MULTIPROC_DIR", os.getenv("METRICS_MULTIPROC_DIR") or os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    )
+    app.config.setdefault("METRICS_FLUSH_SECONDS", float(os.getenv("METRICS_FLUSH_SECONDS", 5)))
+    app.config.setdefault("METRICS_TOKEN", os.getenv("METRICS_TOKEN"))
+    # Without a token, /metrics is admin-only unless public (always public under the debug server)
+    app.config.setdefault(
+        "METRICS_PUBLIC",
+        os.getenv("METRICS_PUBLIC", "true" if app.config.get("TESTING") else "false").lower() == "true",
+    )
+
+    # Admin-only request profiling via "X-Profile: 1" or "?__profile=1"
+    app.config.setdefault("PROFILING_ENABLED", os.getenv("PROFILING_ENABLED", "true").lower() != "false")
+    app.config.setdefault("PROFILE_DIR", os.getenv("PROFILE_DIR"))
+    app.config.setdefault("PROFILE_MAX_FILES", int(os.getenv("PROFILE_MAX_FILES", 50)))
+    app.config.setdefault("PROFILE_SAMPLE_INTERVAL_MS", float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5)))
+    app.config.setdefault("PROFILE_MAX_SECONDS", float(os.getenv("PROFILE_MAX_SECONDS", 30)))
+
+    app.config.setdefault("PLAN_CACHE_ENABLED", os.getenv("PLAN_CACHE_ENABLED", "true").lower() != "false")
+    app.config.setdefault("PLAN_CACHE_MAX_SERVES", int(os.getenv("PLAN_CACHE_MAX_SERVES", 5)))
+    app.config.setdefault("PLAN_CACHE_TTL_HOURS", float(os.getenv("PLAN_CACHE_TTL_HOURS", 72)))
+    app.config.setdefault("PLAN_CACHE_BODYWEIGHT_BUCKET_KG", float(os.getenv("PLAN_CACHE_BODYWEIGHT_BUCKET_KG", 10)))
+
+    app.config.setdefault(
+        "PREFETCH_ENABLED",
+        os.getenv("PREFETCH_ENABLED", "false" if app.config.get("TESTING") else "true").lower() != "false",
+    )
+    app.config.setdefault("PREFETCH_ASYNC", os.getenv("PREFETCH_ASYNC", "true").lower() != "false")
+    app.config.setdefault("PREFETCH_MAX_WORKERS", int(os.getenv("PREFETCH_MAX_WORKERS", 2)))
+
+    app.config.setdefault("PLAN_DRAFT_TTL_HOURS", float(os.getenv("PLAN_DRAFT_TTL_HOURS", 24)))
+
+    # "legacy" writes Rep + Weight + SetEntry per set; "entries" writes SetEntry only
+    app.config.setdefault("SET_STORAGE_MODE", os.getenv("SET_STORAGE_MODE", "legacy").lower())
+
+    # In-process front-end for the LLM rate limiter: "none" or "token_bucket" (single-node only)
+    app.config.setdefault("RATE_LIMIT_FRONTEND", os.getenv("RATE_LIMIT_FRONTEND", "none").lower())
+
+    app.config.setdefault(
+        "ADMIN_USERNAMES",
+        {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()},
+    )
+
+    # Schema changes are a deploy step (scripts/migrate_db.py); only tests create tables on boot
+    app.config.setdefault(
+        "DB_AUTO_CREATE",
+        os.getenv("DB_AUTO_CREATE", "true" if app.config.get("TESTING") else "false").lower() == "true",
+    )
+
     if app.config.get("ENV", "development") == "development":
         logger.info("Running in development mode.")
 
-    if not app.config.get("TESTING") and not app.config.get("SKIP_NLTK_DOWNLOAD"):
-        nltk.download("wordnet")
-        nltk.download("omw-1.4")
+    # Fast-start mode leaves nltk and the OpenAI client to be built on first use;
+    # otherwise warm them up here so the first request doesn't pay for it.
+    app.config.setdefault("FAST_START", os.getenv("FAST_START", "false").lower() == "true")
+    if not app.config.get("TESTING") and not app.config.get("FAST_START"):
+        _warm_up(app, logger)
 
     init_db(app)
+    TelemetryService.init_app(app)
+    QueryStatsService.init_app(app)
+    MetricsService.init_app(app)
+    ProfilerService.init_app(app)
+    PrefetchService.init_app(app)
+    RateLimiter.configure_frontend(app.config["RATE_LIMIT_FRONTEND"])
 
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
@@ -51,6 +154,8 @@ def create_app(test_config=None):
     app.register_blueprint(stats_bp)
     app.register_blueprint(leaderboard_bp)
     app.register_blueprint(groups_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(metrics_bp)
 
 
 
@@ -1,12 +1,19 @@
 """
 Guards module - Input validation, rate limiting, and content filtering.
 """
-from app.guards.decorators import require_auth, rate_limit_llm
+from app.guards.decorators import (
+    require_auth,
+    require_admin,
+    is_admin_session,
+    rate_limit_llm,
+    refund_llm_reservation,
+)
 from app.guards.validators import (
     WorkoutGenerationInput,
     WeeklyWorkoutGenerationInput,
     MovementInput,
     PendingWorkoutUpdateInput,
+    SetChangeInput,
     UserProfileInput,
     ValidationError,
     validate_request,
@@ -15,17 +22,21 @@ from app.guards.validators import (
     VALID_SEXES,
 )
 from app.guards.content_filter import ContentFilter, ContentFilterError
-from app.guards.rate_limiter import RateLimiter, RateLimitExceeded
+from app.guards.rate_limiter import RateLimiter, RateLimitExceeded, Reservation
 
 __all__ = [
     # Decorators
     "require_auth",
+    "require_admin",
+    "is_admin_session",
     "rate_limit_llm",
+    "refund_llm_reservation",
     # Validators
     "WorkoutGenerationInput",
     "WeeklyWorkoutGenerationInput",
     "MovementInput",
     "PendingWorkoutUpdateInput",
+    "SetChangeInput",
     "UserProfileInput",
     "ValidationError",
     "validate_request",
@@ -38,4 +49,5 @@ __all__ = [
     # Rate Limiter
     "RateLimiter",
     "RateLimitExceeded",
+    "Reservation",
 ]
@@ -1,10 +1,14 @@
 """
 Decorators - Authentication and rate limiting decorators.
 """
+import logging
 from functools import wraps
-from flask import session, redirect, url_for, flash, jsonify, request
+from flask import session, redirect, url_for, flash, jsonify, request, current_app, g
 
 from app.guards.rate_limiter import RateLimiter, RateLimitExceeded
+from app.models import db, User
+
+logger = logging.getLogger(__name__)
 
 
 def require_auth(f):
@@ -24,15 +28,45 @@ def require_auth(f):
     return decorated_function
 
 
+def is_admin_session() -> bool:
+    """True when the logged-in user is listed in the ADMIN_USERNAMES config value."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return False
+    user = db.session.get(User, user_id)
+    admins = current_app.config.get('ADMIN_USERNAMES') or set()
+    return bool(user and user.username in admins)
+
+
+def require_admin(f):
+    """
+    Decorator that restricts a view to admin users.
+
+    Admins are the usernames listed in the ADMIN_USERNAMES config value.
+    Returns 401 when not logged in and 403 for non-admin users.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not session.get('user_id'):
+            return jsonify({'error': 'Unauthorized access'}), 401
+        if not is_admin_session():
+            return jsonify({'error': 'Forbidden'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+
 def rate_limit_llm(f):
     """
     Decorator that enforces rate limiting for LLM API calls.
 
     Must be used after @require_auth since it needs user_id in session.
 
+    Quota is reserved before the view runs and refunded if the view raises
+    or calls refund_llm_reservation().
+
     Limits:
-    - 10 requests per hour
-    - 30 requests per day
+    - 20 requests per hour
+    - 50 requests per day
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -44,7 +78,7 @@ def rate_limit_llm(f):
             return redirect(url_for('auth.login'))
 
         try:
-            RateLimiter.check_and_increment(user_id)
+            g.llm_reservation = RateLimiter.reserve(user_id)
         except RateLimitExceeded as e:
             if request.is_json:
                 return jsonify({
@@ -65,5 +99,25 @@ def rate_limit_llm(f):
             # Always redirect to dashboard, not back to the form page
             return redirect(url_for('main_bp.index'))
 
-        return f(*args, **kwargs)
+        try:
+            return f(*args, **kwargs)
+        except Exception:
+            refund_llm_reservation()
+            raise
     return decorated_function
+
+
+def refund_llm_reservation():
+    """
+    Give back the quota reserved by @rate_limit_llm for this request.
+
+    Call from a view's error handling when the LLM call failed (or was never
+    made), so failed generations don't count against the user's limits.
+    """
+    reservation = g.pop('llm_reservation', None)
+    if reservation is not None:
+        try:
+            RateLimiter.refund(reservation)
+        except Exception as e:
+            # The request's own session is left alone; its pending work isn't ours to discard
+            logger.warning(f"Quota refund failed for user {reservation.user_id}: {e}")
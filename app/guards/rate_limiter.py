@@ -1,11 +1,16 @@
 """
 Rate Limiter - DB-backed rate limiting for LLM calls.
 """
+import math
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional
-import pytz
+from typing import Dict, Optional, Tuple
 
-from app.models import User, db
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models import RateLimitCounter, db
 
 
 class RateLimitExceeded(Exception):
@@ -30,84 +35,338 @@ class RateLimitExceeded(Exception):
         super().__init__(self.message)
 
 
+class TokenBucketFrontend:
+    """
+    In-process token buckets checked before the database counters.
+
+    Each (user, period) bucket holds up to the period's limit and refills at
+    limit / period length. An empty bucket rejects the request without a
+    database round-trip; a request that passes still goes through the
+    database counters, which remain authoritative. Buckets are per process,
+    so this only saves work on single-node deployments.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[int, str], Tuple[float, float]] = {}
+
+    def try_acquire(self, user_id: int, limits: Dict[str, Tuple[int, float]]) -> Optional[Tuple[str, float]]:
+        """
+        Take one token from every period's bucket.
+
+        Args:
+            limits: {period: (limit, period_seconds)}
+
+        Returns None on success, or (period, seconds_until_next_token) when
+        a bucket is empty (no tokens are taken in that case).
+        """
+        now = time.monotonic()
+        with self._lock:
+            refreshed = {}
+            for period, (limit, seconds) in limits.items():
+                tokens, last = self._buckets.get((user_id, period), (float(limit), now))
+                rate = limit / seconds
+                tokens = min(float(limit), tokens + (now - last) * rate)
+                if tokens < 1:
+                    return period, (1 - tokens) / rate
+                refreshed[period] = tokens
+
+            for period, tokens in refreshed.items():
+                self._buckets[(user_id, period)] = (tokens - 1, now)
+        return None
+
+    def refund(self, user_id: int, limits: Dict[str, Tuple[int, float]]) -> None:
+        """Return one token to every period's bucket (capped at the limit)."""
+        with self._lock:
+            for period, (limit, _) in limits.items():
+                key = (user_id, period)
+                if key in self._buckets:
+                    tokens, last = self._buckets[key]
+                    self._buckets[key] = (min(float(limit), tokens + 1), last)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class Reservation:
+    """
+    Quota taken by RateLimiter.reserve for one LLM request.
+
+    window_ends maps each period to the end of the window the request was
+    counted in, so a refund can find it even after the window has rolled.
+    """
+
+    def __init__(self, user_id: int, window_ends: Dict[str, datetime]):
+        self.user_id = user_id
+        self.window_ends = window_ends
+        self.refunded = False
+
+
 class RateLimiter:
     """
-    Database-backed rate limiter for LLM API calls.
+    Database-backed sliding-window rate limiter for LLM API calls.
+
+    Counters live in RateLimitCounters, one row per user and period, holding
+    the current aligned window's count and the previous window's count. A
+    request is allowed while
+
+        prev_count * (1 - elapsed / period) + count < limit
+
+    which smooths out the 2x burst a fixed window allows at its boundary.
+    Each check is a pair of atomic conditional UPDATEs in one transaction,
+    so concurrent requests can never exceed the limit and the Users row is
+    never touched.
+
+    Quota is reserved before the LLM call and refunded if the call fails
+    (see reserve/refund and the rate_limit_llm decorator).
 
     Limits:
-    - 10 requests per hour
-    - 30 requests per day
+    - 20 requests per hour
+    - 50 requests per day
+
+    An optional in-process front-end (RATE_LIMIT_FRONTEND=token_bucket)
+    rejects requests from exhausted users before reaching the database.
     """
 
     HOURLY_LIMIT = 20
     DAILY_LIMIT = 50
 
+    PERIOD_LENGTHS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+    FRONTENDS = {
+        "token_bucket": TokenBucketFrontend,
+    }
+
+    frontend: Optional[TokenBucketFrontend] = None
+
     @staticmethod
-    def check_and_increment(user_id: int) -> None:
+    def configure_frontend(name: Optional[str]) -> None:
+        """Install the named in-process front-end, or remove it for 'none'/None."""
+        if not name or name == "none":
+            RateLimiter.frontend = None
+            return
+        if name not in RateLimiter.FRONTENDS:
+            raise ValueError(f"Unknown rate limit front-end: {name}")
+        RateLimiter.frontend = RateLimiter.FRONTENDS[name]()
+
+    @staticmethod
+    def _periods(now: datetime) -> Dict[str, Tuple[int, datetime, datetime]]:
+        """{period: (limit, current window start, current window end)}"""
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            "hour": (RateLimiter.HOURLY_LIMIT, hour_start, hour_start + RateLimiter.PERIOD_LENGTHS["hour"]),
+            # Daily windows are aligned to midnight UTC
+            "day": (RateLimiter.DAILY_LIMIT, day_start, day_start + RateLimiter.PERIOD_LENGTHS["day"]),
+        }
+
+    @staticmethod
+    def _previous_weight(now: datetime, window_start: datetime, window_end: datetime) -> float:
+        """Share of the previous window still inside the sliding window."""
+        elapsed = (now - window_start).total_seconds()
+        length = (window_end - window_start).total_seconds()
+        return max(0.0, 1.0 - elapsed / length)
+
+    @staticmethod
+    def _frontend_limits() -> Dict[str, Tuple[int, float]]:
+        lengths = RateLimiter.PERIOD_LENGTHS
+        return {
+            "hour": (RateLimiter.HOURLY_LIMIT, lengths["hour"].total_seconds()),
+            "day": (RateLimiter.DAILY_LIMIT, lengths["day"].total_seconds()),
+        }
+
+    @staticmethod
+    def _increment(user_id: int, period: str, limit: int, now: datetime,
+                   window_start: datetime, window_end: datetime) -> bool:
+        """
+        Atomically count one request against a period. Returns False at the limit.
+
+        Runs inside the caller's transaction; the conditional UPDATE takes the
+        counter row lock, so concurrent callers serialize on this row only.
+        """
+        match = (RateLimitCounter.user_id == user_id) & (RateLimitCounter.period == period)
+
+        # Roll into the current window. The previous count carries over only if
+        # the row's window ended exactly where this one starts. ordered_values
+        # keeps prev_count assigned before count for MySQL's left-to-right SET.
+        db.session.execute(
+            update(RateLimitCounter)
+            .where(match, RateLimitCounter.reset_at <= window_start)
+            .ordered_values(
+                (RateLimitCounter.prev_count,
+                 case((RateLimitCounter.reset_at == window_start, RateLimitCounter.count), else_=0)),
+                (RateLimitCounter.count, 0),
+                (RateLimitCounter.reset_at, window_end),
+            )
+        )
+
+        weight = RateLimiter._previous_weight(now, window_start, window_end)
+        result = db.session.execute(
+            update(RateLimitCounter)
+            .where(match, RateLimitCounter.prev_count * weight + RateLimitCounter.count < limit)
+            .values(count=RateLimitCounter.count + 1)
+        )
+        if result.rowcount:
+            return True
+
+        exists = db.session.query(RateLimitCounter.counter_id).filter(match).first()
+        if exists:
+            return False
+
+        db.session.add(RateLimitCounter(
+            user_id=user_id, period=period, count=1, prev_count=0, reset_at=window_end
+        ))
+        db.session.flush()
+        return limit > 0
+
+    @staticmethod
+    def _retry_time(user_id: int, period: str, limit: int, now: datetime,
+                    window_start: datetime, window_end: datetime) -> datetime:
+        """Earliest time the sliding estimate drops below the limit."""
+        row = (
+            db.session.query(RateLimitCounter.count, RateLimitCounter.prev_count)
+            .filter_by(user_id=user_id, period=period)
+            .first()
+        )
+        if row is None:
+            return now
+        count, prev_count = row
+        length = window_end - window_start
+        if count >= limit or not prev_count:
+            # Only the next window (where count becomes prev_count) can help
+            return window_end
+        # prev_count * (1 - t / length) + count < limit  =>  solve for t
+        needed = 1.0 - (limit - count) / prev_count
+        return min(window_end, window_start + length * max(0.0, needed))
+
+    @staticmethod
+    def _count_rejection(period: str, source: str) -> None:
+        # Imported here: app.services imports app.guards
+        from app.services.metrics_service import MetricsService
+        MetricsService.inc("rate_limit_rejections_total", period=period, source=source)
+
+    @staticmethod
+    def reserve(user_id: int) -> Reservation:
         """
-        Check if user is within rate limits and increment counters.
+        Take one request of quota before an LLM call.
+
+        Returns a Reservation to pass to refund() if the call fails.
 
         Raises:
             RateLimitExceeded: If rate limit is exceeded
         """
-        user = User.query.get(user_id)
-        if not user:
-            raise ValueError("User not found")
-
         now = datetime.utcnow()
+        periods = RateLimiter._periods(now)
+
+        frontend = RateLimiter.frontend
+        if frontend is not None:
+            denied = frontend.try_acquire(user_id, RateLimiter._frontend_limits())
+            if denied:
+                period, wait_seconds = denied
+                RateLimiter._count_rejection(period, "frontend")
+                raise RateLimitExceeded(period, now + timedelta(seconds=wait_seconds))
+
+        for attempt in range(2):
+            try:
+                for period, (limit, window_start, window_end) in periods.items():
+                    if not RateLimiter._increment(user_id, period, limit, now, window_start, window_end):
+                        # Undo the other period's increment from this transaction
+                        db.session.rollback()
+                        RateLimiter._count_rejection(period, "database")
+                        raise RateLimitExceeded(
+                            period,
+                            RateLimiter._retry_time(user_id, period, limit, now, window_start, window_end),
+                        )
+                db.session.commit()
+                return Reservation(user_id, {period: end for period, (_, _, end) in periods.items()})
+            except IntegrityError:
+                # Another request created the counter row first; retry with it in place
+                db.session.rollback()
+                if attempt:
+                    raise
+
+    @staticmethod
+    def refund(reservation: Optional[Reservation]) -> None:
+        """
+        Give back quota for an LLM call that failed. Safe to call twice.
+
+        Runs in its own transaction so that refunding from an error path never
+        commits whatever the request's session has pending. The reservation is
+        only marked refunded once the counters are updated, so a refund that
+        raises can be retried.
+        """
+        if reservation is None or reservation.refunded:
+            return
 
-        # Initialize or reset hourly counter
-        if user.llm_requests_reset_hour is None or now >= user.llm_requests_reset_hour:
-            user.llm_requests_hour = 0
-            user.llm_requests_reset_hour = now + timedelta(hours=1)
+        with db.engine.begin() as conn:
+            for period, window_end in reservation.window_ends.items():
+                match = (RateLimitCounter.user_id == reservation.user_id) & (RateLimitCounter.period == period)
+                result = conn.execute(
+                    update(RateLimitCounter)
+                    .where(match, RateLimitCounter.reset_at == window_end, RateLimitCounter.count > 0)
+                    .values(count=RateLimitCounter.count - 1)
+                )
+                if not result.rowcount:
+                    # The window rolled since the reservation; it now sits in prev_count
+                    next_end = window_end + RateLimiter.PERIOD_LENGTHS[period]
+                    conn.execute(
+                        update(RateLimitCounter)
+                        .where(match, RateLimitCounter.reset_at == next_end, RateLimitCounter.prev_count > 0)
+                        .values(prev_count=RateLimitCounter.prev_count - 1)
+                    )
+        reservation.refunded = True
 
-        # Initialize or reset daily counter
-        if user.llm_requests_reset_day is None or now >= user.llm_requests_reset_day:
-            user.llm_requests_day = 0
-            # Reset at midnight UTC
-            tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-            user.llm_requests_reset_day = tomorrow
+        if RateLimiter.frontend is not None:
+            RateLimiter.frontend.refund(reservation.user_id, RateLimiter._frontend_limits())
 
-        # Check hourly limit
-        if user.llm_requests_hour >= RateLimiter.HOURLY_LIMIT:
-            raise RateLimitExceeded("hour", user.llm_requests_reset_hour)
+    @staticmethod
+    def check_and_increment(user_id: int) -> None:
+        """
+        Check if user is within rate limits and count the request.
 
-        # Check daily limit
-        if user.llm_requests_day >= RateLimiter.DAILY_LIMIT:
-            raise RateLimitExceeded("day", user.llm_requests_reset_day)
+        Equivalent to reserve() for callers that never refund.
 
-        # Increment counters
-        user.llm_requests_hour = (user.llm_requests_hour or 0) + 1
-        user.llm_requests_day = (user.llm_requests_day or 0) + 1
-        db.session.commit()
+        Raises:
+            RateLimitExceeded: If rate limit is exceeded
+        """
+        RateLimiter.reserve(user_id)
 
     @staticmethod
     def get_remaining(user_id: int) -> dict:
         """
-        Get remaining requests for a user.
+        Get remaining requests for a user. Read-only: one SELECT, no writes.
 
         Returns:
             dict with 'hourly' and 'daily' remaining counts
         """
-        user = User.query.get(user_id)
-        if not user:
-            return {"hourly": 0, "daily": 0}
-
         now = datetime.utcnow()
+        periods = RateLimiter._periods(now)
+        remaining = {period: limit for period, (limit, _, _) in periods.items()}
 
-        # Check if counters need reset
-        hourly_remaining = RateLimiter.HOURLY_LIMIT
-        daily_remaining = RateLimiter.DAILY_LIMIT
+        rows = db.session.query(
+            RateLimitCounter.period, RateLimitCounter.count,
+            RateLimitCounter.prev_count, RateLimitCounter.reset_at,
+        ).filter(RateLimitCounter.user_id == user_id)
 
-        if user.llm_requests_reset_hour and now < user.llm_requests_reset_hour:
-            hourly_remaining = max(0, RateLimiter.HOURLY_LIMIT - (user.llm_requests_hour or 0))
-
-        if user.llm_requests_reset_day and now < user.llm_requests_reset_day:
-            daily_remaining = max(0, RateLimiter.DAILY_LIMIT - (user.llm_requests_day or 0))
+        for period, count, prev_count, reset_at in rows:
+            if period not in periods:
+                continue
+            limit, window_start, window_end = periods[period]
+            if reset_at == window_end:
+                current, previous = count, prev_count
+            elif reset_at == window_start:
+                # Row not rolled yet: its current window is our previous one
+                current, previous = 0, count
+            else:
+                current, previous = 0, 0
+            weight = RateLimiter._previous_weight(now, window_start, window_end)
+            used = math.ceil(previous * weight + current)
+            remaining[period] = max(0, limit - used)
 
         return {
-            "hourly": hourly_remaining,
-            "daily": daily_remaining,
+            "hourly": remaining["hour"],
+            "daily": remaining["day"],
             "hourly_limit": RateLimiter.HOURLY_LIMIT,
             "daily_limit": RateLimiter.DAILY_LIMIT,
         }
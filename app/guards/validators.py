@@ -1,6 +1,7 @@
 """
 Input Validators - Pydantic schemas for request validation.
 """
+from datetime import datetime
 from typing import Optional, Literal
 from pydantic import BaseModel, Field, field_validator
 
@@ -91,6 +92,17 @@ class PendingWorkoutUpdateInput(BaseModel):
     weight: Optional[float] = Field(default=None, ge=0, le=500, description="Weight in kg")
 
 
+class SetChangeInput(BaseModel):
+    """Validation schema for one changed set in an active-workout sync."""
+
+    seq: int = Field(ge=1, description="Client sequence number")
+    set_id: int = Field(ge=1, description="Set being updated")
+    reps: Optional[int] = Field(default=None, ge=0, le=1000, description="Reps performed")
+    weight: Optional[float] = Field(default=None, ge=0, le=999, description="Weight in kg")
+    is_bodyweight: Optional[bool] = Field(default=None, description="Bodyweight flag")
+    base_updated_at: Optional[datetime] = Field(default=None, description="Set version the edit was made against")
+
+
 class UserProfileInput(BaseModel):
     """Validation schema for user profile data."""
 
@@ -21,20 +21,22 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=None, onupdate=datetime.utcnow)
 
-    # Rate limiting fields for LLM API calls
+    # Legacy rate limiting fields; counters now live in RateLimitCounters
     llm_requests_hour = db.Column(db.Integer, default=0)
     llm_requests_day = db.Column(db.Integer, default=0)
     llm_requests_reset_hour = db.Column(db.DateTime, nullable=True)
     llm_requests_reset_day = db.Column(db.DateTime, nullable=True)
 
     # Relationships (with cascade delete to remove all user data when account is deleted)
-    workouts = db.relationship('Workout', back_populates='user', cascade="all, delete-orphan")
-    user_groups = db.relationship('UserGroupMembership', foreign_keys='UserGroupMembership.user_id', cascade="all, delete-orphan", backref='user_account')
-    sent_invitations = db.relationship('GroupInvitation', foreign_keys='GroupInvitation.inviter_user_id', cascade="all, delete-orphan", backref='inviter_account')
-    received_invitations = db.relationship('GroupInvitation', foreign_keys='GroupInvitation.invitee_user_id', cascade="all, delete-orphan", backref='invitee_account')
-    group_join_requests = db.relationship('GroupJoinRequest', foreign_keys='GroupJoinRequest.user_id', cascade="all, delete-orphan", backref='requester_account')
-    responded_join_requests = db.relationship('GroupJoinRequest', foreign_keys='GroupJoinRequest.responded_by', cascade="all, delete-orphan", backref='responder_account')
-    feedback_profiles = db.relationship('UserFeedbackProfile', cascade="all, delete-orphan", backref='user_account')
+    workouts = db.relationship('Workout', back_populates='user', cascade="all, delete-orphan", passive_deletes=True)
+    user_groups = db.relationship('UserGroupMembership', foreign_keys='UserGroupMembership.user_id', cascade="all, delete-orphan", passive_deletes=True, backref='user_account')
+    sent_invitations = db.relationship('GroupInvitation', foreign_keys='GroupInvitation.inviter_user_id', cascade="all, delete-orphan", passive_deletes=True, backref='inviter_account')
+    received_invitations = db.relationship('GroupInvitation', foreign_keys='GroupInvitation.invitee_user_id', cascade="all, delete-orphan", passive_deletes=True, backref='invitee_account')
+    group_join_requests = db.relationship('GroupJoinRequest', foreign_keys='GroupJoinRequest.user_id', cascade="all, delete-orphan", passive_deletes=True, backref='requester_account')
+    rate_limit_counters = db.relationship('RateLimitCounter', cascade="all, delete-orphan", passive_deletes=True)
+    plan_drafts = db.relationship('PlanDraft', cascade="all, delete-orphan", passive_deletes=True)
+    responded_join_requests = db.relationship('GroupJoinRequest', foreign_keys='GroupJoinRequest.responded_by', cascade="all, delete-orphan", passive_deletes=True, backref='responder_account')
+    feedback_profiles = db.relationship('UserFeedbackProfile', cascade="all, delete-orphan", passive_deletes=True, backref='user_account')
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -61,7 +63,7 @@ class UserGroup(db.Model):
 class UserGroupMembership(db.Model):
     __tablename__ = 'UserGroupMembership'
     membership_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
     group_id = db.Column(db.Integer, db.ForeignKey('UserGroups.group_id'), nullable=False)
     role = db.Column(db.String(20), default='member')  # 'owner', 'admin', 'member'
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -77,8 +79,8 @@ class GroupInvitation(db.Model):
     __tablename__ = 'GroupInvitations'
     invitation_id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('UserGroups.group_id'), nullable=False)
-    inviter_user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
-    invitee_user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
+    inviter_user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
+    invitee_user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
     status = db.Column(db.String(20), default='pending')  # 'pending', 'accepted', 'declined'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     responded_at = db.Column(db.DateTime, default=None)
@@ -95,11 +97,11 @@ class GroupJoinRequest(db.Model):
     __tablename__ = 'GroupJoinRequests'
     request_id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('UserGroups.group_id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
     status = db.Column(db.String(20), default='pending')  # 'pending', 'accepted', 'rejected'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     responded_at = db.Column(db.DateTime, default=None)
-    responded_by = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=True)
+    responded_by = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=True)
 
     # Relationships (User relationships defined on User side with cascade delete)
     group = db.relationship('UserGroup', backref='join_requests')
@@ -134,6 +136,8 @@ class Movement(db.Model):
     movement_id = db.Column(db.Integer, primary_key=True)
     movement_name = db.Column(db.String(100), nullable=False)
     movement_description = db.Column(db.String(255))
+    # Form cues generated once (on demand or by PrefetchService) and served from storage
+    movement_instructions = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=None, onupdate=datetime.utcnow)
 
@@ -171,7 +175,7 @@ class MovementMuscleGroup(db.Model):
 class Workout(db.Model):
     __tablename__ = 'Workouts'
     workout_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
     workout_name = db.Column(db.String(100), nullable=False)
     workout_date = db.Column(db.DateTime, nullable=False)
     is_completed = db.Column(db.Boolean, default=False)
@@ -183,10 +187,18 @@ class Workout(db.Model):
     user = db.relationship('User', back_populates='workouts')
 
     # Relationship to WorkoutMovement
-    workout_movements = db.relationship('WorkoutMovement', back_populates='workout', cascade="all, delete-orphan")
+    workout_movements = db.relationship('WorkoutMovement', back_populates='workout', cascade="all, delete-orphan", passive_deletes=True)
 
     # Relationship to WorkoutFeedbackSummary (delete feedback when workout is deleted)
-    feedback_summary = db.relationship('WorkoutFeedbackSummary', backref='workout_ref', cascade="all, delete-orphan", uselist=False)
+    feedback_summary = db.relationship('WorkoutFeedbackSummary', backref='workout_ref', cascade="all, delete-orphan", passive_deletes=True, uselist=False)
+
+    # Per-client delta-sync cursors (see WorkoutService.sync_set_changes)
+    sync_cursors = db.relationship('WorkoutSyncCursor', back_populates='workout', cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Serves per-user listings ordered by date (keyset pagination on /all_workouts)
+        db.Index('ix_workouts_user_date', 'user_id', 'workout_date', 'workout_id'),
+    )
 
     def __repr__(self):
         return f"<Workout {self.workout_name} on {self.workout_date}>"
@@ -198,7 +210,7 @@ class Workout(db.Model):
 class WorkoutMovement(db.Model):
     __tablename__ = 'WorkoutMovement'
     workout_movement_id = db.Column(db.Integer, primary_key=True)
-    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id'), nullable=False)
+    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id', ondelete='CASCADE'), nullable=False, index=True)
     movement_id = db.Column(db.Integer, db.ForeignKey('Movements.movement_id'), nullable=False)
 
     # Relationships
@@ -206,7 +218,7 @@ class WorkoutMovement(db.Model):
     movement = db.relationship('Movement', back_populates='workout_movements')
 
     # Each WorkoutMovement can have multiple sets (with their own reps & weights)
-    sets = db.relationship('Set', back_populates='workout_movement', cascade='all, delete-orphan')
+    sets = db.relationship('Set', back_populates='workout_movement', cascade='all, delete-orphan', passive_deletes=True)
 
     def calculate_muscle_group_impact(self):
         """
@@ -229,7 +241,7 @@ class WorkoutMovement(db.Model):
 class Set(db.Model):
     __tablename__ = 'Sets'
     set_id = db.Column(db.Integer, primary_key=True)
-    workout_movement_id = db.Column(db.Integer, db.ForeignKey('WorkoutMovement.workout_movement_id'), nullable=False)
+    workout_movement_id = db.Column(db.Integer, db.ForeignKey('WorkoutMovement.workout_movement_id', ondelete='CASCADE'), nullable=False, index=True)
     set_order = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=None, onupdate=datetime.utcnow)
@@ -238,9 +250,38 @@ class Set(db.Model):
     workout_movement = db.relationship('WorkoutMovement', back_populates='sets')
 
     # Each set can have multiple entries for Reps & Weights
-    reps = db.relationship('Rep', back_populates='set', cascade='all, delete-orphan')
-    weights = db.relationship('Weight', back_populates='set', cascade='all, delete-orphan')
-    entries = db.relationship('SetEntry', back_populates='set', cascade='all, delete-orphan')
+    reps = db.relationship('Rep', back_populates='set', cascade='all, delete-orphan', passive_deletes=True)
+    weights = db.relationship('Weight', back_populates='set', cascade='all, delete-orphan', passive_deletes=True)
+    entries = db.relationship('SetEntry', back_populates='set', cascade='all, delete-orphan', passive_deletes=True)
+
+    # Read accessors that work in both storage modes (see SET_STORAGE_MODE):
+    # SetEntry rows are authoritative; Rep/Weight are only consulted for sets
+    # that predate entries and have not been folded yet.
+    @property
+    def primary_entry(self):
+        if not self.entries:
+            return None
+        return min(self.entries, key=lambda e: (e.entry_order or 0, e.entry_id or 0))
+
+    @property
+    def rep_count(self) -> int:
+        if self.entries:
+            return sum(e.reps or 0 for e in self.entries)
+        return sum(r.rep_count or 0 for r in self.reps)
+
+    @property
+    def weight_value(self) -> float:
+        entry = self.primary_entry
+        if entry is not None:
+            return float(entry.weight_value or 0)
+        return float(self.weights[0].weight_value or 0) if self.weights else 0.0
+
+    @property
+    def is_bodyweight(self) -> bool:
+        entry = self.primary_entry
+        if entry is not None:
+            return bool(entry.is_bodyweight)
+        return bool(self.weights[0].is_bodyweight) if self.weights else False
 
     def __repr__(self):
         return f"<Set {self.set_id} (order={self.set_order})>"
@@ -252,7 +293,7 @@ class Set(db.Model):
 class Rep(db.Model):
     __tablename__ = 'Reps'
     rep_id = db.Column(db.Integer, primary_key=True)
-    set_id = db.Column(db.Integer, db.ForeignKey('Sets.set_id'), nullable=False)
+    set_id = db.Column(db.Integer, db.ForeignKey('Sets.set_id', ondelete='CASCADE'), nullable=False, index=True)
     rep_count = db.Column(db.Integer, nullable=False)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -271,7 +312,7 @@ class Rep(db.Model):
 class Weight(db.Model):
     __tablename__ = 'Weights'
     weight_id = db.Column(db.Integer, primary_key=True)
-    set_id = db.Column(db.Integer, db.ForeignKey('Sets.set_id'), nullable=False)
+    set_id = db.Column(db.Integer, db.ForeignKey('Sets.set_id', ondelete='CASCADE'), nullable=False, index=True)
     weight_value = db.Column(db.Numeric(5, 2), nullable=False)
     is_bodyweight = db.Column(db.Boolean, default=False)
 
@@ -291,7 +332,7 @@ class Weight(db.Model):
 class SetEntry(db.Model):
     __tablename__ = 'SetEntries'
     entry_id = db.Column(db.Integer, primary_key=True)
-    set_id = db.Column(db.Integer, db.ForeignKey('Sets.set_id'), nullable=False)
+    set_id = db.Column(db.Integer, db.ForeignKey('Sets.set_id', ondelete='CASCADE'), nullable=False, index=True)
     entry_order = db.Column(db.Integer, nullable=False, default=1)
     reps = db.Column(db.Integer, nullable=False)
     weight_value = db.Column(db.Numeric(5, 2), nullable=False)
@@ -309,13 +350,39 @@ class SetEntry(db.Model):
         )
 
 
+# -----------------------------
+# WORKOUT SYNC CURSORS
+# -----------------------------
+class WorkoutSyncCursor(db.Model):
+    """
+    Highest client sequence number applied for one client (browser tab) on
+    one workout. Lets the active-workout page retry set syncs safely: changes
+    at or below last_seq were already applied and are skipped.
+    """
+    __tablename__ = 'WorkoutSyncCursors'
+    cursor_id = db.Column(db.Integer, primary_key=True)
+    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id', ondelete='CASCADE'), nullable=False)
+    client_id = db.Column(db.String(36), nullable=False)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    workout = db.relationship('Workout', back_populates='sync_cursors')
+
+    __table_args__ = (
+        db.UniqueConstraint('workout_id', 'client_id', name='uq_workout_sync_client'),
+    )
+
+    def __repr__(self):
+        return f"<WorkoutSyncCursor workout={self.workout_id} client={self.client_id} seq={self.last_seq}>"
+
+
 # -----------------------------
 # WORKOUT MUSCLE GROUP IMPACT (SUMMARY TABLE)
 # -----------------------------
 class WorkoutMuscleGroupImpact(db.Model):
     __tablename__ = 'WorkoutMuscleGroupImpact'
     impact_id = db.Column(db.Integer, primary_key=True)
-    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id'), nullable=False)
+    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id', ondelete='CASCADE'), nullable=False, index=True)
     muscle_group_id = db.Column(db.Integer, db.ForeignKey('MuscleGroups.muscle_group_id'), nullable=False)
     total_volume = db.Column(db.Numeric(12, 2), nullable=False, default=0)
     total_reps = db.Column(db.Numeric(12, 2), nullable=False, default=0)
@@ -323,7 +390,7 @@ class WorkoutMuscleGroupImpact(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=None, onupdate=datetime.utcnow)
 
-    workout = db.relationship('Workout', backref=db.backref('muscle_group_impacts', cascade='all, delete-orphan'))
+    workout = db.relationship('Workout', backref=db.backref('muscle_group_impacts', cascade='all, delete-orphan', passive_deletes=True))
     muscle_group = db.relationship('MuscleGroup', backref='workout_impacts')
 
     def __repr__(self):
@@ -343,7 +410,7 @@ class UserFeedbackProfile(db.Model):
     """
     __tablename__ = 'UserFeedbackProfiles'
     profile_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
     movement_id = db.Column(db.Integer, db.ForeignKey('Movements.movement_id'), nullable=False)
 
     # Multipliers for AI suggestions (1.0 = no change, 0.9 = 10% lighter, 1.1 = 10% heavier)
@@ -385,7 +452,7 @@ class WorkoutFeedbackSummary(db.Model):
     """
     __tablename__ = 'WorkoutFeedbackSummaries'
     summary_id = db.Column(db.Integer, primary_key=True)
-    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id'), unique=True, nullable=False)
+    workout_id = db.Column(db.Integer, db.ForeignKey('Workouts.workout_id', ondelete='CASCADE'), unique=True, nullable=False)
 
     # Overall workout quality score (0.0 to 1.0)
     completion_quality = db.Column(db.Numeric(3, 2), nullable=False, default=0.0)
@@ -408,3 +475,116 @@ class WorkoutFeedbackSummary(db.Model):
 
     def __repr__(self):
         return f"<WorkoutFeedbackSummary workout={self.workout_id} quality={self.completion_quality}>"
+
+
+# -----------------------------
+# LLM CALL TELEMETRY
+# -----------------------------
+class LLMCallTelemetry(db.Model):
+    """
+    One row per OpenAI call (or JSON-retry event), written in batches by
+    TelemetryService so recording never blocks the request.
+    """
+    __tablename__ = 'LLMCallTelemetry'
+    telemetry_id = db.Column(db.Integer, primary_key=True)
+    model = db.Column(db.String(50), nullable=False)
+    prompt_kind = db.Column(db.String(30), nullable=False)  # 'workout_plan', 'weekly_plan', 'movement_info', ...
+    latency_ms = db.Column(db.Integer, nullable=True)  # NULL for events that made no network call
+    input_tokens = db.Column(db.Integer, nullable=False, default=0)
+    output_tokens = db.Column(db.Integer, nullable=False, default=0)
+    attempt = db.Column(db.Integer, nullable=False, default=1)
+    outcome = db.Column(db.String(20), nullable=False)  # 'success', 'error', 'timeout', 'json_retry', 'cache_hit', 'cache_miss'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return (
+            f"<LLMCallTelemetry {self.prompt_kind} model={self.model} "
+            f"attempt={self.attempt} outcome={self.outcome} latency={self.latency_ms}ms>"
+        )
+
+
+# -----------------------------
+# GENERATED PLAN CACHE
+# -----------------------------
+class PlanCacheEntry(db.Model):
+    """
+    A generated plan (before per-user feedback) reused for requests with the
+    same bucketed inputs. See PlanCacheService for the key and variety policy.
+    """
+    __tablename__ = 'PlanCacheEntries'
+    cache_id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    prompt_kind = db.Column(db.String(30), nullable=False)  # 'workout_plan' or 'weekly_plan'
+    plan_json = db.Column(db.Text, nullable=False)
+    serve_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_served_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<PlanCacheEntry {self.prompt_kind} key={self.cache_key[:8]} served={self.serve_count}>"
+
+
+# -----------------------------
+# SCHEMA VERSION
+# -----------------------------
+class SchemaVersion(db.Model):
+    """
+    Fingerprint of the model metadata recorded by the last migration run.
+    init_db compares it with the current models to skip DDL inspection on boot.
+    """
+    __tablename__ = 'SchemaVersion'
+    version_id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SchemaVersion {self.fingerprint[:12]} applied={self.applied_at}>"
+
+
+# -----------------------------
+# RATE LIMIT COUNTERS
+# -----------------------------
+class RateLimitCounter(db.Model):
+    """
+    Per-user sliding-window LLM request counter for one period ('hour' or 'day').
+
+    count is the current aligned window (ending at reset_at), prev_count the
+    window before it. Updated only with atomic conditional UPDATEs (see
+    RateLimiter), so checking a limit never loads or dirties the Users row.
+    """
+    __tablename__ = 'RateLimitCounters'
+    counter_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # 'hour' or 'day'
+    count = db.Column(db.Integer, nullable=False, default=0)
+    prev_count = db.Column(db.Integer, nullable=False, default=0)
+    reset_at = db.Column(db.DateTime, nullable=False)  # end of the current window
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period', name='uq_rate_limit_user_period'),
+    )
+
+    def __repr__(self):
+        return f"<RateLimitCounter user={self.user_id} {self.period}={self.count} reset={self.reset_at}>"
+
+
+# -----------------------------
+# PENDING PLAN DRAFTS
+# -----------------------------
+class PlanDraft(db.Model):
+    """
+    A generated plan awaiting confirmation. Only draft_id lives in the
+    session cookie; see DraftService.
+    """
+    __tablename__ = 'PlanDrafts'
+    draft_id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = db.Column(db.String(10), nullable=False)  # 'workout' or 'weekly'
+    plan_json = db.Column(db.Text, nullable=False)
+    revision = db.Column(db.Integer, nullable=False, default=0)  # Bumped on every save
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<PlanDraft {self.draft_id} {self.kind} rev={self.revision} user={self.user_id} expires={self.expires_at}>"
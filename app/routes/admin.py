@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify, send_file
+
+from app.guards import require_admin
+from app.services.profiler_service import ProfilerService
+from app.services.query_stats_service import QueryStatsService
+from app.services.telemetry_service import TelemetryService
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+def _days_param(default: int = 7, maximum: int = 90) -> int:
+    try:
+        days = int(request.args.get('days', default))
+    except (TypeError, ValueError):
+        days = default
+    return max(1, min(days, maximum))
+
+
+@admin_bp.route('/llm_telemetry')
+@require_admin
+def llm_telemetry():
+    """Per-day LLM latency percentiles, token usage and outcomes."""
+    # Include rows still waiting in the write buffer
+    TelemetryService.flush()
+    return jsonify(TelemetryService.summarize(days=_days_param()))
+
+
+@admin_bp.route('/sql_stats')
+@require_admin
+def sql_stats():
+    """Per-endpoint query counts and DB time percentiles (SQL_INSTRUMENTATION_ENABLED)."""
+    return jsonify(QueryStatsService.summarize(endpoint=request.args.get('endpoint')))
+
+
+@admin_bp.route('/profiles')
+@require_admin
+def profiles():
+    """Stored request profiles, newest first (see ProfilerService)."""
+    return jsonify({'profiles': ProfilerService.list_profiles()})
+
+
+@admin_bp.route('/profiles/<profile_id>')
+@require_admin
+def download_profile(profile_id):
+    """Collapsed stacks of one profile, for flamegraph.pl or speedscope."""
+    path = ProfilerService.profile_path(profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=f"{profile_id}.collapsed")
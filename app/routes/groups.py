@@ -2,7 +2,8 @@
 from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for, flash
 from datetime import datetime
 from app.models import db, User, UserGroup, UserGroupMembership, GroupInvitation, GroupJoinRequest
-from sqlalchemy import or_
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
 
 groups_bp = Blueprint('groups', __name__, url_prefix='/groups')
 
@@ -15,6 +16,19 @@ def get_current_user():
     return User.query.get(user_id)
 
 
+def member_counts(group_ids):
+    """Member count per group id, in one grouped query."""
+    if not group_ids:
+        return {}
+    rows = (
+        db.session.query(UserGroupMembership.group_id, func.count(UserGroupMembership.membership_id))
+        .filter(UserGroupMembership.group_id.in_(group_ids))
+        .group_by(UserGroupMembership.group_id)
+        .all()
+    )
+    return dict(rows)
+
+
 @groups_bp.route('/create', methods=['POST'])
 def create_group():
     """Create a new group. Creator becomes owner."""
@@ -68,11 +82,17 @@ def get_my_groups():
     if not user:
         return jsonify({'error': 'Not authenticated'}), 401
 
-    memberships = UserGroupMembership.query.filter_by(user_id=user.user_id).all()
+    memberships = (
+        UserGroupMembership.query
+        .options(joinedload(UserGroupMembership.group))
+        .filter_by(user_id=user.user_id)
+        .all()
+    )
+    counts = member_counts([m.group_id for m in memberships])
 
     groups = []
     for m in memberships:
-        member_count = UserGroupMembership.query.filter_by(group_id=m.group_id).count()
+        member_count = counts.get(m.group_id, 0)
         groups.append({
             'group_id': m.group.group_id,
             'group_name': m.group.group_name,
@@ -111,8 +131,9 @@ def leave_group(group_id):
             }), 400
         else:
             # Last member, delete the group entirely
-            # Delete all invitations for this group
+            # Delete all invitations and join requests for this group
             GroupInvitation.query.filter_by(group_id=group_id).delete()
+            GroupJoinRequest.query.filter_by(group_id=group_id).delete()
             # Delete the membership
             db.session.delete(membership)
             # Delete the group
@@ -204,7 +225,10 @@ def get_invitations():
     if not user:
         return jsonify({'error': 'Not authenticated'}), 401
 
-    invitations = GroupInvitation.query.filter_by(
+    invitations = GroupInvitation.query.options(
+        joinedload(GroupInvitation.group),
+        joinedload(GroupInvitation.inviter_account)
+    ).filter_by(
         invitee_user_id=user.user_id,
         status='pending'
     ).all()
@@ -216,7 +240,7 @@ def get_invitations():
             'group_id': inv.group_id,
             'group_name': inv.group.group_name,
             'group_description': inv.group.group_description,
-            'inviter_username': inv.inviter.username,
+            'inviter_username': inv.inviter_account.username,
             'created_at': inv.created_at.isoformat() if inv.created_at else None
         })
 
@@ -326,10 +350,12 @@ def browse_groups():
         r.group_id for r in GroupJoinRequest.query.filter_by(user_id=user.user_id, status='pending').all()
     ]
 
+    counts = member_counts([group.group_id for group in all_groups])
+
     # Build group list with metadata
     groups = []
     for group in all_groups:
-        member_count = UserGroupMembership.query.filter_by(group_id=group.group_id).count()
+        member_count = counts.get(group.group_id, 0)
 
         # Determine user's relationship to this group
         if group.group_id in user_group_ids:
@@ -411,10 +437,15 @@ def manage_group(group_id):
 
     # Get all members
     members = []
-    memberships = UserGroupMembership.query.filter_by(group_id=group_id).all()
+    memberships = (
+        UserGroupMembership.query
+        .options(joinedload(UserGroupMembership.user_account))
+        .filter_by(group_id=group_id)
+        .all()
+    )
     for m in memberships:
         members.append({
-            'user': m.user,
+            'user': m.user_account,
             'role': m.role,
             'joined_at': m.joined_at,
             'membership_id': m.membership_id
@@ -422,11 +453,16 @@ def manage_group(group_id):
 
     # Get pending join requests
     pending_requests = []
-    requests = GroupJoinRequest.query.filter_by(group_id=group_id, status='pending').all()
+    requests = (
+        GroupJoinRequest.query
+        .options(joinedload(GroupJoinRequest.requester_account))
+        .filter_by(group_id=group_id, status='pending')
+        .all()
+    )
     for r in requests:
         pending_requests.append({
             'request_id': r.request_id,
-            'user': r.user,
+            'user': r.requester_account,
             'created_at': r.created_at
         })
 
@@ -477,7 +513,7 @@ def accept_join_request(group_id, request_id):
     db.session.add(new_membership)
     db.session.commit()
 
-    flash(f'{join_request.user.username} has been added to the group', 'success')
+    flash(f'{join_request.requester_account.username} has been added to the group', 'success')
     return jsonify({'success': True})
 
 
@@ -555,7 +591,7 @@ def kick_member(group_id, member_user_id):
             return jsonify({'error': 'Cannot remove the last owner'}), 400
 
     # Remove member
-    kicked_username = member_membership.user.username
+    kicked_username = member_membership.user_account.username
     db.session.delete(member_membership)
     db.session.commit()
 
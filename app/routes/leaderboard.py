@@ -1,9 +1,9 @@
 import math
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-import pytz
 from flask import Blueprint, render_template, request, session, redirect, url_for, jsonify
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from app.models import db, User, Workout, UserGroupMembership, MuscleGroup, WorkoutMuscleGroupImpact
 
@@ -14,14 +14,31 @@ def get_user_groups(user_id):
     """Get all groups the user is a member of."""
     if not user_id:
         return []
-    memberships = UserGroupMembership.query.filter_by(user_id=user_id).all()
+    memberships = (
+        UserGroupMembership.query
+        .options(joinedload(UserGroupMembership.group))
+        .filter_by(user_id=user_id)
+        .all()
+    )
     return [{'group_id': m.group.group_id, 'group_name': m.group.group_name} for m in memberships]
 
 
 def get_group_member_ids(group_id):
     """Get all user IDs that are members of a group."""
-    memberships = UserGroupMembership.query.filter_by(group_id=group_id).all()
-    return [m.user_id for m in memberships]
+    return get_groups_member_ids([group_id])
+
+
+def get_groups_member_ids(group_ids):
+    """Get the distinct user IDs that are members of any of the groups."""
+    if not group_ids:
+        return []
+    rows = (
+        db.session.query(UserGroupMembership.user_id)
+        .filter(UserGroupMembership.group_id.in_(group_ids))
+        .distinct()
+        .all()
+    )
+    return [user_id for (user_id,) in rows]
 
 
 def _normalize_period(value: str) -> str:
@@ -44,13 +61,13 @@ def _period_days(period: str) -> int:
 
 
 def _period_range(period: str):
-    current_datetime = datetime.now(pytz.UTC)
+    current_datetime = datetime.now(timezone.utc)
     current_date = current_datetime.date()
     days = _period_days(period)
     start_date = current_date - timedelta(days=days - 1)
 
-    start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=pytz.UTC)
-    end_datetime = datetime.combine(current_date, datetime.max.time()).replace(tzinfo=pytz.UTC)
+    start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+    end_datetime = datetime.combine(current_date, datetime.max.time()).replace(tzinfo=timezone.utc)
 
     return start_datetime, end_datetime
 
@@ -102,10 +119,7 @@ def leaderboard_data():
         user_groups = get_user_groups(user_id)
         if user_groups:
             # Get all unique user IDs from all the user's groups
-            all_group_member_ids = set()
-            for group in user_groups:
-                group_member_ids = get_group_member_ids(group['group_id'])
-                all_group_member_ids.update(group_member_ids)
+            all_group_member_ids = get_groups_member_ids([g['group_id'] for g in user_groups])
             users = User.query.filter(User.user_id.in_(all_group_member_ids)).all()
         else:
             # User is not in any groups - only show themselves
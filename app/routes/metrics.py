@@ -0,0 +1,30 @@
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, request
+
+from app.guards.decorators import is_admin_session
+from app.services.metrics_service import MetricsService
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _scrape_allowed() -> bool:
+    """Bearer METRICS_TOKEN or an admin session; open only when public and no token is set."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return True
+    elif current_app.config.get('METRICS_PUBLIC') or current_app.debug:
+        return True
+    return is_admin_session()
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Prometheus scrape target (text exposition format)."""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        abort(404)
+    if not _scrape_allowed():
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    return Response(MetricsService.render(), mimetype="text/plain; version=0.0.4")
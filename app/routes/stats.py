@@ -1,6 +1,5 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-import pytz
 from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
 from sqlalchemy import func
 
@@ -29,18 +28,18 @@ def _period_days(period: str) -> int:
 
 
 def _period_range(period: str):
-    current_datetime = datetime.now(pytz.UTC)
+    current_datetime = datetime.now(timezone.utc)
     current_date = current_datetime.date()
     days = _period_days(period)
     start_date = current_date - timedelta(days=days - 1)
 
-    start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=pytz.UTC)
-    end_datetime = datetime.combine(current_date, datetime.max.time()).replace(tzinfo=pytz.UTC)
+    start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+    end_datetime = datetime.combine(current_date, datetime.max.time()).replace(tzinfo=timezone.utc)
 
     previous_end_date = start_date - timedelta(days=1)
     previous_start_date = previous_end_date - timedelta(days=days - 1)
-    previous_start = datetime.combine(previous_start_date, datetime.min.time()).replace(tzinfo=pytz.UTC)
-    previous_end = datetime.combine(previous_end_date, datetime.max.time()).replace(tzinfo=pytz.UTC)
+    previous_start = datetime.combine(previous_start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+    previous_end = datetime.combine(previous_end_date, datetime.max.time()).replace(tzinfo=timezone.utc)
 
     return start_datetime, end_datetime, previous_start, previous_end
 
@@ -118,12 +117,12 @@ def historical_data(muscle_group):
     if not user_id:
         return jsonify({'error': 'Unauthorized'}), 401
 
-    current_datetime = datetime.now(pytz.UTC)
+    current_datetime = datetime.now(timezone.utc)
     current_date = current_datetime.date()
     historical_start_date = current_date - timedelta(days=180)
 
-    start_datetime = datetime.combine(historical_start_date, datetime.min.time()).replace(tzinfo=pytz.UTC)
-    end_datetime = datetime.combine(current_date, datetime.max.time()).replace(tzinfo=pytz.UTC)
+    start_datetime = datetime.combine(historical_start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+    end_datetime = datetime.combine(current_date, datetime.max.time()).replace(tzinfo=timezone.utc)
 
     mg = MuscleGroup.query.filter_by(muscle_group_name=muscle_group).first()
     if not mg:
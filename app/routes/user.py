@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, redirect, url_for, session, flash, jsonify
 from app.models import User
+from app.services.account_service import AccountService
 from scripts.init_db import db
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -118,16 +119,12 @@ def delete_account():
         return jsonify({'success': False, 'error': 'Unauthorized'}), 401
 
     user_id = session['user_id']
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({'success': False, 'error': 'User not found'}), 404
 
     try:
-        # Delete the user - cascade relationships will handle associated data
+        # Set-based deletes of the user and associated data
         # (workouts, feedback profiles, group memberships, etc.)
-        db.session.delete(user)
-        db.session.commit()
+        if not AccountService.delete_account(user_id):
+            return jsonify({'success': False, 'error': 'User not found'}), 404
 
         # Clear the session
         session.clear()
@@ -1,9 +1,21 @@
 """
 Workout Routes - Thin endpoint definitions delegating to services.
 """
+import io
 from datetime import datetime, date
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import (
+    Blueprint,
+    Response,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    session,
+    flash,
+    jsonify,
+    stream_with_context,
+)
 
 from app.models import (
     Movement,
@@ -12,16 +24,23 @@ from app.models import (
     User,
     db,
 )
-from app.services.workout_service import WorkoutService
+from app.services.workout_service import WorkoutService, SetSyncError
 from app.services.movement_service import MovementService
-from app.services.ai_generation_service import AIGenerationService
+from app.services.ai_generation_service import AIGenerationService, AIGenerationError
+from app.services.draft_service import DraftService, DraftConflictError
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService, WorkoutImportError
+from app.services.plan_edit_service import PlanEditService, PlanEditError
+from app.services.prefetch_service import PrefetchService
 from app.guards import (
     require_auth,
     rate_limit_llm,
+    refund_llm_reservation,
     WorkoutGenerationInput,
     WeeklyWorkoutGenerationInput,
     MovementInput,
     PendingWorkoutUpdateInput,
+    SetChangeInput,
     ValidationError,
     validate_request,
     ContentFilterError,
@@ -40,8 +59,24 @@ def start_workout():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
 
-    workouts = Workout.query.filter_by(user_id=session['user_id']).all()
-    return render_template('start_workout.html', workouts=workouts)
+    # The calendar loads its visible months from /calendar/data
+    return render_template('start_workout.html')
+
+
+@workouts_bp.route('/calendar/data', methods=['GET'])
+def calendar_data():
+    """Per-day workout summary for the planner calendar: ?start=YYYY-MM-DD&end=YYYY-MM-DD (end exclusive)."""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        start = datetime.strptime(request.args.get('start', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.args.get('end', ''), '%Y-%m-%d').date()
+        days = WorkoutService.list_calendar_days(session['user_id'], start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'start': start.isoformat(), 'end': end.isoformat(), 'days': days})
 
 
 # -----------------------------
@@ -68,28 +103,14 @@ def new_workout():
 
 @workouts_bp.route('/workout/<int:workout_id>', methods=['GET'])
 def view_workout(workout_id):
-    workout = Workout.query.get_or_404(workout_id)
+    workout = WorkoutService.get_workout_tree(workout_id)
     user = User.query.get(session['user_id'])
 
     date_str = workout.workout_date.strftime("%Y-%m-%d") if workout.workout_date else ""
     date_str_today = date.today().strftime("%Y-%m-%d")
 
     # Get all movements for dropdown
-    all_movements = sorted(Movement.query.all(), key=lambda m: m.movement_name)
-    movements_with_muscle_groups = [
-        {
-            'movement_id': m.movement_id,
-            'movement_name': m.movement_name,
-            'muscle_groups': [
-                {
-                    'muscle_group_name': mmg.muscle_group.muscle_group_name,
-                    'target_percentage': mmg.target_percentage
-                }
-                for mmg in m.muscle_groups
-            ]
-        }
-        for m in all_movements
-    ]
+    movements_with_muscle_groups = MovementService.list_movements_with_muscle_groups()
 
     # Calculate muscle group impacts if completed
     muscle_group_impacts = None
@@ -129,6 +150,8 @@ def active_workout(workout_id):
     if workout.workout_date != today:
         WorkoutService.update_workout_date(workout_id, today)
 
+    # Loaded after the date commit, which would expire it again
+    workout = WorkoutService.get_workout_tree(workout_id)
     return render_template('active_workout.html', workout=workout)
 
 
@@ -181,6 +204,45 @@ def update_workout(workout_id):
     return redirect(url_for('workouts.view_workout', workout_id=workout_id))
 
 
+@workouts_bp.route('/workout/<int:workout_id>/sync_sets', methods=['POST'])
+@require_auth
+def sync_workout_sets(workout_id):
+    """
+    Save only the sets that changed during an active session.
+
+    Body: {"client_id": "<tab id>", "changes": [{"seq", "set_id", "reps",
+    "weight", "is_bodyweight", "base_updated_at"}, ...], "detect_conflicts":
+    bool}. Sequence numbers make retries safe; with detect_conflicts, edits
+    made against a stale set version are returned as conflicts instead of
+    applied. See WorkoutService.sync_set_changes.
+    """
+    workout = db.session.get(Workout, workout_id)
+    if workout is None or workout.user_id != session['user_id']:
+        return jsonify({'error': 'Workout not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    client_id = data.get('client_id')
+    changes = data.get('changes')
+    if not isinstance(client_id, str) or not 0 < len(client_id) <= 36:
+        return jsonify({'error': 'client_id is required'}), 400
+    if not isinstance(changes, list) or not changes:
+        return jsonify({'error': 'changes must be a non-empty list'}), 400
+    if len(changes) > WorkoutService.MAX_SYNC_CHANGES:
+        return jsonify({'error': f'At most {WorkoutService.MAX_SYNC_CHANGES} changes per request'}), 413
+
+    try:
+        validated = [validate_request(SetChangeInput, change if isinstance(change, dict) else {}) for change in changes]
+        result = WorkoutService.sync_set_changes(
+            workout, client_id, validated, detect_conflicts=bool(data.get('detect_conflicts'))
+        )
+    except ValidationError as e:
+        return jsonify({'error': e.message}), 400
+    except SetSyncError as e:
+        return jsonify({'error': e.message}), e.status
+
+    return jsonify({'success': True, **result})
+
+
 @workouts_bp.route('/complete_workout', methods=['POST'])
 def complete_workout():
     workout_id = request.form.get('workout_id', type=int)
@@ -287,20 +349,47 @@ def delete_if_empty(workout_id):
     return jsonify({'deleted': False, 'reason': 'Workout has movements'})
 
 
+def _completion_filter(filter_value):
+    if filter_value == 'completed':
+        return True
+    if filter_value == 'incomplete':
+        return False
+    return None
+
+
 @workouts_bp.route('/all_workouts')
 def all_workouts():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
 
     filter_value = request.args.get('filter', 'all')
-    filter_completed = None
-    if filter_value == 'completed':
-        filter_completed = True
-    elif filter_value == 'incomplete':
-        filter_completed = False
+    workouts, next_cursor = WorkoutService.list_user_workouts_page(
+        session['user_id'], _completion_filter(filter_value)
+    )
+    return render_template(
+        'all_workouts.html', workouts=workouts, next_cursor=next_cursor, filter_value=filter_value
+    )
+
+
+@workouts_bp.route('/all_workouts/data')
+def all_workouts_data():
+    """Next page of /all_workouts for infinite scroll: {workouts, next_cursor}."""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        workouts, next_cursor = WorkoutService.list_user_workouts_page(
+            session['user_id'],
+            _completion_filter(request.args.get('filter', 'all')),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', 24, type=int),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    workouts = WorkoutService.get_user_workouts(session['user_id'], filter_completed)
-    return render_template('all_workouts.html', workouts=workouts)
+    for workout in workouts:
+        workout['workout_date'] = workout['workout_date'].strftime('%Y-%m-%d')
+    return jsonify({'workouts': workouts, 'next_cursor': next_cursor})
 
 
 @workouts_bp.route('/select_workout', methods=['GET'])
@@ -370,7 +459,8 @@ def add_movement():
             set_count,
             reps_per_set,
             weight_value,
-            is_bodyweight=False
+            is_bodyweight=False,
+            movement=movement
         )
     else:
         # New movement - will fetch muscle groups via AI (rate limited)
@@ -392,25 +482,37 @@ def add_movement():
             flash(f"Invalid input: {e.message}", 'error')
             return redirect(url_for('workouts.view_workout', workout_id=workout_id))
 
-        # Rate limit new movement creation (triggers AI call)
-        try:
-            RateLimiter.check_and_increment(session['user_id'])
-        except RateLimitExceeded as e:
-            flash(e.message, 'error')
-            return redirect(url_for('workouts.view_workout', workout_id=workout_id))
+        # Only a movement we don't know yet triggers an AI call (rate limited)
+        movement = MovementService.find_similar_movement(new_movement_name)
+        reservation = None
+        if movement is None:
+            try:
+                reservation = RateLimiter.reserve(session['user_id'])
+            except RateLimitExceeded as e:
+                flash(e.message, 'error')
+                return redirect(url_for('workouts.view_workout', workout_id=workout_id))
 
         try:
-            MovementService.add_movement_to_workout(
+            wm = MovementService.add_movement_to_workout(
                 workout_id,
                 new_movement_name,
                 set_count,
                 reps_per_set,
                 weight_value,
-                is_bodyweight=False
+                is_bodyweight=False,
+                movement=movement
             )
         except ContentFilterError as e:
+            RateLimiter.refund(reservation)
             flash(e.message, "error")
             return redirect(url_for('workouts.view_workout', workout_id=workout_id))
+        except Exception:
+            RateLimiter.refund(reservation)
+            raise
+
+        if reservation is not None and not wm.movement.muscle_groups:
+            # The lookup fell back to an empty result; don't charge for it
+            RateLimiter.refund(reservation)
 
     flash("Movement added to workout!", "success")
     return redirect(url_for('workouts.view_workout', workout_id=workout_id))
@@ -447,6 +549,7 @@ def generate_movements(workout_id):
         restrictions = validated['restrictions']
         goal = validated['goal']
     except ValidationError as e:
+        refund_llm_reservation()
         flash(f"Invalid input: {e.message}", 'error')
         return redirect(url_for('workouts.view_workout', workout_id=workout_id))
 
@@ -458,8 +561,13 @@ def generate_movements(workout_id):
         WorkoutService.generate_and_add_movements(workout_id, workout_plan)
         flash("Movements generated and added to your workout!", "success")
     except ContentFilterError as e:
+        refund_llm_reservation()
         flash(e.message, "error")
+    except AIGenerationError as e:
+        refund_llm_reservation()
+        flash(e.user_message, "error")
     except Exception as e:
+        refund_llm_reservation()
         flash(f"Error generating movements: {str(e)}", "error")
 
     return redirect(url_for('workouts.view_workout', workout_id=workout_id))
@@ -467,8 +575,9 @@ def generate_movements(workout_id):
 
 @workouts_bp.route('/get_instructions', methods=['GET'])
 @require_auth
-@rate_limit_llm
 def get_instructions():
+    from app.guards.rate_limiter import RateLimiter, RateLimitExceeded
+
     movement_name = request.args.get('movement_name', '')
     if not movement_name:
         return jsonify({'error': 'No movement name provided'}), 400
@@ -477,12 +586,36 @@ def get_instructions():
     if len(movement_name) > 100:
         return jsonify({'error': 'Movement name too long (max 100 characters)'}), 400
 
+    # Stored (usually prefetched) instructions don't cost an LLM call or rate limit
+    movement = MovementService.find_movement_by_name(movement_name)
+    if movement is not None and movement.movement_instructions:
+        return jsonify({'instructions': movement.movement_instructions}), 200
+
+    # Generating costs an LLM call, so it is rate limited
+    try:
+        reservation = RateLimiter.reserve(session['user_id'])
+    except RateLimitExceeded as e:
+        return jsonify({
+            'error': 'Rate limit exceeded',
+            'message': e.message,
+            'limit_type': e.limit_type,
+            'reset_time': e.reset_time.isoformat()
+        }), 429
+
     try:
-        instructions = AIGenerationService.get_movement_instructions(movement_name)
+        instructions = MovementService.get_or_generate_instructions(movement_name)
         return jsonify({'instructions': instructions}), 200
     except ContentFilterError as e:
+        RateLimiter.refund(reservation)
         return jsonify({'error': e.message}), 400
+    except AIGenerationError as e:
+        RateLimiter.refund(reservation)
+        response = jsonify(e.to_dict())
+        if e.retry_after:
+            response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+        return response, 503
     except Exception as e:
+        RateLimiter.refund(reservation)
         return jsonify({'error': 'Failed to fetch instructions'}), 500
 
 
@@ -515,6 +648,7 @@ def generate_workout():
             restrictions = validated['restrictions']
             goal = validated['goal']
         except ValidationError as e:
+            refund_llm_reservation()
             flash(f"Invalid input: {e.message}", 'error')
             return redirect(url_for('workouts.generate_workout'))
 
@@ -523,25 +657,36 @@ def generate_workout():
                 sex, bodyweight, gymexp, target, goal, restrictions,
                 user_id=session['user_id']
             )
-            session['pending_workout_plan'] = workout_json
+            DraftService.save('workout', workout_json)
             session['pending_target'] = workout_json.get("workout_name", target)
             session['pending_workout_goal'] = goal  # Preserve goal for confirmation
             return redirect(url_for('workouts.confirm_workout'))
         except ContentFilterError as e:
+            refund_llm_reservation()
             flash(e.message, 'error')
             return redirect(url_for('workouts.generate_workout'))
+        except AIGenerationError as e:
+            refund_llm_reservation()
+            flash(e.user_message, 'error')
+            if e.code == AIGenerationError.CIRCUIT_OPEN:
+                # AI is down: send the user to the manual planner instead of the form
+                return redirect(url_for('workouts.start_workout'))
+            return redirect(url_for('workouts.generate_workout'))
         except Exception as e:
+            refund_llm_reservation()
             flash(f"Error generating workout plan: {str(e)}", 'error')
             return redirect(url_for('workouts.generate_workout'))
 
+    # Showing the form makes no LLM call
+    refund_llm_reservation()
     return render_template('generate_workout.html', user=user)
 
 
 @workouts_bp.route('/cancel_pending_workout', methods=['POST'])
 @require_auth
 def cancel_pending_workout():
-    """Clear pending workout plan from session."""
-    session.pop('pending_workout_plan', None)
+    """Discard the pending workout plan."""
+    DraftService.discard('workout')
     session.pop('pending_workout_goal', None)
     return jsonify({'success': True})
 
@@ -549,8 +694,8 @@ def cancel_pending_workout():
 @workouts_bp.route('/cancel_pending_weekly', methods=['POST'])
 @require_auth
 def cancel_pending_weekly():
-    """Clear pending weekly plan from session."""
-    session.pop('pending_weekly_plan', None)
+    """Discard the pending weekly plan."""
+    DraftService.discard('weekly')
     return jsonify({'success': True})
 
 
@@ -559,7 +704,7 @@ def confirm_workout():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
 
-    workout_json = session.get('pending_workout_plan')
+    workout_json, plan_revision = DraftService.load_with_revision('workout')
     if not workout_json:
         flash("No workout plan found to confirm!", 'error')
         return redirect(url_for('workouts.generate_workout'))
@@ -570,33 +715,21 @@ def confirm_workout():
             workout_json,
             datetime.now()
         )
-        session.pop('pending_workout_plan', None)
+        DraftService.discard('workout')
         session.pop('pending_workout_goal', None)  # Clean up goal from session
+        PrefetchService.enqueue_for_workouts([workout.workout_id])
         flash("Workout successfully created!", 'success')
         return redirect(url_for('workouts.view_workout', workout_id=workout.workout_id))
 
     # Get all movements for the add movement dropdown
-    all_movements = sorted(Movement.query.all(), key=lambda m: m.movement_name)
-    movements_with_muscle_groups = [
-        {
-            'movement_id': m.movement_id,
-            'movement_name': m.movement_name,
-            'muscle_groups': [
-                {
-                    'muscle_group_name': mmg.muscle_group.muscle_group_name,
-                    'target_percentage': mmg.target_percentage
-                }
-                for mmg in m.muscle_groups
-            ]
-        }
-        for m in all_movements
-    ]
+    movements_with_muscle_groups = MovementService.list_movements_with_muscle_groups()
 
     workout_goal = session.get('pending_workout_goal', 'general_fitness')
     return render_template(
         'workout_details.html',
         confirm_mode=True,
         pending_workout=workout_json,
+        plan_revision=plan_revision,
         workout=None,
         workout_goal=workout_goal,
         all_movements=movements_with_muscle_groups,
@@ -612,7 +745,7 @@ def confirm_workout():
 @require_auth
 def update_pending_movement():
     """Update sets/reps/weight for a movement in the pending workout plan."""
-    workout_json = session.get('pending_workout_plan')
+    workout_json = DraftService.load('workout')
     if not workout_json:
         return jsonify({'error': 'No pending workout found'}), 404
 
@@ -647,8 +780,7 @@ def update_pending_movement():
     if weight is not None:
         workout_json['movements'][index]['weight'] = float(weight)
 
-    session['pending_workout_plan'] = workout_json
-    session.modified = True
+    DraftService.save('workout', workout_json)
 
     return jsonify({'success': True, 'movement': workout_json['movements'][index]})
 
@@ -657,7 +789,7 @@ def update_pending_movement():
 @require_auth
 def remove_pending_movement(index):
     """Remove a movement from the pending workout plan."""
-    workout_json = session.get('pending_workout_plan')
+    workout_json = DraftService.load('workout')
     if not workout_json:
         return jsonify({'error': 'No pending workout found'}), 404
 
@@ -667,8 +799,7 @@ def remove_pending_movement(index):
 
     # Remove the movement
     removed = movements.pop(index)
-    session['pending_workout_plan'] = workout_json
-    session.modified = True
+    DraftService.save('workout', workout_json)
 
     return jsonify({'success': True, 'removed': removed['name']})
 
@@ -677,7 +808,7 @@ def remove_pending_movement(index):
 @require_auth
 def reorder_pending_movement():
     """Reorder movements in the pending workout plan."""
-    workout_json = session.get('pending_workout_plan')
+    workout_json = DraftService.load('workout')
     if not workout_json:
         return jsonify({'error': 'No pending workout found'}), 404
 
@@ -699,8 +830,7 @@ def reorder_pending_movement():
     # Swap the movements
     movements[from_index], movements[to_index] = movements[to_index], movements[from_index]
 
-    session['pending_workout_plan'] = workout_json
-    session.modified = True
+    DraftService.save('workout', workout_json)
 
     return jsonify({'success': True})
 
@@ -709,7 +839,7 @@ def reorder_pending_movement():
 @require_auth
 def add_pending_movement():
     """Add an existing movement to the pending workout plan."""
-    workout_json = session.get('pending_workout_plan')
+    workout_json = DraftService.load('workout')
     if not workout_json:
         return jsonify({'error': 'No pending workout found'}), 404
 
@@ -741,27 +871,10 @@ def add_pending_movement():
     if not movement:
         return jsonify({'error': 'Movement not found'}), 404
 
-    # Build movement dict matching the pending plan structure
-    muscle_groups = [
-        {
-            'name': mmg.muscle_group.muscle_group_name,
-            'impact': mmg.target_percentage
-        }
-        for mmg in movement.muscle_groups
-    ]
-
-    new_movement = {
-        'name': movement.movement_name,
-        'sets': int(sets),
-        'reps': int(reps),
-        'weight': float(weight),
-        'is_bodyweight': weight == 0,
-        'muscle_groups': muscle_groups
-    }
+    new_movement = PlanEditService.movement_entry(movement, sets, reps, weight)
 
     workout_json['movements'].append(new_movement)
-    session['pending_workout_plan'] = workout_json
-    session.modified = True
+    DraftService.save('workout', workout_json)
 
     return jsonify({'success': True, 'movement': new_movement})
 
@@ -770,7 +883,7 @@ def add_pending_movement():
 @require_auth
 def add_pending_custom_movement():
     """Add a custom movement to the pending workout plan."""
-    workout_json = session.get('pending_workout_plan')
+    workout_json = DraftService.load('workout')
     if not workout_json:
         return jsonify({'error': 'No pending workout found'}), 404
 
@@ -821,8 +934,7 @@ def add_pending_custom_movement():
     }
 
     workout_json['movements'].append(new_movement)
-    session['pending_workout_plan'] = workout_json
-    session.modified = True
+    DraftService.save('workout', workout_json)
 
     return jsonify({'success': True, 'movement': new_movement})
 
@@ -835,7 +947,7 @@ def add_pending_custom_movement():
 @require_auth
 def update_pending_weekly_movement():
     """Update sets/reps/weight for a movement in the pending weekly plan."""
-    weekly_plan = session.get('pending_weekly_plan')
+    weekly_plan = DraftService.load('weekly')
     if not weekly_plan:
         return jsonify({'error': 'No pending weekly plan found'}), 404
 
@@ -878,8 +990,7 @@ def update_pending_weekly_movement():
     if weight is not None:
         weekly_plan['weekly_plan'][day_index]['movements'][movement_index]['weight'] = float(weight)
 
-    session['pending_weekly_plan'] = weekly_plan
-    session.modified = True
+    DraftService.save('weekly', weekly_plan)
 
     return jsonify({
         'success': True,
@@ -891,7 +1002,7 @@ def update_pending_weekly_movement():
 @require_auth
 def remove_pending_weekly_movement():
     """Remove a movement from the pending weekly plan."""
-    weekly_plan = session.get('pending_weekly_plan')
+    weekly_plan = DraftService.load('weekly')
     if not weekly_plan:
         return jsonify({'error': 'No pending weekly plan found'}), 404
 
@@ -911,8 +1022,7 @@ def remove_pending_weekly_movement():
 
     # Remove the movement
     removed = movements.pop(movement_index)
-    session['pending_weekly_plan'] = weekly_plan
-    session.modified = True
+    DraftService.save('weekly', weekly_plan)
 
     return jsonify({'success': True, 'removed': removed['name']})
 
@@ -921,7 +1031,7 @@ def remove_pending_weekly_movement():
 @require_auth
 def add_pending_weekly_movement():
     """Add an existing movement to a day in the pending weekly plan."""
-    weekly_plan = session.get('pending_weekly_plan')
+    weekly_plan = DraftService.load('weekly')
     if not weekly_plan:
         return jsonify({'error': 'No pending weekly plan found'}), 404
 
@@ -959,31 +1069,53 @@ def add_pending_weekly_movement():
     if not movement:
         return jsonify({'error': 'Movement not found'}), 404
 
-    # Build movement dict matching the pending plan structure
-    muscle_groups = [
-        {
-            'name': mmg.muscle_group.muscle_group_name,
-            'impact': mmg.target_percentage
-        }
-        for mmg in movement.muscle_groups
-    ]
-
-    new_movement = {
-        'name': movement.movement_name,
-        'sets': int(sets),
-        'reps': int(reps),
-        'weight': float(weight),
-        'is_bodyweight': weight == 0,
-        'muscle_groups': muscle_groups
-    }
+    new_movement = PlanEditService.movement_entry(movement, sets, reps, weight)
 
     weekly_plan['weekly_plan'][day_index]['movements'].append(new_movement)
-    session['pending_weekly_plan'] = weekly_plan
-    session.modified = True
+    DraftService.save('weekly', weekly_plan)
 
     return jsonify({'success': True, 'movement': new_movement})
 
 
+# -----------------------------
+# Batched Pending Plan Edits
+# -----------------------------
+
+@workouts_bp.route('/pending_plan/<kind>/patch', methods=['POST'])
+@require_auth
+def patch_pending_plan(kind):
+    """
+    Apply an ordered batch of edits to a pending plan in one round-trip.
+
+    Body: {"revision": <int>, "operations": [...]} (see PlanEditService).
+    All operations apply or none do. A stale revision returns 409 with the
+    current revision so the client can reload before retrying.
+    """
+    if kind not in DraftService.SESSION_KEYS:
+        return jsonify({'error': 'Unknown plan kind'}), 404
+
+    plan, revision = DraftService.load_with_revision(kind)
+    if not plan:
+        return jsonify({'error': f'No pending {kind} plan found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    expected_revision = data.get('revision')
+    if not isinstance(expected_revision, int) or isinstance(expected_revision, bool):
+        return jsonify({'error': 'revision is required'}), 400
+    if expected_revision != revision:
+        return jsonify({'error': 'Plan has changed', 'revision': revision}), 409
+
+    try:
+        new_plan, changed = PlanEditService.apply(kind, plan, data.get('operations'))
+        DraftService.save(kind, new_plan, expected_revision=expected_revision)
+    except PlanEditError as e:
+        return jsonify({'error': e.message, 'op_index': e.op_index}), e.status
+    except DraftConflictError as e:
+        return jsonify({'error': 'Plan has changed', 'revision': e.current_revision}), 409
+
+    return jsonify({'success': True, 'revision': expected_revision + 1, 'changed': changed})
+
+
 # -----------------------------
 # AI Weekly Workout Generation
 # -----------------------------
@@ -1019,6 +1151,7 @@ def generate_weekly_workout():
             gym_days = validated['gym_days']
             session_duration = validated['session_duration']
         except ValidationError as e:
+            refund_llm_reservation()
             flash(f"Invalid input: {e.message}", 'error')
             return redirect(url_for('workouts.generate_weekly_workout'))
 
@@ -1027,15 +1160,25 @@ def generate_weekly_workout():
                 sex, weight, gymexp, target, gym_days, session_duration, goal, restrictions,
                 user_id=session['user_id']
             )
-            session['pending_weekly_plan'] = weekly_plan
+            DraftService.save('weekly', weekly_plan)
             return redirect(url_for('workouts.confirm_weekly_workout'))
         except ContentFilterError as e:
+            refund_llm_reservation()
             flash(e.message, 'error')
             return redirect(url_for('workouts.generate_weekly_workout'))
+        except AIGenerationError as e:
+            refund_llm_reservation()
+            flash(e.user_message, 'error')
+            if e.code == AIGenerationError.CIRCUIT_OPEN:
+                return redirect(url_for('workouts.start_workout'))
+            return redirect(url_for('workouts.generate_weekly_workout'))
         except Exception as e:
+            refund_llm_reservation()
             flash(f"Error generating weekly workout plan: {str(e)}", 'error')
             return redirect(url_for('workouts.generate_weekly_workout'))
 
+    # Showing the form makes no LLM call
+    refund_llm_reservation()
     return render_template('generate_weekly_workout.html', user=user)
 
 
@@ -1044,7 +1187,7 @@ def confirm_weekly_workout():
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
 
-    weekly_plan = session.get('pending_weekly_plan')
+    weekly_plan, plan_revision = DraftService.load_with_revision('weekly')
     if not weekly_plan:
         flash("No weekly workout plan found to confirm!", 'error')
         return redirect(url_for('workouts.generate_weekly_workout'))
@@ -1066,36 +1209,24 @@ def confirm_weekly_workout():
                 flash("Invalid date selection format", 'error')
                 return redirect(url_for('workouts.confirm_weekly_workout'))
 
-        WorkoutService.create_weekly_workouts_from_plan(
+        created_workouts = WorkoutService.create_weekly_workouts_from_plan(
             session['user_id'],
             weekly_plan,
             datetime.today().date(),
             specific_dates=specific_dates
         )
-        session.pop('pending_weekly_plan', None)
+        DraftService.discard('weekly')
+        PrefetchService.enqueue_for_workouts([w.workout_id for w in created_workouts])
         flash("Weekly workout plan successfully created!", 'success')
         return redirect(url_for('workouts.all_workouts'))
 
     # Get all movements for the add movement dropdown
-    all_movements = sorted(Movement.query.all(), key=lambda m: m.movement_name)
-    movements_with_muscle_groups = [
-        {
-            'movement_id': m.movement_id,
-            'movement_name': m.movement_name,
-            'muscle_groups': [
-                {
-                    'muscle_group_name': mmg.muscle_group.muscle_group_name,
-                    'target_percentage': mmg.target_percentage
-                }
-                for mmg in m.muscle_groups
-            ]
-        }
-        for m in all_movements
-    ]
+    movements_with_muscle_groups = MovementService.list_movements_with_muscle_groups()
 
     return render_template(
         'confirm_weekly_workout.html',
         weekly_plan=weekly_plan,
+        plan_revision=plan_revision,
         all_movements=movements_with_muscle_groups,
         date_str_today=date.today().strftime("%Y-%m-%d")
     )
@@ -1107,32 +1238,65 @@ def confirm_weekly_workout():
 
 @workouts_bp.route('/user_data', methods=['GET'])
 def user_data():
+    """
+    Stream the user's workout history.
+
+    Query parameters:
+        format: json (default, an array), ndjson (one workout per line) or csv (one row per set)
+        since: ISO datetime; only workouts created or edited since then (for incremental sync)
+
+    The response is gzip-compressed when the client accepts it. X-Export-Started-At
+    is the value to pass as since on the next sync.
+    """
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
 
-    user = User.query.get_or_404(session['user_id'])
-    data = []
-
-    for workout in user.workouts:
-        movements = [
-            {
-                "name": wm.movement.movement_name,
-                "sets": len(wm.sets),
-                "reps_per_set": wm.sets[0].reps[0].rep_count if wm.sets and wm.sets[0].reps else 0,
-                "weight": float(wm.sets[0].weights[0].weight_value) if wm.sets and wm.sets[0].weights else 0,
-                "done": wm.done if hasattr(wm, 'done') else False,
-            }
-            for wm in workout.workout_movements
-        ]
-        data.append({
-            "workout_id": workout.workout_id,
-            "name": workout.workout_name,
-            "date": workout.workout_date.strftime('%Y-%m-%d') if workout.workout_date else None,
-            "is_completed": workout.is_completed,
-            "movements": movements,
-        })
+    fmt = request.args.get('format', 'json').lower()
+    if fmt not in ExportService.FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(ExportService.FORMATS)}"}), 400
+
+    since = None
+    if request.args.get('since'):
+        try:
+            since = datetime.fromisoformat(request.args['since'])
+        except ValueError:
+            return jsonify({'error': 'since must be an ISO 8601 datetime'}), 400
+
+    started_at = datetime.utcnow().replace(microsecond=0)
+    body = ExportService.stream(session['user_id'], fmt, since=since)
+    headers = {'X-Export-Started-At': started_at.isoformat(), 'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        body = ExportService.gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    if fmt == 'csv':
+        headers['Content-Disposition'] = 'attachment; filename="workouts.csv"'
+
+    return Response(stream_with_context(body), mimetype=ExportService.MIMETYPES[fmt], headers=headers)
+
+
+@workouts_bp.route('/import_workouts', methods=['POST'])
+@require_auth
+def import_workouts():
+    """
+    Import workout history from an uploaded CSV (multipart field "file").
+
+    See ImportService for the columns. Returns the import summary; rows that
+    fail validation are skipped and listed under "errors".
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No file uploaded'}), 400
+
+    text_stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    try:
+        summary = ImportService.import_csv(session['user_id'], text_stream)
+    except WorkoutImportError as e:
+        return jsonify({'error': e.message}), 400
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'The file must be UTF-8 encoded CSV'}), 400
 
-    return jsonify(data)
+    return jsonify({'success': True, **summary})
 
 
 @workouts_bp.route('/update_status', methods=['POST'])
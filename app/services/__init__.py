@@ -7,8 +7,15 @@ from app.services.openai_service import (
     generate_movement_info,
     generate_movement_instructions,
 )
-from app.services.ai_generation_service import AIGenerationService
+from app.services.account_service import AccountService
+from app.services.ai_generation_service import AIGenerationService, AIGenerationError
+from app.services.draft_service import DraftService
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService, WorkoutImportError
 from app.services.movement_service import MovementService
+from app.services.plan_cache_service import PlanCacheService
+from app.services.plan_edit_service import PlanEditService, PlanEditError
+from app.services.prefetch_service import PrefetchService
 from app.services.workout_service import WorkoutService
 
 __all__ = [
@@ -18,7 +25,17 @@ __all__ = [
     "generate_movement_info",
     "generate_movement_instructions",
     # New service classes
+    "AccountService",
     "AIGenerationService",
+    "AIGenerationError",
+    "DraftService",
+    "ExportService",
+    "ImportService",
     "MovementService",
+    "PlanCacheService",
+    "PlanEditService",
+    "PlanEditError",
+    "PrefetchService",
     "WorkoutService",
+    "WorkoutImportError",
 ]
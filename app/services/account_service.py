@@ -0,0 +1,54 @@
+"""
+Account Service - Handles account-level operations.
+"""
+from sqlalchemy import delete, or_, select
+
+from app.models import (
+    db,
+    User,
+    Workout,
+    UserFeedbackProfile,
+    UserGroupMembership,
+    GroupInvitation,
+    GroupJoinRequest,
+    RateLimitCounter,
+    PlanDraft,
+)
+from app.services.workout_service import WorkoutService
+
+
+class AccountService:
+
+    @staticmethod
+    def delete_account(user_id: int) -> bool:
+        """
+        Permanently delete a user and all of their data.
+
+        Issues one DELETE per table (workouts and their sets included) instead
+        of loading the user's history into the session. Explicit deletes keep
+        this working on databases created before the foreign keys gained
+        ON DELETE CASCADE.
+
+        Returns False if the user does not exist.
+        """
+        if db.session.get(User, user_id) is None:
+            return False
+
+        WorkoutService.delete_workouts(select(Workout.workout_id).where(Workout.user_id == user_id))
+        statements = [
+            delete(UserFeedbackProfile).where(UserFeedbackProfile.user_id == user_id),
+            delete(UserGroupMembership).where(UserGroupMembership.user_id == user_id),
+            delete(GroupInvitation).where(
+                or_(GroupInvitation.inviter_user_id == user_id, GroupInvitation.invitee_user_id == user_id)
+            ),
+            delete(GroupJoinRequest).where(
+                or_(GroupJoinRequest.user_id == user_id, GroupJoinRequest.responded_by == user_id)
+            ),
+            delete(RateLimitCounter).where(RateLimitCounter.user_id == user_id),
+            delete(PlanDraft).where(PlanDraft.user_id == user_id),
+            delete(User).where(User.user_id == user_id),
+        ]
+        for statement in statements:
+            db.session.execute(statement, execution_options={"synchronize_session": False})
+        db.session.commit()
+        return True
@@ -3,24 +3,137 @@ AI Generation Service - Wraps OpenAI calls with retry logic and JSON parsing.
 """
 import json
 import logging
-from typing import Optional
-
-from flask import current_app
+import random
+import time
+from typing import Callable, Dict, Optional
 
 from app.services.openai_service import (
+    DEFAULT_MODEL,
+    WEEKLY_MODEL,
     generate_workout_plan,
     generate_weekly_workout_plan,
-    generate_movement_info,
+    empty_movement_info,
+    fetch_movement_info,
     generate_movement_instructions,
 )
 from app.guards.content_filter import ContentFilter, ContentFilterError
+from app.guards.decorators import refund_llm_reservation
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.plan_cache_service import PlanCacheService
+from app.services.metrics_service import MetricsService
+from app.services.telemetry_service import TelemetryService
 
 logger = logging.getLogger(__name__)
 
 
+class AIGenerationError(ValueError):
+    """
+    Raised when AI generation fails. Carries a structured error code so routes
+    can decide how to degrade instead of parsing exception text.
+    """
+
+    CIRCUIT_OPEN = "circuit_open"
+    TIMEOUT = "timeout"
+    UPSTREAM_ERROR = "upstream_error"
+    INVALID_RESPONSE = "invalid_response"
+
+    USER_MESSAGES = {
+        CIRCUIT_OPEN: "The AI coach is temporarily unavailable. You can still build a workout manually.",
+        TIMEOUT: "The AI coach took too long to respond. Please try again in a moment.",
+        UPSTREAM_ERROR: "The AI coach could not be reached. Please try again in a moment.",
+        INVALID_RESPONSE: "The AI coach returned an unusable plan. Please try again.",
+    }
+
+    def __init__(self, code: str, message: str, retry_after: Optional[float] = None):
+        self.code = code
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(message)
+
+    @property
+    def user_message(self) -> str:
+        return self.USER_MESSAGES.get(self.code, self.message)
+
+    def to_dict(self) -> dict:
+        payload = {'error': self.user_message, 'code': self.code}
+        if self.retry_after:
+            payload['retry_after'] = round(self.retry_after, 1)
+        return payload
+
+
 class AIGenerationService:
     MAX_ATTEMPTS = 3
 
+    DEFAULT_CONFIG = {
+        "request_budget_seconds": 45.0,
+        "backoff_base_seconds": 0.5,
+        "backoff_max_seconds": 8.0,
+        "circuit_failure_rate": 0.5,
+        "circuit_min_calls": 5,
+        "circuit_window_size": 20,
+        "circuit_reset_seconds": 30.0,
+    }
+
+    # Shared by every request in the process; see circuit_breaker().
+    _circuit_breaker: Optional[CircuitBreaker] = None
+
+    @staticmethod
+    def get_config() -> Dict[str, float]:
+        config = dict(AIGenerationService.DEFAULT_CONFIG)
+        try:
+            from flask import current_app
+            if current_app:
+                config["request_budget_seconds"] = float(
+                    current_app.config.get("AI_REQUEST_BUDGET_SECONDS", config["request_budget_seconds"])
+                )
+                config["backoff_base_seconds"] = float(
+                    current_app.config.get("AI_BACKOFF_BASE_SECONDS", config["backoff_base_seconds"])
+                )
+                config["backoff_max_seconds"] = float(
+                    current_app.config.get("AI_BACKOFF_MAX_SECONDS", config["backoff_max_seconds"])
+                )
+                config["circuit_failure_rate"] = float(
+                    current_app.config.get("AI_CIRCUIT_FAILURE_RATE", config["circuit_failure_rate"])
+                )
+                config["circuit_min_calls"] = int(
+                    current_app.config.get("AI_CIRCUIT_MIN_CALLS", config["circuit_min_calls"])
+                )
+                config["circuit_window_size"] = int(
+                    current_app.config.get("AI_CIRCUIT_WINDOW_SIZE", config["circuit_window_size"])
+                )
+                config["circuit_reset_seconds"] = float(
+                    current_app.config.get("AI_CIRCUIT_RESET_SECONDS", config["circuit_reset_seconds"])
+                )
+        except RuntimeError:
+            pass
+        return config
+
+    @staticmethod
+    def circuit_breaker() -> CircuitBreaker:
+        """Return the process-wide breaker guarding OpenAI, synced with the current config."""
+        cfg = AIGenerationService.get_config()
+        settings = {
+            "failure_rate_threshold": cfg["circuit_failure_rate"],
+            "min_calls": cfg["circuit_min_calls"],
+            "window_size": cfg["circuit_window_size"],
+            "reset_timeout": cfg["circuit_reset_seconds"],
+        }
+        if AIGenerationService._circuit_breaker is None:
+            AIGenerationService._circuit_breaker = CircuitBreaker("openai", **settings)
+        else:
+            AIGenerationService._circuit_breaker.configure(**settings)
+        return AIGenerationService._circuit_breaker
+
+    @staticmethod
+    def _backoff_delay(attempt: int, cfg: Dict[str, float]) -> float:
+        """Full-jitter exponential backoff: uniform(0, min(max, base * 2^attempt))."""
+        ceiling = min(cfg["backoff_max_seconds"], cfg["backoff_base_seconds"] * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _is_timeout(error: Exception) -> bool:
+        return isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower()
+
     @staticmethod
     def _strip_markdown_fences(text: str) -> str:
         """Remove markdown code fences from AI response."""
@@ -43,6 +156,94 @@ class AIGenerationService:
         cleaned = AIGenerationService._strip_markdown_fences(response)
         return json.loads(cleaned)
 
+    @staticmethod
+    def _record_attempt(prompt_kind: str, outcome: str, started: float) -> None:
+        MetricsService.inc("llm_generation_attempts_total", prompt_kind=prompt_kind, outcome=outcome)
+        MetricsService.observe("llm_generation_attempt_seconds", time.perf_counter() - started, prompt_kind=prompt_kind)
+
+    @staticmethod
+    def _generate_with_retries(kind: str, prompt_kind: str, model: str, call: Callable[[float, int], str]) -> dict:
+        """
+        Run an LLM call under a deadline budget with jittered exponential backoff.
+
+        Args:
+            kind: Label used in logs and error messages (e.g. "workout")
+            prompt_kind: Telemetry prompt kind (e.g. "workout_plan")
+            model: Model name, recorded with JSON-retry telemetry
+            call: Function taking the remaining budget in seconds and the attempt
+                number (1-based) and returning raw JSON text
+
+        Returns the parsed response dict.
+
+        Raises:
+            AIGenerationError: With a structured code when every attempt fails,
+                the deadline budget is spent, or the circuit breaker is open
+        """
+        cfg = AIGenerationService.get_config()
+        breaker = AIGenerationService.circuit_breaker()
+        deadline = time.monotonic() + cfg["request_budget_seconds"]
+        last_error = None
+        last_code = AIGenerationError.TIMEOUT
+        attempts_made = 0
+
+        for attempt in range(AIGenerationService.MAX_ATTEMPTS):
+            if not breaker.allow_request():
+                MetricsService.inc("llm_generation_attempts_total", prompt_kind=prompt_kind,
+                                   outcome=AIGenerationError.CIRCUIT_OPEN)
+                raise AIGenerationError(
+                    AIGenerationError.CIRCUIT_OPEN,
+                    f"OpenAI circuit is open; skipped {kind} generation",
+                    retry_after=breaker.retry_after(),
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                last_code = AIGenerationError.TIMEOUT
+                break
+
+            attempts_made += 1
+            raw_response = None
+            started = time.perf_counter()
+            try:
+                raw_response = call(remaining, attempt + 1)
+            except Exception as e:
+                breaker.record_failure()
+                last_error = e
+                if AIGenerationService._is_timeout(e):
+                    last_code = AIGenerationError.TIMEOUT
+                else:
+                    last_code = AIGenerationError.UPSTREAM_ERROR
+                AIGenerationService._record_attempt(prompt_kind, last_code, started)
+                logger.error(f"Error generating {kind} on attempt {attempt + 1}: {e}")
+            else:
+                # Upstream answered, so a malformed body does not count against the breaker.
+                breaker.record_success()
+                try:
+                    parsed = AIGenerationService._parse_ai_response(raw_response)
+                    AIGenerationService._record_attempt(prompt_kind, "success", started)
+                    return parsed
+                except json.JSONDecodeError as e:
+                    AIGenerationService._record_attempt(prompt_kind, AIGenerationError.INVALID_RESPONSE, started)
+                    logger.warning(f"JSON parse error on attempt {attempt + 1}: {e}")
+                    logger.warning(f"Raw response:\n{raw_response}\n")
+                    TelemetryService.record_llm_call(
+                        model=model, prompt_kind=prompt_kind, outcome="json_retry", attempt=attempt + 1
+                    )
+                    last_error = e
+                    last_code = AIGenerationError.INVALID_RESPONSE
+
+            if attempt + 1 < AIGenerationService.MAX_ATTEMPTS:
+                delay = AIGenerationService._backoff_delay(attempt, cfg)
+                if delay >= deadline - time.monotonic():
+                    # Sleeping would spend the rest of the budget; give up now.
+                    break
+                time.sleep(delay)
+
+        raise AIGenerationError(
+            last_code,
+            f"Failed to generate {kind} after {attempts_made} attempt(s): {last_error}",
+        )
+
     @staticmethod
     def generate_single_workout(
         sex: str,
@@ -56,6 +257,9 @@ class AIGenerationService:
         """
         Generate a single workout plan with retry logic.
 
+        Requests without restrictions may be served from PlanCacheService;
+        feedback adjustments are applied per user either way.
+
         Args:
             sex: User's sex
             bodyweight: User's bodyweight in kg
@@ -69,7 +273,7 @@ class AIGenerationService:
 
         Raises:
             ContentFilterError: If input contains disallowed content
-            ValueError: If generation fails after max attempts
+            AIGenerationError: If generation fails, runs out of time or the circuit is open
         """
         # Filter user inputs for security
         filtered = ContentFilter.filter_workout_inputs(
@@ -79,33 +283,34 @@ class AIGenerationService:
         target = filtered.get('target', target)
         restrictions = filtered.get('restrictions', restrictions)
 
-        last_error = None
-
-        for attempt in range(AIGenerationService.MAX_ATTEMPTS):
+        cache_key = PlanCacheService.make_key(
+            "workout_plan", restrictions,
+            sex=sex, gym_experience=gym_experience, bodyweight=bodyweight, target=target, goal=goal,
+        )
+        workout_json = PlanCacheService.fetch(cache_key, "workout_plan", DEFAULT_MODEL)
+        if workout_json is None:
+            workout_json = AIGenerationService._generate_with_retries(
+                "workout",
+                "workout_plan",
+                DEFAULT_MODEL,
+                lambda timeout, attempt: generate_workout_plan(
+                    sex, bodyweight, gym_experience, target, goal, restrictions, timeout=timeout, attempt=attempt
+                ),
+            )
+            PlanCacheService.store(cache_key, "workout_plan", workout_json)
+        else:
+            # Served without an LLM call, so the request's @rate_limit_llm quota goes back
+            refund_llm_reservation()
+
+        # Post-process: apply personalized weight adjustments
+        if user_id:
             try:
-                raw_response = generate_workout_plan(
-                    sex, bodyweight, gym_experience, target, goal, restrictions
-                )
-                workout_json = AIGenerationService._parse_ai_response(raw_response)
-
-                # Post-process: apply personalized weight adjustments
-                if user_id:
-                    try:
-                        from app.services.feedback_service import FeedbackService
-                        workout_json = FeedbackService.apply_feedback_to_plan(workout_json, user_id)
-                    except Exception as e:
-                        logger.warning(f"Failed to apply feedback for user {user_id}: {e}")
-
-                return workout_json
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON parse error on attempt {attempt + 1}: {e}")
-                logger.warning(f"Raw response:\n{raw_response}\n")
-                last_error = e
+                from app.services.feedback_service import FeedbackService
+                workout_json = FeedbackService.apply_feedback_to_plan(workout_json, user_id)
             except Exception as e:
-                logger.error(f"Error generating workout on attempt {attempt + 1}: {e}")
-                last_error = e
+                logger.warning(f"Failed to apply feedback for user {user_id}: {e}")
 
-        raise ValueError(f"Failed to generate workout after {AIGenerationService.MAX_ATTEMPTS} attempts: {last_error}")
+        return workout_json
 
     @staticmethod
     def generate_weekly_workout(
@@ -122,6 +327,9 @@ class AIGenerationService:
         """
         Generate a weekly workout plan with retry logic.
 
+        Requests without restrictions may be served from PlanCacheService;
+        feedback adjustments are applied per user either way.
+
         Args:
             sex: User's sex
             bodyweight: User's bodyweight in kg
@@ -137,7 +345,7 @@ class AIGenerationService:
 
         Raises:
             ContentFilterError: If input contains disallowed content
-            ValueError: If generation fails after max attempts
+            AIGenerationError: If generation fails, runs out of time or the circuit is open
         """
         # Filter user inputs for security
         filtered = ContentFilter.filter_workout_inputs(
@@ -147,32 +355,36 @@ class AIGenerationService:
         target = filtered.get('target', target)
         restrictions = filtered.get('restrictions', restrictions)
 
-        last_error = None
-
-        for attempt in range(AIGenerationService.MAX_ATTEMPTS):
+        cache_key = PlanCacheService.make_key(
+            "weekly_plan", restrictions,
+            sex=sex, gym_experience=gym_experience, bodyweight=bodyweight, target=target, goal=goal,
+            days=days, duration=duration,
+        )
+        weekly_json = PlanCacheService.fetch(cache_key, "weekly_plan", WEEKLY_MODEL)
+        if weekly_json is None:
+            weekly_json = AIGenerationService._generate_with_retries(
+                "weekly workout",
+                "weekly_plan",
+                WEEKLY_MODEL,
+                lambda timeout, attempt: generate_weekly_workout_plan(
+                    sex, bodyweight, gym_experience, target, days, duration, goal, restrictions,
+                    timeout=timeout, attempt=attempt
+                ),
+            )
+            PlanCacheService.store(cache_key, "weekly_plan", weekly_json)
+        else:
+            # Served without an LLM call, so the request's @rate_limit_llm quota goes back
+            refund_llm_reservation()
+
+        # Post-process: apply personalized weight adjustments
+        if user_id:
             try:
-                raw_response = generate_weekly_workout_plan(
-                    sex, bodyweight, gym_experience, target, days, duration, goal, restrictions
-                )
-                weekly_json = AIGenerationService._parse_ai_response(raw_response)
-
-                # Post-process: apply personalized weight adjustments
-                if user_id:
-                    try:
-                        from app.services.feedback_service import FeedbackService
-                        weekly_json = FeedbackService.apply_feedback_to_weekly_plan(weekly_json, user_id)
-                    except Exception as e:
-                        logger.warning(f"Failed to apply feedback for user {user_id}: {e}")
-
-                return weekly_json
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON parse error on attempt {attempt + 1}: {e}")
-                last_error = e
+                from app.services.feedback_service import FeedbackService
+                weekly_json = FeedbackService.apply_feedback_to_weekly_plan(weekly_json, user_id)
             except Exception as e:
-                logger.error(f"Error generating weekly workout on attempt {attempt + 1}: {e}")
-                last_error = e
+                logger.warning(f"Failed to apply feedback for user {user_id}: {e}")
 
-        raise ValueError(f"Failed to generate weekly workout after {AIGenerationService.MAX_ATTEMPTS} attempts: {last_error}")
+        return weekly_json
 
     @staticmethod
     def get_movement_muscle_groups(movement_name: str) -> dict:
@@ -188,7 +400,21 @@ class AIGenerationService:
         filtered = ContentFilter.filter_workout_inputs(movement_name=movement_name)
         movement_name = filtered.get('movement_name', movement_name)
 
-        return generate_movement_info(movement_name)
+        # Callers treat an empty result as "no data", so an open circuit or a
+        # failed call returns the same fallback instead of raising.
+        breaker = AIGenerationService.circuit_breaker()
+        if not breaker.allow_request():
+            return empty_movement_info(movement_name)
+
+        try:
+            info = fetch_movement_info(movement_name)
+        except Exception as e:
+            breaker.record_failure()
+            logger.warning(f"Movement info request failed for {movement_name}: {e}")
+            return empty_movement_info(movement_name)
+
+        breaker.record_success()
+        return info
 
     @staticmethod
     def get_movement_instructions(movement_name: str) -> str:
@@ -197,9 +423,27 @@ class AIGenerationService:
 
         Raises:
             ContentFilterError: If movement name contains disallowed content
+            AIGenerationError: If the circuit is open or the call fails
         """
         # Filter movement name for security
         filtered = ContentFilter.filter_workout_inputs(movement_name=movement_name)
         movement_name = filtered.get('movement_name', movement_name)
 
-        return generate_movement_instructions(movement_name)
+        breaker = AIGenerationService.circuit_breaker()
+        if not breaker.allow_request():
+            raise AIGenerationError(
+                AIGenerationError.CIRCUIT_OPEN,
+                "OpenAI circuit is open; skipped instructions request",
+                retry_after=breaker.retry_after(),
+            )
+
+        try:
+            instructions = generate_movement_instructions(movement_name)
+        except Exception as e:
+            breaker.record_failure()
+            if AIGenerationService._is_timeout(e):
+                raise AIGenerationError(AIGenerationError.TIMEOUT, f"Instructions request timed out: {e}")
+            raise AIGenerationError(AIGenerationError.UPSTREAM_ERROR, f"Instructions request failed: {e}")
+
+        breaker.record_success()
+        return instructions
@@ -0,0 +1,116 @@
+"""
+Circuit Breaker - Fails fast when an upstream dependency is degraded.
+"""
+import threading
+import time
+from collections import deque
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker shared by every request in the process.
+
+    The breaker tracks the outcome of the most recent calls in a rolling
+    window. Once the failure rate in that window crosses the threshold it
+    opens and rejects calls until the reset timeout has passed. After that a
+    single trial call is let through (half-open); its outcome decides whether
+    the breaker closes again or re-opens for another timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def configure(self, **settings) -> None:
+        """Update thresholds in place (keeps the recorded outcomes)."""
+        with self._lock:
+            for key, value in settings.items():
+                if value is not None and hasattr(self, key):
+                    setattr(self, key, value)
+            if self._outcomes.maxlen != self.window_size:
+                self._outcomes = deque(self._outcomes, maxlen=self.window_size)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted right now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will let a trial call through."""
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._current_state() == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                self._trial_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == self.HALF_OPEN:
+                self._trip()
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for ok in self._outcomes if not ok)
+                if failures / len(self._outcomes) >= self.failure_rate_threshold:
+                    self._trip()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._outcomes.clear()
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        self._outcomes.clear()
+
+    def __repr__(self):
+        return f"<CircuitBreaker {self.name} state={self.state}>"
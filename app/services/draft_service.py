@@ -0,0 +1,149 @@
+"""
+Draft Service - Server-side storage for pending (unconfirmed) plans.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from flask import session
+
+from app.models import db, PlanDraft
+
+
+class DraftConflictError(ValueError):
+    """Raised when a save names a revision that is no longer current."""
+
+    def __init__(self, current_revision: Optional[int]):
+        self.current_revision = current_revision
+        super().__init__(f"Draft revision conflict (current revision: {current_revision})")
+
+
+class DraftService:
+    """
+    Keeps generated plans awaiting confirmation in the PlanDrafts table.
+
+    The session cookie only carries a 32-character draft ID per kind, so
+    pending-plan edits no longer re-sign and ship a multi-KB cookie. Drafts
+    expire after PLAN_DRAFT_TTL_HOURS; expired rows are purged whenever a new
+    draft is created (and by scripts/cleanup_plan_drafts.py).
+
+    Every save bumps the draft's revision. Callers that edit on behalf of a
+    client pass the revision the client last saw as expected_revision; the
+    write is then a conditional UPDATE and a stale revision raises
+    DraftConflictError instead of silently overwriting a newer plan.
+    """
+
+    SESSION_KEYS = {
+        "workout": "pending_workout_draft",
+        "weekly": "pending_weekly_draft",
+    }
+    DEFAULT_TTL_HOURS = 24
+
+    @staticmethod
+    def _ttl() -> timedelta:
+        hours = DraftService.DEFAULT_TTL_HOURS
+        try:
+            from flask import current_app
+            if current_app:
+                hours = float(current_app.config.get("PLAN_DRAFT_TTL_HOURS", hours))
+        except RuntimeError:
+            pass
+        return timedelta(hours=hours)
+
+    @staticmethod
+    def _get_row(kind: str) -> Optional[PlanDraft]:
+        draft_id = session.get(DraftService.SESSION_KEYS[kind])
+        user_id = session.get('user_id')
+        if not draft_id or not user_id:
+            return None
+
+        draft = db.session.get(PlanDraft, draft_id)
+        if draft is None or draft.user_id != user_id or draft.kind != kind:
+            session.pop(DraftService.SESSION_KEYS[kind], None)
+            return None
+        if draft.expires_at <= datetime.utcnow():
+            db.session.delete(draft)
+            db.session.commit()
+            session.pop(DraftService.SESSION_KEYS[kind], None)
+            return None
+        return draft
+
+    @staticmethod
+    def load(kind: str) -> Optional[dict]:
+        """Return the current user's pending plan of this kind, or None."""
+        draft = DraftService._get_row(kind)
+        return json.loads(draft.plan_json) if draft else None
+
+    @staticmethod
+    def load_with_revision(kind: str) -> Tuple[Optional[dict], Optional[int]]:
+        """Return (plan, revision) for the current user's draft, or (None, None)."""
+        draft = DraftService._get_row(kind)
+        if draft is None:
+            return None, None
+        return json.loads(draft.plan_json), draft.revision or 0
+
+    @staticmethod
+    def save(kind: str, plan: dict, expected_revision: Optional[int] = None) -> str:
+        """
+        Create or overwrite the pending plan of this kind. Returns the draft ID.
+
+        With expected_revision, the write only lands if the stored draft is
+        still at that revision; otherwise DraftConflictError is raised and
+        nothing is written.
+        """
+        now = datetime.utcnow()
+        draft = DraftService._get_row(kind)
+        if draft is None:
+            if expected_revision is not None:
+                raise DraftConflictError(None)
+            DraftService.cleanup_expired(commit=False)
+            draft = PlanDraft(
+                draft_id=uuid.uuid4().hex, user_id=session['user_id'], kind=kind, revision=0, created_at=now
+            )
+            db.session.add(draft)
+            session[DraftService.SESSION_KEYS[kind]] = draft.draft_id
+        elif expected_revision is not None:
+            updated = PlanDraft.query.filter_by(draft_id=draft.draft_id, revision=expected_revision).update(
+                {
+                    PlanDraft.plan_json: json.dumps(plan),
+                    PlanDraft.revision: PlanDraft.revision + 1,
+                    PlanDraft.updated_at: now,
+                    PlanDraft.expires_at: now + DraftService._ttl(),
+                },
+                synchronize_session=False,
+            )
+            if not updated:
+                draft_id = draft.draft_id
+                db.session.rollback()
+                current = db.session.query(PlanDraft.revision).filter_by(draft_id=draft_id).scalar()
+                raise DraftConflictError(current)
+            db.session.commit()
+            return draft.draft_id
+        else:
+            draft.revision = (draft.revision or 0) + 1
+
+        draft.plan_json = json.dumps(plan)
+        draft.updated_at = now
+        draft.expires_at = now + DraftService._ttl()
+        db.session.commit()
+        return draft.draft_id
+
+    @staticmethod
+    def discard(kind: str) -> None:
+        """Delete the pending plan of this kind and forget its ID."""
+        draft = DraftService._get_row(kind)
+        if draft is not None:
+            db.session.delete(draft)
+            db.session.commit()
+        session.pop(DraftService.SESSION_KEYS[kind], None)
+
+    @staticmethod
+    def cleanup_expired(commit: bool = True) -> int:
+        """Delete every expired draft. Returns rows removed."""
+        removed = PlanDraft.query.filter(PlanDraft.expires_at <= datetime.utcnow()).delete(
+            synchronize_session=False
+        )
+        if commit:
+            db.session.commit()
+        return removed
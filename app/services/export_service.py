@@ -0,0 +1,151 @@
+"""
+Export Service - Streams a user's workout history as JSON, NDJSON or CSV.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import exists, or_
+from sqlalchemy.orm import selectinload
+
+from app.models import db, Workout, WorkoutMovement, Set
+
+
+class ExportService:
+    """
+    Builds workout exports as generators so memory stays flat however long
+    the history is.
+
+    Workouts are read in keyset chunks of CHUNK_SIZE (ordered by workout_id)
+    with their movements and sets eager-loaded in a fixed number of queries;
+    each chunk is expunged from the session once it has been written out.
+    """
+
+    FORMATS = ("json", "ndjson", "csv")
+    MIMETYPES = {
+        "json": "application/json",
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+    CSV_COLUMNS = [
+        "workout_id", "workout_name", "workout_date", "is_completed",
+        "movement", "set_order", "reps", "weight", "is_bodyweight",
+    ]
+    CHUNK_SIZE = 200
+
+    @staticmethod
+    def iter_workouts(user_id: int, since: Optional[datetime] = None, chunk_size: Optional[int] = None) -> Iterator[Workout]:
+        """
+        Yield the user's workouts in workout_id order, one chunk in memory at a time.
+
+        With since, only workouts created or edited at or after it are
+        yielded (a workout counts as edited when any of its sets was added or
+        changed; adding or removing a movement stamps Workout.updated_at).
+        Deletions are not reported: since covers additions and edits only.
+        """
+        chunk_size = chunk_size or ExportService.CHUNK_SIZE
+        query = (
+            Workout.query
+            .options(
+                selectinload(Workout.workout_movements).joinedload(WorkoutMovement.movement),
+                selectinload(Workout.workout_movements).selectinload(WorkoutMovement.sets).selectinload(Set.entries),
+                selectinload(Workout.workout_movements).selectinload(WorkoutMovement.sets).selectinload(Set.reps),
+                selectinload(Workout.workout_movements).selectinload(WorkoutMovement.sets).selectinload(Set.weights),
+            )
+            .filter(Workout.user_id == user_id)
+        )
+        if since is not None:
+            set_changed = (
+                exists()
+                .where(WorkoutMovement.workout_id == Workout.workout_id)
+                .where(Set.workout_movement_id == WorkoutMovement.workout_movement_id)
+                .where(or_(Set.created_at >= since, Set.updated_at >= since))
+            )
+            query = query.filter(or_(Workout.created_at >= since, Workout.updated_at >= since, set_changed))
+
+        last_id = 0
+        while True:
+            chunk = query.filter(Workout.workout_id > last_id).order_by(Workout.workout_id).limit(chunk_size).all()
+            if not chunk:
+                return
+            yield from chunk
+            last_id = chunk[-1].workout_id
+            for workout in chunk:
+                db.session.expunge(workout)
+
+    @staticmethod
+    def workout_record(workout: Workout) -> dict:
+        """Export shape of one workout (a superset of the old /user_data entries)."""
+        movements = []
+        for wm in workout.workout_movements:
+            sets = sorted(wm.sets, key=lambda s: (s.set_order or 0, s.set_id))
+            movements.append({
+                "name": wm.movement.movement_name,
+                "sets": len(sets),
+                "reps_per_set": sets[0].rep_count if sets else 0,
+                "weight": sets[0].weight_value if sets else 0,
+                "done": wm.done if hasattr(wm, 'done') else False,
+                "set_values": [
+                    {"reps": s.rep_count, "weight": s.weight_value, "is_bodyweight": s.is_bodyweight}
+                    for s in sets
+                ],
+            })
+        return {
+            "workout_id": workout.workout_id,
+            "name": workout.workout_name,
+            "date": workout.workout_date.strftime('%Y-%m-%d') if workout.workout_date else None,
+            "is_completed": workout.is_completed,
+            "movements": movements,
+        }
+
+    @staticmethod
+    def stream(user_id: int, fmt: str = "json", since: Optional[datetime] = None) -> Iterator[str]:
+        """Yield the export as text chunks in the given format (one chunk per workout)."""
+        if fmt not in ExportService.FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(ExportService.FORMATS)}")
+
+        workouts = ExportService.iter_workouts(user_id, since=since)
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(ExportService.CSV_COLUMNS)
+            for workout in workouts:
+                record = ExportService.workout_record(workout)
+                for movement in record["movements"]:
+                    for order, values in enumerate(movement["set_values"], start=1):
+                        writer.writerow([
+                            record["workout_id"], record["name"], record["date"], record["is_completed"],
+                            movement["name"], order, values["reps"], values["weight"], values["is_bodyweight"],
+                        ])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+            return
+
+        if fmt == "ndjson":
+            for workout in workouts:
+                yield json.dumps(ExportService.workout_record(workout)) + "\n"
+            return
+
+        # A JSON array, written element by element
+        yield "["
+        separator = ""
+        for workout in workouts:
+            yield separator + json.dumps(ExportService.workout_record(workout))
+            separator = ","
+        yield "]"
+
+    @staticmethod
+    def gzip_stream(chunks: Iterator[str]) -> Iterator[bytes]:
+        """Gzip-compress a text stream incrementally."""
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk.encode("utf-8"))
+            if compressed:
+                yield compressed
+        yield compressor.flush()
@@ -8,18 +8,22 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy.orm import selectinload
+
 from app.models import (
     db,
     User,
     Workout,
     WorkoutMovement,
     Movement,
+    Set,
     SetEntry,
     UserFeedbackProfile,
     WorkoutFeedbackSummary,
     WorkoutMuscleGroupImpact,
     MuscleGroup,
 )
+from app.services.metrics_service import MetricsService
 
 logger = logging.getLogger(__name__)
 
@@ -439,6 +443,7 @@ class FeedbackService:
         return weekly_plan
 
     @staticmethod
+    @MetricsService.timed("feedback_processing_seconds")
     def process_completed_workout(workout_id: int) -> Optional[WorkoutFeedbackSummary]:
         """
         Process a completed workout and update feedback profiles.
@@ -450,7 +455,16 @@ class FeedbackService:
         Returns:
             WorkoutFeedbackSummary object or None if processing fails
         """
-        workout = Workout.query.get(workout_id)
+        # One query per level instead of one per movement and set in the analysis
+        workout = (
+            Workout.query
+            .options(
+                selectinload(Workout.workout_movements).joinedload(WorkoutMovement.movement),
+                selectinload(Workout.workout_movements).selectinload(WorkoutMovement.sets).selectinload(Set.entries),
+            )
+            .filter_by(workout_id=workout_id)
+            .first()
+        )
         if not workout or not workout.is_completed:
             logger.warning(f"Cannot process workout {workout_id}: not found or not completed")
             return None
@@ -484,6 +498,15 @@ class FeedbackService:
         db.session.add(summary)
 
         # Update user feedback profiles for each movement
+        profiles = {
+            profile.movement_id: profile
+            for profile in UserFeedbackProfile.query.filter(
+                UserFeedbackProfile.user_id == workout.user_id,
+                UserFeedbackProfile.movement_id.in_(
+                    [a['movement_id'] for a in analysis['movement_analyses']]
+                ),
+            )
+        }
         for movement_analysis in analysis['movement_analyses']:
             if movement_analysis['pattern'] == 'insufficient_data':
                 continue
@@ -493,6 +516,7 @@ class FeedbackService:
                 movement_id=movement_analysis['movement_id'],
                 pattern=movement_analysis['pattern'],
                 suggested_multiplier=movement_analysis['suggested_multiplier'],
+                profiles=profiles,
             )
 
         db.session.commit()
@@ -505,16 +529,23 @@ class FeedbackService:
         user_id: int,
         movement_id: int,
         pattern: str,
-        suggested_multiplier: float
+        suggested_multiplier: float,
+        profiles: Optional[Dict[int, UserFeedbackProfile]] = None
     ):
         """
         Update or create a user feedback profile for a movement.
         Uses exponential moving average to smooth multiplier changes.
+
+        profiles, when given, is the user's profiles keyed by movement_id,
+        prefetched by the caller; new profiles are added to it.
         """
-        profile = UserFeedbackProfile.query.filter_by(
-            user_id=user_id,
-            movement_id=movement_id
-        ).first()
+        if profiles is None:
+            profile = UserFeedbackProfile.query.filter_by(
+                user_id=user_id,
+                movement_id=movement_id
+            ).first()
+        else:
+            profile = profiles.get(movement_id)
 
         if not profile:
             # Create new profile
@@ -527,6 +558,8 @@ class FeedbackService:
                 data_points=1,
             )
             db.session.add(profile)
+            if profiles is not None:
+                profiles[movement_id] = profile
         else:
             # Update existing profile with exponential moving average
             # Alpha = 0.3 gives more weight to recent data
@@ -0,0 +1,298 @@
+"""
+Import Service - Bulk CSV import of workout history.
+"""
+import csv
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, TextIO
+
+from sqlalchemy import insert, select
+
+from app.models import db, Movement, Workout, WorkoutMovement, Set, Rep, Weight, SetEntry
+from app.services.movement_service import MovementService
+from app.services.stats_service import StatsService
+
+
+class WorkoutImportError(ValueError):
+    """Raised when a CSV cannot be imported at all (e.g. required columns are missing)."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+class ImportService:
+    """
+    Imports workout history from CSV, one row per set.
+
+    Columns (header names are case-insensitive):
+        workout_date, movement, reps              required
+        workout_name, weight, is_bodyweight,      optional
+        is_completed, set_order, workout_id
+
+    Rows belong to the same workout when they share workout_id (an ID from
+    the source app), or else the same workout_date and workout_name. The
+    CSV written by the /user_data export (format=csv) imports as-is.
+
+    The file is parsed as a stream and written in chunks of CHUNK_SIZE rows.
+    Per chunk, new movement names are resolved through the normalized-name
+    match in one pass, workouts are inserted with one flush, and workout
+    movements, sets and set entries with bulk INSERTs. Impacts for completed
+    workouts are computed at the end with StatsService.rebuild_impacts_for_workouts.
+    Invalid rows are skipped and reported; valid rows are still imported.
+    """
+
+    REQUIRED_COLUMNS = ("workout_date", "movement", "reps")
+    DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+    TRUE_VALUES = {"1", "true", "yes", "y"}
+    FALSE_VALUES = {"0", "false", "no", "n"}
+    MAX_WEIGHT = 999.99  # SetEntries.weight_value is Numeric(5, 2)
+    CHUNK_SIZE = 5000
+    MAX_REPORTED_ERRORS = 20
+
+    @staticmethod
+    def import_csv(
+        user_id: int,
+        text_stream: TextIO,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> dict:
+        """
+        Import a CSV of sets for user_id.
+
+        progress, if given, is called after every chunk with
+        (rows_read, seconds_elapsed).
+
+        Returns a summary: rows, imported_sets, workouts, movements_created,
+        skipped, errors (the first MAX_REPORTED_ERRORS), seconds and
+        rows_per_second.
+
+        Raises:
+            WorkoutImportError: If the header lacks a required column
+        """
+        chunk_size = chunk_size or ImportService.CHUNK_SIZE
+        started = time.perf_counter()
+
+        reader = csv.DictReader(text_stream)
+        if reader.fieldnames is None:
+            raise WorkoutImportError("The file is empty")
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        missing = [c for c in ImportService.REQUIRED_COLUMNS if c not in reader.fieldnames]
+        if missing:
+            raise WorkoutImportError(f"Missing required columns: {', '.join(missing)}")
+
+        state = {
+            "movement_ids": None,  # normalized name -> movement_id, loaded on first chunk
+            "name_to_movement": {},  # raw name -> movement_id
+            "workout_ids": {},  # source workout key -> workout_id
+            "workout_movement_ids": {},  # (workout_id, movement_id) -> workout_movement_id
+            "set_counts": {},  # workout_movement_id -> sets written so far
+            "completed": [],
+            "movements_created": 0,
+        }
+        summary = {"rows": 0, "imported_sets": 0, "skipped": 0, "errors": []}
+
+        chunk = []
+        for line_number, row in enumerate(reader, start=2):
+            summary["rows"] += 1
+            try:
+                chunk.append(ImportService._parse_row(row))
+            except ValueError as e:
+                summary["skipped"] += 1
+                if len(summary["errors"]) < ImportService.MAX_REPORTED_ERRORS:
+                    summary["errors"].append(f"Line {line_number}: {e}")
+            if len(chunk) >= chunk_size:
+                summary["imported_sets"] += ImportService._write_chunk(user_id, chunk, state)
+                chunk = []
+                if progress:
+                    progress(summary["rows"], time.perf_counter() - started)
+        if chunk:
+            summary["imported_sets"] += ImportService._write_chunk(user_id, chunk, state)
+            if progress:
+                progress(summary["rows"], time.perf_counter() - started)
+
+        StatsService.rebuild_impacts_for_workouts(state["completed"])
+
+        seconds = time.perf_counter() - started
+        summary.update({
+            "workouts": len(state["workout_ids"]),
+            "movements_created": state["movements_created"],
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(summary["rows"] / seconds) if seconds > 0 else summary["rows"],
+        })
+        return summary
+
+    @staticmethod
+    def _parse_row(row: Dict[str, str]) -> dict:
+        """Validate one CSV row. Raises ValueError with a readable message."""
+        def value(column):
+            return (row.get(column) or "").strip()
+
+        movement = value("movement")
+        if not movement:
+            raise ValueError("movement is empty")
+
+        workout_date = ImportService._parse_date(value("workout_date"))
+
+        try:
+            reps = int(float(value("reps")))
+        except ValueError:
+            raise ValueError(f"reps is not a number: {value('reps')!r}")
+        if reps < 0:
+            raise ValueError("reps must not be negative")
+
+        try:
+            weight = float(value("weight") or 0)
+        except ValueError:
+            raise ValueError(f"weight is not a number: {value('weight')!r}")
+        if not 0 <= weight <= ImportService.MAX_WEIGHT:
+            raise ValueError(f"weight must be between 0 and {ImportService.MAX_WEIGHT}")
+
+        workout_name = value("workout_name") or "Imported workout"
+        source_id = value("workout_id")
+        return {
+            "key": ("id", source_id) if source_id else ("date", workout_date, workout_name),
+            "workout_date": workout_date,
+            "workout_name": workout_name[:100],
+            "is_completed": ImportService._parse_bool(value("is_completed"), default=True),
+            "movement": movement,
+            "reps": reps,
+            "weight": weight,
+            "is_bodyweight": ImportService._parse_bool(value("is_bodyweight"), default=False),
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_date(raw: str) -> datetime:
+        # Cached: an export repeats each workout's date once per set
+        for fmt in ImportService.DATE_FORMATS:
+            try:
+                return datetime.strptime(raw, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"workout_date is not a date: {raw!r}")
+
+    @staticmethod
+    def _parse_bool(raw: str, default: bool) -> bool:
+        if not raw:
+            return default
+        lowered = raw.lower()
+        if lowered in ImportService.TRUE_VALUES:
+            return True
+        if lowered in ImportService.FALSE_VALUES:
+            return False
+        raise ValueError(f"not a boolean: {raw!r}")
+
+    @staticmethod
+    def _resolve_movements(names: Iterable[str], state: dict) -> None:
+        """Map raw movement names to movement IDs, creating missing movements in one flush."""
+        if state["movement_ids"] is None:
+            state["movement_ids"] = {}
+            for movement_id, movement_name in db.session.execute(
+                select(Movement.movement_id, Movement.movement_name).order_by(Movement.movement_id)
+            ):
+                state["movement_ids"].setdefault(MovementService.normalize_movement_name(movement_name), movement_id)
+
+        created = {}
+        for name in names:
+            if name in state["name_to_movement"]:
+                continue
+            normalized = MovementService.normalize_movement_name(name)
+            if normalized in state["movement_ids"]:
+                state["name_to_movement"][name] = state["movement_ids"][normalized]
+            elif normalized in created:
+                created[normalized][1].append(name)
+            else:
+                created[normalized] = (Movement(movement_name=MovementService.format_movement_name(name)), [name])
+
+        if not created:
+            return
+        db.session.add_all(movement for movement, _ in created.values())
+        db.session.flush()
+        for normalized, (movement, raw_names) in created.items():
+            state["movement_ids"][normalized] = movement.movement_id
+            for raw_name in raw_names:
+                state["name_to_movement"][raw_name] = movement.movement_id
+        state["movements_created"] += len(created)
+
+    @staticmethod
+    def _write_chunk(user_id: int, rows: list, state: dict) -> int:
+        """Insert one chunk of parsed rows. Returns the number of sets written."""
+        ImportService._resolve_movements({row["movement"] for row in rows}, state)
+
+        new_workouts = {}
+        for row in rows:
+            if row["key"] not in state["workout_ids"] and row["key"] not in new_workouts:
+                new_workouts[row["key"]] = Workout(
+                    user_id=user_id,
+                    workout_name=row["workout_name"],
+                    workout_date=row["workout_date"],
+                    is_completed=row["is_completed"],
+                )
+        if new_workouts:
+            db.session.add_all(new_workouts.values())
+            db.session.flush()
+            for key, workout in new_workouts.items():
+                state["workout_ids"][key] = workout.workout_id
+                if workout.is_completed:
+                    state["completed"].append(workout.workout_id)
+
+        # Imported workouts are new, so (workout_id, movement_id) identifies each
+        # inserted workout movement and its ID can be read back in one SELECT
+        new_pairs = {
+            (state["workout_ids"][row["key"]], state["name_to_movement"][row["movement"]]) for row in rows
+        } - state["workout_movement_ids"].keys()
+        if new_pairs:
+            db.session.execute(
+                insert(WorkoutMovement.__table__),
+                [{"workout_id": workout_id, "movement_id": movement_id} for workout_id, movement_id in new_pairs],
+            )
+            for workout_movement_id, workout_id, movement_id in db.session.execute(
+                select(WorkoutMovement.workout_movement_id, WorkoutMovement.workout_id, WorkoutMovement.movement_id)
+                .where(WorkoutMovement.workout_id.in_({workout_id for workout_id, _ in new_pairs}))
+            ):
+                state["workout_movement_ids"][(workout_id, movement_id)] = workout_movement_id
+
+        # Sets are numbered in file order per workout movement, which also keys them for the ID lookup below
+        set_rows = []
+        for row in rows:
+            workout_movement_id = state["workout_movement_ids"][
+                (state["workout_ids"][row["key"]], state["name_to_movement"][row["movement"]])
+            ]
+            state["set_counts"][workout_movement_id] = state["set_counts"].get(workout_movement_id, 0) + 1
+            row["workout_movement_id"] = workout_movement_id
+            row["set_order"] = state["set_counts"][workout_movement_id]
+            set_rows.append({"workout_movement_id": workout_movement_id, "set_order": row["set_order"]})
+        db.session.execute(insert(Set.__table__), set_rows)
+
+        chunk_movement_ids = {row["workout_movement_id"] for row in rows}
+        set_ids = {
+            (workout_movement_id, set_order): set_id
+            for set_id, workout_movement_id, set_order in db.session.execute(
+                select(Set.set_id, Set.workout_movement_id, Set.set_order)
+                .where(Set.workout_movement_id.in_(chunk_movement_ids))
+            )
+        }
+
+        entry_rows = [
+            {
+                "set_id": set_ids[(row["workout_movement_id"], row["set_order"])],
+                "entry_order": 1,
+                "reps": row["reps"],
+                "weight_value": row["weight"],
+                "is_bodyweight": row["is_bodyweight"],
+            }
+            for row in rows
+        ]
+        db.session.execute(insert(SetEntry.__table__), entry_rows)
+        if StatsService.set_storage_mode() == "legacy":
+            db.session.execute(insert(Rep.__table__), [{"set_id": e["set_id"], "rep_count": e["reps"]} for e in entry_rows])
+            db.session.execute(insert(Weight.__table__), [
+                {"set_id": e["set_id"], "weight_value": e["weight_value"], "is_bodyweight": e["is_bodyweight"]}
+                for e in entry_rows
+            ])
+
+        db.session.commit()
+        db.session.expunge_all()
+        return len(rows)
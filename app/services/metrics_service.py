@@ -0,0 +1,400 @@
+"""
+Metrics Service - Dependency-free counters and histograms in Prometheus text format.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{body}}}" if body else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, key: Tuple[str, ...], amount: float = 1) -> None:
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self) -> list:
+        return [[list(key), value] for key, value in self.values.items()]
+
+    def merge(self, snapshot: list) -> None:
+        for key, value in snapshot:
+            self.inc(tuple(key), value)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_number(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Histogram:
+    """Bucketed observations per label set; buckets are upper bounds in ascending order."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (last is +Inf), sum]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def _state(self, key: Tuple[str, ...]) -> list:
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        return state
+
+    def observe(self, key: Tuple[str, ...], value: float) -> None:
+        counts, _ = state = self._state(key)
+        counts[bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def snapshot(self) -> list:
+        return [[list(key), counts, total] for key, (counts, total) in self.values.items()]
+
+    def merge(self, snapshot: list) -> None:
+        for key, counts, total in snapshot:
+            state = self._state(tuple(key))
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+
+    def render(self) -> List[str]:
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for key, (counts, total) in sorted(self.values.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsService:
+    """
+    Process-local metrics registry rendered at /metrics in the Prometheus text
+    exposition format.
+
+    Metrics are declared once (see the definitions at the bottom of this
+    module) and recorded by name, e.g.
+    MetricsService.inc("rate_limit_rejections_total", period="hour", source="database").
+    Recording is a dict update under a lock and is a no-op when disabled.
+
+    Under gunicorn each worker has its own registry. With
+    METRICS_MULTIPROC_DIR set, every process writes a snapshot to
+    <dir>/metrics-<pid>.json from a background thread (and at exit), and
+    /metrics merges the snapshots of all processes. Clear the directory when
+    the server starts; snapshots of exited workers are kept so that counters
+    never go backwards.
+
+    Config:
+        METRICS_ENABLED: Record metrics and serve /metrics (default True)
+        METRICS_MULTIPROC_DIR: Shared directory for per-process snapshots (default unset)
+        METRICS_FLUSH_SECONDS: Snapshot interval in multiprocess mode (default 5)
+        METRICS_TOKEN: If set, /metrics requires "Authorization: Bearer <token>"
+            (or an admin session)
+        METRICS_PUBLIC: Serve /metrics to anyone when no token is set
+            (default False outside TESTING; the debug server is always open)
+    """
+
+    _metrics: Dict[str, object] = {}
+    _lock = threading.RLock()
+    _enabled = True
+    _multiproc_dir: Optional[str] = None
+    _flush_seconds = 5.0
+    _pid = os.getpid()
+    _thread: Optional[threading.Thread] = None
+
+    # -----------------------------
+    # Registry
+    # -----------------------------
+
+    @staticmethod
+    def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return MetricsService._register(Counter(name, documentation, labelnames))
+
+    @staticmethod
+    def histogram(name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return MetricsService._register(Histogram(name, documentation, labelnames, buckets))
+
+    @staticmethod
+    def _register(metric):
+        with MetricsService._lock:
+            existing = MetricsService._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            MetricsService._metrics[metric.name] = metric
+        return metric
+
+    @staticmethod
+    def _key(metric, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(metric.labelnames):
+            raise ValueError(f"{metric.name} expects labels {metric.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in metric.labelnames)
+
+    @staticmethod
+    def inc(name: str, amount: float = 1, **labels) -> None:
+        if not MetricsService._enabled:
+            return
+        metric = MetricsService._metrics[name]
+        key = MetricsService._key(metric, labels)
+        with MetricsService._lock:
+            MetricsService._check_fork()
+            metric.inc(key, amount)
+        MetricsService._ensure_flusher()
+
+    @staticmethod
+    def observe(name: str, value: float, **labels) -> None:
+        if not MetricsService._enabled:
+            return
+        metric = MetricsService._metrics[name]
+        key = MetricsService._key(metric, labels)
+        with MetricsService._lock:
+            MetricsService._check_fork()
+            metric.observe(key, value)
+        MetricsService._ensure_flusher()
+
+    @staticmethod
+    def timed(name: str, **labels):
+        """Decorator observing the wrapped call's duration in seconds, whether it returns or raises."""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    MetricsService.observe(name, time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def reset() -> None:
+        """Drop every recorded value (definitions stay registered)."""
+        with MetricsService._lock:
+            for metric in MetricsService._metrics.values():
+                metric.values.clear()
+
+    # -----------------------------
+    # App wiring
+    # -----------------------------
+
+    @staticmethod
+    def init_app(app) -> None:
+        MetricsService._enabled = bool(app.config.get("METRICS_ENABLED", True))
+        MetricsService._multiproc_dir = app.config.get("METRICS_MULTIPROC_DIR") or None
+        MetricsService._flush_seconds = float(app.config.get("METRICS_FLUSH_SECONDS", 5))
+        if not MetricsService._enabled:
+            return
+        if MetricsService._multiproc_dir:
+            os.makedirs(MetricsService._multiproc_dir, exist_ok=True)
+
+        with app.app_context():
+            engine = db.engine
+        if not event.contains(engine, "before_cursor_execute", MetricsService._count_statement):
+            event.listen(engine, "before_cursor_execute", MetricsService._count_statement)
+        if MetricsService._start_request not in app.before_request_funcs.get(None, []):
+            app.before_request(MetricsService._start_request)
+            app.after_request(MetricsService._finish_request)
+
+    @staticmethod
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and "metrics_statements" in g:
+            g.metrics_statements += 1
+
+    @staticmethod
+    def _start_request() -> None:
+        g.metrics_started = time.perf_counter()
+        g.metrics_statements = 0
+
+    @staticmethod
+    def _finish_request(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or "<unmatched>"
+        MetricsService.observe(
+            "http_request_duration_seconds",
+            time.perf_counter() - started,
+            endpoint=endpoint,
+            method=request.method,
+            status=response.status_code,
+        )
+        MetricsService.observe("db_statements_per_request", g.pop("metrics_statements", 0), endpoint=endpoint)
+        return response
+
+    # -----------------------------
+    # Multiprocess snapshots
+    # -----------------------------
+
+    @staticmethod
+    def _check_fork() -> None:
+        # A forked worker inherits the parent's values, which the parent reports itself
+        if os.getpid() != MetricsService._pid:
+            MetricsService._pid = os.getpid()
+            MetricsService._thread = None
+            for metric in MetricsService._metrics.values():
+                metric.values.clear()
+
+    @staticmethod
+    def _snapshot_path(pid: int) -> str:
+        return os.path.join(MetricsService._multiproc_dir, f"metrics-{pid}.json")
+
+    @staticmethod
+    def flush() -> bool:
+        """Write this process's snapshot in multiprocess mode. Returns True if written."""
+        directory = MetricsService._multiproc_dir
+        if not directory:
+            return False
+        with MetricsService._lock:
+            MetricsService._check_fork()
+            snapshot = {
+                name: {"kind": metric.kind, "values": metric.snapshot()}
+                for name, metric in MetricsService._metrics.items()
+                if metric.values
+            }
+        path = MetricsService._snapshot_path(os.getpid())
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as handle:
+                json.dump(snapshot, handle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot {path}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _ensure_flusher() -> None:
+        if not MetricsService._multiproc_dir:
+            return
+        if MetricsService._thread is not None and MetricsService._thread.is_alive():
+            return
+        with MetricsService._lock:
+            if MetricsService._thread is not None and MetricsService._thread.is_alive():
+                return
+            MetricsService._thread = threading.Thread(
+                target=MetricsService._flush_loop, name="metrics-writer", daemon=True
+            )
+            MetricsService._thread.start()
+
+    @staticmethod
+    def _flush_loop() -> None:
+        while True:
+            time.sleep(MetricsService._flush_seconds)
+            MetricsService.flush()
+
+    @staticmethod
+    def _collect() -> Dict[str, object]:
+        """Metrics to render: this process's, or the merge of every snapshot in multiprocess mode."""
+        if not MetricsService._multiproc_dir:
+            return MetricsService._metrics
+
+        MetricsService.flush()
+        merged = {
+            name: (Histogram(name, m.documentation, m.labelnames, m.buckets) if m.kind == "histogram"
+                   else Counter(name, m.documentation, m.labelnames))
+            for name, m in MetricsService._metrics.items()
+        }
+        for path in glob.glob(os.path.join(MetricsService._multiproc_dir, "metrics-*.json")):
+            try:
+                with open(path) as handle:
+                    snapshot = json.load(handle)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {path}: {e}")
+                continue
+            for name, data in snapshot.items():
+                if name in merged:
+                    merged[name].merge(data["values"])
+        return merged
+
+    @staticmethod
+    def render() -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with MetricsService._lock:
+            metrics = MetricsService._collect()
+            lines = []
+            for name, metric in sorted(metrics.items()):
+                lines.append(f"# HELP {name} {metric.documentation}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+MetricsService.histogram(
+    "http_request_duration_seconds",
+    "Time to build a response, per blueprint endpoint.",
+    ("endpoint", "method", "status"),
+)
+MetricsService.histogram(
+    "db_statements_per_request",
+    "SQL statements executed while handling a request.",
+    ("endpoint",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+MetricsService.counter(
+    "rate_limit_rejections_total",
+    "LLM requests rejected by the rate limiter.",
+    ("period", "source"),
+)
+MetricsService.counter(
+    "llm_generation_attempts_total",
+    "AIGenerationService attempts by outcome.",
+    ("prompt_kind", "outcome"),
+)
+MetricsService.histogram(
+    "llm_generation_attempt_seconds",
+    "Duration of each AIGenerationService attempt.",
+    ("prompt_kind",),
+    buckets=(0.5, 1, 2, 5, 10, 15, 20, 30, 45, 60, 90),
+)
+MetricsService.histogram(
+    "feedback_processing_seconds",
+    "FeedbackService.process_completed_workout duration.",
+)
+
+atexit.register(MetricsService.flush)
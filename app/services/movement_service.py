@@ -1,9 +1,13 @@
 """
 Movement Service - Handles movement management operations.
 """
+import os
 import re
+import threading
+from datetime import datetime
 
-from nltk.stem import WordNetLemmatizer
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.models import (
     db,
@@ -15,12 +19,56 @@ from app.models import (
     Rep,
     Weight,
     SetEntry,
+    Workout,
 )
 from app.services.ai_generation_service import AIGenerationService
+from app.services.stats_service import StatsService
 
 
-# Initialize lemmatizer at module level
-lemmatizer = WordNetLemmatizer()
+# Vendored corpus location populated by scripts/download_nltk_data.py
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "nltk_data")
+REQUIRED_NLTK_CORPORA = ("corpora/wordnet", "corpora/omw-1.4")
+
+# Built on first use (see get_lemmatizer) to keep nltk out of app startup
+lemmatizer = None
+_lemmatizer_lock = threading.Lock()
+
+
+def _register_nltk_data_dir(nltk) -> None:
+    if os.path.isdir(NLTK_DATA_DIR) and NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+
+def get_lemmatizer():
+    """Return the shared WordNet lemmatizer, importing nltk on first call."""
+    global lemmatizer
+    if lemmatizer is None:
+        with _lemmatizer_lock:
+            if lemmatizer is None:
+                import nltk
+                from nltk.stem import WordNetLemmatizer
+
+                _register_nltk_data_dir(nltk)
+                lemmatizer = WordNetLemmatizer()
+    return lemmatizer
+
+
+def missing_nltk_corpora() -> list:
+    """
+    Return the required corpora that are neither vendored nor preinstalled.
+
+    Nothing is downloaded; run scripts/download_nltk_data.py to vendor them.
+    """
+    import nltk
+
+    _register_nltk_data_dir(nltk)
+    missing = []
+    for resource in REQUIRED_NLTK_CORPORA:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(resource)
+    return missing
 
 
 class MovementService:
@@ -47,7 +95,7 @@ class MovementService:
                 continue
             try:
                 # Lemmatize to handle plurals and verb forms
-                lemma = lemmatizer.lemmatize(word)
+                lemma = get_lemmatizer().lemmatize(word)
             except LookupError:
                 # Fallback if NLTK data isn't available during tests
                 lemma = word[:-1] if word.endswith("s") and len(word) > 2 else word
@@ -106,14 +154,9 @@ class MovementService:
         formatted_name = MovementService.format_movement_name(name)
 
         # Check if a similar movement already exists using normalization
-        normalized_input = MovementService.normalize_movement_name(name)
-
-        # Get all movements and check normalized forms
-        all_movements = Movement.query.all()
-        for mov in all_movements:
-            if MovementService.normalize_movement_name(mov.movement_name) == normalized_input:
-                # Found a match - return existing movement
-                return mov
+        existing = MovementService.find_similar_movement(name)
+        if existing is not None:
+            return existing
 
         # No match found - create new movement with formatted name
         movement = Movement(
@@ -124,6 +167,66 @@ class MovementService:
         db.session.commit()
         return movement
 
+    @staticmethod
+    def find_similar_movement(name: str):
+        """Return the stored movement whose normalized name matches name, or None."""
+        normalized_input = MovementService.normalize_movement_name(name)
+        for mov in Movement.query.all():
+            if MovementService.normalize_movement_name(mov.movement_name) == normalized_input:
+                return mov
+        return None
+
+    @staticmethod
+    def list_movements_with_muscle_groups() -> list:
+        """All movements by name with their muscle group split, for the add-movement dropdowns."""
+        movements = (
+            Movement.query
+            .options(selectinload(Movement.muscle_groups).joinedload(MovementMuscleGroup.muscle_group))
+            .order_by(Movement.movement_name)
+            .all()
+        )
+        return [
+            {
+                'movement_id': m.movement_id,
+                'movement_name': m.movement_name,
+                'muscle_groups': [
+                    {
+                        'muscle_group_name': mmg.muscle_group.muscle_group_name,
+                        'target_percentage': mmg.target_percentage
+                    }
+                    for mmg in m.muscle_groups
+                ]
+            }
+            for m in movements
+        ]
+
+    @staticmethod
+    def find_movement_by_name(name: str):
+        """Return the stored movement whose display name matches name, or None."""
+        formatted_name = MovementService.format_movement_name(name)
+        if not formatted_name:
+            return None
+        return Movement.query.filter_by(movement_name=formatted_name).first()
+
+    @staticmethod
+    def get_or_generate_instructions(movement_name: str) -> str:
+        """
+        Return stored form instructions, generating and saving them on a miss.
+
+        Raises:
+            ContentFilterError: If movement name contains disallowed content
+            AIGenerationError: If generation is needed and fails
+        """
+        movement = MovementService.find_movement_by_name(movement_name)
+        if movement is not None and movement.movement_instructions:
+            return movement.movement_instructions
+
+        instructions = AIGenerationService.get_movement_instructions(movement_name)
+        if movement is not None and instructions:
+            movement.movement_instructions = instructions
+            db.session.commit()
+        return instructions
+
     @staticmethod
     def find_or_create_muscle_group(name: str) -> MuscleGroup:
         """Find existing muscle group by name or create new one."""
@@ -197,26 +300,21 @@ class MovementService:
         sets: int,
         reps: int,
         weight: float,
-        is_bodyweight: bool = False
+        is_bodyweight: bool = False,
+        movement: Movement = None
     ) -> WorkoutMovement:
         """
         Add a new movement to an existing workout.
         If movement doesn't exist, fetches muscle groups via AI and creates it.
-        Uses normalization to find similar movements.
+        Uses normalization to find similar movements, unless the caller
+        already looked the movement up and passes it in.
 
         Returns the created WorkoutMovement.
         """
-        # Format the name and check for existing movements using normalization
         formatted_name = MovementService.format_movement_name(movement_name)
-        normalized_input = MovementService.normalize_movement_name(movement_name)
 
-        # Search for existing movement using normalization
-        movement = None
-        all_movements = Movement.query.all()
-        for mov in all_movements:
-            if MovementService.normalize_movement_name(mov.movement_name) == normalized_input:
-                movement = mov
-                break
+        if movement is None:
+            movement = MovementService.find_similar_movement(movement_name)
 
         if not movement:
             # Get movement info from AI using formatted name
@@ -244,6 +342,7 @@ class MovementService:
             movement_id=movement.movement_id
         )
         db.session.add(wm)
+        MovementService.touch_workout(workout_id)
         db.session.commit()
 
         # Create sets with reps and weights
@@ -261,7 +360,10 @@ class MovementService:
         weight_value: float,
         is_bodyweight: bool
     ) -> list:
-        """Create sets with reps and weights for a workout movement."""
+        """
+        Create sets for a workout movement in one commit. Rows per set depend
+        on SET_STORAGE_MODE (see StatsService.write_set_values).
+        """
         created_sets = []
 
         for s_index in range(set_count):
@@ -269,37 +371,11 @@ class MovementService:
                 workout_movement_id=workout_movement_id,
                 set_order=s_index + 1
             )
+            StatsService.write_set_values(new_set, reps_per_set, weight_value, is_bodyweight)
             db.session.add(new_set)
-            db.session.commit()
-
-            # Create rep record
-            rep_record = Rep(
-                set_id=new_set.set_id,
-                rep_count=reps_per_set
-            )
-            db.session.add(rep_record)
-
-            # Create weight record
-            w_record = Weight(
-                set_id=new_set.set_id,
-                weight_value=weight_value,
-                is_bodyweight=is_bodyweight
-            )
-            db.session.add(w_record)
-
-            # Create paired entry record (preferred for scoring)
-            entry_record = SetEntry(
-                set_id=new_set.set_id,
-                entry_order=1,
-                reps=reps_per_set,
-                weight_value=weight_value,
-                is_bodyweight=is_bodyweight
-            )
-            db.session.add(entry_record)
-            db.session.commit()
-
             created_sets.append(new_set)
 
+        db.session.commit()
         return created_sets
 
     @staticmethod
@@ -312,16 +388,52 @@ class MovementService:
         wm = WorkoutMovement.query.get_or_404(workout_movement_id)
         workout_id = wm.workout_id
 
-        db.session.delete(wm)
+        MovementService.delete_workout_movements([workout_movement_id])
+        MovementService.touch_workout(workout_id)
         db.session.commit()
 
         return workout_id
 
+    @staticmethod
+    def touch_workout(workout_id: int) -> None:
+        """
+        Stamp the workout's updated_at so incremental exports (since=...) see
+        movements added to or removed from it. The caller commits.
+        """
+        db.session.execute(
+            update(Workout).where(Workout.workout_id == workout_id).values(updated_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False},
+        )
+
+    @staticmethod
+    def delete_workout_movements(workout_movement_ids) -> None:
+        """
+        Delete workout movements and their sets with set-based statements.
+
+        workout_movement_ids may be a list or a SELECT of IDs. Children are
+        deleted first so this works whether or not the database enforces
+        ON DELETE CASCADE. The caller commits.
+        """
+        set_ids = select(Set.set_id).where(Set.workout_movement_id.in_(workout_movement_ids))
+        statements = [
+            delete(model).where(model.set_id.in_(set_ids)) for model in (SetEntry, Rep, Weight)
+        ] + [
+            delete(Set).where(Set.workout_movement_id.in_(workout_movement_ids)),
+            delete(WorkoutMovement).where(WorkoutMovement.workout_movement_id.in_(workout_movement_ids)),
+        ]
+        for statement in statements:
+            db.session.execute(statement, execution_options={"synchronize_session": False})
+
     @staticmethod
     def populate_workout_movements(workout_id: int, movements_list: list) -> list:
         """
         Create all movements for a workout from an AI-generated list.
 
+        The movement and muscle group catalogs are read once up front and
+        every row (new movements, links, workout movements, sets) is written
+        in one commit, so the number of statements does not grow with the
+        length of the plan.
+
         Args:
             workout_id: The workout to add movements to
             movements_list: List of movement dicts from AI response
@@ -329,6 +441,11 @@ class MovementService:
         Returns:
             List of created WorkoutMovement objects
         """
+        catalog = {
+            MovementService.normalize_movement_name(m.movement_name): m
+            for m in Movement.query.options(selectinload(Movement.muscle_groups)).all()
+        }
+        muscle_groups = {mg.muscle_group_name: mg for mg in MuscleGroup.query.all()}
         created_workout_movements = []
 
         for m in movements_list:
@@ -338,30 +455,27 @@ class MovementService:
             weight_value = float(m.get("weight", 0.0))
             is_bodyweight = bool(m.get("is_bodyweight", False))
 
-            # Find or create the movement
-            movement = MovementService.find_or_create_movement(
-                movement_name,
-                m.get("description", "")
-            )
-
-            # Create WorkoutMovement
-            wm = WorkoutMovement(
-                workout_id=workout_id,
-                movement_id=movement.movement_id
-            )
+            # Find or create the movement (same normalization as find_or_create_movement)
+            normalized_name = MovementService.normalize_movement_name(movement_name)
+            movement = catalog.get(normalized_name)
+            if movement is None:
+                movement = Movement(
+                    movement_name=MovementService.format_movement_name(movement_name),
+                    movement_description=m.get("description", "")
+                )
+                db.session.add(movement)
+                catalog[normalized_name] = movement
+
+            # Create WorkoutMovement and its sets
+            wm = WorkoutMovement(workout_id=workout_id, movement=movement)
+            for s_index in range(set_count):
+                new_set = Set(set_order=s_index + 1)
+                StatsService.write_set_values(new_set, reps_per_set, weight_value, is_bodyweight)
+                wm.sets.append(new_set)
             db.session.add(wm)
-            db.session.commit()
 
-            # Create sets
-            MovementService._create_sets_for_workout_movement(
-                wm.workout_movement_id,
-                set_count,
-                reps_per_set,
-                weight_value,
-                is_bodyweight
-            )
-
-            # Process muscle groups
+            # Link muscle groups the movement is not linked to yet
+            linked = {mmg.muscle_group for mmg in movement.muscle_groups}
             for mg in m.get("muscle_groups", []):
                 mg_name = mg.get("name", "")
                 mg_impact = mg.get("impact", 0)
@@ -369,13 +483,17 @@ class MovementService:
                 if not mg_name:
                     continue
 
-                mg_obj = MovementService.find_or_create_muscle_group(mg_name)
-                MovementService.link_movement_to_muscle_group(
-                    movement.movement_id,
-                    mg_obj.muscle_group_id,
-                    mg_impact
-                )
+                mg_obj = muscle_groups.get(mg_name)
+                if mg_obj is None:
+                    mg_obj = muscle_groups[mg_name] = MuscleGroup(muscle_group_name=mg_name)
+                    db.session.add(mg_obj)
+                if mg_obj not in linked:
+                    movement.muscle_groups.append(
+                        MovementMuscleGroup(muscle_group=mg_obj, target_percentage=mg_impact)
+                    )
+                    linked.add(mg_obj)
 
             created_workout_movements.append(wm)
 
+        db.session.commit()
         return created_workout_movements
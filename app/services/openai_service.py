@@ -1,13 +1,69 @@
 import json
+import threading
+import time
 from typing import List
 from pydantic import BaseModel, Field
-from openai import OpenAI
 import os
 
-# Initialize the OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# The OpenAI client is built on first use (see _get_client) so importing this
+# module, and starting the app, doesn't pay for the openai SDK import.
+client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """Return the shared OpenAI client, constructing it on first call."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return client
+
+
+def _client_for_budget(timeout=None):
+    """
+    Return a client bound to the caller's remaining deadline budget.
+
+    The SDK's own retries are disabled here because AIGenerationService already
+    retries with backoff; stacking both would overrun the budget.
+    """
+    if timeout is None:
+        return _get_client()
+    return _get_client().with_options(timeout=timeout, max_retries=0)
+
+
+def _record_call(prompt_kind, model, started, response=None, error=None, attempt=1):
+    """Queue a telemetry row for one OpenAI call (latency, token usage, outcome)."""
+    try:
+        from app.services.telemetry_service import TelemetryService
+
+        usage = getattr(response, "usage", None)
+        if error is None:
+            outcome = "success"
+        elif isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower():
+            outcome = "timeout"
+        else:
+            outcome = "error"
+
+        TelemetryService.record_llm_call(
+            model=model,
+            prompt_kind=prompt_kind,
+            outcome=outcome,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            output_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            attempt=attempt,
+        )
+    except Exception:
+        # Telemetry must never break generation
+        pass
 
 # Constants - defined once to reduce duplication
+DEFAULT_MODEL = "gpt-4o-mini"  # TODO: Update to gpt-4o or newer model before Feb 14, 2025
+WEEKLY_MODEL = "gpt-5-mini"  # Using stronger model for complex weekly planning
+
 ALLOWED_MUSCLE_GROUPS = [
     "Chest", "Back", "Biceps", "Triceps", "Shoulders", "Quadriceps",
     "Hamstrings", "Calves", "Glutes", "Core", "Obliques", "Lower Back",
@@ -61,10 +117,12 @@ class MovementInfo(BaseModel):
     weight: float = Field(description="Recommended weight in kg (0 if bodyweight)", ge=0)
     muscle_groups: List[MuscleGroup] = Field(description="Muscle groups targeted. Impact percentages must sum to 100")
 
-def generate_workout_plan(sex, weight, gymexp, target, goal="general_fitness", restrictions=""):
+def generate_workout_plan(sex, weight, gymexp, target, goal="general_fitness", restrictions="", timeout=None, attempt=1):
     """
     Generates a single workout plan using OpenAI's structured outputs.
     Returns JSON string for backward compatibility with existing code.
+    Pass timeout (seconds) to bound the request by the caller's deadline;
+    attempt is the caller's retry number, recorded in telemetry.
     """
     # Build restriction text if provided
     restriction_text = ""
@@ -84,15 +142,21 @@ def generate_workout_plan(sex, weight, gymexp, target, goal="general_fitness", r
 
 Create 4-6 movements focusing on the target area with balanced muscle group coverage."""
 
-    response = client.beta.chat.completions.parse(
-        model="gpt-4o-mini",  # TODO: Update to gpt-4o or newer model before Feb 14, 2025
-        messages=[
-            {"role": "system", "content": "You are an expert fitness coach who creates personalized workout plans."},
-            {"role": "user", "content": prompt_text}
-        ],
-        response_format=WorkoutPlan,
-        temperature=0.7
-    )
+    started = time.perf_counter()
+    try:
+        response = _client_for_budget(timeout).beta.chat.completions.parse(
+            model=DEFAULT_MODEL,
+            messages=[
+                {"role": "system", "content": "You are an expert fitness coach who creates personalized workout plans."},
+                {"role": "user", "content": prompt_text}
+            ],
+            response_format=WorkoutPlan,
+            temperature=0.7
+        )
+    except Exception as e:
+        _record_call("workout_plan", DEFAULT_MODEL, started, error=e, attempt=attempt)
+        raise
+    _record_call("workout_plan", DEFAULT_MODEL, started, response=response, attempt=attempt)
 
     # Convert parsed response back to JSON string for backward compatibility
     workout_plan = response.choices[0].message.parsed
@@ -127,9 +191,10 @@ Format (use exact emojis and headers):
 
 Keep each bullet to one short sentence. No markdown formatting. Mobile-friendly."""
 
+    started = time.perf_counter()
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # TODO: Update to gpt-4o or newer model before Feb 14, 2025
+        response = _get_client().chat.completions.create(
+            model=DEFAULT_MODEL,
             messages=[
                 {"role": "system", "content": "You are a fitness expert providing clear, concise exercise form cues."},
                 {"role": "user", "content": prompt_text}
@@ -137,17 +202,20 @@ Keep each bullet to one short sentence. No markdown formatting. Mobile-friendly.
             max_tokens=300,
             temperature=0.7
         )
+        _record_call("movement_instructions", DEFAULT_MODEL, started, response=response)
         instructions = response.choices[0].message.content.strip()
         return instructions
     except Exception as e:
+        _record_call("movement_instructions", DEFAULT_MODEL, started, error=e)
         print(f"Error generating instructions: {e}")
         raise e
 
 
-def generate_movement_info(movement_name):
+def fetch_movement_info(movement_name):
     """
     Gets muscle groups and weight info for a movement using structured outputs.
-    Returns a dict for backward compatibility.
+    Raises on any OpenAI or parsing error; see generate_movement_info for the
+    variant that falls back to an empty result.
     """
     prompt_text = f"""Provide exercise information for: {movement_name}
 
@@ -156,9 +224,10 @@ Determine:
 2. Whether it's typically bodyweight or uses external load
 3. Recommended starting weight in kg (0 if bodyweight)"""
 
+    started = time.perf_counter()
     try:
-        response = client.beta.chat.completions.parse(
-            model="gpt-4o-mini",  # TODO: Update to gpt-4o or newer model before Feb 14, 2025
+        response = _get_client().beta.chat.completions.parse(
+            model=DEFAULT_MODEL,
             messages=[
                 {"role": "system", "content": "You are a fitness expert who knows exercise biomechanics and muscle activation patterns."},
                 {"role": "user", "content": prompt_text}
@@ -166,23 +235,43 @@ Determine:
             response_format=MovementInfo,
             temperature=0.7
         )
+        _record_call("movement_info", DEFAULT_MODEL, started, response=response)
 
         movement_info = response.choices[0].message.parsed
         return movement_info.model_dump()
+    except Exception as e:
+        _record_call("movement_info", DEFAULT_MODEL, started, error=e)
+        raise
+
+
+def empty_movement_info(movement_name):
+    """The result used when movement info can't be generated."""
+    return {
+        "movement_name": movement_name,
+        "is_bodyweight": False,
+        "weight": 0,
+        "muscle_groups": []
+    }
+
+
+def generate_movement_info(movement_name):
+    """
+    Gets muscle groups and weight info for a movement using structured outputs.
+    Returns a dict for backward compatibility.
+    """
+    try:
+        return fetch_movement_info(movement_name)
     except Exception as e:
         print(f"Error generating movement info: {e}")
         # Fallback if something unexpected
-        return {
-            "movement_name": movement_name,
-            "is_bodyweight": False,
-            "weight": 0,
-            "muscle_groups": []
-        }
-
-def generate_weekly_workout_plan(sex, weight, gymexp, target, gym_days, session_duration, goal="general_fitness", restrictions=""):
+        return empty_movement_info(movement_name)
+
+def generate_weekly_workout_plan(sex, weight, gymexp, target, gym_days, session_duration, goal="general_fitness", restrictions="", timeout=None, attempt=1):
     """
     Generates a weekly workout plan using OpenAI's structured outputs.
     Returns JSON string for backward compatibility with existing code.
+    Pass timeout (seconds) to bound the request by the caller's deadline;
+    attempt is the caller's retry number, recorded in telemetry.
     """
     # Build restriction text if provided
     restriction_text = ""
@@ -203,16 +292,22 @@ def generate_weekly_workout_plan(sex, weight, gymexp, target, gym_days, session_
 
 Create {gym_days} varied workouts with 4-6 movements each. Distribute muscle groups across the week for optimal recovery and balance."""
 
-    response = client.beta.chat.completions.parse(
-        model="gpt-5-mini",  # Using stronger model for complex weekly planning
-        messages=[
-            {"role": "system", "content": "You are an expert fitness coach who creates personalized weekly workout plans."},
-            {"role": "user", "content": prompt_text}
-        ],
-        response_format=WeeklyWorkoutPlan,
-        temperature=0.7
-        # Note: No max_tokens needed - structured outputs are more token-efficient
-    )
+    started = time.perf_counter()
+    try:
+        response = _client_for_budget(timeout).beta.chat.completions.parse(
+            model=WEEKLY_MODEL,
+            messages=[
+                {"role": "system", "content": "You are an expert fitness coach who creates personalized weekly workout plans."},
+                {"role": "user", "content": prompt_text}
+            ],
+            response_format=WeeklyWorkoutPlan,
+            temperature=0.7
+            # Note: No max_tokens needed - structured outputs are more token-efficient
+        )
+    except Exception as e:
+        _record_call("weekly_plan", WEEKLY_MODEL, started, error=e, attempt=attempt)
+        raise
+    _record_call("weekly_plan", WEEKLY_MODEL, started, response=response, attempt=attempt)
 
     # Convert parsed response back to JSON string for backward compatibility
     weekly_plan = response.choices[0].message.parsed
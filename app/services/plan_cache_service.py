@@ -0,0 +1,156 @@
+"""
+Plan Cache Service - Reuses generated plans for near-identical requests.
+"""
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.models import db, PlanCacheEntry
+from app.services.telemetry_service import TelemetryService
+
+logger = logging.getLogger(__name__)
+
+
+class PlanCacheService:
+    """
+    Cache of generated plans keyed on normalized, bucketed inputs.
+
+    Only requests without restrictions are cacheable, since restrictions are
+    free text and change the plan. Plans are stored before per-user feedback
+    is applied, so callers still personalise every served copy.
+
+    Variety policy: an entry is served PLAN_CACHE_MAX_SERVES times, then the
+    next request regenerates and replaces it. Entries older than
+    PLAN_CACHE_TTL_HOURS are regenerated as well.
+
+    Hits and misses are recorded as 'cache_hit' / 'cache_miss' telemetry
+    outcomes, so the LLM telemetry summary reports the hit rate.
+    """
+
+    DEFAULT_CONFIG = {
+        "enabled": True,
+        "max_serves": 5,
+        "ttl_hours": 72.0,
+        "bodyweight_bucket_kg": 10.0,
+    }
+
+    @staticmethod
+    def get_config() -> Dict:
+        config = dict(PlanCacheService.DEFAULT_CONFIG)
+        try:
+            from flask import current_app
+            if current_app:
+                config["enabled"] = bool(current_app.config.get("PLAN_CACHE_ENABLED", config["enabled"]))
+                config["max_serves"] = int(current_app.config.get("PLAN_CACHE_MAX_SERVES", config["max_serves"]))
+                config["ttl_hours"] = float(current_app.config.get("PLAN_CACHE_TTL_HOURS", config["ttl_hours"]))
+                config["bodyweight_bucket_kg"] = float(
+                    current_app.config.get("PLAN_CACHE_BODYWEIGHT_BUCKET_KG", config["bodyweight_bucket_kg"])
+                )
+        except RuntimeError:
+            pass
+        return config
+
+    @staticmethod
+    def _normalize_text(value) -> str:
+        return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+    @staticmethod
+    def _bodyweight_bucket(bodyweight, bucket_kg: float) -> Optional[int]:
+        try:
+            bodyweight = float(bodyweight)
+        except (TypeError, ValueError):
+            return None
+        if bucket_kg <= 0:
+            return int(round(bodyweight))
+        return int(bodyweight // bucket_kg * bucket_kg)
+
+    @staticmethod
+    def make_key(prompt_kind: str, restrictions: str = "", **inputs) -> Optional[str]:
+        """
+        Build the cache key for a generation request.
+
+        Returns None when the request is not cacheable (cache disabled or
+        restrictions given).
+        """
+        cfg = PlanCacheService.get_config()
+        if not cfg["enabled"] or PlanCacheService._normalize_text(restrictions):
+            return None
+
+        normalized = {"prompt_kind": prompt_kind}
+        for name, value in inputs.items():
+            if name == "bodyweight":
+                normalized[name] = PlanCacheService._bodyweight_bucket(value, cfg["bodyweight_bucket_kg"])
+            elif isinstance(value, (int, float)):
+                normalized[name] = value
+            else:
+                normalized[name] = PlanCacheService._normalize_text(value)
+
+        payload = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def fetch(cache_key: Optional[str], prompt_kind: str, model: str) -> Optional[dict]:
+        """
+        Return the cached plan for cache_key, or None on a miss. Each call
+        decodes a fresh dict, so callers may personalise it in place.
+
+        Serving counts against the entry's variety budget; exhausted or
+        expired entries are misses.
+        """
+        if cache_key is None:
+            return None
+
+        cfg = PlanCacheService.get_config()
+        plan = None
+        try:
+            entry = PlanCacheEntry.query.filter_by(cache_key=cache_key).first()
+            if entry is not None:
+                fresh = entry.created_at >= datetime.utcnow() - timedelta(hours=cfg["ttl_hours"])
+                if fresh and entry.serve_count < cfg["max_serves"]:
+                    plan = json.loads(entry.plan_json)
+                    entry.serve_count += 1
+                    entry.last_served_at = datetime.utcnow()
+                    db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Plan cache lookup failed: {e}")
+            plan = None
+
+        TelemetryService.record_llm_call(
+            model=model,
+            prompt_kind=prompt_kind,
+            outcome="cache_hit" if plan is not None else "cache_miss",
+        )
+        return plan
+
+    @staticmethod
+    def store(cache_key: Optional[str], prompt_kind: str, plan: dict) -> None:
+        """Save a freshly generated plan, replacing any exhausted entry for the key."""
+        if cache_key is None:
+            return
+
+        try:
+            plan_json = json.dumps(plan)
+            entry = PlanCacheEntry.query.filter_by(cache_key=cache_key).first()
+            if entry is None:
+                db.session.add(PlanCacheEntry(cache_key=cache_key, prompt_kind=prompt_kind, plan_json=plan_json))
+            else:
+                entry.plan_json = plan_json
+                entry.serve_count = 0
+                entry.created_at = datetime.utcnow()
+                entry.last_served_at = None
+            db.session.commit()
+        except Exception as e:
+            # A concurrent request may have stored the same key; either plan is fine.
+            db.session.rollback()
+            logger.warning(f"Plan cache store failed: {e}")
+
+    @staticmethod
+    def clear() -> int:
+        """Delete every cached plan. Returns rows removed."""
+        removed = PlanCacheEntry.query.delete()
+        db.session.commit()
+        return removed
@@ -0,0 +1,210 @@
+"""
+Plan Edit Service - Applies batched edit operations to pending plans.
+"""
+import copy
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import joinedload
+
+from app.models import Movement, MovementMuscleGroup
+from app.guards import MovementInput, PendingWorkoutUpdateInput, ValidationError, validate_request
+
+
+class PlanEditError(ValueError):
+    """Raised when an operation in a patch cannot be applied. Nothing is saved."""
+
+    def __init__(self, message: str, op_index: Optional[int] = None, status: int = 400):
+        self.message = message
+        self.op_index = op_index
+        self.status = status
+        super().__init__(message)
+
+
+class PlanEditService:
+    """
+    Applies an ordered list of edit operations to a pending plan in one pass.
+
+    Operations (weekly plans also take a day_index on each one):
+        {"op": "update", "index": 2, "sets": 4, "reps": 8, "weight": 60}
+        {"op": "remove", "index": 1}
+        {"op": "reorder", "from_index": 3, "to_index": 0}
+        {"op": "add", "movement_id": 17, "sets": 3, "reps": 10, "weight": 0}
+
+    Indexes refer to the plan as it stands after the preceding operations.
+    Operations run against a copy, so a failing operation leaves the stored
+    plan untouched. Only existing movements can be added; custom movements
+    still go through /pending_workout/add_custom_movement.
+    """
+
+    OPERATIONS = ("update", "remove", "reorder", "add")
+    MAX_OPERATIONS = 100
+
+    @staticmethod
+    def movement_entry(movement: Movement, sets: int, reps: int, weight: float) -> dict:
+        """Build a movement dict matching the pending plan structure."""
+        return {
+            'name': movement.movement_name,
+            'sets': int(sets),
+            'reps': int(reps),
+            'weight': float(weight),
+            'is_bodyweight': weight == 0,
+            'muscle_groups': [
+                {
+                    'name': mmg.muscle_group.muscle_group_name,
+                    'impact': mmg.target_percentage
+                }
+                for mmg in movement.muscle_groups
+            ]
+        }
+
+    @staticmethod
+    def apply(kind: str, plan: dict, operations: List[dict]) -> Tuple[dict, Dict]:
+        """
+        Apply operations to a copy of plan.
+
+        Returns (new_plan, changed) where changed holds only the fragments the
+        client needs to redraw:
+            lists:     [{"day_index", "movements"}] for every movement list whose
+                       shape changed (remove/reorder/add)
+            movements: [{"day_index", "index", "movement"}] for updated rows in
+                       lists that did not change shape
+
+        Raises:
+            PlanEditError: If any operation is malformed or out of range
+        """
+        if not isinstance(operations, list) or not operations:
+            raise PlanEditError("operations must be a non-empty list")
+        if len(operations) > PlanEditService.MAX_OPERATIONS:
+            raise PlanEditError(f"At most {PlanEditService.MAX_OPERATIONS} operations per request")
+
+        new_plan = copy.deepcopy(plan)
+        movements_by_id = PlanEditService._load_added_movements(operations)
+        reshaped = set()
+        updated = set()
+
+        for op_index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or operation.get('op') not in PlanEditService.OPERATIONS:
+                raise PlanEditError(
+                    f"op must be one of: {', '.join(PlanEditService.OPERATIONS)}", op_index
+                )
+            day_index, movements = PlanEditService._movement_list(kind, new_plan, operation, op_index)
+            op = operation['op']
+
+            if op == 'update':
+                index = PlanEditService._index(operation, 'index', len(movements), op_index)
+                try:
+                    validated = validate_request(PendingWorkoutUpdateInput, {
+                        'index': index,
+                        'sets': operation.get('sets'),
+                        'reps': operation.get('reps'),
+                        'weight': operation.get('weight')
+                    })
+                except ValidationError as e:
+                    raise PlanEditError(e.message, op_index)
+                if validated.get('sets') is not None:
+                    movements[index]['sets'] = int(validated['sets'])
+                if validated.get('reps') is not None:
+                    movements[index]['reps'] = int(validated['reps'])
+                if validated.get('weight') is not None:
+                    movements[index]['weight'] = float(validated['weight'])
+                updated.add((day_index, id(movements[index])))
+
+            elif op == 'remove':
+                index = PlanEditService._index(operation, 'index', len(movements), op_index)
+                movements.pop(index)
+                reshaped.add(day_index)
+
+            elif op == 'reorder':
+                from_index = PlanEditService._index(operation, 'from_index', len(movements), op_index)
+                to_index = PlanEditService._index(operation, 'to_index', len(movements), op_index)
+                movements.insert(to_index, movements.pop(from_index))
+                reshaped.add(day_index)
+
+            else:  # add
+                movement = movements_by_id.get(PlanEditService._as_int(operation.get('movement_id')))
+                if movement is None:
+                    raise PlanEditError('Movement not found', op_index, status=404)
+                try:
+                    validated = validate_request(MovementInput, {
+                        'movement_name': 'placeholder',
+                        'sets': operation.get('sets', 3),
+                        'reps': operation.get('reps', 10),
+                        'weight': operation.get('weight', 0)
+                    })
+                except ValidationError as e:
+                    raise PlanEditError(e.message, op_index)
+                movements.append(PlanEditService.movement_entry(
+                    movement, validated['sets'], validated['reps'], validated['weight']
+                ))
+                reshaped.add(day_index)
+
+        return new_plan, PlanEditService._changed(kind, new_plan, reshaped, updated)
+
+    @staticmethod
+    def _movement_list(kind: str, plan: dict, operation: dict, op_index: int) -> Tuple[Optional[int], list]:
+        if kind == 'workout':
+            return None, plan.setdefault('movements', [])
+        days = plan.get('weekly_plan', [])
+        day_index = PlanEditService._index(operation, 'day_index', len(days), op_index, label='day index')
+        return day_index, days[day_index].setdefault('movements', [])
+
+    @staticmethod
+    def _index(operation: dict, key: str, length: int, op_index: int, label: Optional[str] = None) -> int:
+        value = operation.get(key)
+        # bool is an int subclass; reject it so `true` is not read as index 1
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0 or value >= length:
+            raise PlanEditError(f"Invalid {label or key.replace('_', ' ')}", op_index)
+        return value
+
+    @staticmethod
+    def _as_int(value) -> Optional[int]:
+        # Form selects post movement IDs as strings
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _load_added_movements(operations: List[dict]) -> Dict[int, Movement]:
+        """Fetch every movement referenced by an add operation in one query."""
+        movement_ids = {
+            PlanEditService._as_int(operation.get('movement_id'))
+            for operation in operations
+            if isinstance(operation, dict) and operation.get('op') == 'add'
+        }
+        movement_ids.discard(None)
+        if not movement_ids:
+            return {}
+        movements = (
+            Movement.query
+            .options(joinedload(Movement.muscle_groups).joinedload(MovementMuscleGroup.muscle_group))
+            .filter(Movement.movement_id.in_(movement_ids))
+            .all()
+        )
+        return {movement.movement_id: movement for movement in movements}
+
+    @staticmethod
+    def _changed(kind: str, plan: dict, reshaped: set, updated: set) -> Dict:
+        def movement_list(day_index):
+            if kind == 'workout':
+                return plan.get('movements', [])
+            return plan['weekly_plan'][day_index].get('movements', [])
+
+        changed = {
+            'lists': [
+                {'day_index': day_index, 'movements': movement_list(day_index)}
+                for day_index in sorted(reshaped, key=lambda d: -1 if d is None else d)
+            ],
+            'movements': [],
+        }
+        # Updated rows are tracked by identity so later reorders/removes in the
+        # same batch do not point the client at the wrong index.
+        for day_index, movement_key in updated:
+            if day_index in reshaped:
+                continue
+            for index, movement in enumerate(movement_list(day_index)):
+                if id(movement) == movement_key:
+                    changed['movements'].append({'day_index': day_index, 'index': index, 'movement': movement})
+                    break
+        changed['movements'].sort(key=lambda item: (-1 if item['day_index'] is None else item['day_index'], item['index']))
+        return changed
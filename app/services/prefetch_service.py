@@ -0,0 +1,149 @@
+"""
+Prefetch Service - Fills in movement instructions and muscle groups in the background.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from sqlalchemy import exists, or_, select
+
+from app.models import db, Movement, MovementMuscleGroup, WorkoutMovement
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchService:
+    """
+    After a plan is confirmed, generates the instructions and muscle-group data
+    its movements are missing, so the active workout page can serve them from
+    storage instead of paying LLM latency on every click.
+
+    Jobs run on a small shared thread pool; each movement is queued at most
+    once at a time.
+
+    Config:
+        PREFETCH_ENABLED: Turn prefetching on/off (default True, False when TESTING)
+        PREFETCH_ASYNC: Run jobs on the thread pool (default True); False runs inline
+        PREFETCH_MAX_WORKERS: Concurrent LLM calls made by prefetching (default 2)
+    """
+
+    _app = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _lock = threading.Lock()
+    _in_flight = set()
+
+    @staticmethod
+    def init_app(app) -> None:
+        PrefetchService._app = app
+
+    @staticmethod
+    def _config(key: str, default):
+        app = PrefetchService._app
+        return app.config.get(key, default) if app is not None else default
+
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        with PrefetchService._lock:
+            if PrefetchService._executor is None:
+                PrefetchService._executor = ThreadPoolExecutor(
+                    max_workers=max(1, int(PrefetchService._config("PREFETCH_MAX_WORKERS", 2))),
+                    thread_name_prefix="movement-prefetch",
+                )
+            return PrefetchService._executor
+
+    @staticmethod
+    def movements_needing_prefetch(workout_ids: Iterable[int]) -> List[int]:
+        """Movement ids in the given workouts that lack instructions or muscle groups."""
+        workout_ids = list(workout_ids)
+        if not workout_ids:
+            return []
+
+        has_muscle_groups = exists().where(MovementMuscleGroup.movement_id == Movement.movement_id)
+        return list(db.session.scalars(
+            select(Movement.movement_id)
+            .join(WorkoutMovement, WorkoutMovement.movement_id == Movement.movement_id)
+            .filter(WorkoutMovement.workout_id.in_(workout_ids))
+            .filter(or_(
+                Movement.movement_instructions.is_(None),
+                Movement.movement_instructions == "",
+                ~has_muscle_groups,
+            ))
+            .distinct()
+        ))
+
+    @staticmethod
+    def enqueue_for_workouts(workout_ids: Iterable[int]) -> int:
+        """
+        Queue prefetch jobs for the movements of the given workouts.
+
+        Returns the number of movements queued. Never raises; a failed
+        prefetch only means the data is generated on demand later.
+        """
+        if PrefetchService._app is None or not PrefetchService._config("PREFETCH_ENABLED", True):
+            return 0
+
+        try:
+            movement_ids = PrefetchService.movements_needing_prefetch(workout_ids)
+        except Exception as e:
+            logger.warning(f"Could not collect movements to prefetch: {e}")
+            return 0
+
+        queued = 0
+        for movement_id in movement_ids:
+            with PrefetchService._lock:
+                if movement_id in PrefetchService._in_flight:
+                    continue
+                PrefetchService._in_flight.add(movement_id)
+            queued += 1
+
+            if PrefetchService._config("PREFETCH_ASYNC", True):
+                PrefetchService._get_executor().submit(PrefetchService._run_job, movement_id)
+            else:
+                PrefetchService._run_job(movement_id)
+        return queued
+
+    @staticmethod
+    def _run_job(movement_id: int) -> None:
+        try:
+            with PrefetchService._app.app_context():
+                PrefetchService.prefetch_movement(movement_id)
+        except Exception as e:
+            logger.warning(f"Prefetch failed for movement {movement_id}: {e}")
+        finally:
+            with PrefetchService._lock:
+                PrefetchService._in_flight.discard(movement_id)
+
+    @staticmethod
+    def prefetch_movement(movement_id: int) -> None:
+        """Generate and store whatever instructions/muscle-group data the movement lacks."""
+        # Imported here to avoid a circular import with MovementService
+        from app.services.ai_generation_service import AIGenerationService
+        from app.services.movement_service import MovementService
+
+        movement = db.session.get(Movement, movement_id)
+        if movement is None:
+            return
+
+        if not movement.movement_instructions:
+            try:
+                movement.movement_instructions = AIGenerationService.get_movement_instructions(
+                    movement.movement_name
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Could not prefetch instructions for {movement.movement_name}: {e}")
+
+        if not movement.muscle_groups:
+            info = AIGenerationService.get_movement_muscle_groups(movement.movement_name)
+            for mg_data in info.get("muscle_groups", []):
+                mg_name = mg_data.get("name", "")
+                if not mg_name:
+                    continue
+                mg = MovementService.find_or_create_muscle_group(mg_name)
+                MovementService.link_movement_to_muscle_group(
+                    movement.movement_id,
+                    mg.muscle_group_id,
+                    mg_data.get("impact", 0),
+                )
@@ -0,0 +1,212 @@
+"""
+Profiler Service - On-demand sampling profiles of single requests.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import g, request
+
+from app.guards.decorators import is_admin_session
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread every
+    interval_seconds and counts identical stacks, giving the collapsed
+    "frame;frame;frame count" lines flamegraph tools read.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float, max_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)[-2:]
+        return f"{code.co_name} ({'/'.join(path)}:{code.co_firstlineno})".replace(";", ":")
+
+    def _run(self) -> None:
+        deadline = self.started + self.max_seconds
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or time.perf_counter() > deadline:
+                return
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ProfilerService:
+    """
+    Profiles single requests for admins. Add "X-Profile: 1" or "?__profile=1"
+    to a request made while logged in as an admin (ADMIN_USERNAMES); the
+    request's thread is sampled while the view runs and the collapsed stacks
+    are written to PROFILE_DIR. The response carries the profile ID in
+    X-Profile-Id.
+
+    PROFILE_DIR is a ring buffer: once it holds PROFILE_MAX_FILES profiles the
+    oldest are deleted. Profiles are listed at /admin/profiles and downloaded
+    from /admin/profiles/<id> (feed them to flamegraph.pl or speedscope).
+
+    Config:
+        PROFILING_ENABLED: Honour the profile flag (default True)
+        PROFILE_DIR: Where profiles are stored (default <instance path>/profiles)
+        PROFILE_MAX_FILES: Profiles kept (default 50)
+        PROFILE_SAMPLE_INTERVAL_MS: Time between stack samples (default 5)
+        PROFILE_MAX_SECONDS: Sampling stops after this long (default 30)
+    """
+
+    HEADER = "X-Profile"
+    QUERY_FLAG = "__profile"
+
+    _enabled = True
+    _directory: Optional[str] = None
+    _max_files = 50
+    _interval_seconds = 0.005
+    _max_seconds = 30.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def init_app(app) -> None:
+        ProfilerService._enabled = bool(app.config.get("PROFILING_ENABLED", True))
+        ProfilerService._directory = app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+        ProfilerService._max_files = max(1, int(app.config.get("PROFILE_MAX_FILES", 50)))
+        ProfilerService._interval_seconds = float(app.config.get("PROFILE_SAMPLE_INTERVAL_MS", 5)) / 1000
+        ProfilerService._max_seconds = float(app.config.get("PROFILE_MAX_SECONDS", 30))
+        if not ProfilerService._enabled:
+            return
+        if ProfilerService._start_request not in app.before_request_funcs.get(None, []):
+            app.before_request(ProfilerService._start_request)
+            app.after_request(ProfilerService._finish_request)
+
+    @staticmethod
+    def _requested() -> bool:
+        flag = request.headers.get(ProfilerService.HEADER) or request.args.get(ProfilerService.QUERY_FLAG)
+        return flag not in (None, "", "0", "false")
+
+    @staticmethod
+    def _start_request() -> None:
+        if not ProfilerService._requested() or not is_admin_session():
+            return
+        g.profile_sampler = StackSampler(
+            threading.get_ident(), ProfilerService._interval_seconds, ProfilerService._max_seconds
+        ).start()
+
+    @staticmethod
+    def _finish_request(response):
+        sampler = g.pop("profile_sampler", None)
+        if sampler is None:
+            return response
+        sampler.stop()
+        try:
+            profile_id = ProfilerService.save(sampler, {
+                "endpoint": request.endpoint,
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "status": response.status_code,
+            })
+        except OSError as e:
+            logger.warning(f"Could not store request profile: {e}")
+            return response
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @staticmethod
+    def save(sampler: StackSampler, meta: Dict) -> str:
+        """Write one profile (collapsed stacks plus a JSON sidecar) and trim the ring buffer."""
+        now = datetime.utcnow()
+        profile_id = f"{now.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        directory = ProfilerService._directory
+        os.makedirs(directory, exist_ok=True)
+
+        with open(os.path.join(directory, f"{profile_id}.collapsed"), "w") as handle:
+            handle.write(sampler.collapsed())
+        with open(os.path.join(directory, f"{profile_id}.json"), "w") as handle:
+            json.dump({
+                **meta,
+                "id": profile_id,
+                "created_at": now.isoformat(timespec="seconds"),
+                "duration_ms": round(sampler.duration * 1000, 1),
+                "samples": sampler.samples,
+                "interval_ms": round(sampler.interval_seconds * 1000, 3),
+            }, handle)
+
+        ProfilerService._trim()
+        return profile_id
+
+    @staticmethod
+    def _trim() -> None:
+        with ProfilerService._lock:
+            ids = ProfilerService._ids()
+            for stale in ids[:-ProfilerService._max_files]:
+                for suffix in (".collapsed", ".json"):
+                    try:
+                        os.remove(os.path.join(ProfilerService._directory, stale + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    @staticmethod
+    def _ids() -> List[str]:
+        """Stored profile IDs, oldest first (IDs start with their timestamp)."""
+        try:
+            names = os.listdir(ProfilerService._directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".collapsed")] for name in names if name.endswith(".collapsed"))
+
+    @staticmethod
+    def list_profiles() -> List[Dict]:
+        """Metadata of stored profiles, newest first."""
+        profiles = []
+        for profile_id in reversed(ProfilerService._ids()):
+            try:
+                with open(os.path.join(ProfilerService._directory, f"{profile_id}.json")) as handle:
+                    profiles.append(json.load(handle))
+            except (OSError, ValueError):
+                profiles.append({"id": profile_id})
+        return profiles
+
+    @staticmethod
+    def profile_path(profile_id: str) -> Optional[str]:
+        """Path of a stored profile's collapsed stacks, or None if the ID is unknown or malformed."""
+        if not PROFILE_ID.match(profile_id or ""):
+            return None
+        path = os.path.join(ProfilerService._directory, f"{profile_id}.collapsed")
+        return path if os.path.exists(path) else None
@@ -0,0 +1,176 @@
+"""
+Query Stats Service - Per-request SQL instrumentation and slow-query log.
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.models import db
+from app.services.telemetry_service import percentile
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape so that repeats group together: literals
+    and bound parameters become ?, IN lists collapse to (?...) and whitespace
+    is squeezed.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NAMED_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryStatsService:
+    """
+    Counts SQL statements and the time spent in them for every request, using
+    SQLAlchemy cursor events on the app's engine.
+
+    Each response gets a Server-Timing header (db;dur=<ms>;desc="<n> queries").
+    Per endpoint the last SQL_STATS_WINDOW requests are kept in memory for the
+    admin summary. Statements slower than SQL_SLOW_QUERY_MS are logged with
+    their normalized SQL and the endpoint that issued them.
+
+    Stats are per process. Queries run after the response is built (streamed
+    bodies) count towards the slow-query log but not the request totals.
+
+    Config:
+        SQL_INSTRUMENTATION_ENABLED: Attach the listeners (default False)
+        SQL_SLOW_QUERY_MS: Slow-query log threshold (default 200)
+        SQL_STATS_WINDOW: Requests kept per endpoint (default 500)
+    """
+
+    _enabled = False
+    _slow_query_ms = 200.0
+    _window = 500
+    _lock = threading.Lock()
+    _samples: Dict[str, deque] = {}
+    _requests: Dict[str, int] = defaultdict(int)
+    _slow_queries: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def init_app(app) -> None:
+        QueryStatsService._enabled = bool(app.config.get("SQL_INSTRUMENTATION_ENABLED", False))
+        QueryStatsService._slow_query_ms = float(app.config.get("SQL_SLOW_QUERY_MS", 200))
+        QueryStatsService._window = int(app.config.get("SQL_STATS_WINDOW", 500))
+        QueryStatsService.reset()
+        if not QueryStatsService._enabled:
+            return
+
+        with app.app_context():
+            engine = db.engine
+        if not event.contains(engine, "before_cursor_execute", QueryStatsService._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", QueryStatsService._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", QueryStatsService._after_cursor_execute)
+        # init_app may run again for the same app (tests, reloads); register the hooks once
+        if QueryStatsService._start_request not in app.before_request_funcs.get(None, []):
+            app.before_request(QueryStatsService._start_request)
+            app.after_request(QueryStatsService._finish_request)
+
+    @staticmethod
+    def reset() -> None:
+        with QueryStatsService._lock:
+            QueryStatsService._samples = {}
+            QueryStatsService._requests = defaultdict(int)
+            QueryStatsService._slow_queries = defaultdict(int)
+
+    @staticmethod
+    def _endpoint() -> str:
+        if has_request_context():
+            return request.endpoint or "<unmatched>"
+        return "<no request>"
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context, so a statement that fails leaves nothing behind
+        context._query_stats_started = time.perf_counter()
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_stats_started", None)
+        if started is None or not QueryStatsService._enabled:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if has_request_context() and "sql_stats" in g:
+            g.sql_stats["queries"] += 1
+            g.sql_stats["ms"] += elapsed_ms
+
+        if elapsed_ms >= QueryStatsService._slow_query_ms:
+            endpoint = QueryStatsService._endpoint()
+            with QueryStatsService._lock:
+                QueryStatsService._slow_queries[endpoint] += 1
+            logger.warning(f"Slow query ({elapsed_ms:.1f}ms) on {endpoint}: {normalize_sql(statement)}")
+
+    @staticmethod
+    def _start_request() -> None:
+        g.sql_stats = {"queries": 0, "ms": 0.0}
+
+    @staticmethod
+    def _finish_request(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        endpoint = QueryStatsService._endpoint()
+        with QueryStatsService._lock:
+            samples = QueryStatsService._samples.get(endpoint)
+            if samples is None:
+                samples = QueryStatsService._samples[endpoint] = deque(maxlen=QueryStatsService._window)
+            samples.append((stats["ms"], stats["queries"]))
+            QueryStatsService._requests[endpoint] += 1
+
+        timing = f'db;dur={stats["ms"]:.1f};desc="{stats["queries"]} queries"'
+        existing = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        return response
+
+    @staticmethod
+    def summarize(endpoint: Optional[str] = None) -> Dict:
+        """
+        Aggregate per-endpoint stats for the admin endpoint: request count,
+        p50/p95 DB time, mean/p95/max queries per request and slow-query count.
+        Percentiles cover the last SQL_STATS_WINDOW requests of each endpoint.
+        """
+        with QueryStatsService._lock:
+            samples = {name: list(values) for name, values in QueryStatsService._samples.items()}
+            requests = dict(QueryStatsService._requests)
+            slow_queries = dict(QueryStatsService._slow_queries)
+
+        endpoints = {}
+        for name, values in sorted(samples.items()):
+            if endpoint and name != endpoint:
+                continue
+            db_ms = [ms for ms, _ in values]
+            queries = [count for _, count in values]
+            endpoints[name] = {
+                "requests": requests.get(name, 0),
+                "window": len(values),
+                "p50_db_ms": round(percentile(db_ms, 50), 2),
+                "p95_db_ms": round(percentile(db_ms, 95), 2),
+                "mean_queries": round(sum(queries) / len(queries), 2),
+                "p95_queries": percentile(queries, 95),
+                "max_queries": max(queries),
+                "slow_queries": slow_queries.get(name, 0),
+            }
+
+        return {
+            "enabled": QueryStatsService._enabled,
+            "slow_query_ms": QueryStatsService._slow_query_ms,
+            "endpoints": endpoints,
+        }
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from itertools import groupby
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, insert, select
 
 
 class StatsService:
@@ -39,8 +43,9 @@ class StatsService:
             return 0.0
 
     @staticmethod
-    def effective_load(weight_value: float, is_bodyweight: bool, user_bodyweight: float) -> float:
-        cfg = StatsService.get_config()
+    def effective_load(weight_value: float, is_bodyweight: bool, user_bodyweight: float,
+                       cfg: Optional[Dict[str, float]] = None) -> float:
+        cfg = cfg or StatsService.get_config()
         external = max(0.0, StatsService._safe_float(weight_value))
         bodyweight = max(0.0, StatsService._safe_float(user_bodyweight))
 
@@ -115,6 +120,37 @@ class StatsService:
             )
         return combined
 
+    @staticmethod
+    def calculate_set_totals(single_set, normalized, user_bodyweight: float,
+                             cfg: Optional[Dict[str, float]] = None) -> Dict[int, dict]:
+        """
+        Per-muscle-group volume/reps/sets contributed by one set.
+
+        Batch callers pass cfg (from get_config) so the app config is read once
+        rather than per entry.
+        """
+        cfg = cfg or StatsService.get_config()
+        totals: Dict[int, dict] = {}
+        entries = StatsService.iter_set_entries(single_set)
+        set_has_reps = False
+        for entry in entries:
+            reps = max(0, int(entry["reps"]))
+            if reps <= 0:
+                continue
+            set_has_reps = True
+            load = StatsService.effective_load(entry["weight_value"], entry["is_bodyweight"], user_bodyweight, cfg)
+            volume = reps * load
+
+            for assoc, pct in normalized:
+                bucket = totals.setdefault(assoc.muscle_group_id, {"volume": 0.0, "reps": 0.0, "sets": 0.0})
+                bucket["volume"] += volume * pct
+                bucket["reps"] += reps * pct
+
+        if set_has_reps:
+            for assoc, pct in normalized:
+                totals[assoc.muscle_group_id]["sets"] += 1.0 * pct
+        return totals
+
     @staticmethod
     def calculate_movement_totals(workout_movement) -> Dict[int, dict]:
         normalized = StatsService.normalize_muscle_groups(workout_movement.movement.muscle_groups)
@@ -122,6 +158,7 @@ class StatsService:
             return {}
 
         user_bodyweight = StatsService._safe_float(getattr(workout_movement.workout.user, "bodyweight", 0))
+        cfg = StatsService.get_config()
         totals: Dict[int, dict] = {}
 
         for assoc, pct in normalized:
@@ -134,28 +171,10 @@ class StatsService:
             }
 
         for single_set in workout_movement.sets:
-            entries = StatsService.iter_set_entries(single_set)
-            if not entries:
-                continue
-
-            set_has_reps = False
-            for entry in entries:
-                reps = max(0, int(entry["reps"]))
-                if reps <= 0:
-                    continue
-                set_has_reps = True
-                load = StatsService.effective_load(entry["weight_value"], entry["is_bodyweight"], user_bodyweight)
-                volume = reps * load
-
-                for assoc, pct in normalized:
-                    mg_id = assoc.muscle_group_id
-                    totals[mg_id]["volume"] += volume * pct
-                    totals[mg_id]["reps"] += reps * pct
-
-            if set_has_reps:
-                for assoc, pct in normalized:
-                    mg_id = assoc.muscle_group_id
-                    totals[mg_id]["sets"] += 1.0 * pct
+            for mg_id, data in StatsService.calculate_set_totals(single_set, normalized, user_bodyweight, cfg).items():
+                totals[mg_id]["volume"] += data["volume"]
+                totals[mg_id]["reps"] += data["reps"]
+                totals[mg_id]["sets"] += data["sets"]
 
         return totals
 
@@ -182,26 +201,66 @@ class StatsService:
                 totals[mg_id]["sets"] += data["sets"]
         return totals
 
-    @staticmethod
-    def sync_set_entry_from_set(single_set):
-        from app.models import SetEntry
-
-        reps = sum(getattr(r, "rep_count", 0) or 0 for r in getattr(single_set, "reps", []))
-        weight_obj = getattr(single_set, "weights", [None])[0] if getattr(single_set, "weights", None) else None
-        weight_value = getattr(weight_obj, "weight_value", 0) if weight_obj else 0
-        is_bodyweight = bool(getattr(weight_obj, "is_bodyweight", False)) if weight_obj else False
+    STORAGE_MODES = ("legacy", "entries")
 
-        entry = None
-        entries = getattr(single_set, "entries", [])
-        if entries:
-            entry = entries[0]
-        else:
-            entry = SetEntry(set_id=single_set.set_id, entry_order=1, reps=0, weight_value=0, is_bodyweight=False)
+    @staticmethod
+    def set_storage_mode() -> str:
+        """
+        'legacy' writes Rep + Weight + SetEntry for every set value; 'entries'
+        writes only SetEntry. Reads work in both modes (see Set.rep_count etc.).
+        """
+        mode = "legacy"
+        try:
+            from flask import current_app
+            if current_app:
+                mode = str(current_app.config.get("SET_STORAGE_MODE", mode)).lower()
+        except RuntimeError:
+            pass
+        return mode if mode in StatsService.STORAGE_MODES else "legacy"
 
-        entry.reps = max(0, int(reps))
+    @staticmethod
+    def write_set_values(single_set, reps=None, weight_value=None, is_bodyweight=None) -> None:
+        """
+        Store new values for a set through the configured storage path.
+
+        The primary SetEntry is always written (created if missing). Rep and
+        Weight rows are only written in 'legacy' mode, so 'entries' mode costs
+        one row per set instead of three. Arguments left as None keep their
+        current value. Caller adds/commits.
+        """
+        from app.models import SetEntry, Rep, Weight
+
+        current_reps = single_set.rep_count
+        current_weight = single_set.weight_value
+        current_bodyweight = single_set.is_bodyweight
+        reps = max(0, int(current_reps if reps is None else reps))
+        weight_value = current_weight if weight_value is None else weight_value
+        is_bodyweight = current_bodyweight if is_bodyweight is None else bool(is_bodyweight)
+
+        entry = single_set.primary_entry
+        if entry is None:
+            entry = SetEntry(entry_order=1)
+            single_set.entries.append(entry)
+        elif len(single_set.entries) > 1 and reps != current_reps:
+            # Per-set reps are stored on the primary entry; drop the extras
+            for extra in [e for e in single_set.entries if e is not entry]:
+                single_set.entries.remove(extra)
+        entry.reps = reps
         entry.weight_value = weight_value
         entry.is_bodyweight = is_bodyweight
-        return entry
+
+        if StatsService.set_storage_mode() != "legacy":
+            return
+
+        if single_set.reps:
+            single_set.reps[0].rep_count = reps
+        else:
+            single_set.reps.append(Rep(rep_count=reps))
+        if single_set.weights:
+            single_set.weights[0].weight_value = weight_value
+            single_set.weights[0].is_bodyweight = is_bodyweight
+        else:
+            single_set.weights.append(Weight(weight_value=weight_value, is_bodyweight=is_bodyweight))
 
     @staticmethod
     def rebuild_workout_impacts(workout, commit: bool = True) -> None:
@@ -222,3 +281,142 @@ class StatsService:
 
         if commit:
             db.session.commit()
+
+    @staticmethod
+    def rebuild_impacts_for_workouts(workout_ids: List[int], chunk_size: int = 1000) -> int:
+        """
+        Rebuild stored impacts for many workouts at once.
+
+        Per chunk of workouts, set entries are read as flat rows in one query
+        (no ORM objects) and fed through calculate_set_totals; old impact rows
+        are removed with one DELETE and the new ones written with one bulk
+        INSERT. Workouts that still have sets without SetEntry rows (not yet
+        folded, see scripts/fold_set_entries.py) go through
+        rebuild_workout_impacts instead. Commits per chunk.
+
+        Returns the number of impact rows written.
+        """
+        from app.models import (
+            db, User, Workout, WorkoutMovement, MovementMuscleGroup, Set, SetEntry, WorkoutMuscleGroupImpact,
+        )
+
+        normalized_by_movement: Dict[int, list] = {}
+        workout_ids = list(workout_ids)
+        written = 0
+        cfg = StatsService.get_config()
+
+        for start in range(0, len(workout_ids), chunk_size):
+            chunk_ids = workout_ids[start:start + chunk_size]
+
+            legacy_ids = set(db.session.execute(
+                select(WorkoutMovement.workout_id).distinct()
+                .join(Set, Set.workout_movement_id == WorkoutMovement.workout_movement_id)
+                .where(WorkoutMovement.workout_id.in_(chunk_ids))
+                .where(~exists().where(SetEntry.set_id == Set.set_id))
+            ).scalars())
+
+            pairs = db.session.execute(
+                select(WorkoutMovement.workout_id, WorkoutMovement.movement_id)
+                .where(WorkoutMovement.workout_id.in_(chunk_ids))
+            ).all()
+            missing = {movement_id for _, movement_id in pairs} - normalized_by_movement.keys()
+            if missing:
+                assocs = db.session.execute(
+                    select(MovementMuscleGroup.movement_id, MovementMuscleGroup.muscle_group_id,
+                           MovementMuscleGroup.target_percentage)
+                    .where(MovementMuscleGroup.movement_id.in_(missing))
+                    .order_by(MovementMuscleGroup.movement_id, MovementMuscleGroup.movement_muscle_group_id)
+                ).all()
+                for movement_id in missing:
+                    normalized_by_movement[movement_id] = []
+                for movement_id, movement_assocs in groupby(assocs, key=lambda a: a.movement_id):
+                    normalized_by_movement[movement_id] = StatsService.normalize_muscle_groups(list(movement_assocs))
+
+            # Every (workout, muscle group) a movement targets gets a row, even with no reps
+            totals: Dict[int, Dict[int, dict]] = {}
+            for workout_id, movement_id in pairs:
+                if workout_id in legacy_ids:
+                    continue
+                for assoc, _ in normalized_by_movement[movement_id]:
+                    totals.setdefault(workout_id, {}).setdefault(
+                        assoc.muscle_group_id, {"volume": 0.0, "reps": 0.0, "sets": 0.0}
+                    )
+
+            entry_rows = db.session.execute(
+                select(
+                    Workout.workout_id, User.bodyweight, WorkoutMovement.movement_id,
+                    SetEntry.set_id, SetEntry.entry_id, SetEntry.entry_order,
+                    SetEntry.reps, SetEntry.weight_value, SetEntry.is_bodyweight,
+                )
+                .join(User, User.user_id == Workout.user_id)
+                .join(WorkoutMovement, WorkoutMovement.workout_id == Workout.workout_id)
+                .join(Set, Set.workout_movement_id == WorkoutMovement.workout_movement_id)
+                .join(SetEntry, SetEntry.set_id == Set.set_id)
+                .where(Workout.workout_id.in_([i for i in chunk_ids if i not in legacy_ids]))
+                .order_by(SetEntry.set_id)
+            )
+            for _, set_entries in groupby(entry_rows, key=lambda row: row.set_id):
+                set_entries = list(set_entries)
+                first = set_entries[0]
+                normalized = normalized_by_movement[first.movement_id]
+                if not normalized:
+                    continue
+                set_totals = StatsService.calculate_set_totals(
+                    SimpleNamespace(entries=set_entries), normalized, StatsService._safe_float(first.bodyweight), cfg
+                )
+                workout_totals = totals[first.workout_id]
+                for mg_id, data in set_totals.items():
+                    workout_totals[mg_id]["volume"] += data["volume"]
+                    workout_totals[mg_id]["reps"] += data["reps"]
+                    workout_totals[mg_id]["sets"] += data["sets"]
+
+            rows = [
+                {
+                    "workout_id": workout_id,
+                    "muscle_group_id": mg_id,
+                    "total_volume": round(data["volume"], 2),
+                    "total_reps": round(data["reps"], 2),
+                    "total_sets": round(data["sets"], 2),
+                }
+                for workout_id, by_group in totals.items()
+                for mg_id, data in by_group.items()
+            ]
+            db.session.execute(
+                delete(WorkoutMuscleGroupImpact).where(WorkoutMuscleGroupImpact.workout_id.in_(chunk_ids)),
+                execution_options={"synchronize_session": False},
+            )
+            if rows:
+                db.session.execute(insert(WorkoutMuscleGroupImpact.__table__), rows)
+            for workout in Workout.query.filter(Workout.workout_id.in_(legacy_ids)):
+                StatsService.rebuild_workout_impacts(workout, commit=False)
+            db.session.commit()
+            written += len(rows)
+        return written
+
+    @staticmethod
+    def apply_workout_impact_delta(workout_id: int, delta: Dict[int, dict]) -> None:
+        """
+        Add per-muscle-group deltas to a workout's stored impacts in place,
+        instead of deleting and rebuilding every row. Caller commits.
+        """
+        from app.models import db, WorkoutMuscleGroupImpact
+
+        for mg_id, data in delta.items():
+            if not any(data.values()):
+                continue
+            updated = WorkoutMuscleGroupImpact.query.filter_by(workout_id=workout_id, muscle_group_id=mg_id).update(
+                {
+                    WorkoutMuscleGroupImpact.total_volume: WorkoutMuscleGroupImpact.total_volume + round(data["volume"], 2),
+                    WorkoutMuscleGroupImpact.total_reps: WorkoutMuscleGroupImpact.total_reps + round(data["reps"], 2),
+                    WorkoutMuscleGroupImpact.total_sets: WorkoutMuscleGroupImpact.total_sets + round(data["sets"], 2),
+                },
+                synchronize_session=False,
+            )
+            if not updated:
+                db.session.add(WorkoutMuscleGroupImpact(
+                    workout_id=workout_id,
+                    muscle_group_id=mg_id,
+                    total_volume=max(0.0, data["volume"]),
+                    total_reps=max(0.0, data["reps"]),
+                    total_sets=max(0.0, data["sets"]),
+                ))
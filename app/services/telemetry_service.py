@@ -0,0 +1,198 @@
+"""
+Telemetry Service - Buffered, batched recording of LLM call metrics.
+"""
+import atexit
+import logging
+import math
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.models import db, LLMCallTelemetry
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; returns None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class TelemetryService:
+    """
+    Collects LLM call records in memory and writes them to LLMCallTelemetry in
+    batches from a background thread, so the request path only appends to a list.
+
+    Config:
+        TELEMETRY_ENABLED: Turn recording on/off (default True)
+        TELEMETRY_ASYNC: Flush from a background thread (default True, False when TESTING)
+        TELEMETRY_BATCH_SIZE: Buffered rows that trigger an early flush (default 50)
+        TELEMETRY_FLUSH_SECONDS: Maximum time a row waits in the buffer (default 5)
+    """
+
+    _app = None
+    _buffer: List[dict] = []
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _thread: Optional[threading.Thread] = None
+    _enabled = False
+    _async = True
+    _batch_size = 50
+    _flush_seconds = 5.0
+
+    @staticmethod
+    def init_app(app) -> None:
+        TelemetryService._app = app
+        TelemetryService._enabled = bool(app.config.get("TELEMETRY_ENABLED", True))
+        TelemetryService._async = bool(app.config.get("TELEMETRY_ASYNC", not app.config.get("TESTING")))
+        TelemetryService._batch_size = int(app.config.get("TELEMETRY_BATCH_SIZE", 50))
+        TelemetryService._flush_seconds = float(app.config.get("TELEMETRY_FLUSH_SECONDS", 5))
+        with TelemetryService._lock:
+            TelemetryService._buffer = []
+
+    @staticmethod
+    def record_llm_call(
+        model: str,
+        prompt_kind: str,
+        outcome: str,
+        latency_ms: Optional[int] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        attempt: int = 1,
+    ) -> None:
+        """Queue one telemetry row. Never raises; telemetry must not break generation."""
+        if not TelemetryService._enabled or TelemetryService._app is None:
+            return
+
+        row = {
+            "model": model,
+            "prompt_kind": prompt_kind,
+            "latency_ms": latency_ms,
+            "input_tokens": int(input_tokens or 0),
+            "output_tokens": int(output_tokens or 0),
+            "attempt": int(attempt or 1),
+            "outcome": outcome,
+            "created_at": datetime.utcnow(),
+        }
+        with TelemetryService._lock:
+            TelemetryService._buffer.append(row)
+            buffered = len(TelemetryService._buffer)
+
+        if TelemetryService._async:
+            TelemetryService._ensure_flusher()
+            if buffered >= TelemetryService._batch_size:
+                TelemetryService._wakeup.set()
+        elif buffered >= TelemetryService._batch_size:
+            TelemetryService.flush()
+
+    @staticmethod
+    def flush() -> int:
+        """Write every buffered row in one batched INSERT. Returns rows written."""
+        with TelemetryService._lock:
+            rows, TelemetryService._buffer = TelemetryService._buffer, []
+        if not rows or TelemetryService._app is None:
+            return 0
+
+        try:
+            with TelemetryService._app.app_context():
+                db.session.execute(insert(LLMCallTelemetry), rows)
+                db.session.commit()
+        except Exception as e:
+            logger.warning(f"Dropped {len(rows)} LLM telemetry rows: {e}")
+            return 0
+        return len(rows)
+
+    @staticmethod
+    def _ensure_flusher() -> None:
+        if TelemetryService._thread is not None and TelemetryService._thread.is_alive():
+            return
+        with TelemetryService._lock:
+            if TelemetryService._thread is not None and TelemetryService._thread.is_alive():
+                return
+            TelemetryService._thread = threading.Thread(
+                target=TelemetryService._flush_loop, name="llm-telemetry-writer", daemon=True
+            )
+            TelemetryService._thread.start()
+
+    @staticmethod
+    def _flush_loop() -> None:
+        while True:
+            TelemetryService._wakeup.wait(TelemetryService._flush_seconds)
+            TelemetryService._wakeup.clear()
+            TelemetryService.flush()
+
+    @staticmethod
+    def summarize(days: int = 7) -> Dict:
+        """
+        Aggregate telemetry for the admin endpoint.
+
+        Returns per-day/per-prompt-kind call counts, p50/p95 latency, token
+        totals, outcome counts and plan cache hit rate. Latency percentiles only
+        consider rows that made a network call (json_retry and cache rows carry
+        no latency).
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+        rows = (
+            db.session.query(
+                LLMCallTelemetry.created_at,
+                LLMCallTelemetry.prompt_kind,
+                LLMCallTelemetry.latency_ms,
+                LLMCallTelemetry.input_tokens,
+                LLMCallTelemetry.output_tokens,
+                LLMCallTelemetry.outcome,
+            )
+            .filter(LLMCallTelemetry.created_at >= since)
+            .all()
+        )
+
+        def _empty():
+            return {"latencies": [], "calls": 0, "input_tokens": 0, "output_tokens": 0, "outcomes": defaultdict(int)}
+
+        daily = defaultdict(_empty)
+        by_kind = defaultdict(_empty)
+        for created_at, kind, latency_ms, input_tokens, output_tokens, outcome in rows:
+            day = created_at.strftime("%Y-%m-%d")
+            for bucket in (daily[(day, kind)], by_kind[kind]):
+                bucket["outcomes"][outcome] += 1
+                if latency_ms is None:
+                    continue
+                bucket["calls"] += 1
+                bucket["latencies"].append(latency_ms)
+                bucket["input_tokens"] += input_tokens or 0
+                bucket["output_tokens"] += output_tokens or 0
+
+        def _finish(bucket):
+            hits = bucket["outcomes"].get("cache_hit", 0)
+            lookups = hits + bucket["outcomes"].get("cache_miss", 0)
+            return {
+                "calls": bucket["calls"],
+                "cache_hit_rate": round(hits / lookups, 3) if lookups else None,
+                "p50_latency_ms": percentile(bucket["latencies"], 50),
+                "p95_latency_ms": percentile(bucket["latencies"], 95),
+                "input_tokens": bucket["input_tokens"],
+                "output_tokens": bucket["output_tokens"],
+                "outcomes": dict(bucket["outcomes"]),
+            }
+
+        return {
+            "range": {
+                "start": since.strftime("%Y-%m-%d"),
+                "end": datetime.utcnow().strftime("%Y-%m-%d"),
+            },
+            "by_prompt_kind": {kind: _finish(bucket) for kind, bucket in sorted(by_kind.items())},
+            "daily": [
+                {"date": day, "prompt_kind": kind, **_finish(bucket)}
+                for (day, kind), bucket in sorted(daily.items())
+            ],
+            "buffered": len(TelemetryService._buffer),
+        }
+
+
+atexit.register(TelemetryService.flush)
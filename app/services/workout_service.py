@@ -1,18 +1,52 @@
 """
 Workout Service - Handles workout CRUD operations.
 """
+import base64
+import binascii
 import uuid
 from datetime import date, datetime, timedelta
 from typing import Optional, List
 
-from app.models import db, Workout, WorkoutMovement
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import (
+    db,
+    Workout,
+    WorkoutMovement,
+    Movement,
+    MovementMuscleGroup,
+    Set,
+    WorkoutSyncCursor,
+    WorkoutMuscleGroupImpact,
+    WorkoutFeedbackSummary,
+)
 from app.services.movement_service import MovementService
 from app.services.stats_service import StatsService
 from app.services.feedback_service import FeedbackService
 
 
+class SetSyncError(ValueError):
+    """Raised when a set-sync batch cannot be applied. Nothing is written."""
+
+    def __init__(self, message: str, status: int = 400):
+        self.message = message
+        self.status = status
+        super().__init__(message)
+
+
 class WorkoutService:
 
+    # Largest batch sync_set_changes accepts (an offline queue flushes in chunks)
+    MAX_SYNC_CHANGES = 200
+
+    # Largest page list_user_workouts_page returns
+    MAX_PAGE_SIZE = 100
+
+    # Widest window list_calendar_days accepts (a month view spans up to six weeks)
+    MAX_CALENDAR_DAYS = 93
+
     @staticmethod
     def create_blank_workout(user_id: int, workout_date: date, name: str = "New workout") -> Workout:
         """
@@ -127,35 +161,19 @@ class WorkoutService:
 
         Args:
             workout_id: The workout to update
-            form_data: Request form data with weight_X, rep_X, done_X keys
+            form_data: Request form data with rep_X, set_weight_X (or legacy
+                weight_<weight_id>), set_is_bodyweight_X and done_X keys
 
         Returns:
             Updated Workout object
         """
-        workout = Workout.query.get_or_404(workout_id)
+        workout = WorkoutService.get_workout_tree(workout_id)
+        now = datetime.utcnow().replace(microsecond=0)
 
         for wm in workout.workout_movements:
-            # Update sets/reps/weights
+            # Update sets/reps/weights; unchanged sets are left untouched
             for s in wm.sets:
-                # Handle weight updates
-                if s.weights:
-                    w = s.weights[0]
-                    weight_key = f"weight_{w.weight_id}"
-                    bodyweight_key = f"is_bodyweight_{w.weight_id}"
-
-                    if weight_key in form_data:
-                        w.weight_value = float(form_data[weight_key])
-                    w.is_bodyweight = (bodyweight_key in form_data)
-
-                # Handle rep updates
-                if s.reps:
-                    rep = s.reps[0]
-                    rep_key = f"rep_{s.set_id}"
-                    if rep_key in form_data:
-                        rep.rep_count = int(form_data[rep_key])
-
-                entry = StatsService.sync_set_entry_from_set(s)
-                db.session.add(entry)
+                WorkoutService._apply_form_set_values(s, form_data, now, bodyweight_from_form=True)
             # Update done status
             done_key = f"done_{wm.workout_movement_id}"
             wm.done = (done_key in form_data)
@@ -173,7 +191,8 @@ class WorkoutService:
 
         Args:
             workout_id: The workout to complete
-            form_data: Request form data with weight_X, rep_X, done_X keys
+            form_data: Request form data with rep_X, set_weight_X (or legacy
+                weight_<weight_id>) and done_X keys
             completion_date: Date of completion (defaults to today)
 
         Returns:
@@ -182,31 +201,18 @@ class WorkoutService:
         if completion_date is None:
             completion_date = datetime.now().date()
 
-        workout = Workout.query.get_or_404(workout_id)
+        workout = WorkoutService.get_workout_tree(workout_id)
         workout.is_completed = True
         workout.workout_date = completion_date
 
         # Update all movements
+        now = datetime.utcnow().replace(microsecond=0)
         for wm in workout.workout_movements:
             done_key = f"done_{wm.workout_movement_id}"
             wm.done = (done_key in form_data)
 
             for s in wm.sets:
-                # Update reps
-                rep_key = f"rep_{s.set_id}"
-                if rep_key in form_data:
-                    if s.reps:
-                        s.reps[0].rep_count = int(form_data[rep_key])
-
-                # Update weights
-                if s.weights:
-                    w = s.weights[0]
-                    weight_key = f"weight_{w.weight_id}"
-                    if weight_key in form_data:
-                        w.weight_value = float(form_data[weight_key])
-
-                entry = StatsService.sync_set_entry_from_set(s)
-                db.session.add(entry)
+                WorkoutService._apply_form_set_values(s, form_data, now)
 
         StatsService.rebuild_workout_impacts(workout, commit=False)
         db.session.commit()
@@ -221,6 +227,206 @@ class WorkoutService:
 
         return workout
 
+    @staticmethod
+    def _apply_form_set_values(single_set: Set, form_data: dict, now: datetime, bodyweight_from_form: bool = False) -> None:
+        """
+        Write a set's posted values if they differ from what is stored.
+
+        Weight fields are keyed by set ID (set_weight_<set_id>); the older
+        weight_<weight_id> keys are still accepted for sets that have Weight rows.
+        """
+        legacy_weight = single_set.weights[0] if single_set.weights else None
+        reps = weight = is_bodyweight = None
+
+        rep_key = f"rep_{single_set.set_id}"
+        if rep_key in form_data:
+            reps = int(form_data[rep_key])
+
+        weight_keys = [f"set_weight_{single_set.set_id}"]
+        bodyweight_keys = [f"set_is_bodyweight_{single_set.set_id}"]
+        if legacy_weight is not None:
+            weight_keys.append(f"weight_{legacy_weight.weight_id}")
+            bodyweight_keys.append(f"is_bodyweight_{legacy_weight.weight_id}")
+        for key in weight_keys:
+            if key in form_data:
+                weight = float(form_data[key])
+                break
+        if bodyweight_from_form:
+            is_bodyweight = any(key in form_data for key in bodyweight_keys)
+
+        state_before = WorkoutService.set_state(single_set)
+        changed = (
+            (reps is not None and reps != state_before['reps'])
+            or (weight is not None and weight != state_before['weight'])
+            or (is_bodyweight is not None and is_bodyweight != state_before['is_bodyweight'])
+        )
+        if changed:
+            StatsService.write_set_values(single_set, reps, weight, is_bodyweight)
+            # Bump the version that active-workout sync checks for conflicts
+            single_set.updated_at = now
+
+    @staticmethod
+    def sync_set_changes(
+        workout: Workout,
+        client_id: str,
+        changes: List[dict],
+        detect_conflicts: bool = False,
+    ) -> dict:
+        """
+        Apply only the sets that changed during an active session.
+
+        Each change carries a client sequence number. Changes at or below the
+        client's stored cursor were already applied and are skipped, so a
+        retried request is harmless. Only the named sets (and their Rep,
+        Weight and SetEntry rows) are touched; for completed workouts the
+        stored muscle group impacts are adjusted by the difference instead of
+        being rebuilt. The whole batch is one transaction.
+
+        With detect_conflicts, each change's base_updated_at must match the
+        set's updated_at as it was before this batch. Changes made against an
+        older version are not applied and come back under 'conflicts' with
+        the server's current values.
+
+        Args:
+            workout: The workout being edited
+            client_id: Opaque ID of the sending client (one per browser tab)
+            changes: Validated SetChangeInput dicts
+            detect_conflicts: Compare base_updated_at against Set.updated_at
+
+        Returns:
+            Dict with applied/skipped sequence numbers, conflicts, the new
+            last_seq, the new updated_at of every written set and the
+            per-muscle-group impact delta
+
+        Raises:
+            SetSyncError: Unknown set (400) or a concurrent sync from the same
+                client (409)
+        """
+        cursor = WorkoutService._sync_cursor(workout.workout_id, client_id)
+        last_seq = cursor.last_seq
+        pending = sorted((c for c in changes if c['seq'] > last_seq), key=lambda c: c['seq'])
+        result = {
+            'applied': [],
+            'skipped': sorted(c['seq'] for c in changes if c['seq'] <= last_seq),
+            'conflicts': [],
+            'last_seq': last_seq,
+            'sets': {},
+            'impact_delta': {},
+        }
+        if not pending:
+            return result
+
+        set_ids = {c['set_id'] for c in pending}
+        sets = (
+            Set.query
+            .join(WorkoutMovement)
+            .filter(WorkoutMovement.workout_id == workout.workout_id, Set.set_id.in_(set_ids))
+            .options(
+                selectinload(Set.reps),
+                selectinload(Set.weights),
+                selectinload(Set.entries),
+                joinedload(Set.workout_movement)
+                .joinedload(WorkoutMovement.movement)
+                .selectinload(Movement.muscle_groups),
+            )
+            .all()
+        )
+        sets_by_id = {s.set_id: s for s in sets}
+        missing = set_ids - sets_by_id.keys()
+        if missing:
+            raise SetSyncError(f"Sets not in this workout: {', '.join(str(i) for i in sorted(missing))}")
+
+        # Claim the sequence range first; a duplicate request racing this one
+        # fails here instead of applying the same changes twice.
+        new_seq = pending[-1]['seq']
+        claimed = WorkoutSyncCursor.query.filter_by(cursor_id=cursor.cursor_id, last_seq=last_seq).update(
+            {WorkoutSyncCursor.last_seq: new_seq, WorkoutSyncCursor.updated_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+        if not claimed:
+            db.session.rollback()
+            raise SetSyncError("Another sync from this client is in progress", status=409)
+
+        track_impacts = bool(workout.is_completed)
+        bodyweight = StatsService._safe_float(getattr(workout.user, "bodyweight", 0))
+
+        def set_totals(single_set):
+            normalized = StatsService.normalize_muscle_groups(single_set.workout_movement.movement.muscle_groups)
+            return StatsService.calculate_set_totals(single_set, normalized, bodyweight)
+
+        before = {s.set_id: set_totals(s) for s in sets} if track_impacts else {}
+        # Versions as the client could have seen them, before this batch
+        base_versions = {s.set_id: WorkoutService._version(s.updated_at) for s in sets}
+        # Second precision so the value round-trips through MySQL DATETIME
+        now = datetime.utcnow().replace(microsecond=0)
+        written = set()
+
+        for change in pending:
+            single_set = sets_by_id[change['set_id']]
+            if detect_conflicts and WorkoutService._version(change.get('base_updated_at')) != base_versions[single_set.set_id]:
+                result['conflicts'].append({'seq': change['seq'], 'set_id': single_set.set_id})
+                continue
+            result['applied'].append(change['seq'])
+            written.add(single_set.set_id)
+            single_set.updated_at = now
+            StatsService.write_set_values(single_set, change.get('reps'), change.get('weight'), change.get('is_bodyweight'))
+
+        if track_impacts:
+            delta = {}
+            for set_id, old_totals in before.items():
+                new_totals = set_totals(sets_by_id[set_id])
+                for mg_id in old_totals.keys() | new_totals.keys():
+                    bucket = delta.setdefault(mg_id, {"volume": 0.0, "reps": 0.0, "sets": 0.0})
+                    for key in bucket:
+                        bucket[key] += new_totals.get(mg_id, {}).get(key, 0.0) - old_totals.get(mg_id, {}).get(key, 0.0)
+            StatsService.apply_workout_impact_delta(workout.workout_id, delta)
+            result['impact_delta'] = {
+                mg_id: {key: round(value, 2) for key, value in data.items()}
+                for mg_id, data in delta.items()
+                if any(data.values())
+            }
+
+        db.session.commit()
+        result['last_seq'] = new_seq
+        result['sets'] = {set_id: now.isoformat() for set_id in sorted(written)}
+        for conflict in result['conflicts']:
+            conflict.update(WorkoutService.set_state(sets_by_id[conflict['set_id']]))
+        return result
+
+    @staticmethod
+    def _version(value) -> Optional[str]:
+        """Normalize an updated_at (datetime or ISO string) for comparison."""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.replace(microsecond=0, tzinfo=None).isoformat()
+
+    @staticmethod
+    def set_state(single_set: Set) -> dict:
+        """Current reps/weight/version of a set, as the active workout page sees it."""
+        return {
+            'reps': single_set.rep_count,
+            'weight': single_set.weight_value,
+            'is_bodyweight': single_set.is_bodyweight,
+            'updated_at': WorkoutService._version(single_set.updated_at),
+        }
+
+    @staticmethod
+    def _sync_cursor(workout_id: int, client_id: str) -> WorkoutSyncCursor:
+        cursor = WorkoutSyncCursor.query.filter_by(workout_id=workout_id, client_id=client_id).first()
+        if cursor is not None:
+            return cursor
+        cursor = WorkoutSyncCursor(workout_id=workout_id, client_id=client_id, last_seq=0)
+        db.session.add(cursor)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # Another request from the same client created it first
+            db.session.rollback()
+            cursor = WorkoutSyncCursor.query.filter_by(workout_id=workout_id, client_id=client_id).one()
+        return cursor
+
     @staticmethod
     def delete_workout(workout_id: int) -> bool:
         """
@@ -228,11 +434,30 @@ class WorkoutService:
 
         Returns True if successful.
         """
-        workout = Workout.query.get_or_404(workout_id)
-        db.session.delete(workout)
+        Workout.query.get_or_404(workout_id)
+        WorkoutService.delete_workouts([workout_id])
         db.session.commit()
         return True
 
+    @staticmethod
+    def delete_workouts(workout_ids) -> int:
+        """
+        Delete workouts and everything under them with set-based statements.
+
+        workout_ids may be a list or a SELECT of IDs (e.g. all of a user's
+        workouts). Nothing is loaded into the session. The caller commits.
+
+        Returns the number of workouts deleted.
+        """
+        MovementService.delete_workout_movements(
+            select(WorkoutMovement.workout_movement_id).where(WorkoutMovement.workout_id.in_(workout_ids))
+        )
+        options = {"synchronize_session": False}
+        for model in (WorkoutMuscleGroupImpact, WorkoutFeedbackSummary, WorkoutSyncCursor):
+            db.session.execute(delete(model).where(model.workout_id.in_(workout_ids)), execution_options=options)
+        result = db.session.execute(delete(Workout).where(Workout.workout_id.in_(workout_ids)), execution_options=options)
+        return result.rowcount
+
     @staticmethod
     def update_workout_name(workout_id: int, new_name: str) -> Workout:
         """Update the name of a workout."""
@@ -254,6 +479,36 @@ class WorkoutService:
         """Get a workout by ID or return None."""
         return Workout.query.get(workout_id)
 
+    @staticmethod
+    def workout_tree_options() -> list:
+        """
+        Loader options for a workout with everything the detail pages, impact
+        rebuild and duplication walk: user, movements with their muscle group
+        split, sets and set rows. A fixed number of queries however many
+        movements the workout has.
+        """
+        movements = selectinload(Workout.workout_movements)
+        sets = movements.selectinload(WorkoutMovement.sets)
+        return [
+            joinedload(Workout.user),
+            movements.joinedload(WorkoutMovement.movement)
+            .selectinload(Movement.muscle_groups)
+            .joinedload(MovementMuscleGroup.muscle_group),
+            sets.selectinload(Set.entries),
+            sets.selectinload(Set.reps),
+            sets.selectinload(Set.weights),
+        ]
+
+    @staticmethod
+    def get_workout_tree(workout_id: int) -> Workout:
+        """Load a workout with workout_tree_options, or abort with 404."""
+        return (
+            Workout.query
+            .options(*WorkoutService.workout_tree_options())
+            .filter_by(workout_id=workout_id)
+            .first_or_404()
+        )
+
     @staticmethod
     def get_user_workouts(user_id: int, filter_completed: Optional[bool] = None) -> list:
         """
@@ -275,6 +530,137 @@ class WorkoutService:
 
         return query.order_by(Workout.workout_date.desc()).all()
 
+    @staticmethod
+    def encode_page_cursor(workout_date: datetime, workout_id: int) -> str:
+        """Opaque cursor pointing just past the given (workout_date, workout_id)."""
+        raw = f"{workout_date.isoformat()}|{workout_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_page_cursor(cursor: str) -> tuple:
+        """Inverse of encode_page_cursor. Raises ValueError on a malformed cursor."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            date_part, id_part = raw.split("|")
+            return datetime.fromisoformat(date_part), int(id_part)
+        except (UnicodeError, ValueError, binascii.Error) as e:
+            raise ValueError("Invalid cursor") from e
+
+    @staticmethod
+    def list_user_workouts_page(
+        user_id: int,
+        filter_completed: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: int = 24,
+    ) -> tuple:
+        """
+        One page of a user's workouts, newest first, as lightweight summaries.
+
+        Uses keyset pagination over (workout_date, workout_id), so each page
+        costs O(limit) however long the history is. Only the listing columns
+        are selected; movement count and total volume come from correlated
+        subqueries evaluated for the page's rows only.
+
+        Returns (summaries, next_cursor); next_cursor is None on the last page.
+        Raises ValueError if the cursor is malformed.
+        """
+        limit = max(1, min(int(limit), WorkoutService.MAX_PAGE_SIZE))
+
+        movement_count = (
+            select(func.count(WorkoutMovement.workout_movement_id))
+            .where(WorkoutMovement.workout_id == Workout.workout_id)
+            .correlate(Workout)
+            .scalar_subquery()
+        )
+        total_volume = (
+            select(func.coalesce(func.sum(WorkoutMuscleGroupImpact.total_volume), 0))
+            .where(WorkoutMuscleGroupImpact.workout_id == Workout.workout_id)
+            .correlate(Workout)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                Workout.workout_id,
+                Workout.workout_name,
+                Workout.workout_date,
+                Workout.is_completed,
+                movement_count.label("movement_count"),
+                total_volume.label("total_volume"),
+            )
+            .where(Workout.user_id == user_id)
+            .order_by(Workout.workout_date.desc(), Workout.workout_id.desc())
+            .limit(limit + 1)
+        )
+
+        if filter_completed is True:
+            query = query.where(Workout.is_completed.is_(True))
+        elif filter_completed is False:
+            query = query.where(Workout.is_completed.is_(False))
+
+        if cursor:
+            after_date, after_id = WorkoutService.decode_page_cursor(cursor)
+            query = query.where(or_(
+                Workout.workout_date < after_date,
+                and_(Workout.workout_date == after_date, Workout.workout_id < after_id),
+            ))
+
+        rows = db.session.execute(query).all()
+        page = rows[:limit]
+        summaries = [
+            {
+                "workout_id": row.workout_id,
+                "workout_name": row.workout_name,
+                "workout_date": row.workout_date,
+                "is_completed": bool(row.is_completed),
+                "movement_count": row.movement_count,
+                "total_volume": round(float(row.total_volume or 0), 2),
+            }
+            for row in page
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = WorkoutService.encode_page_cursor(last.workout_date, last.workout_id)
+        return summaries, next_cursor
+
+    @staticmethod
+    def list_calendar_days(user_id: int, start: date, end: date) -> List[dict]:
+        """
+        A user's workouts in [start, end), grouped per day for the planner calendar.
+
+        Only the columns the calendar shows are selected, bounded by the
+        (user_id, workout_date) index, so the cost follows the window rather
+        than the length of the history.
+
+        Returns [{"date": "YYYY-MM-DD", "workouts": [{"id", "name", "completed"}]}]
+        for days that have workouts, in date order.
+        Raises ValueError if the window is empty or wider than MAX_CALENDAR_DAYS.
+        """
+        if end <= start:
+            raise ValueError("end must be after start")
+        if (end - start).days > WorkoutService.MAX_CALENDAR_DAYS:
+            raise ValueError(f"Range is limited to {WorkoutService.MAX_CALENDAR_DAYS} days")
+
+        rows = db.session.execute(
+            select(Workout.workout_id, Workout.workout_name, Workout.workout_date, Workout.is_completed)
+            .where(
+                Workout.user_id == user_id,
+                Workout.workout_date >= datetime.combine(start, datetime.min.time()),
+                Workout.workout_date < datetime.combine(end, datetime.min.time()),
+            )
+            .order_by(Workout.workout_date, Workout.workout_id)
+        )
+
+        days = {}
+        for row in rows:
+            day = row.workout_date.strftime("%Y-%m-%d")
+            days.setdefault(day, []).append({
+                "id": row.workout_id,
+                "name": row.workout_name,
+                "completed": bool(row.is_completed),
+            })
+        return [{"date": day, "workouts": workouts} for day, workouts in days.items()]
+
     @staticmethod
     def generate_and_add_movements(workout_id: int, plan: dict) -> Workout:
         """
@@ -294,6 +680,8 @@ class WorkoutService:
         if workout_name:
             workout.workout_name = workout_name
 
+        workout.updated_at = datetime.utcnow()
+
         # Populate movements
         movements_list = plan.get("movements", [])
         MovementService.populate_workout_movements(workout_id, movements_list)
@@ -322,11 +710,9 @@ class WorkoutService:
 
             if wm.sets:
                 first_set = wm.sets[0]
-                if first_set.reps:
-                    reps = first_set.reps[0].rep_count
-                if first_set.weights:
-                    weight = float(first_set.weights[0].weight_value)
-                    is_bodyweight = first_set.weights[0].is_bodyweight
+                reps = first_set.rep_count
+                weight = first_set.weight_value
+                is_bodyweight = first_set.is_bodyweight
 
             # Get muscle groups
             muscle_groups = [
@@ -364,7 +750,7 @@ class WorkoutService:
         Returns:
             The newly created Workout object
         """
-        source_workout = Workout.query.get_or_404(workout_id)
+        source_workout = WorkoutService.get_workout_tree(workout_id)
 
         # Verify user owns this workout
         if source_workout.user_id != user_id:
@@ -395,7 +781,7 @@ class WorkoutService:
             List of newly created Workout objects
         """
         # Find all workouts with this group_id, ordered by date
-        source_workouts = Workout.query.filter_by(
+        source_workouts = Workout.query.options(*WorkoutService.workout_tree_options()).filter_by(
             workout_group_id=group_id,
             user_id=user_id
         ).order_by(Workout.workout_date.asc()).all()
@@ -0,0 +1,89 @@
+"""
+Migration script to add ON DELETE CASCADE to the user/workout foreign keys.
+Run this once after updating the model.
+
+Deleting a workout or account works without it (the services delete child
+rows explicitly), but the cascades keep ad-hoc deletes consistent.
+
+Usage:
+    python scripts/add_cascade_deletes.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app import create_app
+from app.models import db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _cascading_foreign_keys():
+    """Yield (table, column, referred table, referred column) for every ON DELETE CASCADE key in the models."""
+    for table in db.metadata.sorted_tables:
+        for fk in table.foreign_keys:
+            if (fk.ondelete or "").upper() == "CASCADE":
+                yield table.name, fk.parent.name, fk.column.table.name, fk.column.name
+
+
+def add_cascade_deletes():
+    """Recreate foreign keys without ON DELETE CASCADE so they cascade."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            db_type = db.engine.dialect.name
+
+            if db_type == "sqlite":
+                # SQLite cannot alter constraints; only freshly created tables cascade
+                logger.info("SQLite foreign keys cannot be altered in place; nothing to do.")
+                return
+
+            if db_type not in ("mysql", "postgresql"):
+                logger.error(f"Unsupported database: {db_type}")
+                return
+
+            inspector = inspect(db.engine)
+            quote = db.engine.dialect.identifier_preparer.quote
+            drop_keyword = "FOREIGN KEY" if db_type == "mysql" else "CONSTRAINT"
+
+            for table, column, referred_table, referred_column in _cascading_foreign_keys():
+                existing = next(
+                    (
+                        fk for fk in inspector.get_foreign_keys(table)
+                        if fk["constrained_columns"] == [column] and fk["referred_table"] == referred_table
+                    ),
+                    None,
+                )
+                if existing is None:
+                    logger.warning(f"No foreign key found for {table}.{column}; skipping.")
+                    continue
+                if (existing.get("options", {}).get("ondelete") or "").upper() == "CASCADE":
+                    logger.info(f"{table}.{column} already cascades.")
+                    continue
+
+                name = existing["name"]
+                logger.info(f"Recreating {name} on {table}.{column} with ON DELETE CASCADE...")
+                db.session.execute(text(f"ALTER TABLE {quote(table)} DROP {drop_keyword} {quote(name)}"))
+                db.session.execute(text(
+                    f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} "
+                    f"FOREIGN KEY ({quote(column)}) REFERENCES {quote(referred_table)} ({quote(referred_column)}) "
+                    f"ON DELETE CASCADE"
+                ))
+                db.session.commit()
+
+            logger.info("Foreign keys are up to date.")
+
+        except Exception as e:
+            logger.error(f"Error updating foreign keys: {e}")
+            db.session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    add_cascade_deletes()
@@ -0,0 +1,56 @@
+"""
+Migration script to create indexes declared on the models but missing from
+an existing database (create_all only adds them to new tables).
+Run this once after updating the model.
+
+Usage:
+    python scripts/add_missing_indexes.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from app import create_app
+from app.models import db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def add_missing_indexes():
+    """Create each model index unless an index with its name or leading columns exists."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            inspector = inspect(db.engine)
+            existing_tables = set(inspector.get_table_names())
+
+            for table in db.metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+                existing = inspector.get_indexes(table.name)
+                names = {index["name"] for index in existing}
+                # MySQL creates an index per foreign key; an index led by the same columns already serves
+                prefixes = [index["column_names"] for index in existing]
+
+                for index in table.indexes:
+                    columns = [column.name for column in index.columns]
+                    if index.name in names or any(prefix[:len(columns)] == columns for prefix in prefixes):
+                        continue
+                    logger.info(f"Creating index '{index.name}' on {table.name} ({', '.join(columns)})...")
+                    index.create(db.engine)
+
+            logger.info("Indexes are up to date.")
+
+        except Exception as e:
+            logger.error(f"Error creating indexes: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    add_missing_indexes()
@@ -0,0 +1,95 @@
+"""
+Migration script to add movement_instructions column to Movements table.
+Run this once after updating the model.
+
+Usage:
+    python scripts/add_movement_instructions.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import create_app
+from app.models import db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def add_movement_instructions_column():
+    """Add movement_instructions column to Movements table if it doesn't exist."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            db_type = os.getenv("DB_TYPE", "mysql").lower()
+
+            if db_type == "mysql":
+                result = db.session.execute(text("""
+                    SELECT COUNT(*) as count
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_NAME = 'Movements'
+                    AND COLUMN_NAME = 'movement_instructions'
+                """))
+                if result.scalar() > 0:
+                    logger.info("Column 'movement_instructions' already exists in Movements table.")
+                    return
+
+                logger.info("Adding 'movement_instructions' column to Movements table...")
+                db.session.execute(text("""
+                    ALTER TABLE Movements
+                    ADD COLUMN movement_instructions TEXT NULL
+                """))
+                db.session.commit()
+                logger.info("Successfully added 'movement_instructions' column.")
+
+            elif db_type == "psql":
+                result = db.session.execute(text("""
+                    SELECT COUNT(*) as count
+                    FROM information_schema.columns
+                    WHERE table_name = 'Movements'
+                    AND column_name = 'movement_instructions'
+                """))
+                if result.scalar() > 0:
+                    logger.info("Column 'movement_instructions' already exists in Movements table.")
+                    return
+
+                logger.info("Adding 'movement_instructions' column to Movements table...")
+                db.session.execute(text("""
+                    ALTER TABLE "Movements"
+                    ADD COLUMN movement_instructions TEXT NULL
+                """))
+                db.session.commit()
+                logger.info("Successfully added 'movement_instructions' column.")
+
+            elif db_type == "sqlite":
+                try:
+                    logger.info("Adding 'movement_instructions' column to Movements table...")
+                    db.session.execute(text("""
+                        ALTER TABLE Movements
+                        ADD COLUMN movement_instructions TEXT
+                    """))
+                    db.session.commit()
+                    logger.info("Successfully added 'movement_instructions' column.")
+                except Exception as e:
+                    if "duplicate column name" in str(e).lower():
+                        logger.info("Column 'movement_instructions' already exists in Movements table.")
+                    else:
+                        raise
+
+            else:
+                logger.error(f"Unsupported DB_TYPE: {db_type}")
+                return
+
+        except Exception as e:
+            logger.error(f"Error adding column: {e}")
+            db.session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    add_movement_instructions_column()
@@ -0,0 +1,95 @@
+"""
+Migration script to add revision column to PlanDrafts table.
+Run this once after updating the model.
+
+Usage:
+    python scripts/add_plan_draft_revision.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import create_app
+from app.models import db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def add_plan_draft_revision_column():
+    """Add revision column to PlanDrafts table if it doesn't exist."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            db_type = os.getenv("DB_TYPE", "mysql").lower()
+
+            if db_type == "mysql":
+                result = db.session.execute(text("""
+                    SELECT COUNT(*) as count
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_NAME = 'PlanDrafts'
+                    AND COLUMN_NAME = 'revision'
+                """))
+                if result.scalar() > 0:
+                    logger.info("Column 'revision' already exists in PlanDrafts table.")
+                    return
+
+                logger.info("Adding 'revision' column to PlanDrafts table...")
+                db.session.execute(text("""
+                    ALTER TABLE PlanDrafts
+                    ADD COLUMN revision INTEGER NOT NULL DEFAULT 0
+                """))
+                db.session.commit()
+                logger.info("Successfully added 'revision' column.")
+
+            elif db_type == "psql":
+                result = db.session.execute(text("""
+                    SELECT COUNT(*) as count
+                    FROM information_schema.columns
+                    WHERE table_name = 'PlanDrafts'
+                    AND column_name = 'revision'
+                """))
+                if result.scalar() > 0:
+                    logger.info("Column 'revision' already exists in PlanDrafts table.")
+                    return
+
+                logger.info("Adding 'revision' column to PlanDrafts table...")
+                db.session.execute(text("""
+                    ALTER TABLE "PlanDrafts"
+                    ADD COLUMN revision INTEGER NOT NULL DEFAULT 0
+                """))
+                db.session.commit()
+                logger.info("Successfully added 'revision' column.")
+
+            elif db_type == "sqlite":
+                try:
+                    logger.info("Adding 'revision' column to PlanDrafts table...")
+                    db.session.execute(text("""
+                        ALTER TABLE PlanDrafts
+                        ADD COLUMN revision INTEGER NOT NULL DEFAULT 0
+                    """))
+                    db.session.commit()
+                    logger.info("Successfully added 'revision' column.")
+                except Exception as e:
+                    if "duplicate column name" in str(e).lower():
+                        logger.info("Column 'revision' already exists in PlanDrafts table.")
+                    else:
+                        raise
+
+            else:
+                logger.error(f"Unsupported DB_TYPE: {db_type}")
+                return
+
+        except Exception as e:
+            logger.error(f"Error adding column: {e}")
+            db.session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    add_plan_draft_revision_column()
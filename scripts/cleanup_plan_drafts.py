@@ -0,0 +1,32 @@
+"""
+Delete expired pending-plan drafts.
+
+Drafts are also purged whenever a new one is created; run this from cron on
+quiet deployments where that rarely happens.
+
+Usage:
+    python scripts/cleanup_plan_drafts.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.draft_service import DraftService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def cleanup_plan_drafts():
+    app = create_app({"FAST_START": True})
+    with app.app_context():
+        removed = DraftService.cleanup_expired()
+        logger.info(f"Removed {removed} expired plan drafts.")
+
+
+if __name__ == "__main__":
+    cleanup_plan_drafts()
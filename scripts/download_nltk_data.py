@@ -0,0 +1,37 @@
+"""
+Download the NLTK corpora used for movement-name matching into ./nltk_data.
+
+The app never downloads at runtime; it looks for corpora in ./nltk_data and
+in NLTK's standard locations (including $NLTK_DATA). Run this once at build
+or deploy time.
+
+Usage:
+    python scripts/download_nltk_data.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nltk
+
+from app.services.movement_service import NLTK_DATA_DIR, REQUIRED_NLTK_CORPORA
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def download_nltk_data(target_dir: str = NLTK_DATA_DIR) -> None:
+    os.makedirs(target_dir, exist_ok=True)
+    for resource in REQUIRED_NLTK_CORPORA:
+        package = resource.split("/", 1)[1]
+        logger.info(f"Downloading {package} into {target_dir}...")
+        if not nltk.download(package, download_dir=target_dir, quiet=True):
+            raise RuntimeError(f"Failed to download NLTK package '{package}'")
+    logger.info("NLTK corpora ready.")
+
+
+if __name__ == "__main__":
+    download_nltk_data()
@@ -0,0 +1,104 @@
+"""
+Fold legacy Rep/Weight rows into SetEntry rows and delete them.
+
+Sets that have no SetEntry yet get entries built from their Rep/Weight rows
+(the same pairing StatsService.iter_set_entries uses); sets that already have
+entries keep them, since entries are authoritative. Afterwards every Rep and
+Weight row is removed. Run once before (or after) switching to
+SET_STORAGE_MODE=entries; reads work either way.
+
+Usage:
+    python scripts/fold_set_entries.py [--batch-size 1000] [--dry-run]
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import selectinload
+
+from app import create_app
+from app.models import db, Set, Rep, Weight, SetEntry
+from app.services.stats_service import StatsService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fold_set_entries(batch_size: int = 1000, dry_run: bool = False) -> dict:
+    """Fold Rep/Weight rows into SetEntry in set_id batches. Returns row counts."""
+    totals = {"sets": 0, "entries_created": 0, "reps_deleted": 0, "weights_deleted": 0}
+    last_set_id = 0
+
+    while True:
+        sets = (
+            Set.query
+            .options(selectinload(Set.reps), selectinload(Set.weights), selectinload(Set.entries))
+            .filter(Set.set_id > last_set_id)
+            .order_by(Set.set_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not sets:
+            break
+        last_set_id = sets[-1].set_id
+        set_ids = [s.set_id for s in sets]
+
+        new_entries = [
+            {
+                "set_id": s.set_id,
+                "entry_order": order,
+                "reps": entry["reps"],
+                "weight_value": entry["weight_value"],
+                "is_bodyweight": entry["is_bodyweight"],
+            }
+            for s in sets
+            if not s.entries
+            for order, entry in enumerate(StatsService.iter_set_entries(s), start=1)
+        ]
+        rep_rows = sum(len(s.reps) for s in sets)
+        weight_rows = sum(len(s.weights) for s in sets)
+
+        totals["sets"] += len(sets)
+        totals["entries_created"] += len(new_entries)
+        totals["reps_deleted"] += rep_rows
+        totals["weights_deleted"] += weight_rows
+
+        # Drop the ORM objects before bulk DML so the session does not track stale rows
+        db.session.expunge_all()
+        if dry_run:
+            continue
+
+        if new_entries:
+            db.session.execute(insert(SetEntry), new_entries)
+        if rep_rows:
+            db.session.execute(delete(Rep).where(Rep.set_id.in_(set_ids)))
+        if weight_rows:
+            db.session.execute(delete(Weight).where(Weight.set_id.in_(set_ids)))
+        db.session.commit()
+        logger.info(f"Folded sets up to id {last_set_id}")
+
+    remaining = db.session.execute(select(db.func.count()).select_from(Rep)).scalar()
+    if remaining and not dry_run:
+        logger.warning(f"{remaining} Rep rows were written during the fold; run again to finish.")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+
+    app = create_app({"FAST_START": True})
+    with app.app_context():
+        result = fold_set_entries(batch_size=args.batch_size, dry_run=args.dry_run)
+        prefix = "Would fold" if args.dry_run else "Folded"
+        logger.info(
+            f"{prefix} {result['sets']} sets: created {result['entries_created']} entries, "
+            f"removed {result['reps_deleted']} Rep and {result['weights_deleted']} Weight rows."
+        )
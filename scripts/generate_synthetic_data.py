@@ -0,0 +1,392 @@
+"""
+Generate a large, realistic synthetic dataset for benchmarks.
+
+Every user gets a training frequency, a movement rotation and working
+weights that progress from session to session (with a deload week every
+sixth week), so stats, leaderboards, listings and exports see realistic
+shapes. Users are also spread over groups of long-tailed sizes. The RNG
+is seeded: the same arguments always produce the same data.
+
+Rows are written with bulk Core INSERTs in chunks, with primary keys
+assigned up front so nothing is read back. Point it at a benchmark
+database, not one that is taking writes.
+
+The defaults (10k users, 12 weeks) produce roughly 5M set entries plus
+the matching workout impacts.
+
+Usage:
+    python scripts/generate_synthetic_data.py [--users 10000] [--weeks 12] [--seed 42]
+        [--prefix synth_] [--chunk-size 50000] [--storage-mode entries|legacy] [--no-impacts]
+
+Synthetic users log in with the password "password".
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.models import (
+    db,
+    User,
+    UserGroup,
+    UserGroupMembership,
+    MuscleGroup,
+    Movement,
+    MovementMuscleGroup,
+    Workout,
+    WorkoutMovement,
+    Set,
+    Rep,
+    Weight,
+    SetEntry,
+    WorkoutMuscleGroupImpact,
+)
+from app.guards.validators import VALID_GOALS, VALID_EXPERIENCES
+from app.services.stats_service import StatsService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# name, starting working weight (kg) for an intermediate 80 kg lifter, bodyweight?, muscle group split
+MOVEMENTS = [
+    ("Bench Press", 70, False, {"Chest": 60, "Triceps": 25, "Shoulders": 15}),
+    ("Incline Dumbbell Press", 24, False, {"Chest": 60, "Shoulders": 25, "Triceps": 15}),
+    ("Overhead Press", 42, False, {"Shoulders": 70, "Triceps": 30}),
+    ("Lateral Raise", 10, False, {"Shoulders": 100}),
+    ("Dips", 0, True, {"Chest": 45, "Triceps": 45, "Shoulders": 10}),
+    ("Push Ups", 0, True, {"Chest": 60, "Triceps": 25, "Shoulders": 15}),
+    ("Triceps Pushdown", 25, False, {"Triceps": 100}),
+    ("Deadlift", 110, False, {"Back": 40, "Hamstrings": 30, "Glutes": 20, "Forearms": 10}),
+    ("Barbell Row", 60, False, {"Back": 70, "Biceps": 20, "Forearms": 10}),
+    ("Lat Pulldown", 55, False, {"Back": 75, "Biceps": 25}),
+    ("Pull Ups", 0, True, {"Back": 70, "Biceps": 30}),
+    ("Seated Cable Row", 55, False, {"Back": 75, "Biceps": 25}),
+    ("Barbell Curl", 30, False, {"Biceps": 85, "Forearms": 15}),
+    ("Face Pull", 20, False, {"Shoulders": 60, "Back": 40}),
+    ("Squat", 90, False, {"Quadriceps": 55, "Glutes": 30, "Core": 15}),
+    ("Front Squat", 70, False, {"Quadriceps": 70, "Core": 20, "Glutes": 10}),
+    ("Romanian Deadlift", 80, False, {"Hamstrings": 60, "Glutes": 30, "Back": 10}),
+    ("Leg Press", 150, False, {"Quadriceps": 65, "Glutes": 35}),
+    ("Walking Lunge", 20, False, {"Quadriceps": 50, "Glutes": 40, "Core": 10}),
+    ("Leg Curl", 40, False, {"Hamstrings": 100}),
+    ("Calf Raise", 60, False, {"Calves": 100}),
+    ("Hip Thrust", 90, False, {"Glutes": 80, "Hamstrings": 20}),
+    ("Plank", 0, True, {"Core": 100}),
+    ("Hanging Leg Raise", 0, True, {"Core": 85, "Forearms": 15}),
+]
+
+WORKOUT_NAMES = ["Push", "Pull", "Legs", "Upper Body", "Lower Body", "Full Body", "Strength", "Conditioning"]
+EXPERIENCE_WEIGHTS = [0.35, 0.35, 0.2, 0.1]
+EXPERIENCE_STRENGTH = {"beginner": 0.55, "intermediate": 0.8, "advanced": 1.0, "expert": 1.2}
+# Per-session load increase range; newer lifters progress faster
+EXPERIENCE_PROGRESS = {
+    "beginner": (0.015, 0.03), "intermediate": (0.007, 0.015), "advanced": (0.003, 0.008), "expert": (0.001, 0.005),
+}
+GOAL_REPS = {
+    "strength": (3, 6), "muscle_growth": (8, 12), "cardio": (12, 20),
+    "weight_loss": (10, 15), "general_fitness": (8, 12),
+}
+DELOAD_EVERY_WEEKS = 6
+
+# Insert order respects foreign keys
+TABLES = [
+    User.__table__, UserGroup.__table__, UserGroupMembership.__table__, Workout.__table__,
+    WorkoutMovement.__table__, Set.__table__, SetEntry.__table__, Rep.__table__, Weight.__table__,
+    WorkoutMuscleGroupImpact.__table__,
+]
+
+
+class BulkWriter:
+    """Buffers rows per table and writes them with one executemany INSERT per table and chunk."""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.buffers = {table.name: [] for table in TABLES}
+        self.written = {table.name: 0 for table in TABLES}
+        self.started = time.perf_counter()
+
+    def add(self, table, row: dict) -> None:
+        self.buffers[table.name].append(row)
+
+    def maybe_flush(self) -> None:
+        if len(self.buffers[SetEntry.__tablename__]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for table in TABLES:
+            rows = self.buffers[table.name]
+            if rows:
+                db.session.execute(insert(table), rows)
+                self.written[table.name] += len(rows)
+                self.buffers[table.name] = []
+        db.session.commit()
+        entries = self.written[SetEntry.__tablename__]
+        elapsed = time.perf_counter() - self.started
+        logger.info(f"{entries:,} set entries written ({entries / elapsed if elapsed else 0:,.0f}/s)")
+
+
+def _next_ids() -> dict:
+    """First free primary key per table, so rows can reference each other without reading IDs back."""
+    ids = {}
+    for table in TABLES:
+        pk = list(table.primary_key.columns)[0]
+        ids[table.name] = (db.session.execute(select(func.max(pk))).scalar() or 0) + 1
+    return ids
+
+
+def _bump_sequences() -> None:
+    """PostgreSQL sequences do not follow explicit IDs; move them past the generated rows."""
+    if db.engine.dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        pk = list(table.primary_key.columns)[0].name
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', '{pk}'), "
+            f"(SELECT COALESCE(MAX({pk}), 1) FROM \"{table.name}\"))"
+        ))
+    db.session.commit()
+
+
+def _catalog() -> list:
+    """Get or create the movement catalog. Returns one namespace per movement with its normalized split."""
+    muscle_groups = {mg.muscle_group_name: mg for mg in MuscleGroup.query.all()}
+    movements = {m.movement_name: m for m in Movement.query.all()}
+
+    for name, _, _, split in MOVEMENTS:
+        for group_name in split:
+            if group_name not in muscle_groups:
+                muscle_groups[group_name] = MuscleGroup(muscle_group_name=group_name)
+                db.session.add(muscle_groups[group_name])
+        if name not in movements:
+            movements[name] = Movement(movement_name=name)
+            db.session.add(movements[name])
+            db.session.flush()
+            for group_name, pct in split.items():
+                db.session.add(MovementMuscleGroup(
+                    movement_id=movements[name].movement_id,
+                    muscle_group_id=muscle_groups[group_name].muscle_group_id,
+                    target_percentage=pct,
+                ))
+    db.session.commit()
+
+    catalog = []
+    for name, base_weight, is_bodyweight, _ in MOVEMENTS:
+        movement = movements[name]
+        catalog.append(SimpleNamespace(
+            movement_id=movement.movement_id,
+            base_weight=base_weight,
+            is_bodyweight=is_bodyweight,
+            normalized=StatsService.normalize_muscle_groups(movement.muscle_groups),
+        ))
+    return catalog
+
+
+def _round_weight(value: float) -> float:
+    return min(999.0, max(0.0, round(value / 2.5) * 2.5))
+
+
+def generate(users: int, weeks: int, seed: int, prefix: str, chunk_size: int,
+             storage_mode: str, impacts: bool) -> dict:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    if db.session.execute(
+        select(func.count()).select_from(User).where(User.username.like(f"{prefix}%"))
+    ).scalar():
+        raise SystemExit(f"Users with prefix {prefix!r} already exist; pass another --prefix")
+
+    if db.engine.dialect.name == "sqlite":
+        db.session.execute(text("PRAGMA synchronous=OFF"))
+
+    catalog = _catalog()
+    ids = _next_ids()
+    writer = BulkWriter(chunk_size)
+    password_hash = generate_password_hash("password")
+    impact_config = StatsService.get_config()
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = today - timedelta(weeks=weeks)
+
+    # Users
+    profiles = []
+    for i in range(users):
+        sex = rng.choice(("male", "female"))
+        bodyweight = round(min(150.0, max(45.0, rng.gauss(82, 11) if sex == "male" else rng.gauss(66, 9))), 1)
+        experience = rng.choices(VALID_EXPERIENCES, EXPERIENCE_WEIGHTS)[0]
+        goal = rng.choice(VALID_GOALS)
+        joined_week = int(rng.random() ** 2 * weeks * 0.5)
+        user_id = ids[User.__tablename__] + i
+        writer.add(User.__table__, {
+            "user_id": user_id,
+            "username": f"{prefix}{i:06d}",
+            "password_hash": password_hash,
+            "sex": sex,
+            "bodyweight": bodyweight,
+            "gym_experience": experience,
+            "workout_goal": goal,
+            "created_at": first_day + timedelta(weeks=joined_week),
+        })
+        profiles.append(SimpleNamespace(
+            user_id=user_id, bodyweight=bodyweight, experience=experience, goal=goal, joined_week=joined_week,
+        ))
+
+    # Groups: long-tailed sizes, most small, a few large
+    user_ids = [p.user_id for p in profiles]
+    for i in range(max(1, users // 40)):
+        group_id = ids[UserGroup.__tablename__] + i
+        writer.add(UserGroup.__table__, {"group_id": group_id, "group_name": f"{prefix}group {i}"})
+        size = min(len(user_ids), 300, max(2, int(rng.paretovariate(1.2) * 4)))
+        for position, member_id in enumerate(rng.sample(user_ids, size)):
+            role = "owner" if position == 0 else ("admin" if rng.random() < 0.1 else "member")
+            writer.add(UserGroupMembership.__table__, {"user_id": member_id, "group_id": group_id, "role": role})
+    writer.flush()
+
+    next_workout = ids[Workout.__tablename__]
+    next_wm = ids[WorkoutMovement.__tablename__]
+    next_set = ids[Set.__tablename__]
+    legacy = storage_mode == "legacy"
+    counts = {"workouts": 0, "sets": 0}
+
+    for profile in profiles:
+        sessions_per_week = min(6.0, max(0.5, rng.gauss(2.8, 1.1)))
+        rotation = rng.sample(catalog, rng.randint(8, 14))
+        strength = EXPERIENCE_STRENGTH[profile.experience] * profile.bodyweight / 80 * rng.uniform(0.85, 1.15)
+        working = {m.movement_id: m.base_weight * strength for m in rotation}
+        bodyweight_reps = {m.movement_id: rng.randint(6, 12) for m in rotation if m.is_bodyweight}
+        low_reps, high_reps = GOAL_REPS[profile.goal]
+        progress = EXPERIENCE_PROGRESS[profile.experience]
+
+        for week in range(profile.joined_week, weeks):
+            deload = 0.9 if week % DELOAD_EVERY_WEEKS == DELOAD_EVERY_WEEKS - 1 else 1.0
+            days = [d for d in range(7) if rng.random() < sessions_per_week / 7]
+            for day in days:
+                workout_date = first_day + timedelta(weeks=week, days=day, hours=rng.randint(6, 21))
+                completed = workout_date < datetime.utcnow() and rng.random() > 0.03
+                workout_id = next_workout
+                next_workout += 1
+                counts["workouts"] += 1
+                writer.add(Workout.__table__, {
+                    "workout_id": workout_id,
+                    "user_id": profile.user_id,
+                    "workout_name": rng.choice(WORKOUT_NAMES),
+                    "workout_date": workout_date,
+                    "is_completed": completed,
+                    "created_at": workout_date,
+                })
+
+                workout_totals = {}
+                movement_count = min(len(rotation), round(rng.triangular(3, 7, 5)))
+                for movement in rng.sample(rotation, movement_count):
+                    wm_id = next_wm
+                    next_wm += 1
+                    writer.add(WorkoutMovement.__table__, {
+                        "workout_movement_id": wm_id, "workout_id": workout_id, "movement_id": movement.movement_id,
+                    })
+                    weight = 0.0 if movement.is_bodyweight else _round_weight(working[movement.movement_id] * deload)
+                    top_reps = bodyweight_reps.get(movement.movement_id) or rng.randint(low_reps, high_reps)
+
+                    for set_order in range(1, rng.randint(3, 5) + 1):
+                        # Later sets lose a rep or two to fatigue
+                        reps = max(1, top_reps - (set_order - 1) // 2 + rng.randint(-1, 0))
+                        set_id = next_set
+                        next_set += 1
+                        counts["sets"] += 1
+                        writer.add(Set.__table__, {
+                            "set_id": set_id, "workout_movement_id": wm_id, "set_order": set_order,
+                            "created_at": workout_date,
+                        })
+                        writer.add(SetEntry.__table__, {
+                            "set_id": set_id, "entry_order": 1, "reps": reps, "weight_value": weight,
+                            "is_bodyweight": movement.is_bodyweight, "created_at": workout_date,
+                        })
+                        if legacy:
+                            writer.add(Rep.__table__, {"set_id": set_id, "rep_count": reps, "created_at": workout_date})
+                            writer.add(Weight.__table__, {
+                                "set_id": set_id, "weight_value": weight, "is_bodyweight": movement.is_bodyweight,
+                                "created_at": workout_date,
+                            })
+
+                        if impacts and completed and movement.normalized:
+                            entry = SimpleNamespace(reps=reps, weight_value=weight,
+                                                    is_bodyweight=movement.is_bodyweight, entry_order=1, entry_id=0)
+                            set_totals = StatsService.calculate_set_totals(
+                                SimpleNamespace(entries=[entry]), movement.normalized, profile.bodyweight, impact_config
+                            )
+                            for mg_id, data in set_totals.items():
+                                bucket = workout_totals.setdefault(mg_id, {"volume": 0.0, "reps": 0.0, "sets": 0.0})
+                                bucket["volume"] += data["volume"]
+                                bucket["reps"] += data["reps"]
+                                bucket["sets"] += data["sets"]
+
+                    # Progressive overload: a little more load (or reps) next time
+                    if movement.is_bodyweight:
+                        if rng.random() < 0.3:
+                            bodyweight_reps[movement.movement_id] += 1
+                    else:
+                        working[movement.movement_id] *= 1 + rng.uniform(*progress)
+
+                for mg_id, data in workout_totals.items():
+                    writer.add(WorkoutMuscleGroupImpact.__table__, {
+                        "workout_id": workout_id,
+                        "muscle_group_id": mg_id,
+                        "total_volume": round(data["volume"], 2),
+                        "total_reps": round(data["reps"], 2),
+                        "total_sets": round(data["sets"], 2),
+                        "created_at": workout_date,
+                    })
+                writer.maybe_flush()
+
+    writer.flush()
+    _bump_sequences()
+
+    seconds = time.perf_counter() - started
+    summary = {
+        "users": users,
+        "groups": writer.written[UserGroup.__tablename__],
+        "workouts": counts["workouts"],
+        "sets": counts["sets"],
+        "set_entries": writer.written[SetEntry.__tablename__],
+        "impact_rows": writer.written[WorkoutMuscleGroupImpact.__tablename__],
+        "seconds": round(seconds, 1),
+    }
+    logger.info(
+        f"Generated {summary['users']:,} users, {summary['groups']:,} groups, {summary['workouts']:,} workouts, "
+        f"{summary['set_entries']:,} set entries and {summary['impact_rows']:,} impact rows in {summary['seconds']}s"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="synth_", help="Username prefix for generated users")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Set entries per INSERT batch")
+    parser.add_argument("--storage-mode", choices=("entries", "legacy"),
+                        help="Also write Reps/Weights rows (legacy); defaults to SET_STORAGE_MODE")
+    parser.add_argument("--no-impacts", action="store_true", help="Skip WorkoutMuscleGroupImpact rows")
+    args = parser.parse_args()
+
+    app = create_app({"FAST_START": True})
+    with app.app_context():
+        generate(
+            users=args.users,
+            weeks=args.weeks,
+            seed=args.seed,
+            prefix=args.prefix,
+            chunk_size=args.chunk_size,
+            storage_mode=args.storage_mode or StatsService.set_storage_mode(),
+            impacts=not args.no_impacts,
+        )
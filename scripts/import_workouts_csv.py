@@ -0,0 +1,61 @@
+"""
+Import workout history for a user from a CSV file (one row per set).
+
+See app/services/import_service.py for the accepted columns; a CSV from
+/user_data?format=csv imports as-is.
+
+Usage:
+    python scripts/import_workouts_csv.py USERNAME path/to/workouts.csv [--chunk-size 5000]
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models import User
+from app.services.import_service import ImportService, WorkoutImportError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _log_progress(rows: int, seconds: float) -> None:
+    rate = rows / seconds if seconds > 0 else rows
+    logger.info(f"{rows} rows read ({rate:,.0f} rows/s)")
+
+
+def import_workouts_csv(username: str, path: str, chunk_size: int = ImportService.CHUNK_SIZE) -> dict:
+    app = create_app({"FAST_START": True})
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise SystemExit(f"No user named {username!r}")
+
+        with open(path, encoding="utf-8-sig", newline="") as handle:
+            try:
+                summary = ImportService.import_csv(user.user_id, handle, chunk_size=chunk_size, progress=_log_progress)
+            except WorkoutImportError as e:
+                raise SystemExit(e.message)
+
+        logger.info(
+            f"Imported {summary['imported_sets']} sets into {summary['workouts']} workouts "
+            f"({summary['movements_created']} new movements) in {summary['seconds']}s, "
+            f"{summary['rows_per_second']:,} rows/s. Skipped {summary['skipped']} rows."
+        )
+        for error in summary["errors"]:
+            logger.warning(error)
+        return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("username")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=ImportService.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    import_workouts_csv(args.username, args.path, chunk_size=args.chunk_size)
@@ -1,19 +1,107 @@
+import hashlib
 import logging
 import os
 
-from sqlalchemy import text
+from sqlalchemy import event, inspect
 
-from app.models import db
+from app.models import db, SchemaVersion
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign keys (and ON DELETE CASCADE) unless asked per connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def schema_fingerprint(metadata=None) -> str:
+    """
+    Hash of every table, column, index and foreign key in the model metadata.
+
+    Computed from the models alone, so checking it needs no reflection.
+    """
+    metadata = metadata if metadata is not None else db.metadata
+    parts = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f"table:{table.name}")
+        for column in table.columns:
+            foreign_keys = ",".join(
+                sorted(f"{fk.target_fullname}:{fk.ondelete or ''}" for fk in column.foreign_keys)
+            )
+            parts.append(
+                f"column:{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}:{foreign_keys}"
+            )
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            columns = ",".join(c.name for c in index.columns)
+            parts.append(f"index:{index.name}:{columns}:{index.unique}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def recorded_schema_version():
+    """Return the fingerprint stored by the last migration, or None if there is none."""
+    try:
+        return (
+            db.session.query(SchemaVersion.fingerprint)
+            .order_by(SchemaVersion.version_id.desc())
+            .limit(1)
+            .scalar()
+        )
+    except Exception:
+        # Table missing (fresh or pre-versioning database)
+        db.session.rollback()
+        return None
+
+
+def missing_columns(metadata=None) -> list:
+    """Return "Table.column" for every model column absent from its existing table."""
+    metadata = metadata if metadata is not None else db.metadata
+    inspector = inspect(db.engine)
+    live_tables = set(inspector.get_table_names())
+    missing = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        if table.name not in live_tables:
+            continue
+        live_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in live_columns)
+    return missing
+
+
+def migrate_db(app):
+    """
+    One-shot schema setup: create missing tables and record the schema version.
+
+    Run from a deploy step (`python scripts/migrate_db.py`), not from every
+    worker. create_all cannot add columns to existing tables, so the version
+    is only recorded once the live columns match the models; until their
+    add_* scripts have run, this raises RuntimeError naming the missing columns.
+    """
+    with app.app_context():
+        fingerprint = schema_fingerprint()
+        db.create_all()
+        missing = missing_columns()
+        if missing:
+            raise RuntimeError(
+                f"Columns missing from existing tables: {', '.join(missing)}. "
+                "Run the matching scripts/add_* migration, then migrate again."
+            )
+        if recorded_schema_version() != fingerprint:
+            db.session.add(SchemaVersion(fingerprint=fingerprint))
+            db.session.commit()
+        logger.info("Schema is at version %s.", fingerprint[:12])
+    return db
+
+
 def init_db(app):
     """
     Initialize the database:
-    - Configures the database connection.
-    - Checks for required tables and creates them if missing.
+    - Configures the database connection (with foreign keys on for SQLite).
+    - Skips all DDL when the recorded schema version matches the models.
+    - Otherwise creates missing tables (when DB_AUTO_CREATE is on, which is
+      the default only under TESTING) or warns that scripts/migrate_db.py
+      needs to run.
     """
     # Dynamic database configuration
     if not app.config.get("SQLALCHEMY_DATABASE_URI"):
@@ -62,23 +150,19 @@ def init_db(app):
     db.init_app(app)
 
     with app.app_context():
-        try:
-            # Test if a key table exists
-            logger.info("Checking if database tables exist...")
-            db.session.execute(text('SELECT 1 FROM Users LIMIT 1'))
-            logger.info("Database tables are already initialized. Ensuring new tables exist...")
-            db.create_all()
-            logger.info("Verified/created any missing tables.")
-        except Exception as e:
-            error_message = str(e).lower()
-            if ("relation" in error_message and "does not exist" in error_message) or "no such table" in error_message:
-                logger.warning("Table does not exist. Initializing database...")
-            else:
-                logger.error("Unexpected error during table existence check: %s", e)
-            try:
-                db.create_all()
-                logger.info("Database initialized successfully.")
-            except Exception as creation_error:
-                logger.error("Error initializing database: %s", creation_error)
-                raise
-    return db
+        # Only this app's engine, and before its first connection is opened
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", _enable_sqlite_foreign_keys)
+        if recorded_schema_version() == schema_fingerprint():
+            logger.info("Database schema is up to date; skipping table checks.")
+            return db
+
+    if not app.config.get("DB_AUTO_CREATE", False):
+        logger.warning(
+            "Database schema version does not match the models. "
+            "Run `python scripts/migrate_db.py` before serving traffic."
+        )
+        return db
+
+    logger.info("Database schema version changed or missing; creating missing tables...")
+    return migrate_db(app)
@@ -0,0 +1,402 @@
+"""
+Load-test the app in-process with seeded users and a local LLM stand-in.
+
+The app runs under a threaded local WSGI server. Virtual users each loop
+through the flow a real user follows: log in, generate a workout, confirm
+it, open the active workout, save a few set edits, complete it, then look
+at stats and the leaderboard. Requests are timed one by one (redirects are
+followed as separate requests, as a browser does), and each concurrency
+level is reported as throughput and latency percentiles per endpoint.
+
+LLM calls go to a small OpenAI-compatible server started by this script
+(OPENAI_BASE_URL points at it). It answers with valid plans after
+--llm-latency seconds (+/-25%), so no API key or quota is used. Some
+generations are served from the plan cache without an LLM call, as in
+production.
+
+Users are seeded with scripts/generate_synthetic_data.py (prefix load_,
+password "password") unless they already exist. Use a separate database
+(DATABASE_URL); SQLite serializes writes, so measure capacity against the
+database you run in production. The per-user LLM rate limit is lifted for
+the run unless --keep-rate-limits is given.
+
+The WSGI server is werkzeug's, one thread per connection, in one process:
+treat the numbers as one gunicorn worker's capacity with threads, not a
+whole multi-worker box.
+
+Usage:
+    python scripts/load_test.py [--concurrency 1,5,10,25] [--duration 60] [--think-time 0.5]
+        [--llm-latency 1.5] [--sync-updates 3] [--p95-budget-ms 500] [--json results.json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.guards.rate_limiter import RateLimiter
+from app.models import db, User
+from scripts.generate_synthetic_data import MOVEMENTS, generate
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+# One log line per request would drown the report
+logging.getLogger("werkzeug").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+USER_PREFIX = "load_"
+PASSWORD = "password"
+TARGETS = ["Upper Body", "Lower Body", "Push", "Pull", "Full Body"]
+MOVEMENTS_DATA = re.compile(r"const movementsData = (\[.*?\]);\s*</script>", re.S)
+
+
+# ---------------------------------------------------------------------------
+# LLM stand-in
+# ---------------------------------------------------------------------------
+
+def _plan_movements(rng: random.Random) -> list:
+    movements = []
+    for name, weight, is_bodyweight, split in rng.sample(MOVEMENTS, 5):
+        movements.append({
+            "name": name,
+            "sets": 3,
+            "reps": rng.choice([6, 8, 10, 12]),
+            "weight": float(weight),
+            "is_bodyweight": is_bodyweight,
+            "muscle_groups": [{"name": group, "impact": impact} for group, impact in split.items()],
+        })
+    return movements
+
+
+def _llm_content(schema: str, rng: random.Random) -> str:
+    """Message content for the response_format the app asked for (plain text when none)."""
+    if schema == "WorkoutPlan":
+        return json.dumps({"workout_name": rng.choice(TARGETS), "movements": _plan_movements(rng)})
+    if schema == "WeeklyWorkoutPlan":
+        return json.dumps({"weekly_plan": [
+            {"day": f"Day {day}", "workout_name": rng.choice(TARGETS), "movements": _plan_movements(rng)}
+            for day in range(1, 4)
+        ]})
+    if schema == "MovementInfo":
+        name, weight, is_bodyweight, split = rng.choice(MOVEMENTS)
+        return json.dumps({
+            "movement_name": name,
+            "is_bodyweight": is_bodyweight,
+            "weight": float(weight),
+            "muscle_groups": [{"name": group, "impact": impact} for group, impact in split.items()],
+        })
+    return "Brace, keep the movement controlled and use a full range of motion."
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Answers POST .../chat/completions like the OpenAI API, after a simulated delay."""
+
+    latency = 1.5
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        rng = random.Random()
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("name", "")
+        time.sleep(self.latency * rng.uniform(0.75, 1.25))
+
+        content = _llm_content(schema, rng)
+        payload = json.dumps({
+            "id": f"chatcmpl-load-{rng.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 600, "completion_tokens": len(content) // 4,
+                      "total_tokens": 600 + len(content) // 4},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_llm_stand_in(latency: float) -> ThreadingHTTPServer:
+    FakeLLMHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="llm-stand-in", daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# Virtual users
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """Collects (endpoint, latency, ok) samples from all virtual users."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.flows = 0
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.samples[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def flow_done(self) -> None:
+        with self._lock:
+            self.flows += 1
+
+
+class FlowError(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, username: str, recorder: Recorder, args, rng: random.Random):
+        self.client = httpx.Client(base_url=base_url, follow_redirects=False, timeout=120)
+        self.username = username
+        self.recorder = recorder
+        self.args = args
+        self.rng = rng
+        self.client_id = f"load-{username}"
+        self.seq = 0
+
+    def request(self, endpoint: str, method: str, url: str, expect: str = None, **kwargs) -> httpx.Response:
+        """Time one request. expect is a regex the redirect's path must match in full."""
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(endpoint, time.perf_counter() - started, ok=False)
+            raise FlowError(f"{endpoint}: {e}") from e
+        elapsed = time.perf_counter() - started
+
+        location = urlparse(response.headers.get("location", "")).path
+        ok = response.status_code < 400 and (expect is None or re.fullmatch(expect, location) is not None)
+        self.recorder.record(endpoint, elapsed, ok)
+        if not ok:
+            raise FlowError(f"{endpoint}: {response.status_code} {location}")
+        return response
+
+    def think(self) -> None:
+        if self.args.think_time:
+            time.sleep(self.args.think_time * self.rng.uniform(0.5, 1.5))
+
+    def run_flow(self) -> None:
+        self.request("POST /login", "POST", "/login", expect="/",
+                     data={"username": self.username, "password": PASSWORD})
+        self.think()
+
+        self.request("POST /generate_workout", "POST", "/generate_workout", expect="/confirm_workout",
+                     data={"target": self.rng.choice(TARGETS)})
+        self.request("GET /confirm_workout", "GET", "/confirm_workout")
+        self.think()
+
+        response = self.request("POST /confirm_workout", "POST", "/confirm_workout", expect=r"/workout/\d+")
+        workout_id = int(response.headers["location"].rsplit("/", 1)[-1])
+        self.request("GET /workout/<id>", "GET", f"/workout/{workout_id}")
+        self.think()
+
+        page = self.request("GET /active_workout/<id>", "GET", f"/active_workout/{workout_id}")
+        match = MOVEMENTS_DATA.search(page.text)
+        if not match:
+            raise FlowError("GET /active_workout/<id>: no movementsData in page")
+        sets = [s for movement in json.loads(match.group(1)) for s in movement["sets"]]
+        versions = {}
+
+        # Edit a few sets the way the page does, then finish with every set's values
+        for s in self.rng.sample(sets, min(self.args.sync_updates, len(sets))):
+            self.think()
+            self.seq += 1
+            s["reps"] = max(1, s["reps"] + self.rng.choice([-2, -1, 1]))
+            set_id = int(s["setId"])
+            response = self.request(
+                "POST /workout/<id>/sync_sets", "POST", f"/workout/{workout_id}/sync_sets",
+                json={"client_id": self.client_id, "detect_conflicts": True, "changes": [{
+                    "seq": self.seq, "set_id": set_id, "reps": s["reps"], "weight": s["weight"],
+                    "base_updated_at": versions.get(str(set_id), s["updatedAt"]),
+                }]},
+            )
+            versions.update(response.json().get("sets", {}))
+        self.think()
+
+        form = {"workout_id": workout_id}
+        for s in sets:
+            form[f"rep_{s['setId']}"] = s["reps"]
+            form[f"set_weight_{s['setId']}"] = s["weight"]
+        self.request("POST /complete_workout", "POST", "/complete_workout", expect="/", data=form)
+        self.think()
+
+        self.request("GET /stats/data", "GET", "/stats/data", params={"period": "month"})
+        self.request("GET /leaderboard/data", "GET", "/leaderboard/data", params={"period": "week"})
+        self.recorder.flow_done()
+
+    def run(self, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            try:
+                self.run_flow()
+            except FlowError as e:
+                logger.debug("%s: flow aborted: %s", self.username, e)
+                self.think()
+        self.client.close()
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _percentile(values: list, q: float) -> float:
+    """q-th percentile (0-100) of sorted values, nearest rank."""
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))
+    return values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        samples = sorted(samples)
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": recorder.errors[endpoint],
+            "rps": round(len(samples) / elapsed, 2),
+            **{f"p{q}_ms": round(_percentile(samples, q) * 1000, 1) for q in (50, 90, 95, 99)},
+            "max_ms": round(samples[-1] * 1000, 1),
+        }
+    requests = sum(e["requests"] for e in endpoints.values())
+    return {
+        "seconds": round(elapsed, 1),
+        "flows": recorder.flows,
+        "requests": requests,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "rps": round(requests / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+def print_summary(concurrency: int, summary: dict) -> None:
+    print(f"\n== {concurrency} concurrent users: {summary['flows']} flows, {summary['requests']} requests, "
+          f"{summary['errors']} errors, {summary['rps']} req/s over {summary['seconds']}s")
+    print(f"{'endpoint':<32} {'reqs':>6} {'errs':>5} {'req/s':>7} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for endpoint, e in summary["endpoints"].items():
+        print(f"{endpoint:<32} {e['requests']:>6} {e['errors']:>5} {e['rps']:>7} {e['p50_ms']:>8} "
+              f"{e['p90_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8} {e['max_ms']:>8}")
+
+
+def seed_users(count: int, weeks: int, seed: int) -> list:
+    usernames = [u for (u,) in db.session.query(User.username)
+                 .filter(User.username.like(f"{USER_PREFIX}%")).order_by(User.user_id)]
+    if not usernames:
+        generate(users=count, weeks=weeks, seed=seed, prefix=USER_PREFIX, chunk_size=50000,
+                 storage_mode="entries", impacts=True)
+        return seed_users(count, weeks, seed)
+    if len(usernames) < count:
+        raise SystemExit(f"{len(usernames)} {USER_PREFIX}* users exist but {count} are needed; "
+                         "use a fresh database or lower --concurrency")
+    return usernames[:count]
+
+
+def run_level(base_url: str, usernames: list, args, concurrency: int) -> dict:
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    users = [
+        VirtualUser(base_url, username, recorder, args, random.Random(f"{args.seed}-{concurrency}-{i}"))
+        for i, username in enumerate(usernames[:concurrency])
+    ]
+    threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.monotonic() - started)
+
+
+def main(args) -> None:
+    levels = sorted({int(level) for level in args.concurrency.split(",")})
+
+    llm = start_llm_stand_in(args.llm_latency)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{llm.server_address[1]}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+    if not args.keep_rate_limits:
+        RateLimiter.HOURLY_LIMIT = RateLimiter.DAILY_LIMIT = 10 ** 9
+
+    app = create_app({"FAST_START": True})
+    with app.app_context():
+        usernames = seed_users(levels[-1], args.weeks, args.seed)
+
+    server = make_server(args.host, args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="wsgi", daemon=True).start()
+    base_url = f"http://{args.host}:{server.server_port}"
+    logger.info(f"Serving on {base_url}, LLM stand-in on {os.environ['OPENAI_BASE_URL']}")
+
+    results = {}
+    try:
+        for concurrency in levels:
+            logger.info(f"Running {concurrency} concurrent users for {args.duration}s")
+            results[concurrency] = run_level(base_url, usernames, args, concurrency)
+            print_summary(concurrency, results[concurrency])
+    finally:
+        server.shutdown()
+        llm.shutdown()
+
+    if args.p95_budget_ms:
+        # Generation waits on the LLM stand-in, so it is left out of the budget
+        within = [
+            c for c, summary in results.items()
+            if all(e["p95_ms"] <= args.p95_budget_ms
+                   for name, e in summary["endpoints"].items() if name != "POST /generate_workout")
+        ]
+        best = max((c for c in within if all(w in within for w in levels if w <= c)), default=None)
+        print(f"\nHighest concurrency with every p95 within {args.p95_budget_ms}ms "
+              f"(generation excluded): {best if best is not None else 'none'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "settings": {k: v for k, v in vars(args).items() if k != "json"},
+                "levels": {str(c): summary for c, summary in results.items()},
+            }, f, indent=2)
+        logger.info(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,5,10",
+                        help="Comma-separated numbers of concurrent users, run one level after another")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per concurrency level")
+    parser.add_argument("--think-time", type=float, default=0.5,
+                        help="Mean pause between a user's steps in seconds (0 for none)")
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="Mean LLM stand-in response time in seconds")
+    parser.add_argument("--sync-updates", type=int, default=3, help="Set edits saved per active workout")
+    parser.add_argument("--p95-budget-ms", type=float,
+                        help="Report the highest level whose p95 latencies all stay under this")
+    parser.add_argument("--weeks", type=int, default=4, help="Weeks of history seeded per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Port for the app (0 picks a free one)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep the per-user LLM rate limits")
+    parser.add_argument("--json", help="Also write the results to this file")
+    main(parser.parse_args())
@@ -0,0 +1,32 @@
+"""
+One-shot schema setup: create missing tables and record the schema version.
+
+Run once per deploy, before starting the workers, so they take the
+schema-version fast path in init_db instead of inspecting tables on every
+boot. Columns added to existing tables still need their add_* migration
+script; until it has run, this exits with an error naming the columns.
+
+Usage:
+    python scripts/migrate_db.py
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from scripts.init_db import migrate_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    app = create_app({"DB_AUTO_CREATE": False, "FAST_START": True})
+    try:
+        migrate_db(app)
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
@@ -21,6 +21,142 @@ let processingOrder = [];      // Array of movement indices in the order they wi
 let currentOrderIndex = 0;       // Pointer into processingOrder for current movement.
 let currentSetIndex = 0;
 
+/* Offline-capable autosave */
+// Confirmed sets are queued in localStorage and flushed in batches to
+// /workout/<id>/sync_sets, so nothing is lost on flaky gym Wi-Fi and the
+// server sees one request per flush rather than one per tap. Sequence numbers
+// make retried flushes safe; base_updated_at lets the server reject edits
+// made against a set that changed elsewhere in the meantime.
+const SYNC_STORAGE_KEY = `workoutSyncQueue:${WORKOUT_ID}`;
+const SYNC_DEBOUNCE_MS = 3000;
+const SYNC_RETRY_MS = 15000;
+const SYNC_BATCH_SIZE = 200;
+
+const syncState = loadSyncState();
+let syncTimer = null;
+let syncInFlight = null;
+
+function loadSyncState() {
+  let saved = null;
+  try {
+    saved = JSON.parse(localStorage.getItem(SYNC_STORAGE_KEY));
+  } catch (error) {
+    saved = null;
+  }
+  const state = saved || {
+    clientId: (window.crypto && crypto.randomUUID)
+      ? crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`,
+    seq: 0,
+    pending: [],
+    versions: {}
+  };
+  // Server-rendered versions seed the map; newer ones from earlier flushes win
+  movementsData.forEach(movement => movement.sets.forEach(set => {
+    if (!(set.setId in state.versions)) {
+      state.versions[set.setId] = set.updatedAt;
+    }
+  }));
+  return state;
+}
+
+function saveSyncState() {
+  try {
+    localStorage.setItem(SYNC_STORAGE_KEY, JSON.stringify(syncState));
+  } catch (error) {
+    console.error('Could not persist workout sync queue:', error);
+  }
+}
+
+function queueSetSync(set) {
+  const setId = parseInt(set.setId);
+  // Only the latest edit per set needs to reach the server
+  syncState.pending = syncState.pending.filter(change => change.set_id !== setId);
+  syncState.seq++;
+  syncState.pending.push({
+    seq: syncState.seq,
+    set_id: setId,
+    reps: set.reps,
+    weight: set.weight
+  });
+  saveSyncState();
+  scheduleSetSync(SYNC_DEBOUNCE_MS);
+}
+
+function scheduleSetSync(delay) {
+  clearTimeout(syncTimer);
+  syncTimer = setTimeout(flushSetSync, delay);
+}
+
+function flushSetSync() {
+  clearTimeout(syncTimer);
+  syncTimer = null;
+  if (syncInFlight) return syncInFlight;
+  if (syncState.pending.length === 0 || !navigator.onLine) {
+    if (syncState.pending.length) scheduleSetSync(SYNC_RETRY_MS);
+    return Promise.resolve();
+  }
+
+  // Versions are attached at send time so they include what earlier flushes returned
+  const batch = syncState.pending.slice(0, SYNC_BATCH_SIZE).map(change => ({
+    ...change,
+    base_updated_at: syncState.versions[change.set_id] || null
+  }));
+  syncInFlight = fetch(`/workout/${WORKOUT_ID}/sync_sets`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ client_id: syncState.clientId, changes: batch, detect_conflicts: true })
+  })
+    .then(response => response.json().then(data => ({ ok: response.ok, data })))
+    .then(({ ok, data }) => {
+      if (!ok) throw new Error(data.error || 'Sync failed');
+      applySyncResult(data);
+    })
+    .catch(error => {
+      // Keep the queue; it is retried when the connection comes back
+      console.error('Error syncing sets:', error);
+      scheduleSetSync(SYNC_RETRY_MS);
+    })
+    .finally(() => {
+      syncInFlight = null;
+      if (syncState.pending.length && !syncTimer) scheduleSetSync(SYNC_DEBOUNCE_MS);
+    });
+  return syncInFlight;
+}
+
+function applySyncResult(data) {
+  syncState.pending = syncState.pending.filter(change => change.seq > data.last_seq);
+  Object.entries(data.sets || {}).forEach(([setId, updatedAt]) => {
+    syncState.versions[setId] = updatedAt;
+  });
+  (data.conflicts || []).forEach(conflict => {
+    // Someone else saved this set first: take the server's values
+    syncState.versions[conflict.set_id] = conflict.updated_at;
+    movementsData.forEach(movement => movement.sets.forEach(set => {
+      if (parseInt(set.setId) === conflict.set_id) {
+        set.reps = conflict.reps;
+        set.weight = conflict.weight;
+        const repInput = document.getElementById('hidden_rep_' + set.setId);
+        if (repInput) repInput.value = conflict.reps;
+        const weightInput = document.getElementById('hidden_weight_' + set.setId);
+        if (weightInput) weightInput.value = conflict.weight;
+      }
+    }));
+  });
+  if (data.conflicts && data.conflicts.length) {
+    alert(`${data.conflicts.length} set(s) were changed elsewhere; the saved values were kept.`);
+  }
+  saveSyncState();
+}
+
+window.addEventListener('online', () => flushSetSync());
+document.addEventListener('visibilitychange', () => {
+  if (document.visibilityState === 'hidden') flushSetSync();
+});
+if (syncState.pending.length) {
+  scheduleSetSync(0);
+}
+
 // For rest timer handling.
 let restTimeLeft = 0;
 let restIntervalId = null;
@@ -93,16 +229,18 @@ function confirmSet() {
   }
   repInput.value = currentSet.reps;
 
-  let weightInput = document.getElementById('hidden_weight_' + currentSet.weightId);
+  let weightInput = document.getElementById('hidden_weight_' + currentSet.setId);
   if (!weightInput) {
     weightInput = document.createElement('input');
     weightInput.type = 'hidden';
-    weightInput.name = 'weight_' + currentSet.weightId;
-    weightInput.id = 'hidden_weight_' + currentSet.weightId;
+    weightInput.name = 'set_weight_' + currentSet.setId;
+    weightInput.id = 'hidden_weight_' + currentSet.setId;
     hiddenInputsDiv.appendChild(weightInput);
   }
   weightInput.value = currentSet.weight;
 
+  queueSetSync(currentSet);
+
   // Disable the Done button to prevent multiple clicks during rest.
   document.querySelector('#setDetail button.btn-success').disabled = true;
   // Start a 60-second rest timer.
@@ -188,10 +326,13 @@ function fetchInstructions(movementName) {
   fetch(`/get_instructions?movement_name=${encodeURIComponent(movementName)}`)
     .then(response => {
       hideSpinner();
-      if (!response.ok) {
-        throw new Error('Failed to fetch instructions');
-      }
-      return response.json();
+      return response.json().catch(() => ({})).then(data => {
+        if (!response.ok) {
+          // The server sends a user-facing message (and error code) when the AI is degraded
+          throw new Error(data.error || 'Failed to fetch instructions. Please try again later.');
+        }
+        return data;
+      });
     })
     .then(data => {
       if (data.instructions) {
@@ -210,7 +351,7 @@ function fetchInstructions(movementName) {
     .catch(error => {
       hideSpinner();
       console.error('Error fetching instructions:', error);
-      alert('Failed to fetch instructions. Please try again later.');
+      alert(error.message || 'Failed to fetch instructions. Please try again later.');
     });
 }
 
@@ -232,7 +373,16 @@ function abandonWorkout() {
 }
 
 /* Set completion date on form submission */
-document.getElementById('completeWorkoutForm').addEventListener('submit', () => {
+document.getElementById('completeWorkoutForm').addEventListener('submit', (event) => {
+  if (!navigator.onLine) {
+    // Keep the page (and the queued sets) until the connection is back
+    event.preventDefault();
+    alert("You're offline. Your sets are saved on this device; finish the workout once you're back online.");
+    return;
+  }
   const today = new Date().toISOString().split('T')[0];
   document.getElementById('completionDate').value = today;
+  // The form carries every set value, so the queue is no longer needed
+  clearTimeout(syncTimer);
+  localStorage.removeItem(SYNC_STORAGE_KEY);
 });
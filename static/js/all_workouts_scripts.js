@@ -0,0 +1,105 @@
+// ===================================
+// All Workouts - Infinite Scroll
+// ===================================
+//
+// The first page is rendered server-side. Further pages are fetched from
+// /all_workouts/data with the keyset cursor of the last card shown, when the
+// sentinel below the grid scrolls into view.
+
+document.addEventListener('DOMContentLoaded', () => {
+    const sentinel = document.getElementById('workoutListSentinel');
+    const grid = document.querySelector('.workout-grid');
+    if (!sentinel || !grid) return;
+
+    let nextCursor = sentinel.dataset.nextCursor;
+    let loading = false;
+
+    function formatDate(isoDate) {
+        const [year, month, day] = isoDate.split('-');
+        return `${day}.${month}.${year}`;
+    }
+
+    function metaRow(label, value) {
+        const row = document.createElement('div');
+        row.className = 'workout-meta';
+        const labelSpan = document.createElement('span');
+        labelSpan.className = 'meta-label';
+        labelSpan.textContent = label;
+        const valueSpan = document.createElement('span');
+        valueSpan.textContent = value;
+        row.append(labelSpan, valueSpan);
+        return row;
+    }
+
+    function buildCard(workout) {
+        const card = document.createElement('article');
+        card.className = 'workout-card';
+
+        const form = document.createElement('form');
+        form.action = `/delete_workout/${workout.workout_id}`;
+        form.method = 'POST';
+        form.className = 'delete-form';
+        form.onsubmit = () => confirm('Are you sure you want to delete this workout?');
+        const removeButton = document.createElement('button');
+        removeButton.type = 'submit';
+        removeButton.className = 'delete-btn';
+        removeButton.textContent = 'Remove';
+        form.appendChild(removeButton);
+
+        const body = document.createElement('div');
+        body.className = 'workout-card-body';
+
+        const header = document.createElement('div');
+        header.className = 'workout-header';
+        const title = document.createElement('h3');
+        title.textContent = workout.workout_name;
+        const badge = document.createElement('span');
+        badge.className = `status-badge ${workout.is_completed ? 'completed' : 'pending'}`;
+        badge.textContent = workout.is_completed ? 'Completed' : 'Incomplete';
+        header.append(title, badge);
+
+        body.append(header, metaRow('Date', formatDate(workout.workout_date)), metaRow('Movements', workout.movement_count));
+        if (workout.total_volume) {
+            body.appendChild(metaRow('Volume', Math.round(workout.total_volume)));
+        }
+
+        const link = document.createElement('a');
+        link.href = `/workout/${workout.workout_id}`;
+        link.className = 'btn btn-outline-light w-100 mt-3';
+        link.textContent = 'View Workout';
+        body.appendChild(link);
+
+        card.append(form, body);
+        return card;
+    }
+
+    async function loadNextPage() {
+        if (loading || !nextCursor) return;
+        loading = true;
+        try {
+            const params = new URLSearchParams({ cursor: nextCursor, filter: sentinel.dataset.filter || 'all' });
+            const response = await fetch(`/all_workouts/data?${params}`);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const data = await response.json();
+            data.workouts.forEach(workout => grid.appendChild(buildCard(workout)));
+            nextCursor = data.next_cursor;
+        } catch (error) {
+            console.error('Error loading workouts:', error);
+        } finally {
+            loading = false;
+        }
+        if (!nextCursor) {
+            observer.disconnect();
+        }
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadNextPage();
+        }
+    }, { rootMargin: '400px' });
+
+    if (nextCursor) {
+        observer.observe(sentinel);
+    }
+});
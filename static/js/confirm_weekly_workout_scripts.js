@@ -7,6 +7,9 @@
 let selectedDates = [];
 let calendar = null;
 
+// Batches pending-plan edits (see pending_plan_patch.js)
+window.pendingPlanPatcher = new PendingPlanPatcher('weekly', PLAN_REVISION);
+
 // ===================================
 // FullCalendar Date Selection
 // ===================================
@@ -173,7 +176,7 @@ function adjustValue(button, field, delta) {
     updateWeeklyMovement(input);
 }
 
-async function updateWeeklyMovement(input) {
+function updateWeeklyMovement(input) {
     const row = input.closest('tr');
     const dayIndex = parseInt(row.dataset.dayIndex);
     const movementIndex = parseInt(row.dataset.movementIndex);
@@ -182,50 +185,22 @@ async function updateWeeklyMovement(input) {
     const reps = row.querySelector('.reps-input').value;
     const weight = row.querySelector('.weight-input').value;
 
-    try {
-        const response = await fetch('/pending_weekly/update_movement', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                day_index: dayIndex,
-                movement_index: movementIndex,
-                sets: sets,
-                reps: reps,
-                weight: weight
-            })
-        });
-
-        const data = await response.json();
-        if (!data.success) {
-            console.error('Failed to update movement:', data.error);
-        }
-    } catch (error) {
-        console.error('Error updating movement:', error);
-    }
+    // Debounced: stepper clicks and typing go out as one batch
+    pendingPlanPatcher.queueUpdate({
+        day_index: dayIndex,
+        index: movementIndex,
+        sets: sets,
+        reps: reps,
+        weight: weight
+    });
 }
 
 async function removeWeeklyMovement(dayIndex, movementIndex) {
     if (!confirm('Remove this movement from the workout?')) return;
 
-    try {
-        const response = await fetch('/pending_weekly/remove_movement', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                day_index: dayIndex,
-                movement_index: movementIndex
-            })
-        });
-
-        const data = await response.json();
-        if (data.success) {
-            location.reload();
-        } else {
-            alert(data.error || 'Failed to remove movement');
-        }
-    } catch (error) {
-        console.error('Error removing movement:', error);
-        alert('Failed to remove movement');
+    const data = await pendingPlanPatcher.submit({ op: 'remove', day_index: dayIndex, index: movementIndex });
+    if (data.success) {
+        location.reload();
     }
 }
 
@@ -259,28 +234,16 @@ async function addWeeklyMovement(dayIndex) {
         return;
     }
 
-    try {
-        const response = await fetch('/pending_weekly/add_movement', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                day_index: dayIndex,
-                movement_id: movementId,
-                sets: sets,
-                reps: reps,
-                weight: weight
-            })
-        });
-
-        const data = await response.json();
-        if (data.success) {
-            location.reload();
-        } else {
-            alert(data.error || 'Failed to add movement');
-        }
-    } catch (error) {
-        console.error('Error adding movement:', error);
-        alert('Failed to add movement');
+    const data = await pendingPlanPatcher.submit({
+        op: 'add',
+        day_index: dayIndex,
+        movement_id: movementId,
+        sets: sets,
+        reps: reps,
+        weight: weight
+    });
+    if (data.success) {
+        location.reload();
     }
 }
 
@@ -0,0 +1,96 @@
+// ===================================
+// Pending Plan Patch Queue
+// ===================================
+//
+// Collects edits to a pending (unconfirmed) plan and sends them to
+// /pending_plan/<kind>/patch as one ordered batch. Field edits are debounced
+// and coalesced per row; structural edits (remove/reorder/add) flush the
+// queue immediately so the server applies everything in order.
+
+class PendingPlanPatcher {
+    constructor(kind, revision, delayMs = 400) {
+        this.kind = kind;
+        this.revision = revision;
+        this.delayMs = delayMs;
+        this.operations = [];
+        this.timer = null;
+        this.inFlight = Promise.resolve();
+    }
+
+    queueUpdate(fields) {
+        const last = this.operations[this.operations.length - 1];
+        if (last && last.op === 'update' && last.index === fields.index && last.day_index === fields.day_index) {
+            Object.assign(last, fields);
+        } else {
+            this.operations.push({ op: 'update', ...fields });
+        }
+        clearTimeout(this.timer);
+        this.timer = setTimeout(() => this.flush(), this.delayMs);
+    }
+
+    submit(operation) {
+        this.operations.push(operation);
+        return this.flush();
+    }
+
+    flush() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.operations.length === 0) {
+            return this.inFlight;
+        }
+        const operations = this.operations;
+        this.operations = [];
+        // Chain batches so each one carries the revision returned by the last
+        this.inFlight = this.inFlight.then(() => this.send(operations));
+        return this.inFlight;
+    }
+
+    async send(operations) {
+        try {
+            const response = await fetch(`/pending_plan/${this.kind}/patch`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ revision: this.revision, operations })
+            });
+            const data = await response.json();
+            if (response.status === 409) {
+                alert('This plan was changed in another tab. Reloading the latest version.');
+                location.reload();
+                return data;
+            }
+            if (data.success) {
+                this.revision = data.revision;
+            } else {
+                alert(data.error || 'Failed to update plan');
+            }
+            return data;
+        } catch (error) {
+            console.error('Error updating plan:', error);
+            alert('Failed to update plan');
+            return { success: false, error: 'Failed to update plan' };
+        }
+    }
+}
+
+// Form onsubmit handler: send queued edits before confirming the plan
+function flushPendingPlanThenSubmit(event) {
+    const patcher = window.pendingPlanPatcher;
+    if (!patcher) return true;
+    event.preventDefault();
+    patcher.flush().then(() => event.target.submit());
+    return false;
+}
+
+window.addEventListener('beforeunload', () => {
+    if (window.pendingPlanPatcher && window.pendingPlanPatcher.operations.length) {
+        const patcher = window.pendingPlanPatcher;
+        navigator.sendBeacon(
+            `/pending_plan/${patcher.kind}/patch`,
+            new Blob(
+                [JSON.stringify({ revision: patcher.revision, operations: patcher.operations })],
+                { type: 'application/json' }
+            )
+        );
+    }
+});
@@ -1,3 +1,86 @@
+// Workouts are fetched per calendar month from /calendar/data and cached, so
+// moving between views re-uses months already loaded. Months adjacent to the
+// visible range are prefetched in the background.
+const monthCache = new Map(); // 'YYYY-MM' -> Promise of event objects
+
+function monthKey(date) {
+    return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
+}
+
+function isoDate(date) {
+    return `${monthKey(date)}-${String(date.getDate()).padStart(2, '0')}`;
+}
+
+function toEvent(day, workout) {
+    return {
+        title: workout.name,
+        start: day,
+        allDay: true,
+        extendedProps: {
+            workout_id: workout.id,
+            is_completed: workout.completed
+        },
+        className: workout.completed ? 'completed-event' : 'planned-event'
+    };
+}
+
+function loadMonth(year, month) {
+    const first = new Date(year, month, 1);
+    const key = monthKey(first);
+    if (!monthCache.has(key)) {
+        const next = new Date(year, month + 1, 1);
+        const request = fetch(`/calendar/data?start=${isoDate(first)}&end=${isoDate(next)}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Calendar request failed (${response.status})`);
+                }
+                return response.json();
+            })
+            .then(data => data.days.flatMap(day => day.workouts.map(workout => toEvent(day.date, workout))))
+            .catch(error => {
+                monthCache.delete(key); // retry on the next navigation
+                throw error;
+            });
+        monthCache.set(key, request);
+    }
+    return monthCache.get(key);
+}
+
+function monthsBetween(start, end) {
+    // Calendar months overlapping [start, end)
+    const months = [];
+    const cursor = new Date(start.getFullYear(), start.getMonth(), 1);
+    while (cursor < end) {
+        months.push([cursor.getFullYear(), cursor.getMonth()]);
+        cursor.setMonth(cursor.getMonth() + 1);
+    }
+    return months;
+}
+
+function fetchWorkoutEvents(info, successCallback, failureCallback) {
+    const months = monthsBetween(info.start, info.end);
+    Promise.all(months.map(([year, month]) => loadMonth(year, month)))
+        .then(results => {
+            const startDay = isoDate(info.start);
+            const endDay = isoDate(info.end);
+            successCallback(results.flat().filter(event => event.start >= startDay && event.start < endDay));
+
+            // Warm the months either side so prev/next render from cache
+            const [firstYear, firstMonth] = months[0];
+            const [lastYear, lastMonth] = months[months.length - 1];
+            loadMonth(firstYear, firstMonth - 1).catch(() => {});
+            loadMonth(lastYear, lastMonth + 1).catch(() => {});
+        })
+        .catch(error => {
+            console.error('Error loading workouts:', error);
+            failureCallback(error);
+        });
+}
+
+function forgetMonth(dateStr) {
+    monthCache.delete(dateStr.slice(0, 7));
+}
+
 document.addEventListener('DOMContentLoaded', function () {
     const calendarEl = document.getElementById('calendar');
     const isMobile = window.innerWidth < 768;
@@ -21,7 +104,7 @@ document.addEventListener('DOMContentLoaded', function () {
         },
         firstDay: 1, // Monday
         locale: 'en-gb',
-        events: workoutEvents, // use the global variable defined in the HTML
+        events: fetchWorkoutEvents, // months are loaded on demand from /calendar/data
         editable: true, // Enable drag-and-drop
         height: isMobile ? 700 : 'auto', // Taller calendar on mobile
         contentHeight: isMobile ? 650 : 600,
@@ -57,6 +140,10 @@ document.addEventListener('DOMContentLoaded', function () {
                         // Revert the drag if update failed
                         info.revert();
                         alert(data.error || 'Failed to update workout date.');
+                    } else {
+                        // Both months changed; reload them when next shown
+                        forgetMonth(info.oldEvent.startStr);
+                        forgetMonth(newDate);
                     }
                 } else {
                     info.revert();
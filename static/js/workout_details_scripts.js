@@ -193,10 +193,13 @@ function fetchInstructions(movementName) {
     fetch(`/get_instructions?movement_name=${encodeURIComponent(movementName)}`)
         .then(response => {
             hideSpinner();
-            if (!response.ok) {
-                throw new Error('Failed to fetch instructions');
-            }
-            return response.json();
+            return response.json().catch(() => ({})).then(data => {
+                if (!response.ok) {
+                    // The server sends a user-facing message (and error code) when the AI is degraded
+                    throw new Error(data.error || 'Failed to fetch instructions. Please try again later.');
+                }
+                return data;
+            });
         })
         .then(data => {
             if (data.instructions) {
@@ -218,7 +221,7 @@ function fetchInstructions(movementName) {
         .catch(error => {
             hideSpinner();
             console.error('Error fetching instructions:', error);
-            alert('Failed to fetch instructions. Please try again later.');
+            alert(error.message || 'Failed to fetch instructions. Please try again later.');
         });
 }
 
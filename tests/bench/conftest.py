@@ -0,0 +1,176 @@
+"""
+Benchmark fixtures.
+
+Benchmarks are skipped unless RUN_BENCHMARKS=1. They run offline against a
+SQLite database seeded once per session with scripts/generate_synthetic_data.py
+(fixed seed), so two runs on the same machine see the same data.
+
+Timings go to BENCH_RESULTS (default .bench/results.json) and are compared
+with tests/bench/baseline.json: a benchmark whose median is more than
+BENCH_TOLERANCE (default 0.3, i.e. 30%) slower than its baseline is reported
+as a regression and fails the run. BENCH_UPDATE_BASELINE=1 writes the
+results as the new baseline instead. Baselines are machine-specific;
+record one on the machine that compares against it.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from scripts.generate_synthetic_data import generate
+
+BENCH_DIR = Path(__file__).parent
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+DATASET = {"users": 1000, "weeks": 4, "seed": 42}
+
+_results = {}
+
+
+def _enabled() -> bool:
+    return os.getenv("RUN_BENCHMARKS", "").lower() in ("1", "true", "yes")
+
+
+def pytest_collection_modifyitems(config, items):
+    if _enabled():
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with RUN_BENCHMARKS=1")
+    for item in items:
+        if BENCH_DIR in Path(str(item.fspath)).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def bench_app(tmp_path_factory):
+    database_path = tmp_path_factory.mktemp("bench") / "bench.db"
+    app = create_app(
+        {
+            "TESTING": True,
+            "SKIP_NLTK_DOWNLOAD": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "SECRET_KEY": "bench-secret",
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        generate(prefix="bench_", chunk_size=50000, storage_mode="entries", impacts=True, **DATASET)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def bench_context(bench_app):
+    with bench_app.app_context():
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def benchmark(bench_app):
+    """
+    benchmark(name, fn, rounds=5, warmup=1) calls fn warmup + rounds times,
+    records wall-clock stats and the SQL statement count of the last round,
+    and returns the last result.
+    """
+    def run(name, fn, rounds=5, warmup=1):
+        for _ in range(warmup):
+            fn()
+
+        statements = []
+        listener = lambda *args: statements.append(1)
+        timings = []
+        result = None
+        for _ in range(rounds):
+            statements.clear()
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                started = time.perf_counter()
+                result = fn()
+                timings.append(time.perf_counter() - started)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+
+        timings.sort()
+        _results[name] = {
+            "rounds": rounds,
+            "min_ms": round(timings[0] * 1000, 3),
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+            "statements": len(statements),
+        }
+        return result
+
+    return run
+
+
+def _compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous.get("statements") is not None and result["statements"] > previous["statements"]:
+            regressions.append(f"{name}: {previous['statements']} -> {result['statements']} statements")
+        if not previous.get("median_ms"):
+            continue
+        ratio = result["median_ms"] / previous["median_ms"]
+        result["baseline_median_ms"] = previous["median_ms"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {previous['median_ms']}ms -> {result['median_ms']}ms ({ratio:.2f}x)")
+    return regressions
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+
+    tolerance = float(os.getenv("BENCH_TOLERANCE", "0.3"))
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text()).get("benchmarks", {})
+    regressions = _compare(_results, baseline, tolerance)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "machine": {"python": sys.version.split()[0], "platform": platform.platform()},
+        "dataset": DATASET,
+        "tolerance": tolerance,
+        "regressions": regressions,
+        "benchmarks": dict(sorted(_results.items())),
+    }
+    results_path = Path(os.getenv("BENCH_RESULTS", ".bench/results.json"))
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    results_path.write_text(json.dumps(report, indent=2) + "\n")
+
+    if os.getenv("BENCH_UPDATE_BASELINE"):
+        for result in report["benchmarks"].values():
+            result.pop("baseline_median_ms", None)
+            result.pop("ratio", None)
+        report["regressions"] = []
+        BASELINE_PATH.write_text(json.dumps(report, indent=2) + "\n")
+        return
+
+    session.config._bench_regressions = regressions
+    if regressions:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    for name, result in sorted(_results.items()):
+        line = f"{name:<55} median {result['median_ms']:>10.2f}ms  statements {result['statements']:>6}"
+        if "ratio" in result:
+            line += f"  ({result['ratio']:.2f}x baseline)"
+        terminalreporter.write_line(line)
+    for regression in getattr(config, "_bench_regressions", []):
+        terminalreporter.write_line(f"REGRESSION {regression}", red=True)
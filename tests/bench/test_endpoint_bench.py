@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import delete, func, insert
+
+from app.models import db, User, UserGroup, UserGroupMembership, Workout
+
+
+@pytest.fixture
+def client(bench_app):
+    return bench_app.test_client()
+
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+
+@pytest.fixture
+def leaderboard_group(request):
+    """A group with request.param synthetic members; removed afterwards."""
+    member_ids = [
+        u.user_id for u in
+        User.query.filter(User.username.like("bench_%")).order_by(User.user_id).limit(request.param)
+    ]
+    group = UserGroup(group_name=f"bench leaderboard {request.param}")
+    db.session.add(group)
+    db.session.flush()
+    db.session.execute(insert(UserGroupMembership.__table__), [
+        {"user_id": user_id, "group_id": group.group_id, "role": "owner" if i == 0 else "member"}
+        for i, user_id in enumerate(member_ids)
+    ])
+    db.session.commit()
+    yield group.group_id, member_ids
+    db.session.execute(delete(UserGroupMembership.__table__).where(UserGroupMembership.group_id == group.group_id))
+    db.session.execute(delete(UserGroup.__table__).where(UserGroup.group_id == group.group_id))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("leaderboard_group", [10, 100, 1000], indirect=True)
+def test_leaderboard_data(benchmark, client, leaderboard_group):
+    group_id, member_ids = leaderboard_group
+    _login(client, member_ids[0])
+
+    response = benchmark(
+        f"leaderboard_data[{len(member_ids)} members]",
+        lambda: client.get(f'/leaderboard/data?group_id={group_id}&period=month'),
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()["users"]) == len(member_ids)
+
+
+@pytest.mark.parametrize("period", ["month", "all"])
+def test_stats_data(benchmark, client, period):
+    (user_id,) = (
+        db.session.query(Workout.user_id)
+        .filter(Workout.is_completed == True)
+        .group_by(Workout.user_id)
+        .order_by(func.count(Workout.workout_id).desc())
+        .first()
+    )
+    _login(client, user_id)
+
+    response = benchmark(f"stats_data[{period}]", lambda: client.get(f'/stats/data?period={period}'))
+
+    assert response.status_code == 200
+    assert response.get_json()["totals_by_muscle"]
@@ -0,0 +1,92 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app.models import db, User, Movement, Workout, WorkoutFeedbackSummary
+from app.services.feedback_service import FeedbackService
+from app.services.movement_service import MovementService
+from app.services.stats_service import StatsService
+from app.services.workout_service import WorkoutService
+
+
+def _completed_workout_ids(limit):
+    return [
+        w.workout_id for w in
+        Workout.query.filter_by(is_completed=True).order_by(Workout.workout_id).limit(limit)
+    ]
+
+
+def test_build_workout_impacts(benchmark):
+    workout_ids = _completed_workout_ids(50)
+
+    def build():
+        db.session.expire_all()
+        workouts = Workout.query.filter(Workout.workout_id.in_(workout_ids)).all()
+        return [StatsService.build_workout_impacts(w) for w in workouts]
+
+    impacts = benchmark("build_workout_impacts[50 workouts]", build)
+
+    assert len(impacts) == 50 and all(impacts)
+
+
+@pytest.fixture
+def movement_catalog(request):
+    """Pads the movement table to request.param rows; the padding is removed afterwards."""
+    padding = request.param - Movement.query.count()
+    names = [f"Bench Movement {i:05d}" for i in range(padding)]
+    db.session.execute(insert(Movement.__table__), [{"movement_name": name} for name in names])
+    db.session.commit()
+    yield names
+    db.session.execute(delete(Movement.__table__).where(Movement.movement_name.in_(names)))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("movement_catalog", [1000, 10000], indirect=True, ids=["1k", "10k"])
+def test_find_or_create_movement(benchmark, movement_catalog):
+    size = Movement.query.count()
+
+    movement = benchmark(
+        f"find_or_create_movement[{size // 1000}k movements]",
+        lambda: MovementService.find_or_create_movement(movement_catalog[-1].lower()),
+        rounds=3,
+    )
+
+    assert movement.movement_name == movement_catalog[-1]
+    assert Movement.query.count() == size
+
+
+def test_process_completed_workout(benchmark):
+    processed = {s.workout_id for s in WorkoutFeedbackSummary.query}
+    pending = iter(w for w in _completed_workout_ids(500) if w not in processed)
+
+    summary = benchmark(
+        "process_completed_workout",
+        lambda: FeedbackService.process_completed_workout(next(pending)),
+        rounds=10,
+    )
+
+    assert summary is not None
+
+
+def test_create_weekly_workouts_from_plan(benchmark):
+    user = User.query.filter(User.username.like("bench_%")).first()
+    plan = {"weekly_plan": [
+        {
+            "workout_name": f"Day {day}",
+            "movements": [
+                {"name": name, "sets": 4, "reps": 8, "weight": 60, "is_bodyweight": False,
+                 "muscle_groups": [{"name": group, "impact": 100}]}
+                for name, group in [("Bench Press", "Chest"), ("Barbell Row", "Back"), ("Squat", "Quadriceps"),
+                                    ("Overhead Press", "Shoulders"), ("Leg Curl", "Hamstrings")]
+            ],
+        }
+        for day in range(1, 5)
+    ]}
+
+    workouts = benchmark(
+        "create_weekly_workouts_from_plan[4 days x 5 movements]",
+        lambda: WorkoutService.create_weekly_workouts_from_plan(user.user_id, plan, start_date=date.today()),
+    )
+
+    assert len(workouts) == 4
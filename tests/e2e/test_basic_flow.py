@@ -60,4 +60,9 @@ def test_create_workout_and_view_planner(client):
     planner_response = client.get("/start_workout")
     assert planner_response.status_code == 200
     assert b"Workout Planner" in planner_response.data
-    assert b"New workout" in planner_response.data
+
+    calendar_response = client.get("/calendar/data?start=2024-01-01&end=2024-02-01")
+    assert calendar_response.status_code == 200
+    (day,) = calendar_response.get_json()["days"]
+    assert day["date"] == "2024-01-15"
+    assert day["workouts"][0]["name"] == "New workout"
@@ -0,0 +1,191 @@
+import json
+
+import pytest
+
+from app.services import ai_generation_service
+from app.services.ai_generation_service import AIGenerationService, AIGenerationError
+from app.services.circuit_breaker import CircuitBreaker
+
+
+VALID_PLAN = json.dumps({"workout_name": "Upper Body", "movements": []})
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    monkeypatch.setattr(AIGenerationService, "_circuit_breaker", None)
+    sleeps = []
+    monkeypatch.setattr(ai_generation_service.time, "sleep", lambda seconds: sleeps.append(seconds))
+    return sleeps
+
+
+def _fake_generator(outcomes, calls):
+    def fake_generate_workout_plan(*args, timeout=None, attempt=1, **kwargs):
+        calls.append(timeout)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return fake_generate_workout_plan
+
+
+def test_retries_with_backoff_then_succeeds(app, monkeypatch, fresh_breaker):
+    calls = []
+    monkeypatch.setattr(
+        ai_generation_service,
+        "generate_workout_plan",
+        _fake_generator([RuntimeError("boom"), VALID_PLAN], calls),
+    )
+
+    with app.app_context():
+        plan = AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+
+    assert plan["workout_name"] == "Upper Body"
+    assert len(calls) == 2
+    # Every attempt gets the remaining budget as its timeout
+    assert all(timeout is not None and timeout > 0 for timeout in calls)
+    assert len(fresh_breaker) == 1
+    assert 0 <= fresh_breaker[0] <= app.config["AI_BACKOFF_BASE_SECONDS"]
+
+
+def test_invalid_json_surfaces_invalid_response_code(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ai_generation_service,
+        "generate_workout_plan",
+        _fake_generator(["not-json"] * AIGenerationService.MAX_ATTEMPTS, calls),
+    )
+
+    with app.app_context():
+        with pytest.raises(AIGenerationError) as excinfo:
+            AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+
+    assert excinfo.value.code == AIGenerationError.INVALID_RESPONSE
+    assert len(calls) == AIGenerationService.MAX_ATTEMPTS
+    # Malformed bodies mean upstream is healthy, so the breaker stays closed
+    assert AIGenerationService.circuit_breaker().state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_budget_stops_retrying(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ai_generation_service,
+        "generate_workout_plan",
+        _fake_generator([TimeoutError("slow")] * AIGenerationService.MAX_ATTEMPTS, calls),
+    )
+    app.config["AI_REQUEST_BUDGET_SECONDS"] = 0.01
+    app.config["AI_BACKOFF_BASE_SECONDS"] = 5
+    monkeypatch.setattr(ai_generation_service.random, "uniform", lambda low, high: high)
+
+    with app.app_context():
+        with pytest.raises(AIGenerationError) as excinfo:
+            AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+
+    assert excinfo.value.code == AIGenerationError.TIMEOUT
+    assert len(calls) == 1
+
+
+def test_circuit_opens_and_fails_fast(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ai_generation_service,
+        "generate_workout_plan",
+        _fake_generator([RuntimeError("down")] * 10, calls),
+    )
+    app.config["AI_CIRCUIT_MIN_CALLS"] = 3
+
+    with app.app_context():
+        with pytest.raises(AIGenerationError) as excinfo:
+            AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+        assert excinfo.value.code == AIGenerationError.UPSTREAM_ERROR
+        assert AIGenerationService.circuit_breaker().state == CircuitBreaker.OPEN
+
+        with pytest.raises(AIGenerationError) as excinfo:
+            AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+
+    assert excinfo.value.code == AIGenerationError.CIRCUIT_OPEN
+    assert excinfo.value.retry_after > 0
+    assert len(calls) == 3
+
+
+def test_circuit_breaker_half_open_recovers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_rate_threshold=0.5, min_calls=2, reset_timeout=10)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request() is False
+
+    now[0] += 11
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    # Only one trial call is allowed while half-open
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_get_instructions_returns_structured_error_when_circuit_open(app, client, monkeypatch):
+    from app.models import db, User
+
+    with app.app_context():
+        user = User(username="coach", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.user_id
+        breaker = AIGenerationService.circuit_breaker()
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+    response = client.get('/get_instructions?movement_name=Squat')
+    assert response.status_code == 503
+    payload = response.get_json()
+    assert payload['code'] == AIGenerationError.CIRCUIT_OPEN
+    assert 'Retry-After' in response.headers
+
+
+def test_muscle_group_lookup_as_half_open_trial_closes_circuit(app, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.circuit_breaker.time.monotonic", lambda: now[0])
+    monkeypatch.setattr(ai_generation_service, "fetch_movement_info", lambda name: {
+        "movement_name": name, "is_bodyweight": False, "weight": 0,
+        "muscle_groups": [{"name": "Quadriceps", "impact": 100}],
+    })
+    calls = []
+    monkeypatch.setattr(ai_generation_service, "generate_workout_plan", _fake_generator([VALID_PLAN], calls))
+
+    with app.app_context():
+        breaker = AIGenerationService.circuit_breaker()
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        now[0] += breaker.reset_timeout + 1
+        info = AIGenerationService.get_movement_muscle_groups("Squat")
+        assert info["muscle_groups"]
+
+        # The lookup was the half-open trial; its success must not leave the trial in flight
+        assert breaker.state == CircuitBreaker.CLOSED
+        plan = AIGenerationService.generate_single_workout("male", 80, "beginner", "legs")
+
+    assert plan["workout_name"] == "Upper Body"
+    assert len(calls) == 1
+
+
+def test_failed_muscle_group_lookup_returns_fallback_and_counts_as_failure(app, monkeypatch):
+    def fail(name):
+        raise RuntimeError("down")
+
+    monkeypatch.setattr(ai_generation_service, "fetch_movement_info", fail)
+
+    with app.app_context():
+        info = AIGenerationService.get_movement_muscle_groups("Squat")
+        breaker = AIGenerationService.circuit_breaker()
+
+    assert info == {"movement_name": "Squat", "is_bodyweight": False, "weight": 0, "muscle_groups": []}
+    assert list(breaker._outcomes) == [False]
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.models import (
+    db, User, Workout, WorkoutMovement, Set, Rep, Weight, SetEntry, WorkoutMuscleGroupImpact,
+    WorkoutSyncCursor, UserFeedbackProfile, PlanDraft,
+)
+from app.services.stats_service import StatsService
+from app.services.workout_service import WorkoutService
+
+
+PLAN = {
+    "workout_name": "Pull",
+    "movements": [
+        {"name": "Row", "sets": 4, "reps": 8, "weight": 60, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Back", "impact": 100}]},
+        {"name": "Curl", "sets": 3, "reps": 12, "weight": 15, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Biceps", "impact": 100}]},
+    ],
+}
+
+
+def _make_user(username, workouts=2):
+    user = User(username=username, password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    created = []
+    for _ in range(workouts):
+        workout = WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+        workout.is_completed = True
+        StatsService.rebuild_workout_impacts(workout)
+        db.session.add(WorkoutSyncCursor(workout_id=workout.workout_id, client_id="tab", last_seq=1))
+        created.append(workout.workout_id)
+    db.session.commit()
+    return user.user_id, created
+
+
+def _set_rows(workout_ids):
+    set_ids = [s.set_id for s in Set.query.join(WorkoutMovement).filter(WorkoutMovement.workout_id.in_(workout_ids))]
+    return set_ids, sum(model.query.filter(model.set_id.in_(set_ids)).count() for model in (Rep, Weight, SetEntry))
+
+
+@pytest.fixture
+def statements(app):
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+def test_delete_workout_removes_children_only_for_that_workout(app):
+    _, (doomed, kept) = _make_user("lifter")
+    kept_sets, kept_rows = _set_rows([kept])
+
+    WorkoutService.delete_workout(doomed)
+
+    db.session.expire_all()
+    assert db.session.get(Workout, doomed) is None
+    assert _set_rows([doomed]) == ([], 0)
+    assert WorkoutMuscleGroupImpact.query.filter_by(workout_id=doomed).count() == 0
+    assert WorkoutSyncCursor.query.filter_by(workout_id=doomed).count() == 0
+    assert _set_rows([kept]) == (kept_sets, kept_rows)
+
+
+def test_delete_workout_uses_a_fixed_number_of_statements(app, statements):
+    _, (small,) = _make_user("small", workouts=1)
+    db.session.expire_all()
+    statements.clear()
+    WorkoutService.delete_workout(small)
+    small_count = len(statements)
+
+    _, workouts = _make_user("big", workouts=1)
+    # Pad the second workout with many more sets
+    wm = WorkoutMovement.query.filter_by(workout_id=workouts[0]).first()
+    for order in range(5, 30):
+        new_set = Set(workout_movement_id=wm.workout_movement_id, set_order=order)
+        StatsService.write_set_values(new_set, 5, 20, False)
+        db.session.add(new_set)
+    db.session.commit()
+    db.session.expire_all()
+    statements.clear()
+    WorkoutService.delete_workout(workouts[0])
+
+    assert len(statements) == small_count
+    assert not any(s.lstrip().upper().startswith("SELECT") and "Sets" in s for s in statements[1:])
+
+
+def test_delete_account_removes_all_user_data(app, client):
+    user_id, workouts = _make_user("leaving")
+    _, other_workouts = _make_user("staying", workouts=1)
+    db.session.add(PlanDraft(draft_id="d" * 32, user_id=user_id, kind="workout", plan_json="{}",
+                             expires_at=datetime.utcnow()))
+    movement_id = WorkoutMovement.query.filter_by(workout_id=workouts[0]).first().movement_id
+    db.session.add(UserFeedbackProfile(user_id=user_id, movement_id=movement_id))
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+    response = client.post('/delete_account')
+
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user_id) is None
+    assert Workout.query.filter_by(user_id=user_id).count() == 0
+    assert _set_rows(workouts) == ([], 0)
+    assert PlanDraft.query.count() == 0
+    assert UserFeedbackProfile.query.count() == 0
+    assert [w.workout_id for w in Workout.query.all()] == other_workouts
+    assert _set_rows(other_workouts)[1] > 0
+
+
+def test_sqlite_cascades_from_the_database(app):
+    _, (workout_id,) = _make_user("raw", workouts=1)
+
+    db.session.execute(db.text('DELETE FROM "Workouts" WHERE workout_id = :id'), {"id": workout_id})
+    db.session.commit()
+
+    assert _set_rows([workout_id]) == ([], 0)
+    assert WorkoutMovement.query.count() == 0
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import db, User, PlanDraft
+from app.services.ai_generation_service import AIGenerationService
+
+
+PLAN = {
+    "workout_name": "Upper Body",
+    "movements": [
+        {"name": f"Movement {i}", "sets": 3, "reps": 10, "weight": 20.0, "is_bodyweight": False,
+         "description": "x" * 200, "muscle_groups": [{"name": "Chest", "impact": 100}]}
+        for i in range(8)
+    ],
+}
+
+
+@pytest.fixture
+def logged_in(app, client, monkeypatch):
+    user = User(username="drafter", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+
+    monkeypatch.setattr(
+        AIGenerationService, "generate_single_workout", staticmethod(lambda *args, **kwargs: dict(PLAN))
+    )
+    return user.user_id
+
+
+def _session_cookie(response):
+    return next((h for h in response.headers.getlist('Set-Cookie') if h.startswith('session=')), '')
+
+
+def test_generated_plan_is_stored_server_side(app, client, logged_in):
+    response = client.post('/generate_workout', data={'target': 'Upper Body'})
+    assert response.status_code == 302
+
+    draft = PlanDraft.query.one()
+    assert draft.user_id == logged_in
+    assert draft.kind == 'workout'
+    # The cookie carries only the draft ID, not the multi-KB plan
+    assert len(_session_cookie(response)) < 400
+    assert len(draft.plan_json) > 1500
+
+
+def test_pending_edits_update_the_draft(app, client, logged_in):
+    client.post('/generate_workout', data={'target': 'Upper Body'})
+
+    response = client.post('/pending_workout/update_movement', json={'index': 0, 'sets': 5})
+    assert response.status_code == 200
+    assert response.get_json()['movement']['sets'] == 5
+
+    db.session.expire_all()
+    assert '"sets": 5' in PlanDraft.query.one().plan_json
+
+
+def test_cancel_discards_draft(app, client, logged_in):
+    client.post('/generate_workout', data={'target': 'Upper Body'})
+    client.post('/cancel_pending_workout')
+
+    assert PlanDraft.query.count() == 0
+    response = client.post('/pending_workout/update_movement', json={'index': 0, 'sets': 5})
+    assert response.status_code == 404
+
+
+def test_expired_draft_is_treated_as_missing_and_purged(app, client, logged_in):
+    client.post('/generate_workout', data={'target': 'Upper Body'})
+    db.session.expire_all()
+    draft = PlanDraft.query.one()
+    draft.expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+
+    response = client.post('/pending_workout/update_movement', json={'index': 0, 'sets': 5})
+    assert response.status_code == 404
+    assert PlanDraft.query.count() == 0
+
+
+def test_drafts_are_private_to_their_owner(app, client, logged_in):
+    client.post('/generate_workout', data={'target': 'Upper Body'})
+    other = User(username="other", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = other.user_id
+
+    response = client.post('/pending_workout/update_movement', json={'index': 0, 'sets': 5})
+    assert response.status_code == 404
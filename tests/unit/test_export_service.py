@@ -0,0 +1,141 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db, User, Set, Workout
+from app.services.export_service import ExportService
+from app.services.movement_service import MovementService
+from app.services.workout_service import WorkoutService
+
+
+PLAN = {
+    "workout_name": "Legs",
+    "movements": [
+        {"name": "Squat", "sets": 3, "reps": 5, "weight": 100, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Quadriceps", "impact": 100}]},
+        {"name": "Lunge", "sets": 2, "reps": 10, "weight": 0, "is_bodyweight": True,
+         "muscle_groups": [{"name": "Glutes", "impact": 100}]},
+    ],
+}
+
+
+@pytest.fixture
+def user_id(app, client):
+    user = User(username="exporter", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+    return user.user_id
+
+
+def test_json_export_keeps_user_data_shape(app, client, user_id):
+    workout = WorkoutService.create_workout_from_plan(user_id, PLAN)
+
+    response = client.get('/user_data')
+
+    assert response.mimetype == "application/json"
+    (record,) = response.get_json()
+    assert record["workout_id"] == workout.workout_id
+    assert [m["name"] for m in record["movements"]] == ["Squat", "Lunge"]
+    squat = record["movements"][0]
+    assert (squat["sets"], squat["reps_per_set"], squat["weight"]) == (3, 5, 100.0)
+    assert record["movements"][1]["set_values"][0] == {"reps": 10, "weight": 0.0, "is_bodyweight": True}
+
+
+def test_ndjson_and_csv_formats(app, client, user_id):
+    for _ in range(3):
+        WorkoutService.create_workout_from_plan(user_id, PLAN)
+
+    lines = client.get('/user_data?format=ndjson').get_data(as_text=True).splitlines()
+    rows = list(csv.DictReader(io.StringIO(client.get('/user_data?format=csv').get_data(as_text=True))))
+
+    assert [json.loads(line)["workout_id"] for line in lines] == [w.workout_id for w in Workout.query.order_by(Workout.workout_id)]
+    assert len(rows) == 3 * 5
+    assert rows[0]["movement"] == "Squat" and rows[0]["reps"] == "5"
+
+
+def test_gzip_when_accepted(app, client, user_id):
+    WorkoutService.create_workout_from_plan(user_id, PLAN)
+
+    response = client.get('/user_data?format=ndjson', headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))["name"] == "Legs"
+
+
+def test_since_returns_only_changed_workouts(app, client, user_id):
+    old, edited, _ = (WorkoutService.create_workout_from_plan(user_id, PLAN) for _ in range(3))
+    cutoff = datetime.utcnow() + timedelta(seconds=1)
+    Workout.query.update({Workout.created_at: cutoff - timedelta(days=1)})
+    db.session.commit()
+    edited_set = Set.query.filter(Set.workout_movement_id == edited.workout_movements[0].workout_movement_id).first()
+    edited_set.updated_at = cutoff + timedelta(minutes=1)
+    db.session.commit()
+
+    response = client.get(f'/user_data?format=ndjson&since={cutoff.isoformat()}')
+
+    assert [json.loads(line)["workout_id"] for line in response.get_data(as_text=True).splitlines()] == [edited.workout_id]
+    assert "X-Export-Started-At" in response.headers
+
+
+def _backdate_and_cut():
+    Workout.query.update({Workout.created_at: datetime.utcnow() - timedelta(days=1)})
+    db.session.commit()
+    return datetime.utcnow()
+
+
+def _exported_ids(client, since):
+    response = client.get(f'/user_data?format=ndjson&since={since.isoformat()}')
+    return [json.loads(line)["workout_id"] for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_since_includes_workout_with_added_movement(app, client, user_id):
+    _, changed = (WorkoutService.create_workout_from_plan(user_id, PLAN) for _ in range(2))
+    cutoff = _backdate_and_cut()
+
+    MovementService.add_movement_to_workout(changed.workout_id, "Squat", 2, 8, 90)
+
+    assert _exported_ids(client, cutoff) == [changed.workout_id]
+
+
+def test_since_includes_workout_with_removed_movement(app, client, user_id):
+    changed, _ = (WorkoutService.create_workout_from_plan(user_id, PLAN) for _ in range(2))
+    removed_id = changed.workout_movements[0].workout_movement_id
+    cutoff = _backdate_and_cut()
+
+    MovementService.remove_movement_from_workout(removed_id)
+
+    assert _exported_ids(client, cutoff) == [changed.workout_id]
+
+
+def test_bad_parameters_are_rejected(app, client, user_id):
+    assert client.get('/user_data?format=xml').status_code == 400
+    assert client.get('/user_data?since=yesterday').status_code == 400
+
+
+def test_query_count_scales_with_chunks_not_workouts(app, user_id, monkeypatch):
+    for _ in range(9):
+        WorkoutService.create_workout_from_plan(user_id, PLAN)
+    db.session.expire_all()
+    monkeypatch.setattr(ExportService, "CHUNK_SIZE", 4)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        lines = list(ExportService.stream(user_id, "ndjson"))
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert len(lines) == 9
+    # Three chunks plus the empty terminating query; each chunk loads a fixed number of relations
+    per_chunk = (len(statements) - 1) / 3
+    assert per_chunk == int(per_chunk) and per_chunk <= 7
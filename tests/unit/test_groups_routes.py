@@ -0,0 +1,25 @@
+from app.models import db, User, UserGroup, UserGroupMembership, GroupJoinRequest
+
+
+def test_last_member_leaving_deletes_group_with_pending_join_request(app, client):
+    owner = User(username="owner", password_hash="x")
+    applicant = User(username="applicant", password_hash="x")
+    group = UserGroup(group_name="Lifters")
+    db.session.add_all([owner, applicant, group])
+    db.session.commit()
+    db.session.add_all([
+        UserGroupMembership(user_id=owner.user_id, group_id=group.group_id, role='owner'),
+        GroupJoinRequest(user_id=applicant.user_id, group_id=group.group_id, status='pending'),
+    ])
+    db.session.commit()
+    group_id = group.group_id
+    with client.session_transaction() as sess:
+        sess['user_id'] = owner.user_id
+
+    response = client.post(f'/groups/{group_id}/leave')
+
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
+    db.session.expire_all()
+    assert db.session.get(UserGroup, group_id) is None
+    assert GroupJoinRequest.query.filter_by(group_id=group_id).count() == 0
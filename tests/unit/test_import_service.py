@@ -0,0 +1,111 @@
+import io
+
+import pytest
+
+from app.models import (
+    db, User, Movement, MuscleGroup, MovementMuscleGroup, Workout, WorkoutMovement, Set, SetEntry, Rep, Weight,
+    WorkoutMuscleGroupImpact,
+)
+from app.services.import_service import ImportService, WorkoutImportError
+from app.services.stats_service import StatsService
+from app.services.workout_service import WorkoutService
+
+
+CSV = """workout_date,workout_name,movement,reps,weight,is_bodyweight
+2024-03-01,Push,Bench Press,8,60,
+2024-03-01,Push,bench_press,8,60,
+2024-03-01,Push,Dips,12,0,yes
+2024-03-03,Pull,Pull Ups,6,0,true
+2024-03-03,Pull,Barbell Row,10,50,
+"""
+
+
+@pytest.fixture
+def user_id(app, client):
+    user = User(username="migrator", password_hash="x", bodyweight=75)
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+    return user.user_id
+
+
+@pytest.fixture
+def bench(app):
+    chest = MuscleGroup(muscle_group_name="Chest")
+    movement = Movement(movement_name="Bench Press")
+    db.session.add_all([chest, movement])
+    db.session.flush()
+    db.session.add(MovementMuscleGroup(movement_id=movement.movement_id, muscle_group_id=chest.muscle_group_id,
+                                       target_percentage=100))
+    db.session.commit()
+    return movement.movement_id
+
+
+def test_rows_group_into_workouts_and_reuse_movements(app, user_id, bench):
+    summary = ImportService.import_csv(user_id, io.StringIO(CSV), chunk_size=2)
+
+    assert (summary["rows"], summary["imported_sets"], summary["workouts"]) == (5, 5, 2)
+    assert summary["movements_created"] == 3
+    push = Workout.query.filter_by(workout_name="Push").one()
+    bench_wm = WorkoutMovement.query.filter_by(workout_id=push.workout_id, movement_id=bench).one()
+    assert sorted(s.set_order for s in bench_wm.sets) == [1, 2]
+    dips = Set.query.join(WorkoutMovement).join(Movement).filter(Movement.movement_name == "Dips").one()
+    assert (dips.rep_count, dips.is_bodyweight) == (12, True)
+
+
+def test_completed_imports_get_impacts(app, user_id, bench):
+    ImportService.import_csv(user_id, io.StringIO(CSV))
+
+    push = Workout.query.filter_by(workout_name="Push").one()
+    stored = {row.muscle_group_id: float(row.total_volume)
+              for row in WorkoutMuscleGroupImpact.query.filter_by(workout_id=push.workout_id)}
+    expected = {mg_id: round(data["volume"], 2) for mg_id, data in StatsService.build_workout_impacts(push).items()}
+    assert stored == pytest.approx(expected)
+    assert stored
+
+
+def test_invalid_rows_are_skipped_and_reported(app, user_id):
+    bad = CSV + "not-a-date,Push,Squat,5,100,\n2024-03-05,Legs,Squat,five,100,\n2024-03-05,Legs,Squat,5,5000,\n"
+
+    summary = ImportService.import_csv(user_id, io.StringIO(bad))
+
+    assert summary["skipped"] == 3
+    assert [e.split(":")[0] for e in summary["errors"]] == ["Line 7", "Line 8", "Line 9"]
+    assert summary["imported_sets"] == 5
+
+
+def test_missing_columns_raise(app, user_id):
+    with pytest.raises(WorkoutImportError):
+        ImportService.import_csv(user_id, io.StringIO("date,exercise\n2024-01-01,Squat\n"))
+
+
+def test_export_csv_round_trips(app, client, user_id):
+    WorkoutService.create_workout_from_plan(user_id, {
+        "workout_name": "Legs",
+        "movements": [{"name": "Squat", "sets": 3, "reps": 5, "weight": 100, "is_bodyweight": False,
+                       "muscle_groups": [{"name": "Quadriceps", "impact": 100}]}],
+    })
+    exported = client.get('/user_data?format=csv').get_data(as_text=True)
+
+    summary = ImportService.import_csv(user_id, io.StringIO(exported))
+
+    assert (summary["imported_sets"], summary["workouts"], summary["movements_created"]) == (3, 1, 0)
+    assert Workout.query.filter_by(workout_name="Legs").count() == 2
+
+
+def test_upload_route(app, client, user_id):
+    response = client.post('/import_workouts', data={"file": (io.BytesIO(CSV.encode()), "history.csv")},
+                           content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    assert response.get_json()["imported_sets"] == 5
+    assert SetEntry.query.count() == 5
+
+
+def test_entries_mode_writes_only_entries(app, user_id):
+    app.config["SET_STORAGE_MODE"] = "entries"
+
+    ImportService.import_csv(user_id, io.StringIO(CSV))
+
+    assert (Rep.query.count(), Weight.query.count(), SetEntry.query.count()) == (0, 0, 5)
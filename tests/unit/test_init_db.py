@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import inspect
+
+from app import create_app
+from app.models import db, SchemaVersion
+from scripts import init_db as init_db_module
+from scripts.init_db import migrate_db, schema_fingerprint
+
+
+def _config(database_path, **overrides):
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}",
+        "SECRET_KEY": "test-secret",
+    }
+    config.update(overrides)
+    return config
+
+
+def test_first_boot_creates_tables_and_records_version(tmp_path):
+    app = create_app(_config(tmp_path / "fresh.db"))
+
+    with app.app_context():
+        assert SchemaVersion.query.one().fingerprint == schema_fingerprint()
+        assert "Users" in inspect(db.engine).get_table_names()
+
+
+def test_matching_version_skips_ddl(tmp_path, monkeypatch):
+    database_path = tmp_path / "existing.db"
+    create_app(_config(database_path))
+
+    def fail_migrate(*args, **kwargs):
+        raise AssertionError("migrate_db should not run when the schema version matches")
+
+    monkeypatch.setattr(init_db_module, "migrate_db", fail_migrate)
+    app = create_app(_config(database_path))
+
+    with app.app_context():
+        assert SchemaVersion.query.count() == 1
+
+
+def test_auto_create_disabled_leaves_schema_to_migrate_command(tmp_path):
+    app = create_app(_config(tmp_path / "workers.db", DB_AUTO_CREATE=False))
+
+    with app.app_context():
+        assert "Users" not in inspect(db.engine).get_table_names()
+
+    migrate_db(app)
+    with app.app_context():
+        assert "Users" in inspect(db.engine).get_table_names()
+        assert SchemaVersion.query.one().fingerprint == schema_fingerprint()
+
+
+def test_auto_create_is_off_outside_testing(tmp_path):
+    app = create_app(_config(tmp_path / "prod.db", TESTING=False, FAST_START=True))
+
+    assert app.config["DB_AUTO_CREATE"] is False
+    with app.app_context():
+        assert "Users" not in inspect(db.engine).get_table_names()
+
+
+def test_missing_column_blocks_version_record(tmp_path):
+    from sqlalchemy import text
+
+    database_path = tmp_path / "stale.db"
+    app = create_app(_config(database_path, DB_AUTO_CREATE=False))
+    with app.app_context():
+        db.create_all()
+        db.session.execute(text("ALTER TABLE Movements DROP COLUMN movement_instructions"))
+        db.session.commit()
+
+    with pytest.raises(RuntimeError, match="Movements.movement_instructions"):
+        migrate_db(app)
+    with app.app_context():
+        assert SchemaVersion.query.count() == 0
+
+
+def test_fingerprint_changes_with_models():
+    from sqlalchemy import Column, Integer, MetaData, Table
+
+    metadata = MetaData()
+    Table("Example", metadata, Column("id", Integer, primary_key=True))
+    before = schema_fingerprint(metadata)
+    Table("Other", metadata, Column("id", Integer, primary_key=True))
+    assert schema_fingerprint(metadata) != before
+
+
+def test_foreign_keys_are_enabled_only_on_the_app_engine(tmp_path):
+    from sqlalchemy import create_engine, text
+
+    app = create_app(_config(tmp_path / "fk.db"))
+
+    with app.app_context():
+        assert db.session.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    with other.connect() as conn:
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 0
+    other.dispose()
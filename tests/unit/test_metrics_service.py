@@ -0,0 +1,144 @@
+import json
+import os
+
+import pytest
+
+from app.guards.rate_limiter import RateLimiter, RateLimitExceeded
+from app.models import db, User
+from app.services import ai_generation_service
+from app.services.ai_generation_service import AIGenerationService
+from app.services.feedback_service import FeedbackService
+from app.services.metrics_service import MetricsService
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(app):
+    MetricsService.reset()
+    yield
+    MetricsService.reset()
+
+
+def _samples(text):
+    """{'name{labels}': value} for every sample line of a scrape."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_counters_and_histograms_render_in_prometheus_format():
+    MetricsService.inc("rate_limit_rejections_total", period="hour", source="database")
+    MetricsService.inc("rate_limit_rejections_total", 2, period="hour", source="database")
+    for seconds in (0.2, 0.7, 120):
+        MetricsService.observe("feedback_processing_seconds", seconds)
+
+    text = MetricsService.render()
+    samples = _samples(text)
+
+    assert "# TYPE rate_limit_rejections_total counter" in text
+    assert samples['rate_limit_rejections_total{period="hour",source="database"}'] == 3
+    assert samples['feedback_processing_seconds_bucket{le="0.25"}'] == 1
+    assert samples['feedback_processing_seconds_bucket{le="1"}'] == 2
+    assert samples['feedback_processing_seconds_bucket{le="+Inf"}'] == 3
+    assert samples['feedback_processing_seconds_count'] == 3
+    assert samples['feedback_processing_seconds_sum'] == pytest.approx(120.9)
+
+
+def test_labels_must_match_definition():
+    with pytest.raises(ValueError):
+        MetricsService.inc("rate_limit_rejections_total", period="hour")
+
+
+def test_requests_record_latency_and_statements(app, client):
+    client.get('/calendar/data?start=2024-01-01&end=2024-02-01')
+
+    response = client.get('/metrics')
+
+    assert response.mimetype == "text/plain"
+    samples = _samples(response.get_data(as_text=True))
+    key = 'endpoint="workouts.calendar_data",method="GET",status="401"'
+    assert samples[f'http_request_duration_seconds_count{{{key}}}'] == 1
+    assert samples['db_statements_per_request_count{endpoint="workouts.calendar_data"}'] == 1
+
+
+def test_repeated_init_app_registers_hooks_once(app):
+    MetricsService.init_app(app)
+
+    assert app.before_request_funcs[None].count(MetricsService._start_request) == 1
+    assert app.after_request_funcs[None].count(MetricsService._finish_request) == 1
+
+
+def test_metrics_token(app, client):
+    app.config["METRICS_TOKEN"] = "s3cret"
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    assert client.get('/metrics', headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_metrics_are_admin_only_when_not_public(app, client):
+    app.config["METRICS_PUBLIC"] = False
+    app.config["ADMIN_USERNAMES"] = {"admin"}
+    admin = User(username="admin", password_hash="x")
+    db.session.add(admin)
+    db.session.commit()
+
+    assert client.get('/metrics').status_code == 401
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin.user_id
+    assert client.get('/metrics').status_code == 200
+
+
+def test_rate_limit_rejections_are_counted(app, monkeypatch):
+    user = User(username="limited", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 1)
+
+    RateLimiter.reserve(user.user_id)
+    with pytest.raises(RateLimitExceeded):
+        RateLimiter.reserve(user.user_id)
+
+    assert _samples(MetricsService.render())['rate_limit_rejections_total{period="hour",source="database"}'] == 1
+
+
+def test_llm_attempts_are_counted_by_outcome(app, monkeypatch):
+    monkeypatch.setattr(AIGenerationService, "_circuit_breaker", None)
+    monkeypatch.setattr(ai_generation_service.time, "sleep", lambda seconds: None)
+    outcomes = ["not json", json.dumps({"workout_name": "Upper", "movements": []})]
+    monkeypatch.setattr(ai_generation_service, "generate_workout_plan", lambda *a, **k: outcomes.pop(0))
+
+    AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+
+    samples = _samples(MetricsService.render())
+    assert samples['llm_generation_attempts_total{prompt_kind="workout_plan",outcome="invalid_response"}'] == 1
+    assert samples['llm_generation_attempts_total{prompt_kind="workout_plan",outcome="success"}'] == 1
+    assert samples['llm_generation_attempt_seconds_count{prompt_kind="workout_plan"}'] == 2
+
+
+def test_feedback_processing_is_timed(app):
+    FeedbackService.process_completed_workout(12345)
+
+    assert _samples(MetricsService.render())["feedback_processing_seconds_count"] == 1
+
+
+def test_multiprocess_mode_merges_worker_snapshots(app, tmp_path, monkeypatch):
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    monkeypatch.setattr(MetricsService, "_multiproc_dir", str(directory))
+    other_worker = {
+        "rate_limit_rejections_total": {"kind": "counter", "values": [[["day", "database"], 4]]},
+        "feedback_processing_seconds": {"kind": "histogram", "values": [[[], [0] * 8 + [1] + [0] * 5, 7.5]]},
+    }
+    (directory / "metrics-999999.json").write_text(json.dumps(other_worker))
+    MetricsService.inc("rate_limit_rejections_total", period="day", source="database")
+    MetricsService.observe("feedback_processing_seconds", 0.1)
+
+    samples = _samples(MetricsService.render())
+
+    assert samples['rate_limit_rejections_total{period="day",source="database"}'] == 5
+    assert samples["feedback_processing_seconds_count"] == 2
+    assert samples["feedback_processing_seconds_sum"] == pytest.approx(7.6)
+    assert {p.name for p in directory.iterdir()} == {"metrics-999999.json", f"metrics-{os.getpid()}.json"}
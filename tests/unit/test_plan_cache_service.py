@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from app.models import LLMCallTelemetry, PlanCacheEntry
+from app.services import ai_generation_service
+from app.services.ai_generation_service import AIGenerationService
+from app.services.plan_cache_service import PlanCacheService
+from app.services.telemetry_service import TelemetryService
+
+
+VALID_PLAN = json.dumps({"workout_name": "Upper Body", "movements": []})
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    monkeypatch.setattr(AIGenerationService, "_circuit_breaker", None)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_generate_workout_plan(*args, **kwargs):
+        calls.append(args)
+        return VALID_PLAN
+
+    monkeypatch.setattr(ai_generation_service, "generate_workout_plan", fake_generate_workout_plan)
+    return calls
+
+
+def test_key_buckets_bodyweight_and_normalizes_text(app):
+    key = PlanCacheService.make_key("workout_plan", "", sex="male", bodyweight=81, target="Upper  Body")
+    assert key == PlanCacheService.make_key("workout_plan", "", sex="Male", bodyweight=88.5, target="upper body")
+    assert key != PlanCacheService.make_key("workout_plan", "", sex="male", bodyweight=91, target="upper body")
+
+
+def test_requests_with_restrictions_are_not_cached(app):
+    assert PlanCacheService.make_key("workout_plan", "bad knee", sex="male", bodyweight=80) is None
+
+
+def test_cached_plan_is_served_until_variety_budget_is_spent(app, llm_calls):
+    app.config["PLAN_CACHE_MAX_SERVES"] = 2
+
+    for _ in range(4):
+        plan = AIGenerationService.generate_single_workout("male", 80, "beginner", "upper")
+        assert plan["workout_name"] == "Upper Body"
+
+    # miss (generate), hit, hit, budget spent -> regenerate
+    assert len(llm_calls) == 2
+    entry = PlanCacheEntry.query.one()
+    assert entry.serve_count == 0
+
+    TelemetryService.flush()
+    outcomes = [row.outcome for row in LLMCallTelemetry.query.order_by(LLMCallTelemetry.telemetry_id)]
+    assert outcomes == ["cache_miss", "cache_hit", "cache_hit", "cache_miss"]
+    summary = TelemetryService.summarize(days=1)
+    assert summary["by_prompt_kind"]["workout_plan"]["cache_hit_rate"] == 0.5
+
+
+def test_feedback_is_applied_per_user_without_touching_cache(app, llm_calls, monkeypatch):
+    from app.services import feedback_service
+
+    def fake_apply(plan, user_id):
+        plan["workout_name"] = f"{plan['workout_name']} for {user_id}"
+        return plan
+
+    monkeypatch.setattr(feedback_service.FeedbackService, "apply_feedback_to_plan", staticmethod(fake_apply))
+
+    first = AIGenerationService.generate_single_workout("male", 80, "beginner", "upper", user_id=1)
+    second = AIGenerationService.generate_single_workout("male", 80, "beginner", "upper", user_id=2)
+
+    assert len(llm_calls) == 1
+    assert first["workout_name"] == "Upper Body for 1"
+    assert second["workout_name"] == "Upper Body for 2"
+    assert json.loads(PlanCacheEntry.query.one().plan_json)["workout_name"] == "Upper Body"
+
+
+def test_cached_generation_does_not_spend_rate_limit(app, client, llm_calls):
+    from app.guards.rate_limiter import RateLimiter
+    from app.models import db, User
+
+    user = User(username="cached", password_hash="x", sex="male", bodyweight=80, gym_experience="beginner")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+
+    for _ in range(2):
+        client.get('/generate_workout')
+        assert client.post('/generate_workout', data={'target': 'Upper Body'}).status_code == 302
+        assert len(llm_calls) == 1
+
+    db.session.expire_all()
+    assert RateLimiter.get_remaining(user.user_id)["hourly"] == RateLimiter.HOURLY_LIMIT - 1
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+from app.models import db, User, Movement, MuscleGroup, MovementMuscleGroup, PlanDraft
+from app.services.ai_generation_service import AIGenerationService
+from app.services.plan_edit_service import PlanEditService, PlanEditError
+
+
+PLAN = {
+    "workout_name": "Upper Body",
+    "movements": [
+        {"name": f"Movement {i}", "sets": 3, "reps": 10, "weight": 20.0, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Chest", "impact": 100}]}
+        for i in range(4)
+    ],
+}
+
+WEEKLY_PLAN = {
+    "weekly_plan": [
+        {"day": f"Day {d}", "workout_name": f"Day {d}", "movements": [dict(m) for m in PLAN["movements"]]}
+        for d in range(3)
+    ]
+}
+
+
+@pytest.fixture
+def logged_in(app, client, monkeypatch):
+    user = User(username="editor", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+
+    monkeypatch.setattr(
+        AIGenerationService, "generate_single_workout", staticmethod(lambda *args, **kwargs: json.loads(json.dumps(PLAN)))
+    )
+    client.post('/generate_workout', data={'target': 'Upper Body'})
+    return user.user_id
+
+
+@pytest.fixture
+def squat(app):
+    legs = MuscleGroup(muscle_group_name="Quadriceps")
+    movement = Movement(movement_name="Squat")
+    db.session.add_all([legs, movement])
+    db.session.flush()
+    db.session.add(MovementMuscleGroup(movement_id=movement.movement_id, muscle_group_id=legs.muscle_group_id,
+                                       target_percentage=80))
+    db.session.commit()
+    return movement.movement_id
+
+
+def _names(plan):
+    return [m["name"] for m in plan["movements"]]
+
+
+def test_operations_apply_in_order(app):
+    new_plan, changed = PlanEditService.apply('workout', PLAN, [
+        {"op": "update", "index": 0, "sets": 5},
+        {"op": "reorder", "from_index": 3, "to_index": 0},
+        {"op": "remove", "index": 1},
+    ])
+
+    assert _names(new_plan) == ["Movement 3", "Movement 1", "Movement 2"]
+    assert changed["lists"] == [{"day_index": None, "movements": new_plan["movements"]}]
+    # The input plan is never mutated
+    assert _names(PLAN) == ["Movement 0", "Movement 1", "Movement 2", "Movement 3"]
+
+
+def test_update_only_returns_changed_rows(app):
+    new_plan, changed = PlanEditService.apply('workout', PLAN, [
+        {"op": "update", "index": 2, "reps": 6},
+        {"op": "update", "index": 2, "weight": 42.5},
+    ])
+
+    assert changed["lists"] == []
+    assert changed["movements"] == [{"day_index": None, "index": 2, "movement": new_plan["movements"][2]}]
+    assert new_plan["movements"][2]["reps"] == 6
+    assert new_plan["movements"][2]["weight"] == 42.5
+
+
+def test_weekly_operations_target_their_day(app, squat):
+    new_plan, changed = PlanEditService.apply('weekly', WEEKLY_PLAN, [
+        {"op": "add", "day_index": 1, "movement_id": str(squat), "sets": 4, "reps": 5, "weight": 100},
+        {"op": "update", "day_index": 2, "index": 0, "sets": 2},
+    ])
+
+    added = new_plan["weekly_plan"][1]["movements"][-1]
+    assert added["name"] == "Squat"
+    assert added["muscle_groups"] == [{"name": "Quadriceps", "impact": 80}]
+    assert [entry["day_index"] for entry in changed["lists"]] == [1]
+    assert changed["movements"][0]["day_index"] == 2
+    assert len(new_plan["weekly_plan"][0]["movements"]) == 4
+
+
+@pytest.mark.parametrize("operation, message", [
+    ({"op": "update", "index": 9, "sets": 4}, "Invalid index"),
+    ({"op": "update", "index": True, "sets": 4}, "Invalid index"),
+    ({"op": "update", "index": 0, "sets": 99}, None),
+    ({"op": "rename", "index": 0}, "op must be one of"),
+])
+def test_invalid_operation_reports_its_position(app, operation, message):
+    with pytest.raises(PlanEditError) as excinfo:
+        PlanEditService.apply('workout', PLAN, [{"op": "remove", "index": 0}, operation])
+
+    assert excinfo.value.op_index == 1
+    if message:
+        assert message in excinfo.value.message
+
+
+def test_patch_endpoint_applies_batch_and_bumps_revision(app, client, logged_in):
+    response = client.post('/pending_plan/workout/patch', json={
+        "revision": 0,
+        "operations": [{"op": "update", "index": 1, "sets": 6}, {"op": "remove", "index": 0}],
+    })
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["revision"] == 1
+    assert [m["name"] for m in payload["changed"]["lists"][0]["movements"]] == [
+        "Movement 1", "Movement 2", "Movement 3"
+    ]
+
+    db.session.expire_all()
+    draft = PlanDraft.query.one()
+    assert draft.revision == 1
+    assert json.loads(draft.plan_json)["movements"][0]["sets"] == 6
+
+
+def test_patch_endpoint_rejects_stale_revision(app, client, logged_in):
+    client.post('/pending_workout/update_movement', json={'index': 0, 'sets': 5})
+
+    response = client.post('/pending_plan/workout/patch', json={
+        "revision": 0, "operations": [{"op": "remove", "index": 0}],
+    })
+
+    assert response.status_code == 409
+    assert response.get_json()["revision"] == 1
+    db.session.expire_all()
+    assert len(json.loads(PlanDraft.query.one().plan_json)["movements"]) == 4
+
+
+def test_patch_endpoint_is_atomic(app, client, logged_in):
+    response = client.post('/pending_plan/workout/patch', json={
+        "revision": 0,
+        "operations": [{"op": "remove", "index": 0}, {"op": "add", "movement_id": 12345}],
+    })
+
+    assert response.status_code == 404
+    assert response.get_json()["op_index"] == 1
+    db.session.expire_all()
+    draft = PlanDraft.query.one()
+    assert draft.revision == 0
+    assert len(json.loads(draft.plan_json)["movements"]) == 4
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+import pytest
+
+from app.guards.rate_limiter import RateLimiter
+from app.models import db, User, Workout, WorkoutMovement, Movement
+from app.services import ai_generation_service
+from app.services.ai_generation_service import AIGenerationService
+from app.services.prefetch_service import PrefetchService
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    monkeypatch.setattr(AIGenerationService, "_circuit_breaker", None)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    calls = []
+
+    def fake_instructions(movement_name):
+        calls.append(("instructions", movement_name))
+        return f"Brace and control the {movement_name}."
+
+    def fake_info(movement_name):
+        calls.append(("info", movement_name))
+        return {
+            "movement_name": movement_name,
+            "is_bodyweight": False,
+            "weight": 0,
+            "muscle_groups": [{"name": "Quads", "impact": 70}, {"name": "Glutes", "impact": 30}],
+        }
+
+    monkeypatch.setattr(ai_generation_service, "generate_movement_instructions", fake_instructions)
+    monkeypatch.setattr(ai_generation_service, "fetch_movement_info", fake_info)
+    return calls
+
+
+def _workout_with_movement(name):
+    user = User(username="lifter", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    workout = Workout(user_id=user.user_id, workout_name="Legs", workout_date=datetime(2026, 1, 5))
+    movement = Movement(movement_name=name)
+    db.session.add_all([workout, movement])
+    db.session.commit()
+    db.session.add(WorkoutMovement(workout_id=workout.workout_id, movement_id=movement.movement_id))
+    db.session.commit()
+    return user, workout, movement
+
+
+def test_prefetch_fills_missing_instructions_and_muscle_groups(app, fake_llm):
+    app.config.update(PREFETCH_ENABLED=True, PREFETCH_ASYNC=False)
+    _, workout, movement = _workout_with_movement("Back Squat")
+
+    assert PrefetchService.enqueue_for_workouts([workout.workout_id]) == 1
+
+    # Jobs run in their own app context/session
+    db.session.expire_all()
+    movement = db.session.get(Movement, movement.movement_id)
+    assert movement.movement_instructions == "Brace and control the Back Squat."
+    assert sorted(mmg.muscle_group.muscle_group_name for mmg in movement.muscle_groups) == ["Glutes", "Quads"]
+
+    # Nothing left to prefetch the second time round
+    assert PrefetchService.enqueue_for_workouts([workout.workout_id]) == 0
+    assert len(fake_llm) == 2
+
+
+def test_movements_needing_prefetch_is_one_query(app):
+    from sqlalchemy import event
+    from app.models import MovementMuscleGroup, MuscleGroup
+
+    _, workout, _ = _workout_with_movement("Back Squat")
+    quads = MuscleGroup(muscle_group_name="Quads")
+    complete = [Movement(movement_name=f"Move {i}", movement_instructions="Brace.") for i in range(5)]
+    db.session.add(quads)
+    db.session.add_all(complete)
+    db.session.commit()
+    for movement in complete:
+        db.session.add(MovementMuscleGroup(movement_id=movement.movement_id,
+                                           muscle_group_id=quads.muscle_group_id, target_percentage=100))
+        db.session.add(WorkoutMovement(workout_id=workout.workout_id, movement_id=movement.movement_id))
+    db.session.commit()
+    workout_id = workout.workout_id
+    db.session.expire_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        needed = PrefetchService.movements_needing_prefetch([workout_id])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert needed == [Movement.query.filter_by(movement_name="Back Squat").one().movement_id]
+    assert len(statements) == 1
+
+
+def test_prefetch_disabled_by_default_in_tests(app, fake_llm):
+    _, workout, _ = _workout_with_movement("Back Squat")
+    assert PrefetchService.enqueue_for_workouts([workout.workout_id]) == 0
+    assert fake_llm == []
+
+
+def test_get_instructions_serves_stored_instructions_without_llm(app, client, fake_llm):
+    user, _, movement = _workout_with_movement("Back Squat")
+    movement.movement_instructions = "Stored cues."
+    db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+
+    response = client.get('/get_instructions?movement_name=back squat')
+    assert response.status_code == 200
+    assert response.get_json()['instructions'] == "Stored cues."
+    assert fake_llm == []
+    assert RateLimiter.get_remaining(user.user_id)["hourly"] == RateLimiter.HOURLY_LIMIT
+
+
+def test_get_instructions_stores_generated_instructions(app, client, fake_llm):
+    user, _, movement = _workout_with_movement("Back Squat")
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+
+    response = client.get('/get_instructions?movement_name=Back Squat')
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Movement, movement.movement_id).movement_instructions == "Brace and control the Back Squat."
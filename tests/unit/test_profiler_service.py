@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from app.models import db, User
+from app.services.profiler_service import ProfilerService, StackSampler
+
+
+def _slow_view():
+    time.sleep(0.05)
+    return "done"
+
+
+@pytest.fixture
+def profiled(app, client, tmp_path):
+    app.config.update(ADMIN_USERNAMES={"boss"}, PROFILE_DIR=str(tmp_path / "profiles"),
+                      PROFILE_SAMPLE_INTERVAL_MS=1, PROFILE_MAX_FILES=3)
+    ProfilerService.init_app(app)
+    app.add_url_rule('/_slow', 'slow_view', _slow_view)
+    return app
+
+
+def _login(client, username):
+    user = User(username=username, password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+
+
+def test_admin_request_with_header_is_profiled(profiled, client):
+    _login(client, "boss")
+
+    response = client.get('/_slow', headers={"X-Profile": "1"})
+
+    profile_id = response.headers["X-Profile-Id"]
+    (meta,) = client.get('/admin/profiles').get_json()["profiles"]
+    assert meta["id"] == profile_id
+    assert (meta["endpoint"], meta["status"]) == ("slow_view", 200)
+    assert meta["samples"] > 0
+
+    download = client.get(f'/admin/profiles/{profile_id}')
+    assert download.status_code == 200
+    lines = download.get_data(as_text=True).splitlines()
+    assert any("_slow_view (unit/test_profiler_service.py" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+def test_query_flag_also_profiles(profiled, client):
+    _login(client, "boss")
+
+    assert "X-Profile-Id" in client.get('/_slow?__profile=1').headers
+
+
+def test_non_admins_are_not_profiled(profiled, client):
+    _login(client, "member")
+
+    response = client.get('/_slow', headers={"X-Profile": "1"})
+
+    assert "X-Profile-Id" not in response.headers
+    assert client.get('/admin/profiles').status_code == 403
+
+
+def test_ring_buffer_keeps_newest_profiles(profiled):
+    sampler = StackSampler(0, 0.001, 1)
+    sampler.stacks["main;work"] = 2
+    ids = [ProfilerService.save(sampler, {"endpoint": "x"}) for _ in range(5)]
+
+    assert [p["id"] for p in ProfilerService.list_profiles()] == ids[:1:-1]
+
+
+def test_unknown_or_malformed_ids_are_404(profiled, client):
+    _login(client, "boss")
+
+    assert client.get('/admin/profiles/20240101T000000000000-deadbeef').status_code == 404
+    assert client.get('/admin/profiles/..%2F..%2Fapp').status_code == 404
@@ -0,0 +1,436 @@
+"""
+SQL statement budgets per route.
+
+Every route of the workouts, stats, leaderboard and groups blueprints is
+requested against the same scenario built at 1, 10 and 100 movements (the
+workout, plan drafts, history, group members, join requests and
+invitations all grow with it). The statement count must be the same at
+every size: a count that grows with the data is an N+1 query. It must also
+stay within the route's pinned budget, so a template or service change
+that adds queries fails here first.
+
+INSERTs are not counted. SQLite cannot batch ORM inserts that need the
+generated keys back, so a route that creates N rows issues N INSERTs here,
+where PostgreSQL gets one statement per table per flush.
+
+When a route legitimately needs more statements, raise its budget in
+BUDGETS in the same change.
+"""
+import io
+import json
+import shutil
+import uuid
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from app.models import (
+    db,
+    User,
+    UserGroup,
+    UserGroupMembership,
+    GroupInvitation,
+    GroupJoinRequest,
+    MuscleGroup,
+    Movement,
+    MovementMuscleGroup,
+    Workout,
+    WorkoutMovement,
+    Set,
+    SetEntry,
+    PlanDraft,
+)
+from app.services import openai_service
+from app.services.ai_generation_service import AIGenerationService
+from app.services.draft_service import DraftService
+from app.services.stats_service import StatsService
+
+SIZES = (1, 10, 100)
+BLUEPRINTS = ("workouts", "stats_bp", "leaderboard", "groups")
+
+# Routes that cannot run at all: they use Workout.status / WorkoutMovement.id,
+# which the models no longer have.
+BROKEN = {
+    "GET workouts.select_workout",
+    "GET workouts.select_workout_by_id",
+    "POST workouts.update_status",
+    "POST workouts.update_workout_movements",
+}
+
+# Routes whose reads are batched on purpose: the export pages through workouts,
+# and selectinload splits IN lists at 500 keys (100 movements x 3 sets across
+# a plan group is 600). Each batch repeats the same statements, so these only
+# have to match at sizes 1 and 10.
+CHUNKED = {
+    "GET workouts.user_data",
+    "POST workouts.duplicate_workout_group",
+}
+
+MUSCLE_GROUPS = ("Chest", "Back", "Quadriceps", "Shoulders")
+
+
+def _plan_movement(movement):
+    return {"name": movement.movement_name, "sets": 3, "reps": 8, "weight": 40, "is_bodyweight": False,
+            "muscle_groups": [{"name": "Chest", "impact": 60}, {"name": "Shoulders", "impact": 40}]}
+
+
+def _seed(size):
+    """A user whose workouts, drafts, groups and invitations all grow with size."""
+    now = datetime.utcnow().replace(microsecond=0)
+    # Sets are stamped well before the request so an edit always changes updated_at
+    stamp = now - timedelta(hours=1)
+    user = User(username="lifter", password_hash="x", bodyweight=80, sex="male",
+                gym_experience="intermediate", workout_goal="muscle_growth")
+    others = [User(username=f"other{i:03d}", password_hash="x") for i in range(3 * size + 1)]
+    groups = {name: MuscleGroup(muscle_group_name=name) for name in MUSCLE_GROUPS}
+    movements = [Movement(movement_name=f"Movement {i:03d}", movement_instructions="Lift it.") for i in range(size)]
+    db.session.add_all([user, *others, *groups.values(), *movements])
+    db.session.flush()
+    # Every movement hits every muscle group, so impacts have the same rows at every size
+    for i, movement in enumerate(movements):
+        db.session.add_all([
+            MovementMuscleGroup(movement_id=movement.movement_id,
+                                muscle_group_id=groups[MUSCLE_GROUPS[(i + j) % 4]].muscle_group_id,
+                                target_percentage=percentage)
+            for j, percentage in enumerate((40, 30, 20, 10))
+        ])
+
+    def workout(name, completed, when, movement_list, group_id=None):
+        w = Workout(user=user, workout_name=name, workout_date=when, is_completed=completed,
+                    workout_group_id=group_id)
+        for movement in movement_list:
+            w.workout_movements.append(WorkoutMovement(movement=movement, sets=[
+                Set(set_order=order, created_at=stamp, updated_at=stamp, entries=[
+                    SetEntry(entry_order=1, reps=8, weight_value=40.0, is_bodyweight=False, created_at=stamp)
+                ])
+                for order in range(1, 4)
+            ]))
+        db.session.add(w)
+        return w
+
+    plan_group = uuid.uuid4().hex
+    active = workout("Active", False, now, movements, plan_group)
+    completed = workout("Done", True, now - timedelta(days=1), movements, plan_group)
+    history = [workout(f"History {i}", True, now - timedelta(days=2 + i), movements[:1]) for i in range(size)]
+    db.session.flush()
+    for w in [completed, *history]:
+        StatsService.rebuild_workout_impacts(w, commit=False)
+
+    # Groups: the user owns one with size members and size join requests, belongs to
+    # size more, and has size pending invitations.
+    owned = UserGroup(group_name="Owned", group_description="Mine")
+    joined = [UserGroup(group_name=f"Joined {i}") for i in range(size)]
+    inviting = [UserGroup(group_name=f"Inviting {i}") for i in range(size)]
+    open_group = UserGroup(group_name="Open")
+    db.session.add_all([owned, *joined, *inviting, open_group])
+    db.session.flush()
+    db.session.add(UserGroupMembership(user_id=user.user_id, group_id=owned.group_id, role="owner"))
+    members, requesters, inviters = others[:size], others[size:2 * size], others[2 * size:3 * size]
+    for member in members:
+        db.session.add(UserGroupMembership(user_id=member.user_id, group_id=owned.group_id, role="member"))
+    join_requests = [GroupJoinRequest(user_id=r.user_id, group_id=owned.group_id, status="pending") for r in requesters]
+    for group in joined:
+        db.session.add(UserGroupMembership(user_id=user.user_id, group_id=group.group_id, role="member"))
+    invitations = [
+        GroupInvitation(group_id=group.group_id, inviter_user_id=inviter.user_id,
+                        invitee_user_id=user.user_id, status="pending")
+        for group, inviter in zip(inviting, inviters)
+    ]
+    db.session.add_all(join_requests + invitations)
+
+    drafts = {
+        "workout": {"workout_name": "Draft", "movements": [_plan_movement(m) for m in movements]},
+        "weekly": {"weekly_plan": [
+            {"workout_name": f"Day {day}", "movements": [_plan_movement(m) for m in movements]} for day in (1, 2, 3)
+        ]},
+    }
+    draft_ids = {}
+    for kind, plan in drafts.items():
+        draft_ids[kind] = uuid.uuid4().hex
+        db.session.add(PlanDraft(draft_id=draft_ids[kind], user_id=user.user_id, kind=kind,
+                                 plan_json=json.dumps(plan), revision=0, expires_at=now + timedelta(hours=1)))
+    db.session.commit()
+
+    first_set = active.workout_movements[0].sets[0]
+    return SimpleNamespace(
+        user_id=user.user_id,
+        workout_id=active.workout_id,
+        completed_id=completed.workout_id,
+        plan_group=plan_group,
+        workout_movement_id=active.workout_movements[-1].workout_movement_id,
+        set_id=first_set.set_id,
+        set_updated_at=first_set.updated_at,
+        movement_id=movements[-1].movement_id,
+        movement_name=movements[-1].movement_name,
+        owned_group_id=owned.group_id,
+        joined_group_id=joined[0].group_id,
+        open_group_id=open_group.group_id,
+        request_id=join_requests[0].request_id,
+        member_user_id=members[0].user_id,
+        invite_username=others[-1].username,
+        invitation_id=invitations[0].invitation_id,
+        draft_ids=draft_ids,
+    )
+
+
+TODAY = date.today().isoformat()
+FUTURE = (date.today() + timedelta(days=30)).isoformat()
+MONTH_START = date.today().replace(day=1)
+CALENDAR = f"start={(MONTH_START - timedelta(days=7)).isoformat()}&end={(MONTH_START + timedelta(days=40)).isoformat()}"
+CSV = ("workout_date,workout_name,movement,set,reps,weight,is_bodyweight\n"
+       + "".join(f"2024-01-0{d},Imported,Movement 000,{s},8,40,false\n" for d in (1, 2) for s in (1, 2, 3)))
+
+# "METHOD endpoint": scenario -> (url, request kwargs)
+ROUTES = {
+    "GET workouts.start_workout": lambda s: ("/start_workout", {}),
+    "GET workouts.calendar_data": lambda s: (f"/calendar/data?{CALENDAR}", {}),
+    "POST workouts.new_workout": lambda s: ("/new_workout", {"json": {"workoutDate": TODAY}}),
+    "GET workouts.view_workout": lambda s: (f"/workout/{s.completed_id}", {}),
+    "GET workouts.active_workout": lambda s: (f"/active_workout/{s.workout_id}", {}),
+    "POST workouts.update_workout_date": lambda s: (
+        f"/update_workout_date/{s.workout_id}", {"json": {"new_date": FUTURE}}),
+    "POST workouts.update_workout_name": lambda s: (
+        f"/update_workout_name/{s.workout_id}", {"data": {"workoutName": "Renamed"}}),
+    "POST workouts.update_workout": lambda s: (
+        f"/update_workout/{s.completed_id}", {"data": {f"rep_{s.set_id}": "10"}}),
+    "POST workouts.sync_workout_sets": lambda s: (f"/workout/{s.workout_id}/sync_sets", {"json": {
+        "client_id": "tab-1",
+        "changes": [{"seq": 1, "set_id": s.set_id, "reps": 10, "weight": 50, "is_bodyweight": False}],
+    }}),
+    "POST workouts.complete_workout": lambda s: (
+        "/complete_workout", {"data": {"workout_id": s.workout_id, f"rep_{s.set_id}": "10"}}),
+    "POST workouts.delete_workout": lambda s: (f"/delete_workout/{s.workout_id}", {}),
+    "POST workouts.duplicate_workout": lambda s: (
+        f"/duplicate_workout/{s.workout_id}", {"json": {"target_date": FUTURE}}),
+    "POST workouts.duplicate_workout_group": lambda s: (
+        f"/duplicate_workout_group/{s.plan_group}", {"json": {"start_date": FUTURE}}),
+    "POST workouts.delete_if_empty": lambda s: (f"/delete_if_empty/{s.workout_id}", {}),
+    "GET workouts.all_workouts": lambda s: ("/all_workouts", {}),
+    "GET workouts.all_workouts_data": lambda s: ("/all_workouts/data?limit=24", {}),
+    "POST workouts.add_movement": lambda s: ("/add_movement", {"data": {
+        "workout_id": s.workout_id, "movement_option": "existing", "movement_id": s.movement_id,
+        "sets": 3, "reps_per_set": 8, "weight": 40,
+    }}),
+    "POST workouts.remove_movement": lambda s: (f"/remove_movement/{s.workout_movement_id}", {}),
+    "POST workouts.generate_movements": lambda s: (
+        f"/generate_movements/{s.workout_id}", {"data": {"target": "upper body"}}),
+    "GET workouts.get_instructions": lambda s: (f"/get_instructions?movement_name={s.movement_name}", {}),
+    "GET workouts.generate_workout": lambda s: ("/generate_workout", {}),
+    "POST workouts.generate_workout": lambda s: ("/generate_workout", {"data": {"target": "upper body"}}),
+    "POST workouts.cancel_pending_workout": lambda s: ("/cancel_pending_workout", {}),
+    "POST workouts.cancel_pending_weekly": lambda s: ("/cancel_pending_weekly", {}),
+    "GET workouts.confirm_workout": lambda s: ("/confirm_workout", {}),
+    "POST workouts.confirm_workout": lambda s: ("/confirm_workout", {}),
+    "POST workouts.update_pending_movement": lambda s: (
+        "/pending_workout/update_movement", {"json": {"index": 0, "sets": 4}}),
+    "POST workouts.remove_pending_movement": lambda s: ("/pending_workout/remove_movement/0", {}),
+    "POST workouts.reorder_pending_movement": lambda s: (
+        "/pending_workout/reorder_movement", {"json": {"from_index": 0, "to_index": 0}}),
+    "POST workouts.add_pending_movement": lambda s: (
+        "/pending_workout/add_movement", {"json": {"movement_id": s.movement_id}}),
+    "POST workouts.add_pending_custom_movement": lambda s: (
+        "/pending_workout/add_custom_movement", {"json": {"movement_name": "Custom Lift"}}),
+    "POST workouts.update_pending_weekly_movement": lambda s: (
+        "/pending_weekly/update_movement", {"json": {"day_index": 0, "movement_index": 0, "reps": 6}}),
+    "POST workouts.remove_pending_weekly_movement": lambda s: (
+        "/pending_weekly/remove_movement", {"json": {"day_index": 0, "movement_index": 0}}),
+    "POST workouts.add_pending_weekly_movement": lambda s: (
+        "/pending_weekly/add_movement", {"json": {"day_index": 0, "movement_id": s.movement_id}}),
+    "POST workouts.patch_pending_plan": lambda s: ("/pending_plan/workout/patch", {"json": {
+        "revision": 0, "operations": [{"op": "update", "index": 0, "sets": 5}],
+    }}),
+    "GET workouts.generate_weekly_workout": lambda s: ("/generate_weekly_workout", {}),
+    "POST workouts.generate_weekly_workout": lambda s: (
+        "/generate_weekly_workout", {"data": {"target": "strength", "gym_days": 3}}),
+    "GET workouts.confirm_weekly_workout": lambda s: ("/confirm_weekly_workout", {}),
+    "POST workouts.confirm_weekly_workout": lambda s: ("/confirm_weekly_workout", {}),
+    "GET workouts.user_data": lambda s: ("/user_data", {}),
+    "POST workouts.import_workouts": lambda s: ("/import_workouts", {"data": {
+        "file": (io.BytesIO(CSV.encode()), "workouts.csv"),
+    }}),
+    "GET stats_bp.historical_data": lambda s: ("/historical_data/Chest", {}),
+    "GET stats_bp.stats": lambda s: ("/stats", {}),
+    "GET stats_bp.stats_data": lambda s: ("/stats/data?period=month", {}),
+    "GET leaderboard.leaderboard_view": lambda s: ("/leaderboard", {}),
+    "GET leaderboard.leaderboard_data": lambda s: ("/leaderboard/data?period=month", {}),
+    "GET leaderboard.leaderboard_workouts_this_week": lambda s: ("/leaderboard/workouts_this_week", {}),
+    "GET leaderboard.leaderboard_total_impact_this_week": lambda s: ("/leaderboard/total_impact_this_week", {}),
+    "GET leaderboard.leaderboard_impact_per_muscle": lambda s: ("/leaderboard/impact_per_muscle", {}),
+    "POST groups.create_group": lambda s: ("/groups/create", {"json": {"group_name": "New"}}),
+    "GET groups.get_my_groups": lambda s: ("/groups/my-groups", {}),
+    "POST groups.leave_group": lambda s: (f"/groups/{s.joined_group_id}/leave", {}),
+    "POST groups.invite_user": lambda s: (
+        f"/groups/{s.owned_group_id}/invite", {"json": {"username": s.invite_username}}),
+    "GET groups.get_invitations": lambda s: ("/groups/invitations", {}),
+    "POST groups.accept_invitation": lambda s: (f"/groups/invitations/{s.invitation_id}/accept", {}),
+    "POST groups.decline_invitation": lambda s: (f"/groups/invitations/{s.invitation_id}/decline", {}),
+    "GET groups.browse_groups": lambda s: ("/groups/browse", {}),
+    "POST groups.request_join": lambda s: (f"/groups/{s.open_group_id}/request", {}),
+    "GET groups.manage_group": lambda s: (f"/groups/{s.owned_group_id}/manage", {}),
+    "POST groups.accept_join_request": lambda s: (
+        f"/groups/{s.owned_group_id}/requests/{s.request_id}/accept", {}),
+    "POST groups.reject_join_request": lambda s: (
+        f"/groups/{s.owned_group_id}/requests/{s.request_id}/reject", {}),
+    "POST groups.kick_member": lambda s: (f"/groups/{s.owned_group_id}/members/{s.member_user_id}/kick", {}),
+}
+
+# Maximum SQL statements (INSERTs aside) per request, at any data size
+BUDGETS = {
+    "GET groups.browse_groups": 5,
+    "GET groups.get_invitations": 2,
+    "GET groups.get_my_groups": 3,
+    "GET groups.manage_group": 5,
+    "GET leaderboard.leaderboard_data": 6,
+    "GET leaderboard.leaderboard_impact_per_muscle": 0,
+    "GET leaderboard.leaderboard_total_impact_this_week": 0,
+    "GET leaderboard.leaderboard_view": 1,
+    "GET leaderboard.leaderboard_workouts_this_week": 0,
+    "GET stats_bp.historical_data": 2,
+    "GET stats_bp.stats": 0,
+    "GET stats_bp.stats_data": 3,
+    "GET workouts.active_workout": 9,
+    "GET workouts.all_workouts": 1,
+    "GET workouts.all_workouts_data": 1,
+    "GET workouts.calendar_data": 1,
+    "GET workouts.confirm_weekly_workout": 3,
+    "GET workouts.confirm_workout": 3,
+    "GET workouts.generate_weekly_workout": 10,
+    "GET workouts.generate_workout": 10,
+    "GET workouts.get_instructions": 1,
+    "GET workouts.start_workout": 0,
+    "GET workouts.user_data": 10,
+    "GET workouts.view_workout": 9,
+    "POST groups.accept_invitation": 5,
+    "POST groups.accept_join_request": 6,
+    "POST groups.create_group": 2,
+    "POST groups.decline_invitation": 3,
+    "POST groups.invite_user": 8,
+    "POST groups.kick_member": 5,
+    "POST groups.leave_group": 4,
+    "POST groups.reject_join_request": 4,
+    "POST groups.request_join": 5,
+    "POST workouts.add_movement": 3,
+    "POST workouts.add_pending_custom_movement": 4,
+    "POST workouts.add_pending_movement": 10,
+    "POST workouts.add_pending_weekly_movement": 10,
+    "POST workouts.cancel_pending_weekly": 2,
+    "POST workouts.cancel_pending_workout": 2,
+    "POST workouts.complete_workout": 24,
+    "POST workouts.confirm_weekly_workout": 18,
+    "POST workouts.confirm_workout": 8,
+    "POST workouts.delete_if_empty": 2,
+    "POST workouts.delete_workout": 10,
+    "POST workouts.duplicate_workout": 12,
+    "POST workouts.duplicate_workout_group": 20,
+    "POST workouts.generate_movements": 12,
+    "POST workouts.generate_weekly_workout": 10,
+    "POST workouts.generate_workout": 10,
+    "POST workouts.import_workouts": 9,
+    "POST workouts.new_workout": 1,
+    "POST workouts.patch_pending_plan": 4,
+    "POST workouts.remove_movement": 7,
+    "POST workouts.remove_pending_movement": 4,
+    "POST workouts.remove_pending_weekly_movement": 4,
+    "POST workouts.reorder_pending_movement": 4,
+    "POST workouts.sync_workout_sets": 11,
+    "POST workouts.update_pending_movement": 4,
+    "POST workouts.update_pending_weekly_movement": 4,
+    "POST workouts.update_workout": 8,
+    "POST workouts.update_workout_date": 2,
+    "POST workouts.update_workout_name": 3,
+}
+
+
+@pytest.fixture(autouse=True)
+def fake_llm(monkeypatch):
+    plan = {"workout_name": "Upper", "movements": [
+        {"name": "Movement 000", "sets": 3, "reps": 8, "weight": 40, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Chest", "impact": 100}]},
+    ]}
+    monkeypatch.setattr(AIGenerationService, "generate_single_workout", lambda *a, **k: plan)
+    monkeypatch.setattr(AIGenerationService, "generate_weekly_workout",
+                        lambda *a, **k: {"weekly_plan": [plan, plan, plan]})
+    monkeypatch.setattr(openai_service, "generate_movement_info",
+                        lambda name: [{"name": "Chest", "impact": 100}])
+    monkeypatch.setattr(AIGenerationService, "get_movement_muscle_groups",
+                        lambda name: {"movement_name": name, "is_bodyweight": False, "weight": 0,
+                                      "muscle_groups": [{"name": "Chest", "impact": 100}]})
+    monkeypatch.setattr(AIGenerationService, "get_movement_instructions", lambda name: "Lift it.")
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    """Seeded database files per size, built on first use and copied into each test's database."""
+    directory = tmp_path_factory.mktemp("query_counts")
+    built = {}
+
+    def restore(size):
+        db.session.remove()
+        database_path = db.engine.url.database
+        if size not in built:
+            db.drop_all()
+            db.create_all()
+            scenario = _seed(size)
+            db.session.remove()
+            db.engine.dispose()
+            shutil.copyfile(database_path, directory / f"{size}.db")
+            built[size] = scenario
+        else:
+            db.engine.dispose()
+            shutil.copyfile(directory / f"{size}.db", database_path)
+        return built[size]
+
+    return restore
+
+
+def _count_statements(app, seeded, size, route):
+    """Restore the database at this size and count the non-INSERT statements one request to route issues."""
+    scenario = seeded(size)
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = scenario.user_id
+        for kind, draft_id in scenario.draft_ids.items():
+            sess[DraftService.SESSION_KEYS[kind]] = draft_id
+
+    method = route.split()[0]
+    url, kwargs = ROUTES[route](scenario)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    db.session.remove()
+
+    assert response.status_code < 400, f"{route} at size {size}: {response.status_code}"
+    return len(statements)
+
+
+def test_every_route_has_a_budget(app):
+    routes = {
+        f"{method} {rule.endpoint}"
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint.split(".")[0] in BLUEPRINTS
+        for method in rule.methods - {"HEAD", "OPTIONS"}
+    }
+
+    assert routes - BROKEN == set(BUDGETS)
+    assert CHUNKED <= set(BUDGETS)
+
+
+@pytest.mark.parametrize("route", sorted(BUDGETS))
+def test_statement_count_is_pinned_and_flat(app, seeded, route):
+    counts = {size: _count_statements(app, seeded, size, route) for size in SIZES}
+
+    flat_sizes = SIZES[:2] if route in CHUNKED else SIZES
+    assert len({counts[size] for size in flat_sizes}) == 1, f"{route} grows with data size (N+1): {counts}"
+    assert counts[SIZES[-1]] <= BUDGETS[route], f"{route} over budget: {counts}"
@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+
+from app.models import db, User, Workout
+from app.services.query_stats_service import QueryStatsService, normalize_sql
+
+
+@pytest.fixture
+def instrumented(app, client):
+    app.config.update(SQL_INSTRUMENTATION_ENABLED=True, ADMIN_USERNAMES={"boss"})
+    QueryStatsService.init_app(app)
+    user = User(username="boss", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+    yield app
+    app.config["SQL_INSTRUMENTATION_ENABLED"] = False
+    QueryStatsService.init_app(app)
+
+
+def test_normalize_sql_groups_statement_shapes():
+    a = normalize_sql("SELECT * FROM Sets\n WHERE set_id IN (1, 2, 3) AND note = 'it''s'")
+    b = normalize_sql("SELECT * FROM Sets WHERE set_id IN (?, ?) AND note = %(note)s")
+
+    assert a == b == "SELECT * FROM Sets WHERE set_id IN (?...) AND note = ?"
+
+
+def test_requests_get_server_timing_and_endpoint_stats(instrumented, client):
+    response = client.get('/calendar/data?start=2024-01-01&end=2024-02-01')
+
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'queries"' in response.headers["Server-Timing"]
+    stats = QueryStatsService.summarize()["endpoints"]["workouts.calendar_data"]
+    assert stats["requests"] == 1
+    assert stats["max_queries"] >= 1
+
+
+def test_slow_queries_are_logged_with_endpoint(instrumented, client, caplog):
+    QueryStatsService._slow_query_ms = 0
+
+    with caplog.at_level(logging.WARNING, logger="app.services.query_stats_service"):
+        client.get('/calendar/data?start=2024-01-01&end=2024-02-01')
+
+    assert any("workouts.calendar_data" in r.message and 'FROM "Workouts"' in r.message for r in caplog.records)
+    assert QueryStatsService.summarize()["endpoints"]["workouts.calendar_data"]["slow_queries"] >= 1
+
+
+def test_admin_endpoint_reports_queries_per_request(instrumented, client):
+    user_id = User.query.filter_by(username="boss").one().user_id
+    db.session.add_all([Workout(user_id=user_id, workout_name=f"W{i}", workout_date=db.func.now()) for i in range(3)])
+    db.session.commit()
+    for _ in range(4):
+        client.get('/all_workouts/data')
+
+    payload = client.get('/admin/sql_stats?endpoint=workouts.all_workouts_data').get_json()
+
+    assert payload["enabled"] is True
+    stats = payload["endpoints"]["workouts.all_workouts_data"]
+    assert stats["requests"] == stats["window"] == 4
+    assert stats["p95_db_ms"] >= stats["p50_db_ms"] >= 0
+
+
+def test_failed_statements_do_not_leave_timers_behind(instrumented):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    with db.engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert not any(key for key in conn.info if "started" in str(key))
+
+
+def test_repeated_init_app_registers_hooks_once(instrumented):
+    QueryStatsService.init_app(instrumented)
+
+    assert instrumented.before_request_funcs[None].count(QueryStatsService._start_request) == 1
+    assert instrumented.after_request_funcs[None].count(QueryStatsService._finish_request) == 1
+
+
+def test_disabled_by_default(app, client):
+    response = client.get('/calendar/data?start=2024-01-01&end=2024-02-01')
+
+    assert "Server-Timing" not in response.headers
+    assert QueryStatsService.summarize()["endpoints"] == {}
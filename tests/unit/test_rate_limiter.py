@@ -0,0 +1,324 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.guards.rate_limiter import RateLimiter, RateLimitExceeded, TokenBucketFrontend
+from app.models import db, User, RateLimitCounter
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(username="limited", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    return user.user_id
+
+
+@pytest.fixture(autouse=True)
+def no_frontend():
+    RateLimiter.configure_frontend(None)
+    yield
+    RateLimiter.configure_frontend(None)
+
+
+def test_counts_requests_without_touching_user_row(app, user_id):
+    RateLimiter.check_and_increment(user_id)
+    RateLimiter.check_and_increment(user_id)
+
+    counters = {c.period: c.count for c in RateLimitCounter.query.filter_by(user_id=user_id)}
+    assert counters == {"hour": 2, "day": 2}
+    assert db.session.get(User, user_id).updated_at is None
+    assert RateLimiter.get_remaining(user_id)["hourly"] == RateLimiter.HOURLY_LIMIT - 2
+    assert RateLimiter.get_remaining(user_id)["daily"] == RateLimiter.DAILY_LIMIT - 2
+
+
+def test_hourly_limit_raises_and_leaves_daily_count_untouched(app, user_id, monkeypatch):
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 2)
+    RateLimiter.check_and_increment(user_id)
+    RateLimiter.check_and_increment(user_id)
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        RateLimiter.check_and_increment(user_id)
+
+    assert excinfo.value.limit_type == "hour"
+    assert RateLimitCounter.query.filter_by(user_id=user_id, period="day").one().count == 2
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze RateLimiter's notion of now; tests move it by assigning clock.now."""
+    class FrozenDatetime(datetime):
+        now_value = datetime(2026, 3, 2, 10, 0, 0)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now_value
+
+    monkeypatch.setattr("app.guards.rate_limiter.datetime", FrozenDatetime)
+    return FrozenDatetime
+
+
+def test_sliding_window_weights_previous_window(app, user_id, monkeypatch, clock):
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 4)
+    for _ in range(4):
+        RateLimiter.check_and_increment(user_id)
+
+    # 15 minutes into the next hour, 75% of the previous 4 requests still count
+    clock.now_value = datetime(2026, 3, 2, 11, 15, 0)
+    assert RateLimiter.get_remaining(user_id)["hourly"] == 1
+    RateLimiter.check_and_increment(user_id)
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        RateLimiter.check_and_increment(user_id)
+    # 4 * (1 - t) + 1 < 4 once t > 25%
+    assert excinfo.value.reset_time == datetime(2026, 3, 2, 11, 15, 0)
+
+    clock.now_value = datetime(2026, 3, 2, 11, 30, 0)
+    RateLimiter.check_and_increment(user_id)
+
+    # Two hours on, nothing carries over
+    clock.now_value = datetime(2026, 3, 2, 13, 5, 0)
+    assert RateLimiter.get_remaining(user_id)["hourly"] == 4
+
+
+def test_boundary_burst_is_smoothed(app, user_id, monkeypatch, clock):
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 5)
+    clock.now_value = datetime(2026, 3, 2, 10, 59, 0)
+    for _ in range(5):
+        RateLimiter.check_and_increment(user_id)
+
+    # A fixed window would allow 5 more at 11:00; the sliding estimate
+    # (5 * 0.99 + count) admits only one
+    clock.now_value = datetime(2026, 3, 2, 11, 0, 30)
+    RateLimiter.check_and_increment(user_id)
+    with pytest.raises(RateLimitExceeded):
+        RateLimiter.check_and_increment(user_id)
+
+
+def test_refund_returns_quota(app, user_id, monkeypatch, clock):
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 1)
+    reservation = RateLimiter.reserve(user_id)
+    with pytest.raises(RateLimitExceeded):
+        RateLimiter.reserve(user_id)
+
+    RateLimiter.refund(reservation)
+    RateLimiter.refund(reservation)  # second refund is a no-op
+
+    db.session.expire_all()
+    counters = {c.period: c.count for c in RateLimitCounter.query.filter_by(user_id=user_id)}
+    assert counters == {"hour": 0, "day": 0}
+    RateLimiter.reserve(user_id)
+
+
+def test_refund_after_window_rolled_reduces_previous_count(app, user_id, clock):
+    reservation = RateLimiter.reserve(user_id)
+    clock.now_value = datetime(2026, 3, 2, 11, 5, 0)
+    RateLimiter.reserve(user_id)
+
+    RateLimiter.refund(reservation)
+    db.session.expire_all()
+    hour = RateLimitCounter.query.filter_by(user_id=user_id, period="hour").one()
+    assert (hour.prev_count, hour.count) == (0, 1)
+
+
+def test_refund_does_not_commit_pending_session_changes(app, user_id):
+    reservation = RateLimiter.reserve(user_id)
+    db.session.add(User(username="half_done", password_hash="x"))
+
+    RateLimiter.refund(reservation)
+    db.session.rollback()
+
+    assert User.query.filter_by(username="half_done").first() is None
+    assert RateLimitCounter.query.filter_by(user_id=user_id, period="hour").one().count == 0
+
+
+def test_failed_refund_keeps_request_session_and_can_be_retried(app, user_id, monkeypatch):
+    from flask import g
+    from app.guards import rate_limiter
+    from app.guards.decorators import refund_llm_reservation
+
+    reservation = RateLimiter.reserve(user_id)
+    pending = User(username="pending_work", password_hash="x")
+
+    def broken_update(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patched, app.test_request_context():
+        patched.setattr(rate_limiter, "update", broken_update)
+        g.llm_reservation = reservation
+        db.session.add(pending)
+        refund_llm_reservation()
+        assert pending in db.session.new
+        assert not reservation.refunded
+
+    RateLimiter.refund(reservation)
+    assert RateLimitCounter.query.filter_by(user_id=user_id, period="hour").one().count == 0
+
+
+def test_get_remaining_does_not_write(app, user_id, clock):
+    RateLimiter.reserve(user_id)
+    statements = []
+
+    from sqlalchemy import event
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        clock.now_value = datetime(2026, 3, 2, 11, 30, 0)
+        remaining = RateLimiter.get_remaining(user_id)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert statements == ["SELECT"]
+    assert remaining["hourly"] == RateLimiter.HOURLY_LIMIT - 1
+
+
+def test_failed_generation_refunds_quota(app, client, user_id, monkeypatch):
+    from app.services.ai_generation_service import AIGenerationService, AIGenerationError
+
+    def failing_generation(*args, **kwargs):
+        raise AIGenerationError(AIGenerationError.UPSTREAM_ERROR, "down")
+
+    monkeypatch.setattr(AIGenerationService, "generate_single_workout", staticmethod(failing_generation))
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+    client.get('/generate_workout')
+    response = client.post('/generate_workout', data={'target': 'Upper Body'})
+    assert response.status_code == 302
+
+    db.session.expire_all()
+    assert RateLimiter.get_remaining(user_id)["hourly"] == RateLimiter.HOURLY_LIMIT
+
+
+def _add_new_movement(client, user_id, name):
+    from app.services.workout_service import WorkoutService
+
+    plan = {"workout_name": "Push", "movements": [{"name": "Bench Press", "sets": 3, "reps": 5, "weight": 60,
+                                                   "muscle_groups": [{"name": "Chest", "impact": 100}]}]}
+    workout = WorkoutService.create_workout_from_plan(user_id, plan)
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+    return client.post('/add_movement', data={
+        'workout_id': workout.workout_id, 'movement_option': 'new', 'new_movement_name': name,
+        'sets': 3, 'reps_per_set': 8, 'weight': 20,
+    })
+
+
+@pytest.mark.parametrize("name, muscle_groups, charged", [
+    ("bench-press", [{"name": "Chest", "impact": 100}], 0),  # already known, no AI call
+    ("Cable Fly", [], 0),  # lookup fell back to an empty result
+    ("Cable Fly", [{"name": "Chest", "impact": 100}], 1),
+])
+def test_add_new_movement_charges_only_for_useful_lookups(app, client, user_id, monkeypatch,
+                                                          name, muscle_groups, charged):
+    from app.services.ai_generation_service import AIGenerationService
+
+    lookups = []
+
+    def lookup(movement_name):
+        lookups.append(movement_name)
+        return {"movement_name": movement_name, "muscle_groups": muscle_groups}
+
+    monkeypatch.setattr(AIGenerationService, "get_movement_muscle_groups", staticmethod(lookup))
+
+    assert _add_new_movement(client, user_id, name).status_code == 302
+
+    db.session.expire_all()
+    assert RateLimiter.get_remaining(user_id)["hourly"] == RateLimiter.HOURLY_LIMIT - charged
+    assert len(lookups) == (0 if name == "bench-press" else 1)
+
+
+def test_add_new_movement_refunds_on_unexpected_error(app, client, user_id, monkeypatch):
+    from app.services.ai_generation_service import AIGenerationService
+
+    def broken_lookup(movement_name):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(AIGenerationService, "get_movement_muscle_groups", staticmethod(broken_lookup))
+
+    with pytest.raises(RuntimeError):
+        _add_new_movement(client, user_id, "Cable Fly")
+
+    db.session.rollback()
+    assert RateLimiter.get_remaining(user_id)["hourly"] == RateLimiter.HOURLY_LIMIT
+
+
+def test_get_instructions_reserves_quota_and_answers_429_as_json(app, client, user_id, monkeypatch):
+    from app.services.ai_generation_service import AIGenerationService
+
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 1)
+    monkeypatch.setattr(AIGenerationService, "get_movement_instructions", staticmethod(lambda name: "Brace."))
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+    assert client.get('/get_instructions?movement_name=Cable Fly').get_json() == {'instructions': "Brace."}
+    response = client.get('/get_instructions?movement_name=Face Pull')
+
+    assert response.status_code == 429
+    assert response.get_json()['limit_type'] == "hour"
+
+
+def test_parallel_requests_enforce_exact_limit(app, user_id, monkeypatch):
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 10)
+    workers = 25
+    barrier = threading.Barrier(workers)
+    outcomes = []
+    outcomes_lock = threading.Lock()
+
+    def fire():
+        with app.app_context():
+            barrier.wait()
+            try:
+                RateLimiter.check_and_increment(user_id)
+                result = "allowed"
+            except RateLimitExceeded:
+                result = "limited"
+            finally:
+                db.session.remove()
+        with outcomes_lock:
+            outcomes.append(result)
+
+    threads = [threading.Thread(target=fire) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes.count("allowed") == 10
+    assert outcomes.count("limited") == workers - 10
+    db.session.expire_all()
+    assert RateLimitCounter.query.filter_by(user_id=user_id, period="hour").one().count == 10
+    assert RateLimitCounter.query.filter_by(user_id=user_id, period="day").one().count == 10
+
+
+def test_token_bucket_frontend_rejects_without_database(app, user_id, monkeypatch):
+    monkeypatch.setattr(RateLimiter, "HOURLY_LIMIT", 2)
+    RateLimiter.configure_frontend("token_bucket")
+    RateLimiter.check_and_increment(user_id)
+    RateLimiter.check_and_increment(user_id)
+
+    def no_database(*args, **kwargs):
+        raise AssertionError("front-end should reject before the database")
+
+    monkeypatch.setattr(RateLimiter, "_increment", staticmethod(no_database))
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        RateLimiter.check_and_increment(user_id)
+    assert excinfo.value.limit_type == "hour"
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.guards.rate_limiter.time.monotonic", lambda: now[0])
+    bucket = TokenBucketFrontend()
+    limits = {"hour": (2, 3600.0)}
+
+    assert bucket.try_acquire(1, limits) is None
+    assert bucket.try_acquire(1, limits) is None
+    period, wait = bucket.try_acquire(1, limits)
+    assert period == "hour" and wait == pytest.approx(1800.0)
+
+    now[0] += 1800
+    assert bucket.try_acquire(1, limits) is None
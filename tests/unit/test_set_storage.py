@@ -0,0 +1,106 @@
+import pytest
+
+from app.models import db, User, Set, Rep, Weight, SetEntry
+from app.services.workout_service import WorkoutService
+from scripts.fold_set_entries import fold_set_entries
+
+
+PLAN = {
+    "workout_name": "Legs",
+    "movements": [
+        {"name": "Squat", "sets": 3, "reps": 5, "weight": 100, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Quadriceps", "impact": 100}]},
+    ],
+}
+
+
+@pytest.fixture
+def user(app, client):
+    user = User(username="squatter", password_hash="x", bodyweight=90)
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+    return user
+
+
+@pytest.fixture
+def entries_mode(app):
+    app.config["SET_STORAGE_MODE"] = "entries"
+
+
+def _row_counts():
+    return Rep.query.count(), Weight.query.count(), SetEntry.query.count()
+
+
+def test_legacy_mode_writes_all_three_tables(app, user):
+    WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+
+    assert _row_counts() == (3, 3, 3)
+
+
+def test_entries_mode_writes_one_row_per_set(app, user, entries_mode):
+    workout = WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+
+    assert _row_counts() == (0, 0, 3)
+    first_set = workout.workout_movements[0].sets[0]
+    assert (first_set.rep_count, first_set.weight_value, first_set.is_bodyweight) == (5, 100.0, False)
+
+
+def test_entries_mode_keeps_legacy_readers_working(app, client, user, entries_mode):
+    workout = WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+
+    plan = WorkoutService.serialize_workout_to_plan(workout)
+    assert plan["movements"][0]["reps"] == 5
+    assert plan["movements"][0]["weight"] == 100.0
+
+    movements = client.get('/user_data').get_json()[0]["movements"]
+    assert movements[0]["reps_per_set"] == 5
+    assert movements[0]["weight"] == 100.0
+
+    page = client.get(f'/active_workout/{workout.workout_id}')
+    assert page.status_code == 200
+    assert b'"reps": 5' in page.data
+
+
+def test_form_updates_use_set_keyed_fields(app, client, user, entries_mode):
+    workout = WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+    set_ids = [s.set_id for s in workout.workout_movements[0].sets]
+
+    client.post('/complete_workout', data={
+        "workout_id": workout.workout_id,
+        f"rep_{set_ids[0]}": "3",
+        f"set_weight_{set_ids[0]}": "110",
+    })
+
+    db.session.expire_all()
+    changed = db.session.get(Set, set_ids[0])
+    assert (changed.rep_count, changed.weight_value) == (3, 110.0)
+    assert db.session.get(Set, set_ids[1]).updated_at is None
+    assert _row_counts() == (0, 0, 3)
+
+
+def test_fold_migrates_legacy_rows_into_entries(app, user):
+    workout = WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+    # Simulate a set from before SetEntry existed
+    legacy_set = workout.workout_movements[0].sets[0]
+    legacy_set.reps[0].rep_count = 8
+    legacy_set.entries.clear()
+    db.session.commit()
+
+    result = fold_set_entries(batch_size=2)
+
+    assert result["entries_created"] == 1
+    assert _row_counts() == (0, 0, 3)
+    db.session.expire_all()
+    folded = db.session.get(Set, legacy_set.set_id)
+    assert (folded.rep_count, folded.weight_value) == (8, 100.0)
+
+
+def test_fold_dry_run_changes_nothing(app, user):
+    WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+
+    result = fold_set_entries(dry_run=True)
+
+    assert result["reps_deleted"] == 3
+    assert _row_counts() == (3, 3, 3)
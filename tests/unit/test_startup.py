@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import time budget for `import app` (microseconds). Generous so it
+# only trips on regressions such as openai/nltk creeping back into startup.
+IMPORT_BUDGET_US = 3_000_000
+
+STARTUP_SCRIPT = """
+from app import create_app
+create_app({
+    "FAST_START": True,
+    "SQLALCHEMY_DATABASE_URI": "sqlite://",
+    "SECRET_KEY": "test",
+})
+"""
+
+
+def _import_times(code):
+    """Run code under `python -X importtime` and return {module: cumulative_us}."""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "test"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative_us)
+    return times
+
+
+def test_fast_start_does_not_import_openai_or_nltk():
+    times = _import_times(STARTUP_SCRIPT)
+
+    assert "app" in times
+    assert "openai" not in times
+    assert "nltk" not in times
+    assert "pytz" not in times
+
+
+def test_app_import_time_budget():
+    times = _import_times("import app")
+    assert times["app"] < IMPORT_BUDGET_US, f"import app took {times['app'] / 1000:.0f} ms"
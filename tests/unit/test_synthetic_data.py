@@ -0,0 +1,56 @@
+import pytest
+
+from app.models import db, User, Workout, SetEntry, Rep, WorkoutMuscleGroupImpact
+from app.services.stats_service import StatsService
+from scripts.generate_synthetic_data import generate
+
+
+def _generate(**overrides):
+    options = dict(users=6, weeks=3, seed=7, prefix="synth_", chunk_size=100,
+                   storage_mode="entries", impacts=True)
+    options.update(overrides)
+    return generate(**options)
+
+
+def _entries():
+    return [(e.set_id, e.reps, e.weight_value) for e in SetEntry.query.order_by(SetEntry.set_id)]
+
+
+def test_generates_users_workouts_and_entries(app):
+    summary = _generate()
+
+    assert User.query.filter(User.username.like("synth_%")).count() == 6
+    assert Workout.query.count() == summary["workouts"] > 0
+    assert SetEntry.query.count() == summary["set_entries"] == summary["sets"]
+    assert Rep.query.count() == 0
+
+
+def test_same_seed_gives_same_data(app):
+    _generate()
+    first = _entries()
+
+    _generate(prefix="again_")
+
+    second = _entries()[len(first):]
+    offset = second[0][0] - first[0][0]
+    assert [(set_id + offset, reps, weight) for set_id, reps, weight in first] == second
+
+
+def test_existing_prefix_is_refused(app):
+    _generate(users=1, weeks=1)
+
+    with pytest.raises(SystemExit):
+        _generate(users=1, weeks=1)
+
+
+def test_impacts_match_stats_service(app):
+    _generate()
+    workout = (Workout.query.filter_by(is_completed=True)
+               .join(WorkoutMuscleGroupImpact).first())
+
+    stored = {i.muscle_group_id: float(i.total_volume) for i in workout.muscle_group_impacts}
+    expected = StatsService.build_workout_impacts(workout)
+
+    assert stored.keys() == expected.keys()
+    for mg_id, data in expected.items():
+        assert stored[mg_id] == pytest.approx(data["volume"], abs=0.01)
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+from app.models import db, User, LLMCallTelemetry
+from app.services import openai_service
+from app.services.telemetry_service import TelemetryService, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([], 50) is None
+
+
+def test_records_are_buffered_then_written_in_one_batch(app):
+    for latency in (100, 200, 300, 400):
+        TelemetryService.record_llm_call(
+            model="gpt-4o-mini",
+            prompt_kind="workout_plan",
+            outcome="success",
+            latency_ms=latency,
+            input_tokens=50,
+            output_tokens=20,
+        )
+    TelemetryService.record_llm_call(
+        model="gpt-4o-mini", prompt_kind="workout_plan", outcome="json_retry", attempt=2
+    )
+    assert LLMCallTelemetry.query.count() == 0
+
+    assert TelemetryService.flush() == 5
+    assert LLMCallTelemetry.query.count() == 5
+
+    summary = TelemetryService.summarize(days=1)
+    kind = summary["by_prompt_kind"]["workout_plan"]
+    assert kind["calls"] == 4
+    assert kind["p50_latency_ms"] == 200
+    assert kind["p95_latency_ms"] == 400
+    assert kind["input_tokens"] == 200
+    assert kind["output_tokens"] == 80
+    assert kind["outcomes"] == {"success": 4, "json_retry": 1}
+    assert len(summary["daily"]) == 1
+
+
+def test_openai_calls_record_usage(app, monkeypatch):
+    response = SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30),
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Keep your back straight."))],
+    )
+
+    class FakeCompletions:
+        def create(self, **kwargs):
+            return response
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    monkeypatch.setattr(openai_service, "client", fake_client)
+
+    openai_service.generate_movement_instructions("Squat")
+    TelemetryService.flush()
+
+    row = LLMCallTelemetry.query.one()
+    assert row.prompt_kind == "movement_instructions"
+    assert row.outcome == "success"
+    assert row.input_tokens == 120
+    assert row.output_tokens == 30
+    assert row.latency_ms is not None
+
+
+def _login(app, client, username):
+    with app.app_context():
+        user = User(username=username, password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.user_id
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+
+def test_admin_endpoint_requires_admin(app, client):
+    _login(app, client, "member")
+    response = client.get('/admin/llm_telemetry')
+    assert response.status_code == 403
+
+
+def test_admin_endpoint_returns_summary(app, client):
+    app.config["ADMIN_USERNAMES"] = {"boss"}
+    _login(app, client, "boss")
+    TelemetryService.record_llm_call(
+        model="gpt-5-mini", prompt_kind="weekly_plan", outcome="timeout", latency_ms=900
+    )
+
+    response = client.get('/admin/llm_telemetry?days=3')
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["by_prompt_kind"]["weekly_plan"]["outcomes"] == {"timeout": 1}
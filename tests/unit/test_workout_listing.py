@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db, User, Workout
+from app.services.stats_service import StatsService
+from app.services.workout_service import WorkoutService
+
+
+PLAN = {
+    "workout_name": "Full Body",
+    "movements": [
+        {"name": "Deadlift", "sets": 2, "reps": 5, "weight": 100, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Hamstrings", "impact": 100}]},
+        {"name": "Press", "sets": 2, "reps": 5, "weight": 40, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Shoulders", "impact": 100}]},
+    ],
+}
+
+
+@pytest.fixture
+def user_id(app, client):
+    user = User(username="archivist", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+    return user.user_id
+
+
+def _add_workouts(user_id, count, start=datetime(2024, 1, 1)):
+    # Two workouts share each date so the workout_id tie-breaker matters
+    db.session.add_all([
+        Workout(user_id=user_id, workout_name=f"W{i}", workout_date=start + timedelta(days=i // 2),
+                is_completed=i % 3 == 0)
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def _walk(user_id, limit, filter_completed=None):
+    seen, cursor = [], None
+    while True:
+        page, cursor = WorkoutService.list_user_workouts_page(user_id, filter_completed, cursor=cursor, limit=limit)
+        seen.extend(w["workout_id"] for w in page)
+        if cursor is None:
+            return seen
+
+
+def test_pages_cover_history_in_order_without_gaps(app, user_id):
+    _add_workouts(user_id, 11)
+    expected = [w.workout_id for w in Workout.query.order_by(Workout.workout_date.desc(), Workout.workout_id.desc())]
+
+    assert _walk(user_id, limit=4) == expected
+    completed = [w.workout_id for w in Workout.query.filter_by(is_completed=True)
+                 .order_by(Workout.workout_date.desc(), Workout.workout_id.desc())]
+    assert _walk(user_id, limit=2, filter_completed=True) == completed
+
+
+def test_summary_includes_movement_count_and_volume(app, user_id):
+    workout = WorkoutService.create_workout_from_plan(user_id, PLAN)
+    workout.is_completed = True
+    StatsService.rebuild_workout_impacts(workout)
+    expected_volume = round(sum(data["volume"] for data in StatsService.build_workout_impacts(workout).values()), 2)
+
+    (summary,), cursor = WorkoutService.list_user_workouts_page(user_id)
+
+    assert cursor is None
+    assert summary["movement_count"] == 2
+    assert summary["total_volume"] == pytest.approx(expected_volume, abs=0.05)
+
+
+def test_page_query_count_does_not_grow_with_history(app, user_id):
+    _add_workouts(user_id, 60)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        WorkoutService.list_user_workouts_page(user_id, limit=10)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert len(statements) == 1
+    assert "LIMIT" in statements[0].upper()
+
+
+def test_data_endpoint_returns_next_page(app, client, user_id):
+    _add_workouts(user_id, 5)
+    first = client.get('/all_workouts/data?limit=3').get_json()
+
+    second = client.get(f'/all_workouts/data?limit=3&cursor={first["next_cursor"]}').get_json()
+
+    assert len(first["workouts"]) == 3
+    assert len(second["workouts"]) == 2
+    assert second["next_cursor"] is None
+    assert not {w["workout_id"] for w in first["workouts"]} & {w["workout_id"] for w in second["workouts"]}
+
+
+def test_data_endpoint_rejects_bad_cursor(app, client, user_id):
+    assert client.get('/all_workouts/data?cursor=not-a-cursor').status_code == 400
+
+
+def test_other_users_workouts_are_not_listed(app, client, user_id):
+    other = User(username="other", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+    _add_workouts(other.user_id, 3)
+
+    assert client.get('/all_workouts/data').get_json()["workouts"] == []
+
+
+def test_page_renders_first_page_with_cursor(app, client, user_id):
+    _add_workouts(user_id, 30)
+
+    html = client.get('/all_workouts').get_data(as_text=True)
+
+    assert html.count('class="workout-card"') == 24
+    assert 'data-next-cursor=""' not in html
+
+
+def test_calendar_data_groups_a_month_by_day(app, client, user_id):
+    _add_workouts(user_id, 90, start=datetime(2024, 2, 20))
+
+    response = client.get('/calendar/data?start=2024-03-01&end=2024-04-01')
+
+    assert response.status_code == 200
+    days = response.get_json()["days"]
+    assert [d["date"] for d in days] == [f"2024-03-{n:02d}" for n in range(1, 32)]
+    assert all(len(d["workouts"]) == 2 for d in days)
+    assert set(days[0]["workouts"][0]) == {"id", "name", "completed"}
+
+
+def test_calendar_data_rejects_bad_ranges(app, client, user_id):
+    assert client.get('/calendar/data?start=2024-03-01').status_code == 400
+    assert client.get('/calendar/data?start=2024-03-01&end=2024-02-01').status_code == 400
+    assert client.get('/calendar/data?start=2024-01-01&end=2025-01-01').status_code == 400
@@ -0,0 +1,193 @@
+import pytest
+
+from app.models import db, User, Set, SetEntry, WorkoutMuscleGroupImpact, WorkoutSyncCursor
+from app.services.stats_service import StatsService
+from app.services.workout_service import WorkoutService
+
+
+PLAN = {
+    "workout_name": "Push",
+    "movements": [
+        {"name": "Bench Press", "sets": 3, "reps": 10, "weight": 50, "is_bodyweight": False,
+         "muscle_groups": [{"name": "Chest", "impact": 70}, {"name": "Triceps", "impact": 30}]},
+        {"name": "Dips", "sets": 2, "reps": 8, "weight": 0, "is_bodyweight": True,
+         "muscle_groups": [{"name": "Triceps", "impact": 100}]},
+    ],
+}
+
+
+@pytest.fixture
+def workout(app, client):
+    user = User(username="lifter", password_hash="x", bodyweight=80)
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.user_id
+    return WorkoutService.create_workout_from_plan(user.user_id, PLAN)
+
+
+def _set_ids(workout):
+    return [s.set_id for wm in workout.workout_movements for s in wm.sets]
+
+
+def _sync(client, workout, changes, client_id="tab-1"):
+    return client.post(f'/workout/{workout.workout_id}/sync_sets', json={"client_id": client_id, "changes": changes})
+
+
+def test_sync_updates_only_changed_sets(app, client, workout):
+    first, second = _set_ids(workout)[:2]
+
+    response = _sync(client, workout, [{"seq": 1, "set_id": first, "reps": 6, "weight": 55}])
+
+    assert response.status_code == 200
+    assert response.get_json()["applied"] == [1]
+    db.session.expire_all()
+    changed = db.session.get(Set, first)
+    assert changed.reps[0].rep_count == 6
+    assert float(changed.weights[0].weight_value) == 55
+    assert changed.entries[0].reps == 6
+    # Untouched sets keep their values
+    assert db.session.get(Set, second).reps[0].rep_count == 10
+
+
+def test_retried_changes_are_skipped(app, client, workout):
+    set_id = _set_ids(workout)[0]
+    _sync(client, workout, [{"seq": 1, "set_id": set_id, "reps": 6}, {"seq": 2, "set_id": set_id, "reps": 7}])
+
+    # A retry of the same batch plus one newer change
+    response = _sync(client, workout, [
+        {"seq": 2, "set_id": set_id, "reps": 7},
+        {"seq": 3, "set_id": set_id, "reps": 9},
+    ])
+
+    payload = response.get_json()
+    assert payload["skipped"] == [2]
+    assert payload["applied"] == [3]
+    assert payload["last_seq"] == 3
+    db.session.expire_all()
+    assert db.session.get(Set, set_id).reps[0].rep_count == 9
+    assert WorkoutSyncCursor.query.one().last_seq == 3
+
+
+def test_sequence_numbers_are_per_client(app, client, workout):
+    set_id = _set_ids(workout)[0]
+    _sync(client, workout, [{"seq": 1, "set_id": set_id, "reps": 6}], client_id="tab-1")
+
+    response = _sync(client, workout, [{"seq": 1, "set_id": set_id, "reps": 4}], client_id="tab-2")
+
+    assert response.get_json()["applied"] == [1]
+    db.session.expire_all()
+    assert db.session.get(Set, set_id).reps[0].rep_count == 4
+
+
+def test_unknown_set_rejects_whole_batch(app, client, workout):
+    set_id = _set_ids(workout)[0]
+
+    response = _sync(client, workout, [{"seq": 1, "set_id": set_id, "reps": 6}, {"seq": 2, "set_id": 99999, "reps": 1}])
+
+    assert response.status_code == 400
+    db.session.expire_all()
+    assert db.session.get(Set, set_id).reps[0].rep_count == 10
+
+
+def test_completed_workout_impacts_match_full_rebuild(app, client, workout):
+    workout.is_completed = True
+    StatsService.rebuild_workout_impacts(workout)
+    bench_set, _, _, dip_set, _ = _set_ids(workout)
+
+    response = _sync(client, workout, [
+        {"seq": 1, "set_id": bench_set, "reps": 0},
+        {"seq": 2, "set_id": dip_set, "weight": 10, "is_bodyweight": False},
+    ])
+    assert response.status_code == 200
+    assert response.get_json()["impact_delta"]
+
+    db.session.expire_all()
+    incremental = {
+        row.muscle_group_id: (float(row.total_volume), float(row.total_reps), float(row.total_sets))
+        for row in WorkoutMuscleGroupImpact.query.filter_by(workout_id=workout.workout_id)
+    }
+    expected = {
+        mg_id: (round(data["volume"], 2), round(data["reps"], 2), round(data["sets"], 2))
+        for mg_id, data in StatsService.build_workout_impacts(workout).items()
+    }
+    assert incremental.keys() == expected.keys()
+    for mg_id, values in expected.items():
+        assert incremental[mg_id] == pytest.approx(values, abs=0.02)
+
+
+def test_other_users_cannot_sync(app, client, workout):
+    intruder = User(username="intruder", password_hash="x")
+    db.session.add(intruder)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['user_id'] = intruder.user_id
+
+    response = _sync(client, workout, [{"seq": 1, "set_id": _set_ids(workout)[0], "reps": 1}])
+
+    assert response.status_code == 404
+    assert SetEntry.query.filter_by(reps=1).count() == 0
+
+
+def test_stale_edits_come_back_as_conflicts(app, client, workout):
+    first, second = _set_ids(workout)[:2]
+    response = _sync(client, workout, [{"seq": 1, "set_id": first, "reps": 6, "base_updated_at": None}],
+                     client_id="phone")
+    version = response.get_json()["sets"][str(first)]
+
+    # An offline tab still holds the original (never-updated) version of both sets
+    response = client.post(f'/workout/{workout.workout_id}/sync_sets', json={
+        "client_id": "tablet",
+        "detect_conflicts": True,
+        "changes": [
+            {"seq": 1, "set_id": first, "reps": 12, "base_updated_at": None},
+            {"seq": 2, "set_id": second, "reps": 5, "base_updated_at": None},
+        ],
+    })
+
+    payload = response.get_json()
+    assert payload["applied"] == [2]
+    assert payload["conflicts"] == [
+        {"seq": 1, "set_id": first, "reps": 6, "weight": 50.0, "is_bodyweight": False, "updated_at": version}
+    ]
+    assert payload["last_seq"] == 2
+    db.session.expire_all()
+    assert db.session.get(Set, first).reps[0].rep_count == 6
+    assert db.session.get(Set, second).reps[0].rep_count == 5
+
+
+def test_current_version_is_accepted(app, client, workout):
+    set_id = _set_ids(workout)[0]
+    body = {"client_id": "phone", "detect_conflicts": True}
+    first = client.post(f'/workout/{workout.workout_id}/sync_sets', json={
+        **body, "changes": [{"seq": 1, "set_id": set_id, "reps": 6, "base_updated_at": None}],
+    }).get_json()
+
+    second = client.post(f'/workout/{workout.workout_id}/sync_sets', json={
+        **body, "changes": [{"seq": 2, "set_id": set_id, "reps": 7, "base_updated_at": first["sets"][str(set_id)]}],
+    }).get_json()
+
+    assert second["applied"] == [2]
+    assert second["conflicts"] == []
+
+
+def test_form_save_bumps_set_version(app, client, workout):
+    set_id = _set_ids(workout)[0]
+    client.post(f'/update_workout/{workout.workout_id}', data={f"rep_{set_id}": "4"})
+
+    response = client.post(f'/workout/{workout.workout_id}/sync_sets', json={
+        "client_id": "phone",
+        "detect_conflicts": True,
+        "changes": [{"seq": 1, "set_id": set_id, "reps": 9, "base_updated_at": None}],
+    })
+
+    assert [c["set_id"] for c in response.get_json()["conflicts"]] == [set_id]
+    db.session.expire_all()
+    assert db.session.get(Set, set_id).reps[0].rep_count == 4
+
+
+def test_oversized_batch_is_rejected(app, client, workout):
+    changes = [{"seq": i + 1, "set_id": _set_ids(workout)[0], "reps": 5}
+               for i in range(WorkoutService.MAX_SYNC_CHANGES + 1)]
+
+    assert _sync(client, workout, changes).status_code == 413